@@ -7,6 +7,7 @@ import copy
 import time
 from fnmatch import translate
 from math import isinf, isnan
+from operator import itemgetter
 from os.path import isfile
 from re import compile
 
@@ -1054,70 +1055,55 @@ class OpenMetricsScraperMixin(object):
     def _compute_bucket_hash(self, tags):
         # we need the unique context for all the buckets
         # hence we remove the "le" tag
-        return hash(frozenset(sorted((k, v) for k, v in tags.items() if k != 'le')))
+        return frozenset((k, v) for k, v in tags.items() if k != 'le')
 
     def _decumulate_histogram_buckets(self, metric):
         """
         Decumulate buckets in a given histogram metric and adds the lower_bound label (le being upper_bound)
-        """
-        bucket_values_by_context_upper_bound = {}
-        for sample in metric.samples:
-            if sample[self.SAMPLE_NAME].endswith("_bucket"):
-                context_key = self._compute_bucket_hash(sample[self.SAMPLE_LABELS])
-                if context_key not in bucket_values_by_context_upper_bound:
-                    bucket_values_by_context_upper_bound[context_key] = {}
-                bucket_values_by_context_upper_bound[context_key][float(sample[self.SAMPLE_LABELS]["le"])] = sample[
-                    self.SAMPLE_VALUE
-                ]
-
-        sorted_buckets_by_context = {}
-        for context in bucket_values_by_context_upper_bound:
-            sorted_buckets_by_context[context] = sorted(bucket_values_by_context_upper_bound[context])
-
-        # Tuples (lower_bound, upper_bound, value)
-        bucket_tuples_by_context_upper_bound = {}
-        for context in sorted_buckets_by_context:
-            for i, upper_b in enumerate(sorted_buckets_by_context[context]):
-                if i == 0:
-                    if context not in bucket_tuples_by_context_upper_bound:
-                        bucket_tuples_by_context_upper_bound[context] = {}
-                    if upper_b > 0:
-                        # positive buckets start at zero
-                        bucket_tuples_by_context_upper_bound[context][upper_b] = (
-                            0,
-                            upper_b,
-                            bucket_values_by_context_upper_bound[context][upper_b],
-                        )
-                    else:
-                        # negative buckets start at -inf
-                        bucket_tuples_by_context_upper_bound[context][upper_b] = (
-                            self.MINUS_INF,
-                            upper_b,
-                            bucket_values_by_context_upper_bound[context][upper_b],
-                        )
-                    continue
-                tmp = (
-                    bucket_values_by_context_upper_bound[context][upper_b]
-                    - bucket_values_by_context_upper_bound[context][sorted_buckets_by_context[context][i - 1]]
-                )
-                bucket_tuples_by_context_upper_bound[context][upper_b] = (
-                    sorted_buckets_by_context[context][i - 1],
-                    upper_b,
-                    tmp,
-                )
 
-        # modify original metric to inject lower_bound & modified value
-        for i, sample in enumerate(metric.samples):
+        The exposition format lists the buckets of each context one after the other by increasing upper bound, so
+        they are grouped in a single pass by comparing the labels of each bucket with the previous one. Only the
+        contexts whose buckets are not in order are sorted.
+        """
+        samples = metric.samples
+        # The (upper bound, sample index) of the buckets of each context, by labels other than `le`
+        buckets_by_context = {}
+        unordered_contexts = set()
+        context = context_labels = buckets = None
+        for i, sample in enumerate(samples):
             if not sample[self.SAMPLE_NAME].endswith("_bucket"):
                 continue
 
-            context_key = self._compute_bucket_hash(sample[self.SAMPLE_LABELS])
-            matching_bucket_tuple = bucket_tuples_by_context_upper_bound[context_key][
-                float(sample[self.SAMPLE_LABELS]["le"])
-            ]
-            # Replacing the sample tuple
-            sample[self.SAMPLE_LABELS]["lower_bound"] = str(matching_bucket_tuple[0])
-            metric.samples[i] = Sample(sample[self.SAMPLE_NAME], sample[self.SAMPLE_LABELS], matching_bucket_tuple[2])
+            labels = sample[self.SAMPLE_LABELS]
+            upper_bound = float(labels["le"])
+            if buckets is None or not _is_same_bucket_context(labels, context_labels):
+                context = self._compute_bucket_hash(labels)
+                context_labels = labels
+                buckets = buckets_by_context.get(context)
+                if buckets is None:
+                    buckets = buckets_by_context[context] = []
+                else:
+                    # The buckets of this context are split across the samples
+                    unordered_contexts.add(context)
+            elif upper_bound <= buckets[-1][0]:
+                unordered_contexts.add(context)
+            buckets.append((upper_bound, i))
+
+        for context, buckets in buckets_by_context.items():
+            if context in unordered_contexts:
+                buckets.sort(key=itemgetter(0))
+
+            # positive buckets start at zero, negative buckets start at -inf
+            lower_bound = 0 if buckets[0][0] > 0 else self.MINUS_INF
+            previous_value = 0
+            for upper_bound, i in buckets:
+                sample = samples[i]
+                value = sample[self.SAMPLE_VALUE]
+                # Replacing the sample tuple to inject lower_bound & modified value
+                sample[self.SAMPLE_LABELS]["lower_bound"] = str(lower_bound)
+                samples[i] = Sample(sample[self.SAMPLE_NAME], sample[self.SAMPLE_LABELS], value - previous_value)
+                lower_bound = upper_bound
+                previous_value = value
 
     def _submit_sample_histogram_buckets(self, metric_name, sample, scraper_config, hostname=None):
         if "lower_bound" not in sample[self.SAMPLE_LABELS] or "le" not in sample[self.SAMPLE_LABELS]:
@@ -1262,3 +1248,15 @@ class OpenMetricsScraperMixin(object):
 
     def _summary_from_seconds_to_microseconds(self, metric_name):
         return self._summary_convert_values(metric_name, lambda v: v * self.MICROS_IN_S)
+
+
+def _is_same_bucket_context(labels, other_labels):
+    """
+    Return whether two buckets belong to the same context, which is the case when all their labels but `le` match.
+    """
+    if len(labels) != len(other_labels):
+        return False
+    for key, value in labels.items():
+        if key != 'le' and other_labels.get(key) != value:
+            return False
+    return True
@@ -2,6 +2,7 @@
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
 from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor, wait
 from contextlib import contextmanager
 
 from requests.exceptions import RequestException
@@ -51,6 +52,10 @@ class OpenMetricsBaseCheckV2(AgentCheck):
         # All configured scrapers keyed by the endpoint
         self.scrapers = {}
 
+        # Maximum number of endpoints fetched at the same time, scrapes are sequential by default
+        self.scrape_concurrency = 1
+        self._scrape_executor = None
+
         self.check_initializations.append(self.configure_scrapers)
 
     def check(self, _):
@@ -64,6 +69,9 @@ class OpenMetricsBaseCheckV2(AgentCheck):
         """
         self.refresh_scrapers()
 
+        if self.scrape_concurrency > 1 and len(self.scrapers) > 1:
+            self.prefetch_responses()
+
         for endpoint, scraper in self.scrapers.items():
             self.log.debug('Scraping OpenMetrics endpoint: %s', endpoint)
 
@@ -74,11 +82,32 @@ class OpenMetricsBaseCheckV2(AgentCheck):
                     self.log.error("There was an error scraping endpoint %s: %s", endpoint, str(e))
                     raise type(e)("There was an error scraping endpoint {}: {}".format(endpoint, e)) from None
 
+    def prefetch_responses(self):
+        """
+        Fetch the payload of every endpoint concurrently before the scrapers process them one after another.
+
+        Only the network I/O is parallelized, parsing and submission remain on the check thread so that the
+        order of submissions, health checks and telemetry of each scraper is unchanged.
+        """
+
+        if self._scrape_executor is None:
+            self._scrape_executor = ThreadPoolExecutor(
+                max_workers=self.scrape_concurrency, thread_name_prefix=f'{self.name}-scraper'
+            )
+
+        wait([self._scrape_executor.submit(scraper.prefetch_response) for scraper in self.scrapers.values()])
+
     def configure_scrapers(self):
         """
         Creates a scraper configuration for each instance.
         """
 
+        scrape_concurrency = self.instance.get('scrape_concurrency', 1)
+        if not isinstance(scrape_concurrency, int) or scrape_concurrency < 1:
+            raise ConfigurationError('Setting `scrape_concurrency` must be an integer greater than 0')
+
+        self.scrape_concurrency = scrape_concurrency
+
         scrapers = {}
 
         for config in self.scraper_configs:
@@ -112,6 +141,11 @@ class OpenMetricsBaseCheckV2(AgentCheck):
     def refresh_scrapers(self):
         pass
 
+    def cancel(self):
+        if self._scrape_executor is not None:
+            self._scrape_executor.shutdown(wait=False)
+            self._scrape_executor = None
+
     @contextmanager
     def adopt_namespace(self, namespace):
         old_namespace = self.__NAMESPACE__
@@ -0,0 +1,416 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import re
+from math import isinf
+from sys import intern
+
+from google.protobuf.internal.decoder import _DecodeVarint32  # pylint: disable=E0611,E0401
+from prometheus_client.metrics_core import Metric
+from prometheus_client.samples import Sample
+from prometheus_client.utils import floatToGoString
+
+from ....utils.prometheus import metrics_pb2
+
+ESCAPE_SEQUENCES = {'\\\\': '\\', '\\n': '\n', '\\"': '"'}
+HELP_ESCAPING = re.compile(r'\\[\\n]')
+LABEL_ESCAPING = re.compile(r'\\[\\n"]')
+LABEL_PAIRS = re.compile(r'([^\s=,{}]+)\s*=\s*"((?:[^"\\]|\\.)*)"')
+LABEL_NAME_NOISE = ' \t,='
+
+new_sample = tuple.__new__
+
+ALLOWED_SUFFIXES = {
+    'summary': ('_count', '_sum', ''),
+    'histogram': ('_count', '_sum', '_bucket'),
+}
+DEFAULT_SUFFIXES = ('',)
+
+PROTOBUF_METRIC_TYPES = {
+    metrics_pb2.COUNTER: 'counter',
+    metrics_pb2.GAUGE: 'gauge',
+    metrics_pb2.SUMMARY: 'summary',
+    metrics_pb2.UNTYPED: 'untyped',
+    metrics_pb2.HISTOGRAM: 'histogram',
+    metrics_pb2.GAUGE_HISTOGRAM: 'gaugehistogram',
+}
+
+
+def replace_escape_sequence(match):
+    return ESCAPE_SEQUENCES[match.group(0)]
+
+
+class MetricFamilyParser:
+    """
+    Skips metric families based on the `exclude_family` predicate, which is evaluated once per family name.
+    """
+
+    def __init__(self, exclude_family=None):
+        self.exclude_family = exclude_family
+
+        # Family name -> whether its samples are skipped, evaluated only once per name
+        self.family_exclusions = {}
+
+        # Reset on every parse
+        self.excluded_samples = 0
+
+    def is_excluded(self, name, metric_type):
+        if self.exclude_family is None:
+            return False
+
+        if metric_type == 'counter' and name.endswith('_total'):
+            name = name[:-6]
+
+        excluded = self.family_exclusions.get(name)
+        if excluded is None:
+            excluded = self.family_exclusions[name] = bool(self.exclude_family(name))
+
+        return excluded
+
+
+class FastTextParser(MetricFamilyParser):
+    """
+    A parser for the Prometheus text exposition format that works directly on the raw response bytes.
+
+    The payload is decoded one chunk at a time and every sample is tokenized with a single pass, metric and
+    label names are interned since the same few are repeated for every series. The `exclude_family`
+    predicate is evaluated once per metric family name and samples of excluded families are skipped
+    before any label is parsed or any object is built, likewise lines matching `line_filter` are never parsed.
+
+    The produced families are identical to those of `prometheus_client.parser.text_fd_to_metric_families`.
+    """
+
+    def __init__(self, exclude_family=None, line_filter=None):
+        super().__init__(exclude_family)
+        self.line_filter = line_filter
+
+        # Reset on every parse
+        self.filtered_lines = 0
+
+    def parse(self, chunks, encoding='utf-8'):
+        """
+        Yield a `Metric` for every non-excluded family found in an iterable of byte chunks.
+        """
+        self.excluded_samples = 0
+        self.filtered_lines = 0
+
+        yield from self.parse_lines(self.iter_lines(chunks, encoding))
+
+    def iter_lines(self, chunks, encoding):
+        line_filter = self.line_filter
+        remainder = b''
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+
+            # Only complete lines are decoded, which is safe as no multi-byte sequence contains a newline byte
+            end = chunk.rfind(b'\n')
+            if end == -1:
+                remainder += chunk
+                continue
+
+            lines = (remainder + chunk[:end]).decode(encoding).splitlines()
+            remainder = chunk[end + 1 :]
+
+            if line_filter is not None:
+                lines = self.filter_lines(lines)
+
+            yield lines
+
+        if remainder:
+            lines = remainder.decode(encoding).splitlines()
+            if line_filter is not None:
+                lines = self.filter_lines(lines)
+
+            yield lines
+
+    def filter_lines(self, lines):
+        search = self.line_filter.search
+        kept = [line for line in lines if not search(line)]
+        self.filtered_lines += len(lines) - len(kept)
+        return kept
+
+    def parse_lines(self, line_batches):
+        name = ''
+        documentation = ''
+        metric_type = 'untyped'
+        samples = []
+        allowed_names = ()
+        skip = False
+
+        for lines in line_batches:
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+
+                if line[0] == '#':
+                    parts = line.split(None, 3)
+                    if len(parts) < 3:
+                        continue
+
+                    directive = parts[1]
+                    if directive == 'HELP':
+                        if parts[2] != name:
+                            if name and not skip:
+                                yield build_metric(name, documentation, metric_type, samples)
+
+                            name = intern(parts[2])
+                            metric_type = 'untyped'
+                            samples = []
+                            allowed_names = (name,)
+                            skip = self.is_excluded(name, metric_type)
+
+                        documentation = HELP_ESCAPING.sub(replace_escape_sequence, parts[3]) if len(parts) == 4 else ''
+                    elif directive == 'TYPE':
+                        if parts[2] != name:
+                            if name and not skip:
+                                yield build_metric(name, documentation, metric_type, samples)
+
+                            name = intern(parts[2])
+                            documentation = ''
+                            samples = []
+
+                        metric_type = parts[3]
+                        allowed_names = tuple(
+                            intern(name + suffix) for suffix in ALLOWED_SUFFIXES.get(metric_type, DEFAULT_SUFFIXES)
+                        )
+                        skip = self.is_excluded(name, metric_type)
+
+                    continue
+
+                label_start = line.find('{')
+                if label_start == -1:
+                    tokens = line.split()
+                    sample_name = tokens[0]
+                else:
+                    tokens = None
+                    sample_name = line[:label_start].strip()
+
+                if sample_name not in allowed_names:
+                    if name and not skip:
+                        yield build_metric(name, documentation, metric_type, samples)
+
+                    # New metric, yield immediately as untyped singleton
+                    name = ''
+                    documentation = ''
+                    metric_type = 'untyped'
+                    samples = []
+                    allowed_names = ()
+                    skip = False
+
+                    if self.is_excluded(sample_name, metric_type):
+                        self.excluded_samples += 1
+                    else:
+                        yield build_metric(
+                            sample_name, '', 'untyped', [parse_sample(line, sample_name, label_start, tokens)]
+                        )
+
+                    continue
+                elif skip:
+                    self.excluded_samples += 1
+                    continue
+
+                samples.append(parse_sample(line, sample_name, label_start, tokens))
+
+        if name and not skip:
+            yield build_metric(name, documentation, metric_type, samples)
+
+
+class ProtobufParser(MetricFamilyParser):
+    """
+    A parser for the delimited protobuf exposition format, a sequence of `MetricFamily` messages each
+    prefixed by its size as a varint.
+
+    Families are converted to the same samples as those produced for the text format. Histograms exposing
+    no classic buckets are considered native histograms, whose sparse exponential buckets are expanded into
+    cumulative `le` buckets so that the histogram transformer can handle both kinds.
+    """
+
+    def parse(self, payload):
+        """
+        Yield a `Metric` for every non-excluded family found in the raw payload.
+        """
+        self.excluded_samples = 0
+
+        position = 0
+        end = len(payload)
+        while position < end:
+            size, position = _DecodeVarint32(payload, position)
+            family = metrics_pb2.MetricFamily.FromString(payload[position : position + size])
+            position += size
+
+            name = intern(family.name)
+            metric_type = PROTOBUF_METRIC_TYPES.get(family.type, 'untyped')
+            if self.is_excluded(name, metric_type):
+                self.excluded_samples += len(family.metric)
+                continue
+
+            samples = []
+            for metric in family.metric:
+                samples.extend(iter_protobuf_samples(name, metric_type, metric))
+
+            yield build_metric(name, family.help, metric_type, samples)
+
+
+def parse_sample(line, name, label_start, tokens):
+    if tokens is None:
+        label_end = line.rindex('}')
+        tokens = line[label_end + 1 :].split()
+        labels_string = line[label_start + 1 : label_end]
+
+        if '\\' in labels_string:
+            labels = {
+                intern(label): LABEL_ESCAPING.sub(replace_escape_sequence, value)
+                for label, value in LABEL_PAIRS.findall(labels_string)
+            }
+        else:
+            # Without escape sequences no label value may contain a quote, so splitting on quotes alternates
+            # between `name=` fragments and values e.g. `a="1",b="2",` -> ['a=', '1', ',b=', '2', ',']
+            parts = labels_string.split('"')
+            labels = dict(zip([intern(label.strip(LABEL_NAME_NOISE)) for label in parts[0:-1:2]], parts[1::2]))
+
+        value = float(tokens[0])
+        timestamp = float(tokens[-1]) / 1000 if len(tokens) > 1 else None
+    else:
+        labels = {}
+        value = float(tokens[1])
+        timestamp = float(tokens[-1]) / 1000 if len(tokens) > 2 else None
+
+    # Bypass the keyword handling of the named tuple constructor
+    return new_sample(Sample, (intern(name), labels, value, timestamp, None))
+
+
+def iter_protobuf_samples(name, metric_type, metric):
+    labels = {intern(label.name): label.value for label in metric.label}
+    timestamp = metric.timestamp_ms / 1000 if metric.HasField('timestamp_ms') else None
+
+    # Every sample gets its own labels as they are modified in place during processing
+    if metric_type == 'counter':
+        yield new_sample(Sample, (name, labels, metric.counter.value, timestamp, None))
+    elif metric_type == 'gauge':
+        yield new_sample(Sample, (name, labels, metric.gauge.value, timestamp, None))
+    elif metric_type == 'summary':
+        summary = metric.summary
+        for quantile in summary.quantile:
+            quantile_labels = {**labels, 'quantile': floatToGoString(quantile.quantile)}
+            yield new_sample(Sample, (name, quantile_labels, quantile.value, timestamp, None))
+
+        yield new_sample(Sample, (intern(name + '_sum'), dict(labels), summary.sample_sum, timestamp, None))
+        yield new_sample(Sample, (intern(name + '_count'), labels, float(summary.sample_count), timestamp, None))
+    elif metric_type in ('histogram', 'gaugehistogram'):
+        histogram = metric.histogram
+        if histogram.HasField('sample_count_float'):
+            count = histogram.sample_count_float
+        else:
+            count = float(histogram.sample_count)
+
+        if histogram.bucket:
+            buckets = [
+                (
+                    bucket.upper_bound,
+                    (
+                        bucket.cumulative_count_float
+                        if bucket.HasField('cumulative_count_float')
+                        else bucket.cumulative_count
+                    ),
+                )
+                for bucket in histogram.bucket
+            ]
+        else:
+            buckets = get_native_histogram_buckets(histogram)
+
+        # Unlike the text format, the `+Inf` bucket is implicit
+        if not buckets or not isinf(buckets[-1][0]):
+            buckets.append((float('inf'), count))
+
+        bucket_name = intern(name + '_bucket')
+        for upper_bound, cumulative_count in buckets:
+            bucket_labels = {**labels, 'le': floatToGoString(upper_bound)}
+            yield new_sample(Sample, (bucket_name, bucket_labels, float(cumulative_count), timestamp, None))
+
+        if metric_type == 'histogram':
+            sum_name, count_name = intern(name + '_sum'), intern(name + '_count')
+        else:
+            sum_name, count_name = intern(name + '_gsum'), intern(name + '_gcount')
+
+        yield new_sample(Sample, (sum_name, dict(labels), histogram.sample_sum, timestamp, None))
+        yield new_sample(Sample, (count_name, labels, count, timestamp, None))
+    else:
+        yield new_sample(Sample, (name, labels, metric.untyped.value, timestamp, None))
+
+
+def get_native_histogram_buckets(histogram):
+    """
+    Expand the sparse buckets of a native histogram into cumulative buckets sorted by upper bound.
+
+    https://prometheus.io/docs/specs/native_histograms/
+    """
+    if not (
+        histogram.positive_span
+        or histogram.negative_span
+        or histogram.zero_threshold
+        or histogram.zero_count
+        or histogram.zero_count_float
+    ):
+        return []
+
+    # Bucket boundaries are powers of `2 ** (2 ** -schema)`, positive bucket `i` ending at `base ** i`
+    exponent_factor = 2.0**-histogram.schema
+    buckets = []
+    cumulative_count = 0
+
+    negative_buckets = list(
+        iter_native_histogram_buckets(histogram.negative_span, histogram.negative_delta, histogram.negative_count)
+    )
+    for index, count in reversed(negative_buckets):
+        cumulative_count += count
+        buckets.append((-(2.0 ** ((index - 1) * exponent_factor)), cumulative_count))
+
+    cumulative_count += histogram.zero_count_float if histogram.HasField('zero_count_float') else histogram.zero_count
+    buckets.append((histogram.zero_threshold, cumulative_count))
+
+    for index, count in iter_native_histogram_buckets(
+        histogram.positive_span, histogram.positive_delta, histogram.positive_count
+    ):
+        cumulative_count += count
+        buckets.append((2.0 ** (index * exponent_factor), cumulative_count))
+
+    return buckets
+
+
+def iter_native_histogram_buckets(spans, deltas, counts):
+    """
+    Yield the index and the count of every populated bucket of one side of a native histogram.
+
+    Integer counts are delta encoded across all spans while float counts are absolute. The offset of the
+    first span is the index of its first bucket, the other offsets are relative to the end of the previous span.
+    """
+    index = 0
+    position = 0
+    count = 0
+    for span in spans:
+        index += span.offset
+        for _ in range(span.length):
+            if counts:
+                count = counts[position]
+            else:
+                count += deltas[position]
+
+            yield index, count
+            index += 1
+            position += 1
+
+
+def build_metric(name, documentation, metric_type, samples):
+    # Munge counters into the OpenMetrics representation used internally
+    if metric_type == 'counter':
+        if name.endswith('_total'):
+            name = name[:-6]
+        else:
+            samples = [Sample(intern(sample.name + '_total'), *sample[1:]) for sample in samples]
+
+    metric = Metric(name, documentation, metric_type)
+    metric.samples = samples
+    return metric
@@ -2,8 +2,10 @@
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
 import fnmatch
+import hashlib
 import inspect
 import re
+from contextlib import contextmanager
 from copy import copy, deepcopy
 from itertools import chain
 from math import isinf, isnan
@@ -20,10 +22,27 @@ from ....constants import ServiceCheck
 from ....errors import ConfigurationError
 from ....utils.functions import no_op, return_true
 from ....utils.http import RequestsWrapper
+from ....utils.time import get_precise_time
 from .first_scrape_handler import first_scrape_handler
 from .labels import LabelAggregator, get_label_normalizer
+from .parser import FastTextParser, ProtobufParser
+from .tag_cache import SeriesTagCache
 from .transform import MetricTransformer
 
+# Size of the raw chunks read from the response when using the fast text parser
+FAST_PARSER_CHUNK_SIZE = 65536
+
+PROTOBUF_MEDIA_TYPE = 'application/vnd.google.protobuf'
+PROTOBUF_ACCEPT_HEADER = f'{PROTOBUF_MEDIA_TYPE};proto=io.prometheus.client.MetricFamily;encoding=delimited'
+
+PROCESSED_METRIC_SAMPLES_TELEMETRY = 'telemetry.metrics.processed.count'
+
+
+class UnchangedPayload(Exception):
+    """
+    Raised when the payload is identical to the one of the previous scrape, which can be replayed instead.
+    """
+
 
 class OpenMetricsScraper:
     """
@@ -223,12 +242,51 @@ class OpenMetricsScraper:
         else:
             accept_header = 'text/plain'
 
+        self.protobuf_parser = None
+        if is_affirmative(config.get('use_protobuf', False)):
+            self.protobuf_parser = ProtobufParser(exclude_family=self.exclude_metric_family)
+            # Endpoints that do not support protobuf will fall back to the text formats
+            accept_header = f'{PROTOBUF_ACCEPT_HEADER},{accept_header}'
+
         # Request the appropriate exposition format
         if self.http.options['headers'].get('Accept') == '*/*':
             self.http.options['headers']['Accept'] = accept_header
 
         self.use_process_start_time = is_affirmative(config.get('use_process_start_time'))
 
+        text_parser = config.get('text_parser', 'prometheus_client')
+        if text_parser not in ('prometheus_client', 'fast'):
+            raise ConfigurationError('Setting `text_parser` must be one of: prometheus_client, fast')
+
+        self.fast_text_parser = None
+        if text_parser == 'fast':
+            self.fast_text_parser = FastTextParser(
+                exclude_family=self.exclude_metric_family,
+                line_filter=self.raw_line_filter,
+            )
+
+        tag_cache_size = config.get('tag_cache_size', 0)
+        if not isinstance(tag_cache_size, int) or tag_cache_size < 0:
+            raise ConfigurationError('Setting `tag_cache_size` must be a positive integer')
+
+        self.tag_cache = None
+        if tag_cache_size:
+            self.tag_cache = SeriesTagCache(tag_cache_size, self.compute_sample_tags)
+
+        self.skip_unchanged_payloads = is_affirmative(config.get('skip_unchanged_payloads', False))
+
+        # Submissions of the last scrape, only kept if they can be replayed as is for an unchanged payload
+        self._replayable_submissions = None
+        self._payload_fingerprint = None
+        self._payload_validators = {}
+        # Describe the payload being processed, only kept once its submissions have been recorded
+        self._pending_payload_fingerprint = None
+        self._pending_payload_validators = {}
+
+        # Set when the response was fetched ahead of the scrape, see `prefetch_response`
+        self._prefetched_response = None
+        self._fetch_duration = None
+
         # Used for monotonic counts
         self.flush_first_value = False
 
@@ -236,16 +294,111 @@ class OpenMetricsScraper:
         """
         Execute a scrape, and for each metric collected, transform the metric.
         """
+        start_time = get_precise_time()
         runtime_data = {'flush_first_value': self.flush_first_value, 'static_tags': self.static_tags}
 
+        if self.skip_unchanged_payloads:
+            try:
+                self.transform_and_record_metrics(runtime_data)
+            except UnchangedPayload:
+                self.replay_submissions()
+        else:
+            for metric in self.consume_metrics(runtime_data):
+                transformer = self.metric_transformer.get(metric)
+                if transformer is None:
+                    continue
+
+                transformer(metric, self.generate_sample_data(metric), runtime_data)
+
+        self.flush_first_value = True
+
+        # Only available for concurrent scrapes, where fetching and processing the payload are separate steps
+        if self._fetch_duration is not None:
+            self.submit_telemetry_fetch_duration(self._fetch_duration)
+            self.submit_telemetry_scrape_duration(get_precise_time() - start_time)
+            self._fetch_duration = None
+
+        if self.tag_cache is not None:
+            self.submit_telemetry_tag_cache()
+            self.tag_cache.reset_stats()
+
+    def transform_and_record_metrics(self, runtime_data):
+        """
+        Transform every metric while recording the submissions, which are kept only if the payload is gauge-only.
+        """
+
+        replayable = True
+        submissions = []
+
         for metric in self.consume_metrics(runtime_data):
             transformer = self.metric_transformer.get(metric)
             if transformer is None:
                 continue
 
-            transformer(metric, self.generate_sample_data(metric), runtime_data)
+            if replayable and not self.metric_transformer.submits_gauges_only(metric, transformer):
+                replayable = False
+                submissions.clear()
 
-        self.flush_first_value = True
+            if replayable:
+                with self.record_submissions(submissions):
+                    transformer(metric, self.generate_sample_data(metric), runtime_data)
+            else:
+                transformer(metric, self.generate_sample_data(metric), runtime_data)
+
+        if replayable:
+            self._replayable_submissions = submissions
+            self._payload_fingerprint = self._pending_payload_fingerprint
+            self._payload_validators = self._pending_payload_validators
+        else:
+            self._replayable_submissions = None
+            self._payload_fingerprint = None
+            self._payload_validators = {}
+
+    @contextmanager
+    def record_submissions(self, submissions):
+        # Every metric submission method of the check goes through `_submit_metric`
+        submit_metric = self.check._submit_metric
+
+        def record(*args, **kwargs):
+            # Replaying a payload skips its parsing, so the telemetry counting the parsed samples is not replayed
+            # either, like the counts of input and ignored samples which are submitted outside of transformers
+            if args[1] != PROCESSED_METRIC_SAMPLES_TELEMETRY:
+                submissions.append((args, kwargs))
+            submit_metric(*args, **kwargs)
+
+        self.check._submit_metric = record
+        try:
+            yield
+        finally:
+            del self.check._submit_metric
+
+    def replay_submissions(self):
+        submit_metric = self.check._submit_metric
+        for args, kwargs in self._replayable_submissions:
+            submit_metric(*args, **kwargs)
+
+        self.submit_telemetry_number_of_skipped_parses()
+
+    def detect_unchanged_payload(self, response):
+        """
+        Raise `UnchangedPayload` if the response is identical to the one of the last replayable scrape.
+        """
+
+        if response.status_code == 304:
+            response.close()
+            raise UnchangedPayload
+
+        fingerprint = hashlib.blake2b(response.content, digest_size=16).digest()
+        if fingerprint == self._payload_fingerprint and self._replayable_submissions is not None:
+            response.close()
+            raise UnchangedPayload
+
+        self._pending_payload_fingerprint = fingerprint
+        self._pending_payload_validators = {}
+        for header, validator in (('ETag', 'If-None-Match'), ('Last-Modified', 'If-Modified-Since')):
+            value = response.headers.get(header)
+            if value:
+                self._pending_payload_validators[validator] = value
 
     def consume_metrics(self, runtime_data):
         """
@@ -269,7 +422,27 @@ class OpenMetricsScraper:
 
     def parse_metrics(self):
         """
-        Get the line streamer and yield processed metrics.
+        Get the metric families and yield processed metrics.
+        """
+
+        if self.protobuf_parser is not None or (self.fast_text_parser is not None and not self._use_latest_spec):
+            metric_families = self.parse_connection_chunks()
+        else:
+            metric_families = self.parse_connection_lines()
+
+        for metric in metric_families:
+            self.submit_telemetry_number_of_total_metric_samples(metric)
+
+            # It is critical that the prefix is removed immediately so that
+            # all other configuration may reference the trimmed metric name
+            if self.raw_metric_prefix and metric.name.startswith(self.raw_metric_prefix):
+                metric.name = metric.name[len(self.raw_metric_prefix) :]
+
+            yield metric
+
+    def parse_connection_lines(self):
+        """
+        Get the line streamer and yield metric families.
         """
 
         line_streamer = self.stream_connection_lines()
@@ -285,15 +458,73 @@ class OpenMetricsScraper:
             # If line_streamer is an empty iterator, next(line_streamer) fails.
             return
 
-        for metric in self.parse_metric_families(line_streamer):
-            self.submit_telemetry_number_of_total_metric_samples(metric)
+        yield from self.parse_metric_families(line_streamer)
 
-            # It is critical that the prefix is removed immediately so that
-            # all other configuration may reference the trimmed metric name
-            if self.raw_metric_prefix and metric.name.startswith(self.raw_metric_prefix):
-                metric.name = metric.name[len(self.raw_metric_prefix) :]
+    def parse_connection_chunks(self):
+        """
+        Decode the raw response with the protobuf or the fast text parser and yield metric families.
 
-            yield metric
+        Payloads in the OpenMetrics format, or in the text format when the fast text parser is not
+        enabled, are still handled by `prometheus_client`. Raw line filters do not apply to protobuf payloads.
+        """
+
+        try:
+            with self.get_connection() as connection:
+                self._content_type = connection.headers.get('Content-Type', '')
+                media_type = self._content_type.split(';')[0]
+                if media_type == PROTOBUF_MEDIA_TYPE and self.protobuf_parser is not None:
+                    parser = self.protobuf_parser
+                    yield from parser.parse(connection.content)
+
+                    if parser.excluded_samples:
+                        self.submit_telemetry_number_of_excluded_metric_samples(parser.excluded_samples)
+                    return
+                elif (
+                    self.fast_text_parser is None
+                    or self._use_latest_spec
+                    or media_type == 'application/openmetrics-text'
+                ):
+                    line_streamer = connection.iter_lines(decode_unicode=True)
+                    if self.raw_line_filter is not None:
+                        line_streamer = self.filter_connection_lines(line_streamer)
+
+                    yield from self.parse_metric_families(line_streamer)
+                    return
+
+                parser = self.fast_text_parser
+                yield from parser.parse(connection.iter_content(FAST_PARSER_CHUNK_SIZE), connection.encoding)
+
+                if parser.excluded_samples:
+                    self.submit_telemetry_number_of_excluded_metric_samples(parser.excluded_samples)
+                if parser.filtered_lines:
+                    self.submit_telemetry_number_of_ignored_lines(parser.filtered_lines)
+        except ConnectionError as e:
+            if self.ignore_connection_errors:
+                self.log.warning("OpenMetrics endpoint %s is not accessible", self.endpoint)
+            else:
+                raise e
+
+    def exclude_metric_family(self, name):
+        """
+        Whether or not the fast text parser may skip every sample of a metric family.
+
+        Families required by `share_labels` or by the first scrape handler are always parsed.
+        """
+
+        if self.raw_metric_prefix and name.startswith(self.raw_metric_prefix):
+            name = name[len(self.raw_metric_prefix) :]
+
+        if not (
+            name in self.exclude_metrics
+            or (self.exclude_metrics_pattern is not None and self.exclude_metrics_pattern.search(name))
+        ):
+            return False
+        elif self.label_aggregator.configured and name in self.label_aggregator.metric_config:
+            return False
+        elif self.use_process_start_time and name == 'process_start_time_seconds':
+            return False
+
+        return True
 
     @property
     def parse_metric_families(self):
@@ -314,6 +545,7 @@ class OpenMetricsScraper:
         """
 
         label_normalizer = get_label_normalizer(metric.type)
+        tag_cache = self.tag_cache
 
         for sample in metric.samples:
             value = sample.value
@@ -321,39 +553,51 @@ class OpenMetricsScraper:
                 self.log.debug('Ignoring sample for metric `%s` as it has an invalid value: %s', metric.name, value)
                 continue
 
-            tags = []
-            skip_sample = False
             labels = sample.labels
             self.label_aggregator.populate(labels)
             label_normalizer(labels)
 
-            for label_name, label_value in labels.items():
-                sample_excluder = self.exclude_metrics_by_labels.get(label_name)
-                if sample_excluder is not None and sample_excluder(label_value):
-                    skip_sample = True
-                    break
-                elif label_name in self.exclude_labels:
-                    continue
-                elif self.include_labels and label_name not in self.include_labels:
-                    continue
-
-                label_name = self.rename_labels.get(label_name, label_name)
-                tags.append(f'{label_name}:{label_value}')
+            if tag_cache is None:
+                sample_tags = self.compute_sample_tags(labels)
+            else:
+                sample_tags = tag_cache.get(metric.name, labels)
 
-            if skip_sample:
+            if sample_tags is None:
                 continue
 
-            tags.extend(self.tags)
-
-            hostname = ""
-            if self.hostname_label and self.hostname_label in labels:
-                hostname = labels[self.hostname_label]
-                if self.hostname_formatter is not None:
-                    hostname = self.hostname_formatter(hostname)
+            tags, hostname = sample_tags
 
             self.submit_telemetry_number_of_processed_metric_samples()
             yield sample, tags, hostname
 
+    def compute_sample_tags(self, labels):
+        """
+        Return the tags and hostname of a sample based on its labels, or `None` if the sample is excluded.
+        """
+
+        tags = []
+        for label_name, label_value in labels.items():
+            sample_excluder = self.exclude_metrics_by_labels.get(label_name)
+            if sample_excluder is not None and sample_excluder(label_value):
+                return
+            elif label_name in self.exclude_labels:
+                continue
+            elif self.include_labels and label_name not in self.include_labels:
+                continue
+
+            label_name = self.rename_labels.get(label_name, label_name)
+            tags.append(f'{label_name}:{label_value}')
+
+        tags.extend(self.tags)
+
+        hostname = ""
+        if self.hostname_label and self.hostname_label in labels:
+            hostname = labels[self.hostname_label]
+            if self.hostname_formatter is not None:
+                hostname = self.hostname_formatter(hostname)
+
+        return tags, hostname
+
     def stream_connection_lines(self):
         """
         Yield the connection line.
@@ -387,8 +631,15 @@ class OpenMetricsScraper:
         Send a request to scrape metrics. Return the response or throw an exception.
         """
 
+        prefetched_response, self._prefetched_response = self._prefetched_response, None
+
         try:
-            response = self.send_request()
+            if prefetched_response is None:
+                response = self.send_request()
+            elif isinstance(prefetched_response, Exception):
+                raise prefetched_response
+            else:
+                response = prefetched_response
         except Exception as e:
             self.submit_health_check(ServiceCheck.CRITICAL, message=str(e))
             raise
@@ -408,14 +659,41 @@ class OpenMetricsScraper:
 
                 self.submit_telemetry_endpoint_response_size(response)
 
+                if self.skip_unchanged_payloads:
+                    self.detect_unchanged_payload(response)
+
                 return response
 
+    def prefetch_response(self):
+        """
+        Send the request and download the whole payload ahead of the next scrape.
+
+        This is meant to run in a worker thread, so nothing is submitted here. Any error is stored
+        and raised by `get_connection` on the check thread.
+        """
+
+        start_time = get_precise_time()
+        try:
+            response = self.send_request()
+            # Access the body so that it's read now rather than streamed while parsing
+            response.content  # noqa: B018
+        except Exception as e:
+            self._prefetched_response = e
+        else:
+            self._prefetched_response = response
+
+        self._fetch_duration = get_precise_time() - start_time
+
     def send_request(self, **kwargs):
         """
         Send an HTTP GET request to the `openmetrics_endpoint` value.
         """
 
         kwargs['stream'] = True
+        if self._payload_validators and self._replayable_submissions is not None:
+            # Let the server tell us that the payload hasn't changed
+            kwargs['extra_headers'] = {**self._payload_validators, **kwargs.get('extra_headers', {})}
+
         return self.http.get(self.endpoint, **kwargs)
 
     def set_dynamic_tags(self, *tags):
@@ -423,7 +701,17 @@ class OpenMetricsScraper:
         Set dynamic tags.
         """
 
-        self.tags = tuple(chain(self.static_tags, tags))
+        new_tags = tuple(chain(self.static_tags, tags))
+        if new_tags != self.tags:
+            if self.tag_cache is not None:
+                self.tag_cache.clear()
+
+            # The recorded submissions carry the previous tags, the next payload must be parsed again
+            self._replayable_submissions = None
+            self._payload_fingerprint = None
+            self._payload_validators = {}
+
+        self.tags = new_tags
 
     def submit_health_check(self, status, **kwargs):
         """
@@ -439,11 +727,30 @@ class OpenMetricsScraper:
     def submit_telemetry_number_of_ignored_metric_samples(self, metric):
         self.count('telemetry.metrics.ignored.count', len(metric.samples), tags=self.tags)
 
+    def submit_telemetry_number_of_excluded_metric_samples(self, count):
+        # Samples skipped while parsing are never seen by `consume_metrics`
+        self.count('telemetry.metrics.input.count', count, tags=self.tags)
+        self.count('telemetry.metrics.ignored.count', count, tags=self.tags)
+
     def submit_telemetry_number_of_processed_metric_samples(self):
-        self.count('telemetry.metrics.processed.count', 1, tags=self.tags)
+        self.count(PROCESSED_METRIC_SAMPLES_TELEMETRY, 1, tags=self.tags)
+
+    def submit_telemetry_number_of_ignored_lines(self, count=1):
+        self.count('telemetry.metrics.blacklist.count', count, tags=self.tags)
+
+    def submit_telemetry_tag_cache(self):
+        self.count('telemetry.tag_cache.hits.count', self.tag_cache.hits, tags=self.tags)
+        self.count('telemetry.tag_cache.misses.count', self.tag_cache.misses, tags=self.tags)
+        self.gauge('telemetry.tag_cache.size', len(self.tag_cache), tags=self.tags)
+
+    def submit_telemetry_scrape_duration(self, duration):
+        self.gauge('telemetry.scrape.duration', duration, tags=self.tags)
+
+    def submit_telemetry_fetch_duration(self, duration):
+        self.gauge('telemetry.fetch.duration', duration, tags=self.tags)
 
-    def submit_telemetry_number_of_ignored_lines(self):
-        self.count('telemetry.metrics.blacklist.count', 1, tags=self.tags)
+    def submit_telemetry_number_of_skipped_parses(self):
+        self.count('telemetry.payload.unchanged.count', 1, tags=self.tags)
 
     def submit_telemetry_endpoint_response_size(self, response):
         content_length = response.headers.get('Content-Length')
@@ -0,0 +1,68 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class SeriesTagCache:
+    """
+    A bounded cache of the finished tags and hostname of every series, keyed by metric name and labels.
+
+    Most series keep the same labels from one scrape to the next, so this avoids running the label
+    filtering, renaming and formatting for each of their samples on every run. Once full, the least
+    recently used entries are evicted first.
+    """
+
+    def __init__(self, max_size, compute_tags):
+        self.max_size = max_size
+
+        # Labels -> (tags, hostname) or `None` if the sample must be skipped
+        self.compute_tags = compute_tags
+
+        # Ordered from the least to the most recently used
+        self.entries = OrderedDict()
+
+        # Reset after every scrape
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, metric_name, labels):
+        """
+        Return a new list of tags and the hostname for a sample, or `None` if it must be skipped.
+        """
+        key = (metric_name, tuple(labels.items()))
+
+        entry = self.entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+
+            entry = self.compute_tags(labels)
+            if entry is not None:
+                entry = (tuple(entry[0]), entry[1])
+
+            if len(self.entries) >= self.max_size:
+                self.entries.popitem(last=False)
+
+            self.entries[key] = entry
+        else:
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+        if entry is None:
+            return
+
+        tags, hostname = entry
+        # Transformers are free to modify the tags that they receive
+        return list(tags), hostname
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
@@ -3,6 +3,7 @@
 # Licensed under a 3-clause BSD style license (see LICENSE)
 import re
 from copy import deepcopy
+from weakref import WeakKeyDictionary
 
 from ....config import is_affirmative
 from . import transformers
@@ -36,6 +37,9 @@ class MetricTransformer:
             'non_cumulative_histogram_buckets': self.non_cumulative_histogram_buckets,
         }
 
+        # Transformer -> configured type, `None` for custom transformers
+        self.transformer_types = WeakKeyDictionary()
+
         metrics_config = deepcopy(self.normalize_metric_config(config))
 
         self.transformer_data = {}
@@ -99,7 +103,22 @@ class MetricTransformer:
         if factory is None:
             raise ValueError(f'unknown type `{metric_type}`')
 
-        return metric_type, factory(self.check, metric_name, config, self.global_options)
+        transformer = factory(self.check, metric_name, config, self.global_options)
+        self.transformer_types[transformer] = metric_type
+
+        return metric_type, transformer
+
+    def submits_gauges_only(self, metric, transformer):
+        """
+        Whether or not a transformer only submits gauges whose values depend solely on the metric's samples.
+        """
+        metric_type = self.transformer_types.get(transformer)
+        if metric_type == 'gauge':
+            return True
+        elif metric_type in ('native', 'native_dynamic'):
+            return metric.type == 'gauge'
+
+        return False
 
     def skip_native_metric(self, metric):
         if metric.type == 'unknown':
@@ -0,0 +1,171 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+"""
+A process-wide cache of X.509 certificates.
+
+Many check instances usually monitor endpoints signed by the same certificate authorities. Certificates are parsed
+once per content, and the intermediate certificates referenced by their Authority Information Access extension are
+downloaded once per issuer and URL, for all the instances of the process.
+"""
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha256
+from typing import Any, Callable, Dict, Optional, Tuple  # noqa: F401
+
+from cryptography.x509 import Certificate, Name, load_der_x509_certificate  # noqa: F401
+
+# Entries unused for this many seconds are evicted
+DEFAULT_TTL = 3600
+
+# Evict the least recently used entries beyond this many
+DEFAULT_MAX_SIZE = 1024
+
+
+class CacheStats(object):
+    __slots__ = ('hits', 'misses')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return str({'hits': self.hits, 'misses': self.misses})
+
+
+class CertificateCache(object):
+    """
+    Cache parsed certificates by fingerprint, and downloaded intermediate certificates by issuer and URL.
+
+    Downloads are shared: when several threads need the same certificate, a single one downloads it while the others
+    wait for the result. Failed downloads are not cached.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_size=DEFAULT_MAX_SIZE):
+        # type: (float, int) -> None
+        self._ttl = ttl
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        # Ordered from the least to the most recently used, with the time of their last use
+        self._certificates = OrderedDict()  # type: OrderedDict[bytes, Tuple[float, Certificate]]
+        # Ordered from the oldest to the most recent download, with the time of the download
+        self._downloads = OrderedDict()  # type: OrderedDict[Tuple[Name, str], Tuple[float, bytes]]
+        self._pending_downloads = {}  # type: Dict[Tuple[Name, str], threading.Lock]
+        self.certificate_stats = CacheStats()
+        self.download_stats = CacheStats()
+
+    @classmethod
+    def shared_instance(cls):
+        # type: () -> CertificateCache
+        """
+        Return the globally shared cache.
+        """
+        if not hasattr(cls, "_instance"):
+            cls._instance = CertificateCache()  # type: ignore
+        return cls._instance  # type: ignore
+
+    def __repr__(self):
+        return str({'certificates': self.certificate_stats, 'downloads': self.download_stats})
+
+    def load_certificate(self, der_cert, stats=None):
+        # type: (bytes, Optional[CacheStats]) -> Tuple[Certificate, bytes]
+        """
+        Return a DER encoded certificate parsed, along with its SHA-256 fingerprint. The lookup is also counted in
+        `stats` if given, to tell apart the callers sharing the cache.
+
+        Raises:
+        * ValueError: if the certificate can't be parsed.
+        """
+        fingerprint = sha256(der_cert).digest()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._certificates.get(fingerprint)
+            if entry is not None and now - entry[0] < self._ttl:
+                self._certificates[fingerprint] = (now, entry[1])
+                self._certificates.move_to_end(fingerprint)
+                _record(self.certificate_stats, stats, hit=True)
+                return entry[1], fingerprint
+
+            _record(self.certificate_stats, stats, hit=False)
+
+        cert = load_der_x509_certificate(der_cert)
+        with self._lock:
+            self._certificates[fingerprint] = (now, cert)
+            self._evict(self._certificates, now)
+
+        return cert, fingerprint
+
+    def download(self, issuer, uri, fetch, max_age=None, stats=None):
+        # type: (Name, str, Callable[[str], bytes], Optional[float], Optional[CacheStats]) -> bytes
+        """
+        Return the certificate of `issuer` available at `uri`. It's downloaded by calling `fetch` with the URL if it's
+        not cached, or was downloaded more than `max_age` seconds ago, which defaults to the TTL of the cache. The
+        lookup is also counted in `stats` if given.
+
+        Raises any error of `fetch`.
+        """
+        key = (issuer, uri)
+        if max_age is None:
+            max_age = self._ttl
+
+        cert = self._get_download(key, max_age, stats)
+        if cert is not None:
+            return cert
+
+        with self._lock:
+            pending = self._pending_downloads.get(key)
+            if pending is None:
+                pending = self._pending_downloads[key] = threading.Lock()
+
+        with pending:
+            # Another thread may have downloaded it in the meantime
+            cert = self._get_download(key, max_age, stats)
+            if cert is not None:
+                return cert
+
+            with self._lock:
+                _record(self.download_stats, stats, hit=False)
+
+            try:
+                cert = fetch(uri)
+
+                now = time.monotonic()
+                with self._lock:
+                    self._downloads[key] = (now, cert)
+                    self._downloads.move_to_end(key)
+                    self._evict(self._downloads, now)
+            finally:
+                with self._lock:
+                    self._pending_downloads.pop(key, None)
+
+        return cert
+
+    def _get_download(self, key, max_age, stats):
+        # type: (Tuple[Name, str], float, Optional[CacheStats]) -> Optional[bytes]
+        with self._lock:
+            entry = self._downloads.get(key)
+            if entry is not None and time.monotonic() - entry[0] < max_age:
+                _record(self.download_stats, stats, hit=True)
+                return entry[1]
+        return None
+
+    def _evict(self, entries, now):
+        # type: (OrderedDict[Any, Tuple[float, Any]], float) -> None
+        # Entries are ordered by time, so the expired ones come first
+        while entries:
+            key, (timestamp, _) = next(iter(entries.items()))
+            if now - timestamp < self._ttl and len(entries) <= self._max_size:
+                break
+            del entries[key]
+
+
+def _record(cache_stats, stats, hit):
+    # type: (CacheStats, Optional[CacheStats], bool) -> None
+    for counter in (cache_stats, stats):
+        if counter is None:
+            continue
+        if hit:
+            counter.hits += 1
+        else:
+            counter.misses += 1
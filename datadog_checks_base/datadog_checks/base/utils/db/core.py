@@ -2,8 +2,10 @@
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from itertools import chain
-from typing import Any, Callable, Dict, List, Tuple  # noqa: F401
+from queue import Queue
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple  # noqa: F401
 
 from datadog_checks.base import AgentCheck  # noqa: F401
 from datadog_checks.base.utils.db.types import QueriesExecutor, QueriesSubmitter, Transformer  # noqa: F401
@@ -20,6 +22,10 @@ class QueryExecutor(object):
     QueryExecutor is a lower-level implementation of QueryManager which supports multiple instances
     per AgentCheck. It is used to execute queries via the `executor` parameter and submit resulting
     telemetry via the `submitter` parameter.
+
+    Queries run one after another with the `executor`, unless an `executor_pool` is given. In that case each
+    executor of the pool must use its own connection, and queries run concurrently on one executor at a time.
+    Their results are still submitted in the order of the queries.
     """
 
     def __init__(
@@ -32,6 +38,7 @@ class QueryExecutor(object):
         hostname=None,  # type: str
         logger=None,
         track_operation_time=False,  # type: bool
+        executor_pool=None,  # type: List[QueriesExecutor]
     ):  # type: (...) -> QueryExecutor
         self.executor = executor  # type: QueriesExecutor
         self.submitter = submitter  # type: QueriesSubmitter
@@ -47,6 +54,7 @@ class QueryExecutor(object):
         self.hostname = hostname  # type: str
         self.logger = logger or logging.getLogger(__name__)
         self.track_operation_time = track_operation_time
+        self.executor_pool = executor_pool  # type: List[QueriesExecutor]
 
     def compile_queries(self):
         """This method compiles every `Query` object."""
@@ -67,6 +75,7 @@ class QueryExecutor(object):
         if extra_tags:
             global_tags.extend(list(extra_tags))
 
+        queries = []
         for query in self.queries:
             if not query.should_execute():
                 self.logger.debug(
@@ -76,69 +85,69 @@ class QueryExecutor(object):
                 )
                 continue
 
-            query_name = query.name
-            query_columns = query.column_transformers
-            extra_transformers = query.extra_transformers
-            query_tags = query.base_tags
+            queries.append(query)
 
-            try:
-                if self.track_operation_time:
-                    with tracked_query(check=self.submitter, operation=query_name):
-                        rows = self.execute_query(query.query)
-                else:
-                    rows = self.execute_query(query.query)
-            except Exception as e:
-                if self.error_handler:
-                    self.logger.error('Error querying %s: %s', query_name, self.error_handler(str(e)))
-                else:
-                    self.logger.error('Error querying %s: %s', query_name, e)
+        if self.executor_pool:
+            results = self._run_queries_concurrently(queries)
+        else:
+            results = ((query, self._run_query(query, self.executor)) for query in queries)
 
+        for query, rows in results:
+            if rows is None:
                 continue
 
+            handle_row = query.create_row_handler(global_tags, self.hostname, self.logger)
             for row in rows:
                 if not self._is_row_valid(query, row):
                     continue
 
-                # It holds the query results
-                sources = {}  # type: Dict[str, str]
-                # It holds the transformers defined in query_columns along with the column value
-                submission_queue = []  # type: List[Tuple[Transformer, Any]]
-                tags = global_tags + query_tags
-
-                for (column_name, type_transformer), column_value in zip(query_columns, row):
-                    # Columns can be ignored via configuration
-                    if not column_name:
-                        continue
-
-                    sources[column_name] = column_value
-                    column_type, transformer = type_transformer
-
-                    # The transformer can be None for `source` types. Those such columns do not submit
-                    # anything but are collected into the row values for other columns to reference.
-                    if transformer is None:
-                        continue
-                    elif column_type == 'tag':
-                        tags.append(transformer(None, column_value))  # get_tag transformer
-                    elif column_type == 'tag_not_null':
-                        if column_value is not None:
-                            tags.append(transformer(None, column_value))  # get_tag transformer
-                    elif column_type == 'tag_list':
-                        tags.extend(transformer(None, column_value))  # get_tag_list transformer
-                    else:
-                        submission_queue.append((transformer, column_value))
-
-                for transformer, value in submission_queue:
-                    transformer(sources, value, tags=tags, hostname=self.hostname, raw=query.metric_name_raw)
-
-                for name, transformer in extra_transformers:
-                    try:
-                        result = transformer(sources, tags=tags, hostname=self.hostname, raw=query.metric_name_raw)
-                    except Exception as e:
-                        self.logger.error('Error transforming %s: %s', name, e)
-                        continue
-                    else:
-                        if result is not None:
-                            sources[name] = result
+                handle_row(row)
+
+    def _run_queries_concurrently(self, queries):
+        # type: (List[Query]) -> Iterator[Tuple[Query, Optional[List]]]
+        executors = Queue()  # type: Queue[QueriesExecutor]
+        for executor in self.executor_pool:
+            executors.put(executor)
+
+        def run_query(query):
+            # type: (Query) -> Optional[List]
+            # There are as many workers as executors, so an executor is always available
+            executor = executors.get()
+            try:
+                # Fetch every row while the connection of the executor is held
+                return self._run_query(query, executor, fetch_all=True)
+            finally:
+                executors.put(executor)
+
+        with ThreadPoolExecutor(max_workers=len(self.executor_pool)) as pool:
+            futures = [pool.submit(run_query, query) for query in queries]
+            for query, future in zip(queries, futures):
+                yield query, future.result()
+
+    def _run_query(self, query, executor, fetch_all=False):
+        # type: (Query, QueriesExecutor, bool) -> Optional[Iterable]
+        """
+        Run a query with the given executor, returning its rows or None if it failed.
+        """
+        try:
+            if self.track_operation_time:
+                with tracked_query(check=self.submitter, operation=query.name):
+                    rows = self.execute_query(query.query, executor)
+                    if fetch_all:
+                        rows = list(rows)
+            else:
+                rows = self.execute_query(query.query, executor)
+                if fetch_all:
+                    rows = list(rows)
+        except Exception as e:
+            if self.error_handler:
+                self.logger.error('Error querying %s: %s', query.name, self.error_handler(str(e)))
+            else:
+                self.logger.error('Error querying %s: %s', query.name, e)
+
+            return None
+
+        return rows
 
     def _is_row_valid(self, query, row):
         # type: (Query, List) -> bool
@@ -158,12 +167,12 @@ class QueryExecutor(object):
             return False
         return True
 
-    def execute_query(self, query):
+    def execute_query(self, query, executor=None):
         """
         Called by `execute`, this triggers query execution to check for errors immediately in a way that is compatible
         with any library. If there are no errors, this is guaranteed to return an iterator over the result set.
         """
-        rows = self.executor(query)
+        rows = (executor or self.executor)(query)
         if rows is None:
             return iter([])
         else:
@@ -212,6 +221,7 @@ class QueryManager(QueryExecutor):
         tags=None,  # type: List[str]
         error_handler=None,  # type: Callable[[str], str]
         hostname=None,  # type: str
+        executor_pool=None,  # type: List[QueriesExecutor]
     ):  # type: (...) -> QueryManager
         """
         - **check** (_AgentCheck_) - an instance of a Check
@@ -221,6 +231,8 @@ class QueryManager(QueryExecutor):
         - **tags** (_List[str]_) - a list of tags to associate with every submission
         - **error_handler** (_callable_) - a callable accepting a `str` error as its sole argument and returning
           a sanitized string, useful for scrubbing potentially sensitive information libraries emit
+        - **executor_pool** (_List[callable]_) - executors like `executor`, each using its own connection, to run
+          the queries concurrently instead
         """
         super(QueryManager, self).__init__(
             executor=executor,
@@ -230,6 +242,7 @@ class QueryManager(QueryExecutor):
             error_handler=error_handler,
             hostname=hostname,
             logger=check.log,
+            executor_pool=executor_pool,
         )
         self.check = check  # type: AgentCheck
 
@@ -2,13 +2,31 @@
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
 from copy import deepcopy
-from typing import Any, Dict, List, Tuple  # noqa: F401
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple  # noqa: F401
 
 from datadog_checks.base.utils.db.types import Transformer, TransformerFactory  # noqa: F401
 from datadog_checks.base.utils.time import get_timestamp
 
 from .utils import create_extra_transformer
 
+# The column types whose transformers never read the other values of the row
+SOURCELESS_COLUMN_TYPES = frozenset(
+    (
+        'gauge',
+        'count',
+        'monotonic_count',
+        'rate',
+        'histogram',
+        'historate',
+        'metadata',
+        'monotonic_gauge',
+        'temporal_percent',
+        'time_elapsed',
+    )
+)
+# The maximum number of distinct values for which the tags of a tag column are kept
+TAG_CACHE_SIZE = 10000
+
 
 class Query(object):
     """
@@ -64,6 +82,11 @@ class Query(object):
         self.__last_execution_time = None  # type: float
         # whether to ignore any defined namespace prefix. True when `metric_prefix` is defined.
         self.metric_name_raw = False  # type: bool
+        # The columns resolved by `compile` for `create_row_handler`
+        self._tag_columns = None  # type: Tuple[Tuple[int, Transformer, bool, bool, Optional[Dict[str, str]]], ...]
+        self._submission_columns = None  # type: Tuple[Tuple[int, Transformer, Optional[Callable], str, Dict], ...]
+        # None when no transformer reads the values of the other columns
+        self._source_columns = None  # type: Optional[Tuple[Tuple[int, str], ...]]
 
     def compile(
         self,
@@ -113,10 +136,12 @@ class Query(object):
         sources = {}
 
         column_data = []
+        column_types = []
         for i, column in enumerate(columns, 1):
             # Columns can be ignored via configuration.
             if not column:
                 column_data.append((None, None))
+                column_types.append(None)
                 continue
             elif not isinstance(column, dict):
                 raise ValueError('column #{} of {} is not a mapping'.format(i, query_name))
@@ -142,6 +167,7 @@ class Query(object):
                 raise ValueError('field `type` for column {} of {} must be a string'.format(column_name, query_name))
             elif column_type == 'source':
                 column_data.append((column_name, (None, None)))
+                column_types.append(column_type)
                 continue
             elif column_type not in column_transformers:
                 raise ValueError('unknown type `{}` for column {} of {}'.format(column_type, column_name, query_name))
@@ -171,6 +197,7 @@ class Query(object):
                     # All these would actually submit data. As that is the default case, we represent it as
                     # a reference to None since if we use e.g. `value` it would never be checked anyway.
                     column_data.append((column_name, (None, transformer)))
+                column_types.append(column_type)
 
         submission_transformers = column_transformers.copy()  # type: Dict[str, Transformer]
         submission_transformers.pop('tag')
@@ -257,8 +284,110 @@ class Query(object):
         self.base_tags = tags
         self.collection_interval = collection_interval
         self.metric_name_raw = metric_prefix is not None
+        self._compile_row_handler(column_types)
         del self.query_data
 
+    def _compile_row_handler(self, column_types):
+        # type: (List[Optional[str]]) -> None
+        tag_columns = []
+        submission_columns = []
+        source_columns = []
+        needs_sources = bool(self.extra_transformers)
+
+        for index, ((column_name, type_transformer), column_type) in enumerate(
+            zip(self.column_transformers, column_types)
+        ):
+            # Columns can be ignored via configuration
+            if not column_name:
+                continue
+
+            _, transformer = type_transformer
+            source_columns.append((index, column_name))
+            if column_type in ('tag', 'tag_not_null'):
+                tag_columns.append((index, transformer, column_type == 'tag_not_null', False, {}))
+            elif column_type == 'tag_list':
+                tag_columns.append((index, transformer, False, True, None))
+            elif transformer is not None:
+                needs_sources = needs_sources or column_type not in SOURCELESS_COLUMN_TYPES
+
+                submit_method = None
+                submission = getattr(transformer, 'submission', None)
+                if submission is not None:
+                    method, creation_args, modifiers = submission
+                    # The modifiers take precedence over the arguments passed by the executor
+                    if len(creation_args) == 1 and not modifiers.keys() & {'tags', 'hostname', 'raw'}:
+                        submit_method = method
+                        column_name = creation_args[0]
+                else:
+                    modifiers = None
+                submission_columns.append((index, transformer, submit_method, column_name, modifiers))
+
+        self._tag_columns = tuple(tag_columns)
+        self._submission_columns = tuple(submission_columns)
+        self._source_columns = tuple(source_columns) if needs_sources else None
+
+    def create_row_handler(self, tags, hostname, logger):
+        # type: (List[str], str, Any) -> Callable[[Sequence[Any]], None]
+        """
+        Return a function submitting everything for a row of the query result, with the given global `tags`
+        and `hostname`.
+
+        Everything which does not depend on the row is resolved beforehand. When no extra or column transformer
+        reads the values of the other columns, rows are submitted without collecting them, and when there are no tag
+        columns every row shares the same tags. The tags of the same tag column values are only built once.
+        """
+        static_tags = tags + self.base_tags
+        raw = self.metric_name_raw
+        tag_columns = self._tag_columns
+        submission_columns = self._submission_columns
+        source_columns = self._source_columns
+        extra_transformers = self.extra_transformers
+
+        def handle_row(row):
+            # type: (Sequence[Any]) -> None
+            if tag_columns:
+                row_tags = list(static_tags)
+                for index, transformer, skip_null, is_list, cache in tag_columns:
+                    value = row[index]
+                    if is_list:
+                        row_tags.extend(transformer(None, value))  # get_tag_list transformer
+                    elif value is None and skip_null:
+                        continue
+                    elif value.__class__ is str:
+                        tag = cache.get(value)
+                        if tag is None:
+                            if len(cache) >= TAG_CACHE_SIZE:
+                                cache.clear()
+                            tag = cache[value] = transformer(None, value)  # get_tag transformer
+                        row_tags.append(tag)
+                    else:
+                        row_tags.append(transformer(None, value))  # get_tag transformer
+            else:
+                row_tags = static_tags
+
+            if source_columns is None:
+                sources = None
+            else:
+                sources = {column_name: row[index] for index, column_name in source_columns}
+
+            for index, transformer, submit_method, name, modifiers in submission_columns:
+                if submit_method is None:
+                    transformer(sources, row[index], tags=row_tags, hostname=hostname, raw=raw)
+                else:
+                    submit_method(name, row[index], tags=row_tags, hostname=hostname, raw=raw, **modifiers)
+
+            for name, transformer in extra_transformers:
+                try:
+                    result = transformer(sources, tags=row_tags, hostname=hostname, raw=raw)
+                except Exception as e:
+                    logger.error('Error transforming %s: %s', name, e)
+                    continue
+                else:
+                    if result is not None:
+                        sources[name] = result
+
+        return handle_row
+
     def should_execute(self):
         '''
         Check if the query should be executed based on the collection interval.
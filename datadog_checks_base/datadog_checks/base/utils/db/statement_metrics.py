@@ -2,6 +2,7 @@
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
 import logging
+from array import array
 
 logger = logging.getLogger(__name__)
 
@@ -91,6 +92,112 @@ class StatementMetrics:
         return result
 
 
+class ColumnarStatementMetrics:
+    """
+    Drop-in alternative to `StatementMetrics` meant for tables with a large number of statements.
+
+    Rather than keeping every row of the previous check run, only the metric values are kept, one compact
+    array per metric column along with the position of every row key. Deltas are computed column by column
+    and a new row is only built for statements that changed, with the same semantics for duplicate rows
+    and stats resets.
+    """
+
+    def __init__(self):
+        # Row key -> position of the row in the columns of the previous run
+        self._previous_positions = {}
+        # Metric -> values of the previous run, `None` for rows without the metric
+        self._previous_columns = {}
+
+    def compute_derivative_rows(self, rows, metrics, key):
+        """
+        Same as `StatementMetrics.compute_derivative_rows`.
+
+        :params rows (_List[dict]_): rows from current check run
+        :params metrics (_List[str]_): the metrics to compute for each row
+        :params key (_callable_): function for an ID which uniquely identifies a row across runs
+        :return (_List[dict]_): a list of rows with the first derivative of the metrics
+        """
+        metrics = set(metrics)
+
+        merged_rows, dropped_metrics = _merge_duplicate_rows(rows, metrics, key)
+        if dropped_metrics:
+            logger.warning(
+                'Some statement metrics are not available from the table: %s', ','.join(m for m in dropped_metrics)
+            )
+
+        current_rows = list(merged_rows.values())
+        previous_positions = self._previous_positions
+        previous_columns = self._previous_columns
+
+        # Pairs of current and previous positions of the rows seen during both runs
+        matches = []
+        for position, row_key in enumerate(merged_rows):
+            previous_position = previous_positions.get(row_key)
+            if previous_position is not None:
+                matches.append((position, previous_position))
+
+        columns = {}
+        deltas = {}
+        discarded = set()
+        changed = set()
+        for metric in metrics:
+            column = columns[metric] = _to_column([row.get(metric) for row in current_rows])
+
+            previous_column = previous_columns.get(metric)
+            if previous_column is None or not matches:
+                continue
+
+            if isinstance(column, array) and isinstance(previous_column, array):
+                column_deltas = [column[i] - previous_column[j] for i, j in matches]
+            else:
+                column_deltas = [
+                    None if column[i] is None or previous_column[j] is None else column[i] - previous_column[j]
+                    for i, j in matches
+                ]
+
+            # See `StatementMetrics.compute_derivative_rows` for the handling of stats resets and unchanged rows
+            for match, delta in enumerate(column_deltas):
+                if delta is None:
+                    continue
+                elif delta < 0:
+                    discarded.add(match)
+                elif delta:
+                    changed.add(match)
+
+            deltas[metric] = column_deltas
+
+        result = []
+        for match in sorted(changed - discarded):
+            diffed_row = dict(current_rows[matches[match][0]])
+            for metric, column_deltas in deltas.items():
+                delta = column_deltas[match]
+                if delta is not None:
+                    diffed_row[metric] = delta
+
+            result.append(diffed_row)
+
+        self._previous_positions = {row_key: position for position, row_key in enumerate(merged_rows)}
+        self._previous_columns = columns
+
+        return result
+
+
+def _to_column(values):
+    """
+    Store the values of a metric column as an array of integers or floats, falling back to a list for mixed
+    or other types such as `Decimal`, or when some rows do not have the metric.
+    """
+    try:
+        return array('q', values)
+    except (TypeError, OverflowError):
+        pass
+
+    if all(type(value) is float for value in values):
+        return array('d', values)
+
+    return values
+
+
 def _merge_duplicate_rows(rows, metrics, key):
     """
     Given a list of query rows, merge all duplicate rows as determined by the key function into a single row
@@ -5,11 +5,14 @@ import contextlib
 import datetime
 import decimal
 import functools
+import hashlib
 import logging
 import os
 import socket
+import sys
 import threading
 import time
+from collections import OrderedDict
 from concurrent.futures.thread import ThreadPoolExecutor
 from ipaddress import IPv4Address
 from typing import Any, Callable, Dict, List, Tuple  # noqa: F401
@@ -80,6 +83,8 @@ def create_submission_transformer(submit_method):
 
             submit_method(*creation_args, *call_args, **kwargs)
 
+        # Lets compiled queries call the submission method directly, see `Query.create_row_handler`
+        transformer.submission = (submit_method, creation_args, modifiers)
         return transformer
 
     return get_transformer
@@ -258,6 +263,112 @@ def obfuscate_sql_with_metadata(query, options=None, replace_null_character=Fals
     return statement_with_metadata
 
 
+class ObfuscationCache:
+    """
+    Size bounded LRU cache of `obfuscate_sql_with_metadata` results, meant to be shared by all the DBM jobs
+    of a check instance since the same query texts are obfuscated on every collection.
+
+    Entries are keyed by a hash of the raw query text and the obfuscator options, so raw queries are never held.
+    The approximate memory used by the obfuscated statements is accounted for and the least recently used entries
+    are evicted once `max_bytes` is exceeded. Thread safe.
+    """
+
+    # Rough memory used by the key, the ordered mapping slot and the statement containers of an entry
+    ENTRY_OVERHEAD = 600
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+
+        # Reset every time metrics are submitted
+        self.hits = 0
+        self.misses = 0
+
+    def obfuscate_sql_with_metadata(self, query, options=None, replace_null_character=False):
+        """
+        Same as the `obfuscate_sql_with_metadata` function, returning a new statement for every call.
+        Failures are never cached.
+        """
+        if not query:
+            return obfuscate_sql_with_metadata(query, options, replace_null_character)
+
+        key = hashlib.blake2b(
+            '{}\x00{}\x00{}'.format(options, replace_null_character, query).encode('utf-8', 'surrogatepass'),
+            digest_size=16,
+        ).digest()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy_statement(entry[0])
+
+            self.misses += 1
+
+        statement = obfuscate_sql_with_metadata(query, options, replace_null_character)
+        size = _statement_size(statement) + self.ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return statement
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (statement, size)
+                self.bytes += size
+
+                while self.bytes > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self.bytes -= evicted_size
+
+        return _copy_statement(statement)
+
+    def submit_metrics(self, check, dbms, tags, hostname=None, raw=True):
+        """
+        Submit the usage of the cache since the last submission as internal metrics.
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            self.hits = self.misses = 0
+            entries, size = len(self._entries), self.bytes
+
+        prefix = "dd.{}.obfuscation_cache".format(dbms)
+        check.count(prefix + ".hits", hits, tags=tags, hostname=hostname, raw=raw)
+        check.count(prefix + ".misses", misses, tags=tags, hostname=hostname, raw=raw)
+        if hits or misses:
+            check.gauge(prefix + ".hit_rate", hits / (hits + misses), tags=tags, hostname=hostname, raw=raw)
+        check.gauge(prefix + ".entries", entries, tags=tags, hostname=hostname, raw=raw)
+        check.gauge(prefix + ".bytes", size, tags=tags, hostname=hostname, raw=raw)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _statement_size(statement):
+    size = sys.getsizeof(statement['query'])
+    for value in statement['metadata'].values():
+        size += sys.getsizeof(value)
+        if isinstance(value, list):
+            size += sum(sys.getsizeof(item) for item in value)
+
+    return size
+
+
+def _copy_statement(statement):
+    # Callers are free to modify the statements they receive
+    statement = dict(statement)
+    statement['metadata'] = {
+        name: list(value) if isinstance(value, list) else value for name, value in statement['metadata'].items()
+    }
+    return statement
+
+
 class DBMAsyncJob(object):
     # Set an arbitrary high limit so that dbm async jobs (which aren't CPU bound) don't
     # get artificially limited by the default max_workers count. Note that since threads are
@@ -14,7 +14,6 @@ from urllib.parse import quote, urlparse, urlunparse
 import requests
 import requests_unixsocket
 from binary import KIBIBYTE
-from cryptography.x509 import load_der_x509_certificate
 from cryptography.x509.extensions import ExtensionNotFound
 from cryptography.x509.oid import AuthorityInformationAccessOID, ExtensionOID
 from requests import auth as requests_auth
@@ -26,6 +25,7 @@ from datadog_checks.base.agent import datadog_agent
 
 from ..config import is_affirmative
 from ..errors import ConfigurationError
+from .certificates import CertificateCache
 from .common import ensure_bytes, ensure_unicode
 from .headers import get_default_headers, update_headers
 from .network import CertAdapter, create_socket_connection
@@ -485,8 +485,9 @@ class RequestsWrapper(object):
     def load_intermediate_certs(self, der_cert, certs):
         # https://tools.ietf.org/html/rfc3280#section-4.2.2.1
         # https://tools.ietf.org/html/rfc5280#section-5.2.7
+        cert_cache = CertificateCache.shared_instance()
         try:
-            cert = load_der_x509_certificate(der_cert)
+            cert, _ = cert_cache.load_certificate(der_cert)
         except Exception as e:
             self.logger.error('Error while deserializing peer certificate to discover intermediate certificates: %s', e)
             return
@@ -509,12 +510,10 @@ class RequestsWrapper(object):
 
             # Assume HTTP for now
             try:
-                response = requests.get(uri)  # SKIP_HTTP_VALIDATION
+                intermediate_cert = cert_cache.download(cert.issuer, uri, download_certificate)
             except Exception as e:
                 self.logger.error('Error fetching intermediate certificate from `%s`: %s', uri, e)
                 continue
-            else:
-                intermediate_cert = response.content
 
             certs.append(intermediate_cert)
             self.load_intermediate_certs(intermediate_cert, certs)
@@ -587,6 +586,12 @@ def handle_kerberos_cache(cache_file_path):
         os.environ['KRB5CCNAME'] = old_cache_path
 
 
+def download_certificate(uri):
+    response = requests.get(uri)  # SKIP_HTTP_VALIDATION
+    response.raise_for_status()
+    return response.content
+
+
 def should_bypass_proxy(url, no_proxy_uris):
     # Accepts a URL and a list of no_proxy URIs
     # Returns True if URL should bypass the proxy.
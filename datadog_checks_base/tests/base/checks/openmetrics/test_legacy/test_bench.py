@@ -4,6 +4,8 @@
 import os
 
 import pytest
+from prometheus_client.core import HistogramMetricFamily
+from prometheus_client.samples import Sample
 
 from datadog_checks.base import OpenMetricsBaseCheck
 from datadog_checks.dev import get_here
@@ -77,3 +79,75 @@ def test_label_joins_old(benchmark, dd_run_check, mock_http_response, fixture_ks
     dd_run_check(c)
 
     benchmark(c.check, instance)
+
+
+def histogram_family(contexts=1000):
+    """
+    A histogram with as many contexts as the request latency histograms of a busy Kubernetes API server.
+    """
+    upper_bounds = ['0.005', '0.01', '0.025', '0.05', '0.1', '0.25', '0.5', '1', '2.5', '5', '10', '+Inf']
+    metric = HistogramMetricFamily('apiserver_request_duration_seconds', 'Response latency distribution.')
+    for i in range(contexts):
+        labels = {'verb': 'GET', 'resource': 'resource{}'.format(i), 'scope': 'cluster', 'component': 'apiserver'}
+        for j, upper_bound in enumerate(upper_bounds):
+            metric.samples.append(
+                Sample('apiserver_request_duration_seconds_bucket', dict(labels, le=upper_bound), float(j * 10))
+            )
+        metric.samples.append(Sample('apiserver_request_duration_seconds_sum', dict(labels), 1.5))
+        metric.samples.append(Sample('apiserver_request_duration_seconds_count', dict(labels), 110.0))
+    return metric
+
+
+def decumulate_histogram_buckets_by_hash(check, metric):
+    """
+    The previous implementation, which hashes the labels of every bucket twice and sorts the buckets of every
+    context, for comparison.
+    """
+    bucket_values_by_context_upper_bound = {}
+    for sample in metric.samples:
+        if sample[0].endswith("_bucket"):
+            context_key = hash(frozenset(sorted((k, v) for k, v in sample[1].items() if k != 'le')))
+            bucket_values_by_context_upper_bound.setdefault(context_key, {})[float(sample[1]["le"])] = sample[2]
+
+    bucket_tuples_by_context_upper_bound = {}
+    for context, values in bucket_values_by_context_upper_bound.items():
+        upper_bounds = sorted(values)
+        tuples = bucket_tuples_by_context_upper_bound[context] = {}
+        for i, upper_b in enumerate(upper_bounds):
+            if i == 0:
+                tuples[upper_b] = (0 if upper_b > 0 else check.MINUS_INF, upper_b, values[upper_b])
+            else:
+                tuples[upper_b] = (upper_bounds[i - 1], upper_b, values[upper_b] - values[upper_bounds[i - 1]])
+
+    for i, sample in enumerate(metric.samples):
+        if not sample[0].endswith("_bucket"):
+            continue
+        context_key = hash(frozenset(sorted((k, v) for k, v in sample[1].items() if k != 'le')))
+        matching_bucket_tuple = bucket_tuples_by_context_upper_bound[context_key][float(sample[1]["le"])]
+        sample[1]["lower_bound"] = str(matching_bucket_tuple[0])
+        metric.samples[i] = Sample(sample[0], sample[1], matching_bucket_tuple[2])
+
+
+def test_decumulate_histogram_buckets(benchmark):
+    check = OpenMetricsBaseCheck('test', {}, [{'prometheus_url': 'foo', 'namespace': 'bar', 'metrics': ['*']}])
+
+    benchmark.pedantic(
+        check._decumulate_histogram_buckets, setup=lambda: ((histogram_family(),), {}), rounds=20, warmup_rounds=1
+    )
+
+
+def test_decumulate_histogram_buckets_by_hash(benchmark):
+    check = OpenMetricsBaseCheck('test', {}, [{'prometheus_url': 'foo', 'namespace': 'bar', 'metrics': ['*']}])
+
+    benchmark.pedantic(
+        decumulate_histogram_buckets_by_hash,
+        setup=lambda: ((check, histogram_family()), {}),
+        rounds=20,
+        warmup_rounds=1,
+    )
+
+    # Both implementations give the same results
+    metric, expected = histogram_family(), histogram_family()
+    check._decumulate_histogram_buckets(metric)
+    decumulate_histogram_buckets_by_hash(check, expected)
+    assert metric.samples == expected.samples
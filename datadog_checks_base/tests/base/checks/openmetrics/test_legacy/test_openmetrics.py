@@ -1394,6 +1394,30 @@ def test_decumulate_histogram_buckets_negative_buckets(p_check, mocked_prometheu
     assert sorted(expected_metric.samples, key=lambda i: i[0]) == sorted(current_metric.samples, key=lambda i: i[0])
 
 
+def test_decumulate_histogram_buckets_unordered(p_check, mocked_prometheus_scraper_config):
+    # the buckets of the GET context are split and out of order, the labels are not in the same order either
+    metric = HistogramMetricFamily('random_histogram', 'Nonsense histogram.')
+    metric.samples = [
+        Sample('random_histogram_bucket', {'verb': 'GET', 'le': '2'}, 20.0),
+        Sample('random_histogram_bucket', {'verb': 'GET', 'le': '+Inf'}, 30.0),
+        Sample('random_histogram_bucket', {'verb': 'POST', 'le': '1'}, 5.0),
+        Sample('random_histogram_bucket', {'verb': 'POST', 'le': '+Inf'}, 7.0),
+        Sample('random_histogram_bucket', {'le': '1', 'verb': 'GET'}, 10.0),
+        Sample('random_histogram_count', {'verb': 'GET'}, 30.0),
+    ]
+
+    p_check._decumulate_histogram_buckets(metric)
+
+    assert metric.samples == [
+        Sample('random_histogram_bucket', {'verb': 'GET', 'le': '2', 'lower_bound': '1.0'}, 10.0),
+        Sample('random_histogram_bucket', {'verb': 'GET', 'le': '+Inf', 'lower_bound': '2.0'}, 10.0),
+        Sample('random_histogram_bucket', {'verb': 'POST', 'le': '1', 'lower_bound': '0'}, 5.0),
+        Sample('random_histogram_bucket', {'verb': 'POST', 'le': '+Inf', 'lower_bound': '1.0'}, 2.0),
+        Sample('random_histogram_bucket', {'le': '1', 'verb': 'GET', 'lower_bound': '0'}, 10.0),
+        Sample('random_histogram_count', {'verb': 'GET'}, 30.0),
+    ]
+
+
 def test_decumulate_histogram_buckets_no_buckets(p_check, mocked_prometheus_scraper_config):
     # buckets are not necessary ordered
     text_data = (
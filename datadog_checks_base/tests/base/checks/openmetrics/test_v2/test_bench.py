@@ -4,8 +4,10 @@
 import os
 
 import pytest
+from prometheus_client.parser import text_fd_to_metric_families
 
 from datadog_checks.base import OpenMetricsBaseCheckV2
+from datadog_checks.base.checks.openmetrics.v2.parser import FastTextParser
 from datadog_checks.dev import get_here
 
 from ..bench_utils import AMAZON_MSK_JMX_METRICS_MAP, AMAZON_MSK_JMX_METRICS_OVERRIDES
@@ -24,9 +26,14 @@ def fixture_amazon_msk_jmx_metrics():
     return os.path.join(FIXTURE_PATH, 'amazon_msk_jmx_metrics.txt')
 
 
-def test_ksm_new(benchmark, dd_run_check, mock_http_response, fixture_ksm):
+@pytest.mark.parametrize('text_parser', ['prometheus_client', 'fast'])
+def test_ksm_new(benchmark, dd_run_check, mock_http_response, fixture_ksm, text_parser):
     mock_http_response(file_path=fixture_ksm)
-    c = OpenMetricsBaseCheckV2('test', {}, [{'openmetrics_endpoint': 'foo', 'namespace': 'bar', 'metrics': ['.+']}])
+    c = OpenMetricsBaseCheckV2(
+        'test',
+        {},
+        [{'openmetrics_endpoint': 'foo', 'namespace': 'bar', 'metrics': ['.+'], 'text_parser': text_parser}],
+    )
 
     # Run once to get initialization steps out of the way.
     dd_run_check(c)
@@ -34,7 +41,25 @@ def test_ksm_new(benchmark, dd_run_check, mock_http_response, fixture_ksm):
     benchmark(c.check, None)
 
 
-def test_amazon_msk_jmx_metrics_new(benchmark, dd_run_check, mock_http_response, fixture_amazon_msk_jmx_metrics):
+@pytest.mark.parametrize('tag_cache_size', [0, 100000])
+def test_ksm_new_tag_cache(benchmark, dd_run_check, mock_http_response, fixture_ksm, tag_cache_size):
+    mock_http_response(file_path=fixture_ksm)
+    c = OpenMetricsBaseCheckV2(
+        'test',
+        {},
+        [{'openmetrics_endpoint': 'foo', 'namespace': 'bar', 'metrics': ['.+'], 'tag_cache_size': tag_cache_size}],
+    )
+
+    # Run once to get initialization steps out of the way.
+    dd_run_check(c)
+
+    benchmark(c.check, None)
+
+
+@pytest.mark.parametrize('text_parser', ['prometheus_client', 'fast'])
+def test_amazon_msk_jmx_metrics_new(
+    benchmark, dd_run_check, mock_http_response, fixture_amazon_msk_jmx_metrics, text_parser
+):
     mock_http_response(file_path=fixture_amazon_msk_jmx_metrics)
 
     metrics = []
@@ -45,7 +70,11 @@ def test_amazon_msk_jmx_metrics_new(benchmark, dd_run_check, mock_http_response,
 
         metrics.append(config)
 
-    c = OpenMetricsBaseCheckV2('test', {}, [{'openmetrics_endpoint': 'foo', 'namespace': 'bar', 'metrics': metrics}])
+    c = OpenMetricsBaseCheckV2(
+        'test',
+        {},
+        [{'openmetrics_endpoint': 'foo', 'namespace': 'bar', 'metrics': metrics, 'text_parser': text_parser}],
+    )
 
     # Run once to get initialization steps out of the way.
     dd_run_check(c)
@@ -53,13 +82,15 @@ def test_amazon_msk_jmx_metrics_new(benchmark, dd_run_check, mock_http_response,
     benchmark(c.check, None)
 
 
-def test_label_joins_new(benchmark, dd_run_check, mock_http_response, fixture_ksm):
+@pytest.mark.parametrize('text_parser', ['prometheus_client', 'fast'])
+def test_label_joins_new(benchmark, dd_run_check, mock_http_response, fixture_ksm, text_parser):
     mock_http_response(file_path=fixture_ksm)
     instance = {
         'openmetrics_endpoint': 'foo',
         'namespace': 'bar',
         'hostname_label': 'node',
         'metrics': ['.+'],
+        'text_parser': text_parser,
         'share_labels': {
             'kube_pod_info': {'match': ['pod', 'namespace'], 'labels': ['node'], 'values': [1]},
             '1': {'match': ['pod', 'namespace'], 'labels': ['node'], 'values': [1]},
@@ -79,3 +110,22 @@ def test_label_joins_new(benchmark, dd_run_check, mock_http_response, fixture_ks
     dd_run_check(c)
 
     benchmark(c.check, None)
+
+
+@pytest.mark.parametrize('fixture', ['ksm.txt', 'amazon_msk_jmx_metrics.txt'])
+def test_parse_prometheus_client(benchmark, fixture):
+    with open(os.path.join(FIXTURE_PATH, fixture), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    benchmark(lambda: list(text_fd_to_metric_families(lines)))
+
+
+@pytest.mark.parametrize('fixture', ['ksm.txt', 'amazon_msk_jmx_metrics.txt'])
+def test_parse_fast(benchmark, fixture):
+    with open(os.path.join(FIXTURE_PATH, fixture), 'rb') as f:
+        data = f.read()
+
+    chunks = [data[i : i + 65536] for i in range(0, len(data), 65536)]
+    parser = FastTextParser()
+
+    benchmark(lambda: list(parser.parse(chunks)))
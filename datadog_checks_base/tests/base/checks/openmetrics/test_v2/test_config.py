@@ -426,3 +426,29 @@ class TestUseLatestSpec:
         check.configure_scrapers()
         scraper = check.scrapers['test']
         assert scraper.http.options['headers']['Accept'] == 'text/plain'
+
+
+class TestTextParser:
+    def test_unknown(self, dd_run_check):
+        check = get_check({'text_parser': 'foo'})
+
+        with pytest.raises(Exception, match='^Setting `text_parser` must be one of: prometheus_client, fast$'):
+            dd_run_check(check, extract_message=True)
+
+
+class TestTagCacheSize:
+    @pytest.mark.parametrize('tag_cache_size', [-1, 'foo'])
+    def test_invalid(self, dd_run_check, tag_cache_size):
+        check = get_check({'tag_cache_size': tag_cache_size})
+
+        with pytest.raises(Exception, match='^Setting `tag_cache_size` must be a positive integer$'):
+            dd_run_check(check, extract_message=True)
+
+
+class TestScrapeConcurrency:
+    @pytest.mark.parametrize('scrape_concurrency', [0, 'foo'])
+    def test_invalid(self, dd_run_check, scrape_concurrency):
+        check = get_check({'scrape_concurrency': scrape_concurrency})
+
+        with pytest.raises(Exception, match='^Setting `scrape_concurrency` must be an integer greater than 0$'):
+            dd_run_check(check, extract_message=True)
@@ -1,8 +1,12 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import pytest
+from requests.exceptions import ConnectionError
+
 from datadog_checks.base import OpenMetricsBaseCheckV2
 from datadog_checks.base.constants import ServiceCheck
+from datadog_checks.dev.http import MockResponse
 
 from .utils import get_check
 
@@ -125,3 +129,57 @@ def test_custom_transformer(aggregator, dd_run_check, mock_http_response):
     dd_run_check(check)
 
     aggregator.assert_metric('test.server.watchdog_mega_miss', metric_type=aggregator.GAUGE, count=2)
+
+
+def test_concurrent_scrapes(aggregator, dd_run_check, mocker):
+    class Check(OpenMetricsBaseCheckV2):
+        __NAMESPACE__ = 'test'
+
+        def __init__(self, name, init_config, instances):
+            super().__init__(name, init_config, instances)
+            self.scraper_configs = [
+                {'openmetrics_endpoint': endpoint, 'metrics': ['.+'], 'telemetry': True}
+                for endpoint in ('foo', 'bar', 'baz')
+            ]
+
+    def get(url, *args, **kwargs):
+        if url == 'baz':
+            raise ConnectionError('unreachable')
+
+        return MockResponse(
+            f"""
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{{endpoint_name="{url}"}} 6.396288e+06
+            """
+        )
+
+    mocker.patch('requests.get', side_effect=get)
+    check = Check('test', {}, [{'openmetrics_endpoint': 'foo', 'scrape_concurrency': 3}])
+
+    with pytest.raises(Exception, match='There was an error scraping endpoint baz: unreachable'):
+        dd_run_check(check, extract_message=True)
+
+    for endpoint in ('foo', 'bar'):
+        tags = [f'endpoint:{endpoint}']
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes',
+            6396288,
+            metric_type=aggregator.GAUGE,
+            tags=tags + [f'endpoint_name:{endpoint}'],
+        )
+        aggregator.assert_metric('test.telemetry.fetch.duration', tags=tags)
+        aggregator.assert_metric('test.telemetry.scrape.duration', tags=tags)
+        aggregator.assert_metric('test.telemetry.metrics.input.count', tags=tags)
+        aggregator.assert_metric('test.telemetry.metrics.processed.count', tags=tags)
+        aggregator.assert_metric('test.telemetry.payload.size', tags=tags)
+        aggregator.assert_service_check('test.openmetrics.health', ServiceCheck.OK, tags=tags)
+
+    aggregator.assert_service_check(
+        'test.openmetrics.health', ServiceCheck.CRITICAL, tags=['endpoint:baz'], message='unreachable'
+    )
+    aggregator.assert_all_metrics_covered()
+    assert check._scrape_executor is not None
+
+    check.cancel()
+    assert check._scrape_executor is None
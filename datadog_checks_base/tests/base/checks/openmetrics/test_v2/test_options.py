@@ -1,13 +1,24 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import os
+
 import pytest
+from google.protobuf.internal.encoder import _VarintBytes  # pylint: disable=E0611,E0401
 from mock import Mock
 
+from datadog_checks.base.checks.openmetrics.v2.scraper import PROTOBUF_ACCEPT_HEADER
+from datadog_checks.base.checks.openmetrics.v2.tag_cache import SeriesTagCache
 from datadog_checks.base.constants import ServiceCheck
+from datadog_checks.base.utils.prometheus import metrics_pb2
+from datadog_checks.dev import get_here
+from datadog_checks.dev.http import MockResponse
 
 from .utils import get_check
 
+HERE = get_here()
+FIXTURE_PATH = os.path.abspath(os.path.join(os.path.dirname(HERE), '..', '..', '..', 'fixtures', 'prometheus'))
+
 
 class TestNamespace:
     def test(self, aggregator, dd_run_check, mock_http_response):
@@ -317,6 +328,488 @@ class TestRawLineFilters:
         aggregator.assert_all_metrics_covered()
 
 
+class TestTextParser:
+    def test_exclude_metrics(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            # HELP go_memstats_gc_sys_bytes Number of bytes used for garbage collection system metadata.
+            # TYPE go_memstats_gc_sys_bytes gauge
+            go_memstats_gc_sys_bytes{bar="foo"} 901120
+            # HELP go_memstats_free_bytes Number of bytes free and available for use.
+            # TYPE go_memstats_free_bytes gauge
+            go_memstats_free_bytes{foo="bar"} 6.396288e+06
+            go_memstats_free_bytes{foo="baz"} 6.396288e+06
+            """
+        )
+        check = get_check(
+            {
+                'metrics': ['.+'],
+                'exclude_metrics': ['^go_memstats_(alloc|free)_bytes$'],
+                'text_parser': 'fast',
+                'telemetry': True,
+            }
+        )
+        dd_run_check(check)
+
+        aggregator.assert_metric(
+            'test.go_memstats_gc_sys_bytes', 901120, metric_type=aggregator.GAUGE, tags=['endpoint:test', 'bar:foo']
+        )
+        aggregator.assert_metric('test.telemetry.metrics.input.count', 4, tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.metrics.ignored.count', 3, tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.metrics.processed.count', 1, tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.payload.size', tags=['endpoint:test'])
+
+        aggregator.assert_all_metrics_covered()
+
+    def test_exclude_metrics_share_labels(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP kube_pod_info Information about pod.
+            # TYPE kube_pod_info gauge
+            kube_pod_info{namespace="default",pod="foo",node="node-1"} 1
+            # HELP kube_pod_status_ready Describes whether the pod is ready to serve requests.
+            # TYPE kube_pod_status_ready gauge
+            kube_pod_status_ready{namespace="default",pod="foo",condition="true"} 1
+            """
+        )
+        check = get_check(
+            {
+                'metrics': ['.+'],
+                'exclude_metrics': ['kube_pod_info'],
+                'share_labels': {'kube_pod_info': {'match': ['pod', 'namespace'], 'labels': ['node']}},
+                'text_parser': 'fast',
+            }
+        )
+        dd_run_check(check)
+
+        aggregator.assert_metric(
+            'test.kube_pod_status_ready',
+            1,
+            metric_type=aggregator.GAUGE,
+            tags=['endpoint:test', 'namespace:default', 'pod:foo', 'condition:true', 'node:node-1'],
+        )
+
+        aggregator.assert_all_metrics_covered()
+
+    def test_raw_line_filters(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{bar=""} 6.396288e+06
+            # HELP go_memstats_gc_sys_bytes Number of bytes used for garbage collection system metadata.
+            # TYPE go_memstats_gc_sys_bytes gauge
+            go_memstats_gc_sys_bytes{foo="bar"} 901120
+            # HELP go_memstats_free_bytes Number of bytes free and available for use.
+            # TYPE go_memstats_free_bytes gauge
+            go_memstats_free_bytes{foo=""} 6.396288e+06
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'raw_line_filters': ['=""'], 'text_parser': 'fast', 'telemetry': True})
+        dd_run_check(check)
+
+        aggregator.assert_metric(
+            'test.go_memstats_gc_sys_bytes', 901120, metric_type=aggregator.GAUGE, tags=['endpoint:test', 'foo:bar']
+        )
+        aggregator.assert_metric('test.telemetry.metrics.blacklist.count', 2, tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.metrics.input.count', tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.metrics.processed.count', tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.payload.size', tags=['endpoint:test'])
+
+        aggregator.assert_all_metrics_covered()
+
+    def test_openmetrics_format(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            # EOF
+            """,
+            headers={'Content-Type': 'application/openmetrics-text; version=1.0.0; charset=utf-8'},
+        )
+        check = get_check({'metrics': ['.+'], 'text_parser': 'fast'})
+        dd_run_check(check)
+
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes', 6396288, metric_type=aggregator.GAUGE, tags=['endpoint:test', 'foo:bar']
+        )
+
+        aggregator.assert_all_metrics_covered()
+
+
+class TestUseProtobuf:
+    def test_protobuf(self, aggregator, dd_run_check, mocker):
+        get = mocker.patch(
+            'requests.get',
+            return_value=MockResponse(
+                file_path=os.path.join(FIXTURE_PATH, 'protobuf.bin'),
+                headers={'Content-Type': PROTOBUF_ACCEPT_HEADER},
+            ),
+        )
+        check = get_check(
+            {
+                'metrics': ['go_goroutines', 'go_memstats_mallocs', 'kube_pod_container_status_restarts'],
+                'use_protobuf': True,
+            }
+        )
+        dd_run_check(check)
+
+        assert get.call_args.kwargs['headers']['Accept'] == f'{PROTOBUF_ACCEPT_HEADER},text/plain'
+        aggregator.assert_metric('test.go_goroutines', 23, metric_type=aggregator.GAUGE, tags=['endpoint:test'])
+        aggregator.assert_metric(
+            'test.go_memstats_mallocs.count', 334483, metric_type=aggregator.MONOTONIC_COUNT, tags=['endpoint:test']
+        )
+        aggregator.assert_metric(
+            'test.kube_pod_container_status_restarts.count',
+            0,
+            metric_type=aggregator.MONOTONIC_COUNT,
+            tags=['endpoint:test', 'container:dd-agent', 'namespace:default', 'pod:dd-agent'],
+        )
+
+    def test_text_fallback(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes 6.396288e+06
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'use_protobuf': True})
+        dd_run_check(check)
+
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes', 6396288, metric_type=aggregator.GAUGE, tags=['endpoint:test']
+        )
+
+        aggregator.assert_all_metrics_covered()
+
+    def test_native_histogram(self, aggregator, dd_run_check, mocker, tmp_path):
+        family = metrics_pb2.MetricFamily(name='latency_seconds', type=metrics_pb2.HISTOGRAM)
+        metric = family.metric.add()
+        metric.label.add(name='verb', value='GET')
+        metric.histogram.sample_count = 3
+        metric.histogram.sample_sum = 2.5
+        metric.histogram.schema = 0
+        metric.histogram.positive_span.add(offset=0, length=2)
+        metric.histogram.positive_delta.extend([1, 0])
+        metric.histogram.zero_threshold = 0.001
+        metric.histogram.zero_count = 1
+
+        payload = tmp_path / 'payload.bin'
+        payload.write_bytes(_VarintBytes(family.ByteSize()) + family.SerializeToString())
+        mocker.patch(
+            'requests.get',
+            return_value=MockResponse(file_path=str(payload), headers={'Content-Type': PROTOBUF_ACCEPT_HEADER}),
+        )
+        check = get_check({'metrics': ['.+'], 'use_protobuf': True, 'non_cumulative_histogram_buckets': True})
+        dd_run_check(check)
+
+        tags = ['endpoint:test', 'verb:GET']
+        for lower_bound, upper_bound, value in (('0', '0.001', 1), ('0.001', '1.0', 1), ('1.0', '2.0', 1)):
+            aggregator.assert_metric(
+                'test.latency_seconds.bucket',
+                value,
+                metric_type=aggregator.MONOTONIC_COUNT,
+                tags=tags + [f'lower_bound:{lower_bound}', f'upper_bound:{upper_bound}'],
+            )
+        aggregator.assert_metric('test.latency_seconds.sum', 2.5, metric_type=aggregator.MONOTONIC_COUNT, tags=tags)
+        aggregator.assert_metric('test.latency_seconds.count', 3, metric_type=aggregator.MONOTONIC_COUNT, tags=tags)
+
+        aggregator.assert_all_metrics_covered()
+
+
+class TestTagCacheSize:
+    def test_cached_tags(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar",baz="qux"} 6.396288e+06
+            go_memstats_alloc_bytes{foo="bar",node="foo"} 9
+            go_memstats_alloc_bytes{foo="baz"} 10
+            """
+        )
+        check = get_check(
+            {
+                'metrics': ['.+'],
+                'tag_cache_size': 100,
+                'rename_labels': {'foo': 'bar'},
+                'exclude_labels': ['baz'],
+                'exclude_metrics_by_labels': {'foo': ['baz']},
+                'hostname_label': 'node',
+                'telemetry': True,
+            }
+        )
+        dd_run_check(check)
+        aggregator.reset()
+        dd_run_check(check)
+
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes', 6396288, metric_type=aggregator.GAUGE, tags=['endpoint:test', 'bar:bar']
+        )
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes',
+            9,
+            metric_type=aggregator.GAUGE,
+            tags=['endpoint:test', 'bar:bar', 'node:foo'],
+            hostname='foo',
+        )
+        aggregator.assert_metric('test.telemetry.tag_cache.hits.count', 3, tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.tag_cache.misses.count', 0, tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.tag_cache.size', 3, tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.metrics.input.count', tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.metrics.processed.count', tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.payload.size', tags=['endpoint:test'])
+
+        aggregator.assert_all_metrics_covered()
+
+    def test_eviction(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 1
+            go_memstats_alloc_bytes{foo="baz"} 2
+            go_memstats_alloc_bytes{foo="qux"} 3
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'tag_cache_size': 2})
+        dd_run_check(check)
+
+        for value, tag in ((1, 'foo:bar'), (2, 'foo:baz'), (3, 'foo:qux')):
+            aggregator.assert_metric(
+                'test.go_memstats_alloc_bytes', value, metric_type=aggregator.GAUGE, tags=['endpoint:test', tag]
+            )
+
+        aggregator.assert_all_metrics_covered()
+        assert len(check.scrapers['test'].tag_cache) == 2
+
+    def test_least_recently_used_evicted(self):
+        compute_tags = Mock(side_effect=lambda labels: ([f'foo:{labels["foo"]}'], ''))
+        tag_cache = SeriesTagCache(2, compute_tags)
+
+        for value in ('bar', 'baz', 'bar', 'qux', 'bar'):
+            assert tag_cache.get('metric', {'foo': value}) == ([f'foo:{value}'], '')
+
+        # `baz` was evicted rather than `bar`, which was used since
+        assert (tag_cache.hits, tag_cache.misses) == (2, 3)
+        assert tag_cache.get('metric', {'foo': 'baz'}) == (['foo:baz'], '')
+        assert tag_cache.misses == 4
+
+    def test_dynamic_tags(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'tag_cache_size': 100})
+        dd_run_check(check)
+        aggregator.reset()
+
+        check.set_dynamic_tags('baz:qux')
+        dd_run_check(check)
+
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes',
+            6396288,
+            metric_type=aggregator.GAUGE,
+            tags=['endpoint:test', 'foo:bar', 'baz:qux'],
+        )
+
+        aggregator.assert_all_metrics_covered()
+
+    def test_histogram_buckets(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP rest_client_request_latency_seconds Request latency in seconds.
+            # TYPE rest_client_request_latency_seconds histogram
+            rest_client_request_latency_seconds_bucket{url="http://127.0.0.1:8080/api",verb="GET",le="0.004"} 702
+            rest_client_request_latency_seconds_bucket{url="http://127.0.0.1:8080/api",verb="GET",le="0.008"} 727
+            rest_client_request_latency_seconds_sum{url="http://127.0.0.1:8080/api",verb="GET"} 2.185820220000001
+            rest_client_request_latency_seconds_count{url="http://127.0.0.1:8080/api",verb="GET"} 755
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'tag_cache_size': 100, 'non_cumulative_histogram_buckets': True})
+        for _ in range(2):
+            aggregator.reset()
+            dd_run_check(check)
+
+        tags = ['endpoint:test', 'url:http://127.0.0.1:8080/api', 'verb:GET']
+        aggregator.assert_metric(
+            'test.rest_client_request_latency_seconds.bucket',
+            702,
+            metric_type=aggregator.MONOTONIC_COUNT,
+            tags=tags + ['lower_bound:0', 'upper_bound:0.004'],
+        )
+        aggregator.assert_metric(
+            'test.rest_client_request_latency_seconds.bucket',
+            25,
+            metric_type=aggregator.MONOTONIC_COUNT,
+            tags=tags + ['lower_bound:0.004', 'upper_bound:0.008'],
+        )
+        aggregator.assert_metric(
+            'test.rest_client_request_latency_seconds.sum', metric_type=aggregator.MONOTONIC_COUNT, tags=tags
+        )
+        aggregator.assert_metric(
+            'test.rest_client_request_latency_seconds.count', metric_type=aggregator.MONOTONIC_COUNT, tags=tags
+        )
+
+        aggregator.assert_all_metrics_covered()
+
+
+class TestSkipUnchangedPayloads:
+    def test_gauges_replayed(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            go_memstats_alloc_bytes{foo="baz"} 5
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'skip_unchanged_payloads': True, 'telemetry': True})
+        dd_run_check(check)
+        aggregator.reset()
+
+        scraper = check.scrapers['test']
+        scraper.metric_transformer.get = Mock(side_effect=Exception('the payload should not be transformed'))
+        dd_run_check(check)
+
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes', 6396288, metric_type=aggregator.GAUGE, tags=['endpoint:test', 'foo:bar']
+        )
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes', 5, metric_type=aggregator.GAUGE, tags=['endpoint:test', 'foo:baz']
+        )
+        aggregator.assert_metric('test.telemetry.payload.unchanged.count', 1, tags=['endpoint:test'])
+        # The payload is not parsed again, the parsed samples are neither counted as input nor as processed
+        aggregator.assert_metric('test.telemetry.metrics.input.count', count=0)
+        aggregator.assert_metric('test.telemetry.metrics.processed.count', count=0)
+        aggregator.assert_metric('test.telemetry.payload.size', tags=['endpoint:test'])
+        aggregator.assert_service_check('test.openmetrics.health', ServiceCheck.OK, tags=['endpoint:test'])
+
+        aggregator.assert_all_metrics_covered()
+
+    def test_counters_not_replayed(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes 6.396288e+06
+            # HELP go_memstats_frees_total Total number of frees.
+            # TYPE go_memstats_frees_total counter
+            go_memstats_frees_total 1.2
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'skip_unchanged_payloads': True, 'telemetry': True})
+        dd_run_check(check)
+        aggregator.reset()
+        dd_run_check(check)
+
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', 6396288, metric_type=aggregator.GAUGE)
+        aggregator.assert_metric('test.go_memstats_frees.count', 1.2, metric_type=aggregator.MONOTONIC_COUNT)
+        aggregator.assert_metric('test.telemetry.payload.unchanged.count', count=0)
+
+    def test_payload_changed(self, aggregator, dd_run_check, mock_http_response):
+        payload = """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes {}
+            """
+        check = get_check({'metrics': ['.+'], 'skip_unchanged_payloads': True})
+
+        for value in (1, 2):
+            mock_http_response(payload.format(value))
+            dd_run_check(check)
+
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', 1, metric_type=aggregator.GAUGE, count=1)
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', 2, metric_type=aggregator.GAUGE, count=1)
+
+    def test_not_modified(self, aggregator, dd_run_check, mocker):
+        requests = []
+
+        def get(url, *args, **kwargs):
+            requests.append(kwargs['headers'])
+            if 'If-None-Match' in kwargs['headers']:
+                return MockResponse(status_code=304)
+
+            return MockResponse(
+                """
+                # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+                # TYPE go_memstats_alloc_bytes gauge
+                go_memstats_alloc_bytes 5
+                """,
+                headers={'ETag': '"foo"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'},
+            )
+
+        mocker.patch('requests.get', side_effect=get)
+        check = get_check({'metrics': ['.+'], 'skip_unchanged_payloads': True})
+        dd_run_check(check)
+        dd_run_check(check)
+
+        assert 'If-None-Match' not in requests[0]
+        assert requests[1]['If-None-Match'] == '"foo"'
+        assert requests[1]['If-Modified-Since'] == 'Wed, 21 Oct 2015 07:28:00 GMT'
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', 5, metric_type=aggregator.GAUGE, count=2)
+
+    def test_dynamic_tags_changed(self, aggregator, dd_run_check, mocker):
+        requests = []
+
+        def get(url, *args, **kwargs):
+            requests.append(kwargs['headers'])
+            if 'If-None-Match' in kwargs['headers']:
+                return MockResponse(status_code=304)
+
+            return MockResponse(
+                """
+                # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+                # TYPE go_memstats_alloc_bytes gauge
+                go_memstats_alloc_bytes{foo="bar"} 5
+                """,
+                headers={'ETag': '"foo"'},
+            )
+
+        mocker.patch('requests.get', side_effect=get)
+        check = get_check({'metrics': ['.+'], 'skip_unchanged_payloads': True, 'telemetry': True})
+        dd_run_check(check)
+        aggregator.reset()
+
+        check.set_dynamic_tags('baz:qux')
+        dd_run_check(check)
+
+        # The submissions recorded with the previous tags are not replayed
+        assert 'If-None-Match' not in requests[1]
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes',
+            5,
+            metric_type=aggregator.GAUGE,
+            tags=['endpoint:test', 'foo:bar', 'baz:qux'],
+            count=1,
+        )
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', tags=['endpoint:test', 'foo:bar'], count=0)
+        aggregator.assert_metric('test.telemetry.payload.unchanged.count', count=0)
+
+        # The payload recorded with the new tags is replayed
+        aggregator.reset()
+        dd_run_check(check)
+
+        assert requests[2]['If-None-Match'] == '"foo"'
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes',
+            5,
+            metric_type=aggregator.GAUGE,
+            tags=['endpoint:test', 'foo:bar', 'baz:qux'],
+            count=1,
+        )
+        aggregator.assert_metric('test.telemetry.payload.unchanged.count', 1, tags=['endpoint:test', 'baz:qux'])
+
+
 class TestMetrics:
     def test_unknown_type_override(self, aggregator, dd_run_check, mock_http_response):
         mock_http_response(
@@ -0,0 +1,222 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import os
+import re
+
+import pytest
+from google.protobuf.internal.encoder import _VarintBytes  # pylint: disable=E0611,E0401
+from prometheus_client.parser import text_string_to_metric_families
+
+from datadog_checks.base.checks.openmetrics.v2.parser import FastTextParser, ProtobufParser
+from datadog_checks.base.utils.prometheus import metrics_pb2
+from datadog_checks.dev import get_here
+
+HERE = get_here()
+FIXTURE_PATH = os.path.abspath(os.path.join(os.path.dirname(HERE), '..', '..', '..', 'fixtures', 'prometheus'))
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def encode_families(*families):
+    return b''.join(_VarintBytes(family.ByteSize()) + family.SerializeToString() for family in families)
+
+
+def canonicalize_bounds(metrics):
+    # Bounds are formatted differently than Go's exposition but canonicalized before submission
+    metrics = list(metrics)
+    for metric in metrics:
+        for sample in metric.samples:
+            for label in ('le', 'quantile'):
+                if label in sample.labels:
+                    sample.labels[label] = float(sample.labels[label])
+
+    return metrics
+
+
+@pytest.mark.parametrize('fixture', ['ksm.txt', 'metrics.txt', 'amazon_msk_jmx_metrics.txt', 'deprecated.txt'])
+@pytest.mark.parametrize('chunk_size', [7, 65536])
+def test_fixtures_match_prometheus_client(fixture, chunk_size):
+    with open(os.path.join(FIXTURE_PATH, fixture), 'rb') as f:
+        data = f.read()
+
+    expected = list(text_string_to_metric_families(data.decode('utf-8')))
+
+    assert list(FastTextParser().parse(chunked(data, chunk_size))) == expected
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_edge_cases_match_prometheus_client(chunk_size):
+    text = (
+        '# HELP requests_total Total requests with "quotes", \\\\ and \\n escapes\n'
+        '# TYPE requests_total counter\n'
+        'requests_total{path="/a\\"b",code="200"} 12 1395066363000\n'
+        'requests_total{path="/c\\\\d",code="500",} 3\n'
+        '\n'
+        '# TYPE errors counter\n'
+        'errors{kind="timeout"} 1\n'
+        '# HELP latency_seconds Request latency\n'
+        '# TYPE latency_seconds histogram\n'
+        'latency_seconds_bucket{le="0.1"} 1\n'
+        'latency_seconds_bucket{le="+Inf"} 2\n'
+        'latency_seconds_sum 0.3\n'
+        'latency_seconds_count 2\n'
+        '# TYPE rpc_duration summary\n'
+        'rpc_duration{quantile="0.5"} 4.2\n'
+        'rpc_duration_sum 10\n'
+        'rpc_duration_count 3\n'
+        'untyped_one{ label = "spaces" , other="é"} 0\n'
+        'untyped_two\t-Inf\n'
+        '# Some comment\n'
+        'untyped_one 5\n'
+        'no_trailing_newline 1'
+    )
+
+    expected = list(text_string_to_metric_families(text))
+
+    assert list(FastTextParser().parse(chunked(text.encode('utf-8'), chunk_size))) == expected
+
+
+def test_exclude_family():
+    text = (
+        '# TYPE requests_total counter\n'
+        'requests_total{code="200"} 12\n'
+        'requests_total{code="500"} 3\n'
+        '# TYPE memory gauge\n'
+        'memory 5\n'
+        'untyped 1\n'
+    )
+    excluded = []
+
+    def exclude_family(name):
+        excluded.append(name)
+        return name in ('requests', 'untyped')
+
+    parser = FastTextParser(exclude_family=exclude_family)
+    metrics = list(parser.parse([text.encode('utf-8')]))
+    metrics.extend(parser.parse([text.encode('utf-8')]))
+
+    assert [metric.name for metric in metrics] == ['memory', 'memory']
+    assert parser.excluded_samples == 3
+    assert excluded == ['requests', 'memory', 'untyped']
+
+
+def test_line_filter():
+    text = '# TYPE memory gauge\nmemory{foo=""} 5\nmemory{foo="bar"} 6\n'
+
+    parser = FastTextParser(line_filter=re.compile('=""'))
+    metrics = list(parser.parse([text.encode('utf-8')]))
+
+    assert len(metrics) == 1
+    assert [sample.value for sample in metrics[0].samples] == [6]
+    assert parser.filtered_lines == 1
+
+
+def test_protobuf_fixture():
+    with open(os.path.join(FIXTURE_PATH, 'protobuf.bin'), 'rb') as f:
+        metrics = list(ProtobufParser().parse(f.read()))
+
+    assert len(metrics) == 61
+    assert metrics[-1].name == 'process_virtual_memory_bytes'
+    assert metrics[-1].samples[0].value == 39211008
+
+
+def test_protobuf_matches_text_format():
+    counter = metrics_pb2.MetricFamily(name='requests_total', help='Total requests', type=metrics_pb2.COUNTER)
+    for code, value in (('200', 12), ('500', 3)):
+        metric = counter.metric.add(timestamp_ms=1395066363000)
+        metric.label.add(name='code', value=code)
+        metric.counter.value = value
+
+    gauge = metrics_pb2.MetricFamily(name='memory', type=metrics_pb2.GAUGE)
+    gauge.metric.add().gauge.value = 5
+
+    histogram = metrics_pb2.MetricFamily(name='latency_seconds', help='Request latency', type=metrics_pb2.HISTOGRAM)
+    metric = histogram.metric.add()
+    metric.label.add(name='path', value='/')
+    metric.histogram.sample_count = 2
+    metric.histogram.sample_sum = 0.3
+    metric.histogram.bucket.add(upper_bound=0.1, cumulative_count=1)
+    metric.histogram.bucket.add(upper_bound=1, cumulative_count=1)
+
+    summary = metrics_pb2.MetricFamily(name='rpc_duration', type=metrics_pb2.SUMMARY)
+    metric = summary.metric.add()
+    metric.summary.sample_count = 3
+    metric.summary.sample_sum = 10
+    metric.summary.quantile.add(quantile=0.5, value=4.2)
+
+    untyped = metrics_pb2.MetricFamily(name='untyped', type=metrics_pb2.UNTYPED)
+    untyped.metric.add().untyped.value = -1
+
+    text = (
+        '# HELP requests_total Total requests\n'
+        '# TYPE requests_total counter\n'
+        'requests_total{code="200"} 12 1395066363000\n'
+        'requests_total{code="500"} 3 1395066363000\n'
+        '# TYPE memory gauge\n'
+        'memory 5\n'
+        '# HELP latency_seconds Request latency\n'
+        '# TYPE latency_seconds histogram\n'
+        'latency_seconds_bucket{path="/",le="0.1"} 1\n'
+        'latency_seconds_bucket{path="/",le="1"} 1\n'
+        'latency_seconds_bucket{path="/",le="+Inf"} 2\n'
+        'latency_seconds_sum{path="/"} 0.3\n'
+        'latency_seconds_count{path="/"} 2\n'
+        '# TYPE rpc_duration summary\n'
+        'rpc_duration{quantile="0.5"} 4.2\n'
+        'rpc_duration_sum 10\n'
+        'rpc_duration_count 3\n'
+        '# TYPE untyped untyped\n'
+        'untyped -1\n'
+    )
+
+    expected = canonicalize_bounds(text_string_to_metric_families(text))
+    payload = encode_families(counter, gauge, histogram, summary, untyped)
+
+    assert canonicalize_bounds(ProtobufParser().parse(payload)) == expected
+
+
+def test_protobuf_native_histogram():
+    family = metrics_pb2.MetricFamily(name='latency_seconds', type=metrics_pb2.HISTOGRAM)
+    histogram = family.metric.add().histogram
+    histogram.sample_count = 7
+    histogram.sample_sum = 12
+    histogram.schema = 0
+    histogram.zero_threshold = 0.001
+    histogram.zero_count = 1
+    histogram.negative_span.add(offset=1, length=1)
+    histogram.negative_delta.append(2)
+    # Buckets 0, 1 and 3 i.e. (0.5, 1], (1, 2] and (4, 8]
+    histogram.positive_span.add(offset=0, length=2)
+    histogram.positive_span.add(offset=1, length=1)
+    histogram.positive_delta.extend([1, 1, -1])
+
+    metrics = list(ProtobufParser().parse(encode_families(family)))
+
+    assert len(metrics) == 1
+    assert [(sample.name, sample.labels, sample.value) for sample in metrics[0].samples] == [
+        ('latency_seconds_bucket', {'le': '-1.0'}, 2),
+        ('latency_seconds_bucket', {'le': '0.001'}, 3),
+        ('latency_seconds_bucket', {'le': '1.0'}, 4),
+        ('latency_seconds_bucket', {'le': '2.0'}, 6),
+        ('latency_seconds_bucket', {'le': '8.0'}, 7),
+        ('latency_seconds_bucket', {'le': '+Inf'}, 7),
+        ('latency_seconds_sum', {}, 12),
+        ('latency_seconds_count', {}, 7),
+    ]
+
+
+def test_protobuf_exclude_family():
+    counter = metrics_pb2.MetricFamily(name='requests_total', type=metrics_pb2.COUNTER)
+    counter.metric.add().counter.value = 12
+    counter.metric.add().counter.value = 3
+    gauge = metrics_pb2.MetricFamily(name='memory', type=metrics_pb2.GAUGE)
+    gauge.metric.add().gauge.value = 5
+
+    parser = ProtobufParser(exclude_family=lambda name: name == 'requests')
+    metrics = list(parser.parse(encode_families(counter, gauge)))
+
+    assert [metric.name for metric in metrics] == ['memory']
+    assert parser.excluded_samples == 2
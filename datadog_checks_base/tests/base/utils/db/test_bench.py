@@ -0,0 +1,107 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+from datadog_checks.base.utils.db import QueryExecutor
+from datadog_checks.base.utils.db.utils import SUBMISSION_METHODS
+
+from .common import mock_executor
+
+ROWS = 5000
+
+
+class NullSubmitter(object):
+    """
+    Discards everything so that only the processing of the rows is measured.
+    """
+
+    def __getattr__(self, name):
+        if name not in SUBMISSION_METHODS:
+            raise AttributeError(name)
+        return self.submit
+
+    def submit(self, *args, **kwargs):
+        pass
+
+
+def run_query(benchmark, query, rows):
+    executor = QueryExecutor(mock_executor(rows), NullSubmitter(), queries=[query], tags=['env:test', 'app:db'])
+    executor.compile_queries()
+
+    benchmark(executor.execute)
+
+
+def test_metrics(benchmark):
+    query = {
+        'name': 'metrics',
+        'query': 'foo',
+        'columns': [{'name': 'metric.{}'.format(i), 'type': 'gauge'} for i in range(5)],
+    }
+    run_query(benchmark, query, [[i, i, i, i, i] for i in range(ROWS)])
+
+
+def test_tags_and_metrics(benchmark):
+    query = {
+        'name': 'tags and metrics',
+        'query': 'foo',
+        'columns': [
+            {'name': 'db', 'type': 'tag'},
+            {'name': 'schema', 'type': 'tag'},
+            {'name': 'table', 'type': 'tag_not_null'},
+            {'name': 'metric.rows', 'type': 'gauge'},
+            {'name': 'metric.reads', 'type': 'monotonic_count'},
+            {'name': 'metric.writes', 'type': 'rate'},
+        ],
+        'tags': ['query:tables'],
+    }
+    rows = [['db{}'.format(i % 3), 'public', 'table{}'.format(i % 100), i, i, i] for i in range(ROWS)]
+    run_query(benchmark, query, rows)
+
+
+def test_metric_prefix(benchmark):
+    query = {
+        'name': 'metric prefix',
+        'query': 'foo',
+        'columns': [
+            {'name': 'db', 'type': 'tag'},
+            {'name': 'ignored', 'type': 'source'},
+            None,
+            {'name': 'size', 'type': 'gauge'},
+        ],
+        'metric_prefix': 'custom',
+    }
+    run_query(benchmark, query, [['db{}'.format(i % 10), i, i, i] for i in range(ROWS)])
+
+
+def test_match(benchmark):
+    query = {
+        'name': 'match',
+        'query': 'foo',
+        'columns': [
+            {'name': 'db', 'type': 'tag'},
+            {'name': 'value', 'type': 'source'},
+            {
+                'name': 'metric',
+                'type': 'match',
+                'source': 'value',
+                'items': {'foo': {'name': 'test.foo', 'type': 'gauge'}, 'bar': {'name': 'test.bar', 'type': 'count'}},
+            },
+        ],
+    }
+    run_query(benchmark, query, [['db{}'.format(i % 10), i, 'foo' if i % 2 else 'bar'] for i in range(ROWS)])
+
+
+def test_extras(benchmark):
+    query = {
+        'name': 'extras',
+        'query': 'foo',
+        'columns': [
+            {'name': 'db', 'type': 'tag'},
+            {'name': 'hits', 'type': 'gauge'},
+            {'name': 'misses', 'type': 'gauge'},
+        ],
+        'extras': [
+            {'name': 'total', 'expression': 'hits + misses'},
+            {'name': 'hit_ratio', 'type': 'percent', 'part': 'hits', 'total': 'total'},
+        ],
+    }
+    run_query(benchmark, query, [['db{}'.format(i % 10), i, i + 1] for i in range(ROWS)])
@@ -4,10 +4,15 @@
 
 import copy
 import random
+from decimal import Decimal
 
 import pytest
 
-from datadog_checks.base.utils.db.statement_metrics import StatementMetrics, _merge_duplicate_rows
+from datadog_checks.base.utils.db.statement_metrics import (
+    ColumnarStatementMetrics,
+    StatementMetrics,
+    _merge_duplicate_rows,
+)
 
 
 def add_to_dict(a, b):
@@ -17,6 +22,11 @@ def add_to_dict(a, b):
     return a
 
 
+@pytest.fixture(params=[StatementMetrics, ColumnarStatementMetrics])
+def statement_metrics_class(request):
+    return request.param
+
+
 class TestStatementMetrics:
     @pytest.mark.parametrize(
         'fn_args',
@@ -26,13 +36,13 @@ class TestStatementMetrics:
             ([{}, {}, {}], [], lambda x: x.get('key')),
         ],
     )
-    def test_compute_derivative_rows_boundary_cases(self, fn_args):
-        sm = StatementMetrics()
+    def test_compute_derivative_rows_boundary_cases(self, fn_args, statement_metrics_class):
+        sm = statement_metrics_class()
         sm.compute_derivative_rows(*fn_args)
         sm.compute_derivative_rows(*fn_args)
 
-    def test_compute_derivative_rows_happy_path(self):
-        sm = StatementMetrics()
+    def test_compute_derivative_rows_happy_path(self, statement_metrics_class):
+        sm = statement_metrics_class()
 
         rows1 = [
             {'count': 13, 'time': 2005, 'errors': 1, 'query': 'COMMIT', 'db': 'puppies', 'user': 'dog'},
@@ -84,8 +94,8 @@ class TestStatementMetrics:
         # No changes should produce no rows
         assert [] == sm.compute_derivative_rows(rows2, metrics, key=key)
 
-    def test_compute_derivative_rows_stats_reset(self):
-        sm = StatementMetrics()
+    def test_compute_derivative_rows_stats_reset(self, statement_metrics_class):
+        sm = statement_metrics_class()
 
         def key(row):
             return (row['query'], row['db'], row['user'])
@@ -114,8 +124,8 @@ class TestStatementMetrics:
         assert 1 == len(sm.compute_derivative_rows(rows3, metrics, key=key))  # only 1 row computed
         assert 2 == len(sm.compute_derivative_rows(rows4, metrics, key=key))  # both rows computed
 
-    def test_compute_derivative_rows_with_duplicates(self):
-        sm = StatementMetrics()
+    def test_compute_derivative_rows_with_duplicates(self, statement_metrics_class):
+        sm = statement_metrics_class()
 
         def key(row):
             return (row['query_signature'], row['db'], row['user'])
@@ -183,6 +193,29 @@ class TestStatementMetrics:
 
         assert expected_merged_metrics == metrics
 
+    def test_compute_derivative_rows_value_types(self, statement_metrics_class):
+        sm = statement_metrics_class()
+
+        def key(row):
+            return row['query']
+
+        metrics = ['count', 'time', 'rows', 'blocks']
+
+        rows1 = [
+            {'count': 10, 'time': 1.5, 'rows': Decimal('3'), 'blocks': 1, 'query': 'COMMIT'},
+            {'count': 20, 'time': 2.5, 'rows': Decimal('4'), 'query': 'ROLLBACK'},
+        ]
+        rows2 = [
+            {'count': 11, 'time': 2.0, 'rows': Decimal('5'), 'blocks': 2, 'query': 'COMMIT'},
+            {'count': 20, 'time': 2.5, 'rows': Decimal('4'), 'query': 'ROLLBACK'},
+            {'count': 1, 'time': 1.0, 'rows': Decimal('1'), 'query': 'SELECT 1'},
+        ]
+
+        assert [] == sm.compute_derivative_rows(rows1, metrics, key=key)
+        derived_rows = sm.compute_derivative_rows(rows2, metrics, key=key)
+        assert derived_rows == [{'count': 1, 'time': 0.5, 'rows': Decimal('2'), 'blocks': 1, 'query': 'COMMIT'}]
+        assert [type(derived_rows[0][metric]) for metric in metrics] == [int, float, Decimal, int]
+
     def test_merge_duplicate_rows(self):
         rows = [
             {
@@ -271,7 +304,7 @@ class TestStatementMetrics:
             ]
             sm.compute_derivative_rows(rows, ['count', 'time'], lambda x: x['query_signature'])
 
-    def test_compute_derivative_rows_mem_usage(self):
+    def test_compute_derivative_rows_mem_usage(self, statement_metrics_class):
         '''
         Test that the memory usage of `compute_derivative_rows` is within acceptable limits
         Make sure we minimize the temporary objects created when computing the derivative
@@ -288,7 +321,7 @@ class TestStatementMetrics:
         tracemalloc.start()
 
         _, peak_before = tracemalloc.get_traced_memory()
-        sm = StatementMetrics()
+        sm = statement_metrics_class()
         self.__run_compute_derivative_rows(sm)
 
         _, peak_after = tracemalloc.get_traced_memory()
@@ -300,6 +333,29 @@ class TestStatementMetrics:
             peak_diff, MEMORY_USAGE_THRESHOLD
         )
 
-    def test_compute_derivative_rows_benchmark(self, benchmark):
-        sm = StatementMetrics()
+    def test_compute_derivative_rows_benchmark(self, benchmark, statement_metrics_class):
+        sm = statement_metrics_class()
         benchmark(self.__run_compute_derivative_rows, sm)
+
+    def test_compute_derivative_rows_many_columns_benchmark(self, benchmark, statement_metrics_class):
+        metrics = ['metric{}'.format(i) for i in range(20)]
+        snapshots = []
+        for run in range(10):
+            # About 10% of the statements change between runs
+            snapshots.append(
+                [
+                    dict(
+                        dict.fromkeys(metrics, i + run * (i % 10 == run % 10)),
+                        query_signature='sig{}'.format(i),
+                        query='x' * 3000,
+                    )
+                    for i in range(10000)
+                ]
+            )
+
+        def run():
+            sm = statement_metrics_class()
+            for rows in snapshots:
+                sm.compute_derivative_rows(rows, metrics, lambda x: x['query_signature'])
+
+        benchmark(run)
@@ -1,8 +1,11 @@
 # (C) Datadog, Inc. 2022-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import logging
+import threading
 import time
 
+import mock
 import pytest
 
 from datadog_checks.base import AgentCheck
@@ -265,3 +268,121 @@ class TestQueryExecutor:
 
         with pytest.raises(expected_exception):
             qe.compile_queries()
+
+    def test_tag_values_are_cached(self, aggregator):
+        queries = [
+            {
+                'name': 'query1',
+                'query': 'select 1',
+                'columns': [
+                    {'name': 'db', 'type': 'tag'},
+                    {'name': 'table', 'type': 'tag_not_null'},
+                    {'name': 'metric', 'type': 'gauge'},
+                ],
+            }
+        ]
+        rows = [['db1', 't1', 1], ['db1', None, 2], [1, 't1', 3], [True, 't2', 4], ['db1', 't3', 5]]
+
+        check = AgentCheck('test', {}, [{}])
+        qe = QueryExecutor(mock_executor(rows), check, queries, tags=['test:foo'])
+        qe.compile_queries()
+        with mock.patch('datadog_checks.base.utils.db.query.TAG_CACHE_SIZE', 2):
+            qe.execute()
+
+        aggregator.assert_metric('metric', 1, tags=['test:foo', 'db:db1', 'table:t1'])
+        aggregator.assert_metric('metric', 2, tags=['test:foo', 'db:db1'])
+        aggregator.assert_metric('metric', 3, tags=['test:foo', 'db:1', 'table:t1'])
+        aggregator.assert_metric('metric', 4, tags=['test:foo', 'db:True', 'table:t2'])
+        aggregator.assert_metric('metric', 5, tags=['test:foo', 'db:db1', 'table:t3'])
+        aggregator.assert_all_metrics_covered()
+
+        # Only string values are cached, up to the size of the cache
+        db_cache, table_cache = [cache for _, _, _, _, cache in qe.queries[0]._tag_columns]
+        assert db_cache == {'db1': 'db:db1'}
+        assert table_cache == {'t3': 'table:t3'}
+
+    def test_modifiers_override_submission_arguments(self):
+        queries = [
+            {
+                'name': 'query1',
+                'query': 'select 1',
+                'columns': [
+                    {'name': 'db', 'type': 'tag'},
+                    {'name': 'metric1', 'type': 'gauge', 'hostname': 'foo'},
+                    {'name': 'metric2', 'type': 'gauge'},
+                ],
+            }
+        ]
+
+        check = mock.Mock()
+        qe = QueryExecutor(mock_executor([['db1', 1, 2]]), check, queries, hostname='bar')
+        qe.compile_queries()
+        qe.execute()
+
+        assert check.gauge.call_args_list == [
+            mock.call('metric1', 1, tags=['db:db1'], hostname='foo', raw=False),
+            mock.call('metric2', 2, tags=['db:db1'], hostname='bar', raw=False),
+        ]
+
+    def test_executor_pool(self, aggregator):
+        queries = [
+            {'name': 'query{}'.format(i), 'query': str(i), 'columns': [{'name': 'metric{}'.format(i), 'type': 'gauge'}]}
+            for i in range(6)
+        ]
+        lock = threading.Lock()
+        running = set()
+        stats = {'max_running': 0, 'shared': False}
+
+        def create_executor(connection):
+            def executor(query):
+                with lock:
+                    stats['shared'] = stats['shared'] or connection in running
+                    running.add(connection)
+                    stats['max_running'] = max(stats['max_running'], len(running))
+                # The first queries are the slowest
+                time.sleep(0.05 * (6 - int(query)))
+                with lock:
+                    running.discard(connection)
+                return [[int(query)]]
+
+            return executor
+
+        check = mock.Mock(spec=AgentCheck)
+        check.name = 'test'
+        qe = QueryExecutor(
+            None,
+            check,
+            queries,
+            executor_pool=[create_executor(connection) for connection in range(3)],
+            track_operation_time=True,
+        )
+        qe.compile_queries()
+        qe.execute()
+
+        assert [c.args[:2] for c in check.gauge.call_args_list] == [('metric{}'.format(i), i) for i in range(6)]
+        assert stats == {'max_running': 3, 'shared': False}
+        assert sorted(c.kwargs['tags'][-1] for c in check.histogram.call_args_list) == [
+            'operation:query{}'.format(i) for i in range(6)
+        ]
+
+    def test_executor_pool_query_error(self, aggregator, caplog):
+        queries = [
+            {'name': 'query{}'.format(i), 'query': str(i), 'columns': [{'name': 'metric{}'.format(i), 'type': 'gauge'}]}
+            for i in range(3)
+        ]
+
+        def executor(query):
+            if query == '1':
+                raise Exception('Invalid query')
+            return [[int(query)]]
+
+        check = AgentCheck('test', {}, [{}])
+        qe = QueryExecutor(None, check, queries, executor_pool=[executor, executor])
+        qe.compile_queries()
+        with caplog.at_level(logging.ERROR):
+            qe.execute()
+
+        aggregator.assert_metric('metric0', 0)
+        aggregator.assert_metric('metric2', 2)
+        aggregator.assert_all_metrics_covered()
+        assert 'Error querying query1: Invalid query' in caplog.text
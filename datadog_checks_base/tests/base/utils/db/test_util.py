@@ -16,6 +16,7 @@ from datadog_checks.base.stubs.datadog_agent import datadog_agent
 from datadog_checks.base.utils.db.utils import (
     ConstantRateLimiter,
     DBMAsyncJob,
+    ObfuscationCache,
     RateLimitingTTLCache,
     default_json_event_encoding,
     get_agent_host_tags,
@@ -238,6 +239,69 @@ def test_obfuscate_sql_with_metadata_replace_null_character(input_query, expecte
         assert statement['query'] == expected_query
 
 
+def test_obfuscation_cache(aggregator):
+    calls = []
+
+    def _mock_obfuscate_sql(query, options=None):
+        calls.append((query, options))
+        return json.dumps({'query': query.upper(), 'metadata': {'tables_csv': 'a,b', 'commands': ['SELECT']}})
+
+    cache = ObfuscationCache()
+    with mock.patch.object(datadog_agent, 'obfuscate_sql', passthrough=True) as mock_agent:
+        mock_agent.side_effect = _mock_obfuscate_sql
+        first = cache.obfuscate_sql_with_metadata('select 1', '{}')
+        first['metadata']['tables'].append('c')
+        second = cache.obfuscate_sql_with_metadata('select 1', '{}')
+        other_options = cache.obfuscate_sql_with_metadata('select 1', '{"keep_sql_alias":true}')
+
+    expected = {'query': 'SELECT 1', 'metadata': {'tables': ['a', 'b'], 'commands': ['SELECT']}}
+    assert second == expected
+    assert other_options == expected
+    assert calls == [('select 1', '{}'), ('select 1', '{"keep_sql_alias":true}')]
+    assert len(cache) == 2
+    assert cache.bytes > 0
+
+    check = AgentCheck()
+    cache.submit_metrics(check, 'postgres', ['foo:bar'])
+    assert (cache.hits, cache.misses) == (0, 0)
+    aggregator.assert_metric('dd.postgres.obfuscation_cache.hits', 1, tags=['foo:bar'])
+    aggregator.assert_metric('dd.postgres.obfuscation_cache.misses', 2, tags=['foo:bar'])
+    aggregator.assert_metric('dd.postgres.obfuscation_cache.hit_rate', 1 / 3, tags=['foo:bar'])
+    aggregator.assert_metric('dd.postgres.obfuscation_cache.entries', 2, tags=['foo:bar'])
+    aggregator.assert_metric('dd.postgres.obfuscation_cache.bytes', cache.bytes, tags=['foo:bar'])
+
+
+def test_obfuscation_cache_eviction():
+    def _mock_obfuscate_sql(query, options=None):
+        return json.dumps({'query': query, 'metadata': {}})
+
+    cache = ObfuscationCache(max_bytes=ObfuscationCache.ENTRY_OVERHEAD * 3)
+    with mock.patch.object(datadog_agent, 'obfuscate_sql', passthrough=True) as mock_agent:
+        mock_agent.side_effect = _mock_obfuscate_sql
+        for query in ('select 1', 'select 2', 'select 1', 'select 3'):
+            cache.obfuscate_sql_with_metadata(query)
+
+        # The least recently used query was evicted
+        cache.obfuscate_sql_with_metadata('select 1')
+        cache.obfuscate_sql_with_metadata('select 2')
+
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert cache.bytes <= cache.max_bytes
+
+
+def test_obfuscation_cache_errors_not_cached():
+    cache = ObfuscationCache()
+    with mock.patch.object(datadog_agent, 'obfuscate_sql', passthrough=True) as mock_agent:
+        mock_agent.side_effect = Exception('failed')
+        for _ in range(2):
+            with pytest.raises(Exception, match='failed'):
+                cache.obfuscate_sql_with_metadata('select 1')
+
+    assert len(cache) == 0
+    assert cache.misses == 2
+
+
 class JobForTesting(DBMAsyncJob):
     def __init__(
         self, check, run_sync=False, enabled=True, rate_limit=10, min_collection_interval=15, job_execution_time=0
@@ -0,0 +1,200 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import threading
+from datetime import datetime, timedelta
+from hashlib import sha256
+
+import mock
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import AuthorityInformationAccessOID, NameOID
+
+from datadog_checks.base.utils.certificates import CacheStats, CertificateCache
+from datadog_checks.base.utils.http import RequestsWrapper
+
+pytestmark = [pytest.mark.unit]
+
+KEY = ec.generate_private_key(ec.SECP256R1())
+
+
+def create_certificate(subject, issuer, ca_issuers_uri=None):
+    now = datetime.utcnow()
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, subject)]))
+        .issuer_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, issuer)]))
+        .public_key(KEY.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + timedelta(days=30))
+    )
+    if ca_issuers_uri:
+        builder = builder.add_extension(
+            x509.AuthorityInformationAccess(
+                [
+                    x509.AccessDescription(
+                        AuthorityInformationAccessOID.CA_ISSUERS, x509.UniformResourceIdentifier(ca_issuers_uri)
+                    )
+                ]
+            ),
+            critical=False,
+        )
+    return builder.sign(KEY, hashes.SHA256()).public_bytes(serialization.Encoding.DER)
+
+
+LEAF = create_certificate('leaf.example.com', 'Intermediate CA', 'http://ca.example.com/intermediate.der')
+INTERMEDIATE = create_certificate('Intermediate CA', 'Root CA')
+ISSUER = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'Intermediate CA')])
+
+
+class TestLoadCertificate:
+    def test_parse_once(self):
+        cache = CertificateCache()
+
+        cert, fingerprint = cache.load_certificate(LEAF)
+        cached_cert, cached_fingerprint = cache.load_certificate(LEAF)
+
+        assert cached_cert is cert
+        assert fingerprint == cached_fingerprint == sha256(LEAF).digest()
+        assert cert.subject.rfc4514_string() == 'CN=leaf.example.com'
+        assert (cache.certificate_stats.hits, cache.certificate_stats.misses) == (1, 1)
+
+    def test_invalid_certificate(self):
+        cache = CertificateCache()
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                cache.load_certificate(b'not a certificate')
+
+        assert (cache.certificate_stats.hits, cache.certificate_stats.misses) == (0, 2)
+
+    def test_ttl(self):
+        cache = CertificateCache(ttl=10)
+
+        with mock.patch('time.monotonic', return_value=100):
+            cert, _ = cache.load_certificate(LEAF)
+        with mock.patch('time.monotonic', return_value=105):
+            assert cache.load_certificate(LEAF)[0] is cert
+            cache.load_certificate(INTERMEDIATE)
+        # The leaf was used less than 10 seconds ago
+        with mock.patch('time.monotonic', return_value=114):
+            assert cache.load_certificate(LEAF)[0] is cert
+        with mock.patch('time.monotonic', return_value=125):
+            cache.load_certificate(INTERMEDIATE)
+
+        assert cache.load_certificate(LEAF)[0] is not cert
+
+    def test_max_size(self):
+        cache = CertificateCache(max_size=1)
+
+        cert, _ = cache.load_certificate(LEAF)
+        cache.load_certificate(INTERMEDIATE)
+
+        assert cache.load_certificate(LEAF)[0] is not cert
+        assert (cache.certificate_stats.hits, cache.certificate_stats.misses) == (0, 3)
+
+    def test_caller_stats(self):
+        cache = CertificateCache()
+        stats = CacheStats()
+
+        cache.load_certificate(LEAF)
+        cache.load_certificate(LEAF, stats=stats)
+        cache.load_certificate(INTERMEDIATE, stats=stats)
+
+        assert (stats.hits, stats.misses) == (1, 1)
+        assert (cache.certificate_stats.hits, cache.certificate_stats.misses) == (1, 2)
+
+
+class TestDownload:
+    def test_download_once(self):
+        cache = CertificateCache()
+        fetch = mock.Mock(return_value=INTERMEDIATE)
+
+        assert cache.download(ISSUER, 'http://ca.example.com/a.der', fetch) == INTERMEDIATE
+        assert cache.download(ISSUER, 'http://ca.example.com/a.der', fetch) == INTERMEDIATE
+        cache.download(ISSUER, 'http://ca.example.com/b.der', fetch)
+
+        assert fetch.call_args_list == [
+            mock.call('http://ca.example.com/a.der'),
+            mock.call('http://ca.example.com/b.der'),
+        ]
+        assert (cache.download_stats.hits, cache.download_stats.misses) == (1, 2)
+
+    def test_caller_stats(self):
+        cache = CertificateCache()
+        fetch = mock.Mock(return_value=INTERMEDIATE)
+        stats = CacheStats()
+
+        cache.download(ISSUER, 'http://ca.example.com/a.der', fetch)
+        cache.download(ISSUER, 'http://ca.example.com/a.der', fetch, stats=stats)
+        cache.download(ISSUER, 'http://ca.example.com/b.der', fetch, stats=stats)
+
+        assert (stats.hits, stats.misses) == (1, 1)
+        assert (cache.download_stats.hits, cache.download_stats.misses) == (1, 2)
+
+    def test_max_age(self):
+        cache = CertificateCache()
+        fetch = mock.Mock(return_value=INTERMEDIATE)
+
+        with mock.patch('time.monotonic', return_value=100):
+            cache.download(ISSUER, 'http://ca.example.com/a.der', fetch, max_age=60)
+        with mock.patch('time.monotonic', return_value=150):
+            cache.download(ISSUER, 'http://ca.example.com/a.der', fetch, max_age=60)
+        with mock.patch('time.monotonic', return_value=170):
+            cache.download(ISSUER, 'http://ca.example.com/a.der', fetch, max_age=60)
+
+        assert fetch.call_count == 2
+
+    def test_errors_are_not_cached(self):
+        cache = CertificateCache()
+        fetch = mock.Mock(side_effect=[Exception('unreachable'), INTERMEDIATE])
+
+        with pytest.raises(Exception, match='unreachable'):
+            cache.download(ISSUER, 'http://ca.example.com/a.der', fetch)
+
+        assert cache.download(ISSUER, 'http://ca.example.com/a.der', fetch) == INTERMEDIATE
+        assert fetch.call_count == 2
+
+    def test_concurrent_downloads(self):
+        cache = CertificateCache()
+        downloading = threading.Event()
+        release = threading.Event()
+
+        def fetch(uri):
+            downloading.set()
+            release.wait(5)
+            return INTERMEDIATE
+
+        fetch = mock.Mock(side_effect=fetch)
+        results = []
+
+        def download():
+            results.append(cache.download(ISSUER, 'http://ca.example.com/a.der', fetch))
+
+        threads = [threading.Thread(target=download) for _ in range(5)]
+        threads[0].start()
+        downloading.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == [INTERMEDIATE] * 5
+        assert fetch.call_count == 1
+
+
+def test_requests_wrapper_share_downloads():
+    response = mock.Mock(content=INTERMEDIATE)
+    cache = CertificateCache()
+
+    with mock.patch.object(CertificateCache, 'shared_instance', return_value=cache):
+        with mock.patch('requests.get', return_value=response) as get:
+            certs = [RequestsWrapper({}, {}).load_intermediate_certs(LEAF, []) for _ in range(3)]
+
+    assert certs == [[INTERMEDIATE]] * 3
+    get.assert_called_once_with('http://ca.example.com/intermediate.der')
+    assert (cache.certificate_stats.hits, cache.certificate_stats.misses) == (4, 2)
@@ -7,6 +7,7 @@ from re import compile as re_compile
 from datadog_checks.base import ConfigurationError, is_affirmative
 
 MAX_FILEGAUGE_COUNT = 20
+FULL_SCAN_INTERVAL = 10
 
 
 class DirectoryConfig(object):
@@ -32,3 +33,18 @@ class DirectoryConfig(object):
         self.submit_histograms = is_affirmative(instance.get('submit_histograms', True))
         self.tags = instance.get('tags', [])
         self.max_filegauge_count = instance.get('max_filegauge_count', MAX_FILEGAUGE_COUNT)
+        self.traversal_workers = int(instance.get('traversal_workers', 1))
+        if self.traversal_workers < 1:
+            raise ConfigurationError('DirectoryCheck: `traversal_workers` must be a positive integer')
+
+        self.incremental = is_affirmative(instance.get('incremental', False))
+        self.full_scan_interval = int(instance.get('full_scan_interval', FULL_SCAN_INTERVAL))
+
+        if self.incremental:
+            if self.submit_histograms or self.filegauges:
+                raise ConfigurationError(
+                    'DirectoryCheck: `incremental` requires `submit_histograms` to be false and `filegauges` '
+                    'to be disabled'
+                )
+            if self.full_scan_interval < 1:
+                raise ConfigurationError('DirectoryCheck: `full_scan_interval` must be a positive integer')
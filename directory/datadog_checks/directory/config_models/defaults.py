@@ -32,10 +32,18 @@ def instance_follow_symlinks():
     return True
 
 
+def instance_full_scan_interval():
+    return 10
+
+
 def instance_ignore_missing():
     return False
 
 
+def instance_incremental():
+    return False
+
+
 def instance_min_collection_interval():
     return 15
 
@@ -54,3 +62,7 @@ def instance_stat_follow_symlinks():
 
 def instance_submit_histograms():
     return True
+
+
+def instance_traversal_workers():
+    return 1
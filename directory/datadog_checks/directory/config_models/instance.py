@@ -44,7 +44,9 @@ class InstanceConfig(BaseModel):
     filegauges: Optional[bool] = None
     filetagname: Optional[str] = None
     follow_symlinks: Optional[bool] = None
+    full_scan_interval: Optional[int] = None
     ignore_missing: Optional[bool] = None
+    incremental: Optional[bool] = None
     metric_patterns: Optional[MetricPatterns] = None
     min_collection_interval: Optional[float] = None
     name: Optional[str] = None
@@ -54,6 +56,7 @@ class InstanceConfig(BaseModel):
     stat_follow_symlinks: Optional[bool] = None
     submit_histograms: Optional[bool] = None
     tags: Optional[tuple[str, ...]] = None
+    traversal_workers: Optional[int] = None
 
     @model_validator(mode='before')
     def _initial_validation(cls, values):
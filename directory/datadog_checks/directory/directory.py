@@ -2,19 +2,27 @@
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from fnmatch import fnmatch
-from os.path import exists, join, realpath, relpath
-from time import time
+from os import sep, stat
+from os.path import dirname, exists, join, realpath, relpath
+from time import time, time_ns
 from typing import Any  # noqa: F401
 
 from datadog_checks.base import AgentCheck
 from datadog_checks.base.errors import CheckException
 from datadog_checks.directory.config import DirectoryConfig
 
-from .traverse import walk
+from .index import DirectoryIndex, DirectoryStats
+from .traverse import scan, walk, walk_ahead
 
 SERVICE_DIRECTORY_EXISTS = 'system.disk.directory.exists'
 
+INDEX_CACHE_KEY = 'directory_index'
+
+# Directories modified less than this many nanoseconds before a scan are scanned again on the next run
+RACY_MTIME_NS = 2 * 10**9
+
 
 class DirectoryCheck(AgentCheck):
     """This check is for monitoring and reporting metrics on the files for a provided directory.
@@ -34,6 +42,10 @@ class DirectoryCheck(AgentCheck):
                       Useful for very large directories. default False
         `ignore_missing` - boolean, when true do not raise an exception on missing/inaccessible directories.
                            default False
+        `incremental` - boolean, when true only scan the directories modified since the previous run. default False
+        `full_scan_interval` - integer, when `incremental` is true, scan the whole directory every
+                               `full_scan_interval` runs. default 10
+        `traversal_workers` - integer, the number of threads scanning the directories ahead of the check. default 1
     """
 
     SOURCE_TYPE_NAME = 'system'
@@ -43,6 +55,18 @@ class DirectoryCheck(AgentCheck):
         super(DirectoryCheck, self).__init__(*args, **kwargs)
 
         self._config = DirectoryConfig(self.instance)
+        # The index of the directories in incremental mode, loaded on the first run
+        self._index = None
+        self._runs_since_full_scan = 0
+
+        # Scans the directories ahead of the check when traversing with several threads
+        self._executor = None
+        if self._config.traversal_workers > 1:
+            self._executor = ThreadPoolExecutor(max_workers=self._config.traversal_workers)
+
+    def cancel(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
 
     def check(self, _):
         service_check_tags = ['dir_name:{}'.format(self._config.name)]
@@ -65,7 +89,10 @@ class DirectoryCheck(AgentCheck):
             return
 
         self.service_check(name=SERVICE_DIRECTORY_EXISTS, tags=service_check_tags, status=self.OK)
-        self._get_stats()
+        if self._config.incremental:
+            self._get_incremental_stats()
+        else:
+            self._get_stats()
 
     def _get_stats(self):
         dirtags = ['{}:{}'.format(self._config.dirtagname, self._config.name)]
@@ -82,32 +109,11 @@ class DirectoryCheck(AgentCheck):
         # Avoid duplicate files for directory bytes
         seen_files = defaultdict(lambda: defaultdict(int))
 
-        for root, dirs, files in self._walk():
-            matched_files = []
+        for root, dirs, (matched_files, file_stats) in self._walk():
             adjust_max_filegauge = False
 
-            if self._config.exclude_dirs_pattern is not None:
-                if self._config.dirs_patterns_full:
-                    dirs[:] = [d for d in dirs if not self._config.exclude_dirs_pattern.search(d.path)]
-                else:
-                    dirs[:] = [d for d in dirs if not self._config.exclude_dirs_pattern.search(d.name)]
-                self.log.debug('Directories: %s', str(dirs))
             directory_folders += get_length(dirs)
 
-            if self._config.pattern is not None:
-                # Check if the path of the file relative to the directory
-                # matches the pattern. Also check if the absolute path of the
-                # filename matches the pattern, for compatibility with previous
-                # agent versions.
-                for file_entry in files:
-                    filename = join(root, file_entry.name)
-                    if fnmatch(filename, self._config.pattern) or fnmatch(
-                        relpath(filename, self._config.abs_directory), self._config.pattern
-                    ):
-                        matched_files.append(file_entry)
-            else:
-                matched_files = list(files)
-
             matched_files_length = get_length(matched_files)
             directory_files += matched_files_length
 
@@ -115,14 +121,11 @@ class DirectoryCheck(AgentCheck):
             if self._config.countonly:
                 continue
 
-            for file_entry in matched_files:
-                try:
-                    self.log.debug('File entries in matched files: %s', str(file_entry))
-                    file_stat = file_entry.stat(follow_symlinks=self._config.stat_follow_symlinks)
-                    real_path = realpath(file_entry.path)
-                except OSError as ose:
+            for file_entry, file_stat, real_path, error in file_stats:
+                self.log.debug('File entries in matched files: %s', str(file_entry))
+                if error is not None:
                     self.log.debug(
-                        'DirectoryCheck: could not stat file %s, skipping it - %s', join(root, file_entry.name), ose
+                        'DirectoryCheck: could not stat file %s, skipping it - %s', join(root, file_entry.name), error
                     )
                 else:
                     # Directory bytes metric
@@ -191,22 +194,215 @@ class DirectoryCheck(AgentCheck):
             # seen_files = {'/path/to/real/file': [list of symlinks]}
             self.log.trace("Processed files: %s", seen_files)
 
+    def _get_incremental_stats(self):
+        """
+        Compute the totals from the index of the directories, only scanning the ones which changed since the
+        previous run, or all of them every `full_scan_interval` runs.
+        """
+        dirtags = ['{}:{}'.format(self._config.dirtagname, self._config.name)]
+        dirtags.extend(self._config.tags)
+        abs_directory = self._config.abs_directory
+
+        if self._index is None:
+            self._index = self._load_index()
+        full_scan = not self._index.directories or self._runs_since_full_scan + 1 >= self._config.full_scan_interval
+        # A directory modified within the granularity of its mtime may change again without its mtime changing
+        racy_mtime = time_ns() - RACY_MTIME_NS
+        indexed = {} if full_scan else self._index.directories
+
+        directories = {}
+        scanned = 0
+        pending = ['']
+        while pending:
+            path = pending.pop()
+            abs_path = join(abs_directory, path) if path else abs_directory
+            try:
+                mtime = stat(abs_path).st_mtime_ns
+            except OSError as e:
+                self.log.error("Error when traversing %s: %s", abs_directory, e)
+                continue
+
+            directory_stats = indexed.get(path)
+            if directory_stats is None or directory_stats.mtime != mtime:
+                directory_stats = self._scan_directory(abs_path, mtime if mtime < racy_mtime else None)
+                if directory_stats is None:
+                    continue
+                scanned += 1
+
+            directories[path] = directory_stats
+            if self._config.recursive:
+                pending.extend(join(path, name) for name in directory_stats.dirs)
+
+        self.log.debug("Scanned %s of the %s directories in %s", scanned, len(directories), abs_directory)
+        self._runs_since_full_scan = 0 if full_scan else self._runs_since_full_scan + 1
+        if scanned or len(directories) != len(self._index.directories):
+            self._index.directories = directories
+            self.write_persistent_cache(INDEX_CACHE_KEY, self._index.dumps())
+
+        directory_files = 0
+        directory_folders = 0
+        directory_bytes = 0
+        links = {}
+        # The targets of the symlinks are resolved, and so must be the directory they are compared with
+        real_directory = realpath(abs_directory)
+        for directory_stats in directories.values():
+            directory_files += directory_stats.files
+            directory_folders += len(directory_stats.dirs)
+            directory_bytes += directory_stats.bytes
+            for real_path, size in directory_stats.links:
+                # The matched files of the scanned directories are already counted
+                relative_path = self._relative_path(real_path, real_directory)
+                if (
+                    relative_path is None
+                    or dirname(relative_path) not in directories
+                    or not self._match_file(join(abs_directory, relative_path))
+                ):
+                    links[real_path] = size
+        directory_bytes += sum(links.values())
+
+        self.gauge('system.disk.directory.files', directory_files, tags=dirtags)
+        self.gauge('system.disk.directory.folders', directory_folders, tags=dirtags)
+        if not self._config.countonly:
+            self.gauge('system.disk.directory.bytes', directory_bytes, tags=dirtags)
+
+    def _scan_directory(self, path, mtime):
+        def log_error(e):
+            self.log.error("Error when traversing %s: %s", self._config.abs_directory, e)
+
+        entries = scan(path, onerror=log_error, followlinks=self._config.follow_symlinks)
+        if entries is None:
+            return None
+
+        dirs, files = entries
+        dirs = self._filter_dirs(dirs)
+        matched_files = self._match_files(path, files)
+
+        size = 0
+        links = []
+        if not self._config.countonly:
+            stat_follow_symlinks = self._config.stat_follow_symlinks
+            for file_entry in matched_files:
+                try:
+                    file_stat = file_entry.stat(follow_symlinks=stat_follow_symlinks)
+                    if stat_follow_symlinks and file_entry.is_symlink():
+                        links.append((realpath(file_entry.path), file_stat.st_size))
+                    else:
+                        size += file_stat.st_size
+                except OSError as ose:
+                    self.log.debug('DirectoryCheck: could not stat file %s, skipping it - %s', file_entry.path, ose)
+
+        return DirectoryStats(mtime, len(matched_files), size, tuple(d.name for d in dirs), tuple(links))
+
+    def _load_index(self):
+        key = [
+            self._config.abs_directory,
+            self._config.pattern,
+            self._config.exclude_dirs_pattern.pattern if self._config.exclude_dirs_pattern is not None else None,
+            self._config.dirs_patterns_full,
+            self._config.recursive,
+            self._config.countonly,
+            self._config.follow_symlinks,
+            self._config.stat_follow_symlinks,
+        ]
+        try:
+            return DirectoryIndex.loads(self.read_persistent_cache(INDEX_CACHE_KEY), key)
+        except Exception as e:
+            self.log.warning("Could not load the index of %s, scanning it again: %s", self._config.abs_directory, e)
+            return DirectoryIndex(key)
+
+    @staticmethod
+    def _relative_path(path, directory):
+        if path == directory:
+            return ''
+        if path.startswith(directory + sep):
+            return path[len(directory) + 1 :]
+        return None
+
+    def _filter_dirs(self, dirs):
+        if self._config.exclude_dirs_pattern is None:
+            return dirs
+
+        if self._config.dirs_patterns_full:
+            dirs = [d for d in dirs if not self._config.exclude_dirs_pattern.search(d.path)]
+        else:
+            dirs = [d for d in dirs if not self._config.exclude_dirs_pattern.search(d.name)]
+        self.log.debug('Directories: %s', str(dirs))
+        return dirs
+
+    def _match_files(self, root, files):
+        if self._config.pattern is None:
+            return list(files)
+
+        return [file_entry for file_entry in files if self._match_file(join(root, file_entry.name))]
+
+    def _match_file(self, filename):
+        if self._config.pattern is None:
+            return True
+
+        # Check if the path of the file relative to the directory
+        # matches the pattern. Also check if the absolute path of the
+        # filename matches the pattern, for compatibility with previous
+        # agent versions.
+        return fnmatch(filename, self._config.pattern) or fnmatch(
+            relpath(filename, self._config.abs_directory), self._config.pattern
+        )
+
     def _walk(self):
         """
         Wraps walker iteration to handle errors and recursive option.
+
+        Yields the directories to descend into, the matched files and their stats for each directory.
         """
 
         def log_error(e):
             self.log.error("Error when traversing %s: %s", self._config.abs_directory, e)
 
+        if self._executor is not None:
+            for root, dirs, data in walk_ahead(
+                self._config.abs_directory,
+                self._visit,
+                self._executor,
+                onerror=log_error,
+                followlinks=self._config.follow_symlinks,
+                recursive=self._config.recursive,
+                prefetch=2 * self._config.traversal_workers,
+            ):
+                yield root, dirs, data
+            return
+
         walker = walk(self._config.abs_directory, onerror=log_error, followlinks=self._config.follow_symlinks)
 
         while True:
             try:
-                yield next(walker)
+                root, dirs, files = next(walker)
             except StopIteration:
                 break
 
+            # Prune the excluded directories from the walk
+            dirs[:], data = self._visit(root, dirs, files)
+            yield root, dirs, data
+
             # Only visit the first directory when we don't want recursive search
             if not self._config.recursive:
                 break
+
+    def _visit(self, root, dirs, files):
+        """
+        Return the directories which are not excluded, along with the matched files and their
+        `(entry, stat, real path, error)` unless only counting them.
+
+        This runs on the traversal threads when there are several.
+        """
+        matched_files = self._match_files(root, files)
+        file_stats = []
+        if not self._config.countonly:
+            for file_entry in matched_files:
+                try:
+                    file_stat = file_entry.stat(follow_symlinks=self._config.stat_follow_symlinks)
+                    real_path = realpath(file_entry.path)
+                except OSError as ose:
+                    file_stats.append((file_entry, None, None, ose))
+                else:
+                    file_stats.append((file_entry, file_stat, real_path, None))
+
+        return self._filter_dirs(dirs), (matched_files, file_stats)
@@ -0,0 +1,53 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import base64
+import json
+import zlib
+from collections import namedtuple
+
+# Prefix of the persisted format, to change whenever it does
+INDEX_PREFIX = 'v1:'
+
+# What a scan found in a directory, not counting its subdirectories:
+# * `mtime`: the modification time of the directory in nanoseconds, or None if it must be scanned again
+# * `files`: the number of matched files
+# * `bytes`: the size of the matched files, except the symlinks when following them
+# * `dirs`: the names of the subdirectories which are not excluded
+# * `links`: the (real path, size) pairs of the symlinks to matched files, counted once per real path
+DirectoryStats = namedtuple('DirectoryStats', ['mtime', 'files', 'bytes', 'dirs', 'links'])
+
+
+class DirectoryIndex(object):
+    """
+    The stats of every directory found by the last scan, by path relative to the monitored directory.
+
+    The index is only valid for the configuration it was built with, identified by `key`.
+    """
+
+    def __init__(self, key, directories=None):
+        self.key = key
+        self.directories = directories if directories is not None else {}
+
+    def dumps(self):
+        content = json.dumps({'key': self.key, 'directories': self.directories}, separators=(',', ':'))
+        return INDEX_PREFIX + base64.b64encode(zlib.compress(content.encode('utf-8'))).decode('ascii')
+
+    @classmethod
+    def loads(cls, content, key):
+        """
+        Return the index persisted in `content` if it was built with the configuration identified by `key`,
+        or an empty one.
+        """
+        if not content or not content.startswith(INDEX_PREFIX):
+            return cls(key)
+
+        data = json.loads(zlib.decompress(base64.b64decode(content[len(INDEX_PREFIX) :])).decode('utf-8'))
+        if data['key'] != key:
+            return cls(key)
+
+        directories = {
+            path: DirectoryStats(mtime, files, size, tuple(dirs), tuple(tuple(link) for link in links))
+            for path, (mtime, files, size, dirs, links) in data['directories'].items()
+        }
+        return cls(key, directories)
@@ -1,7 +1,10 @@
 # (C) Datadog, Inc. 2018-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+from collections import deque
+from itertools import islice
 from os import scandir
+from threading import Lock
 
 
 def walk(top, onerror=None, followlinks=False):
@@ -26,6 +29,22 @@ def walk(top, onerror=None, followlinks=False):
     # always requires a system call on Unix but only requires one for symbolic links on
     # Windows.
 
+    entries = scan(top, onerror, followlinks)
+    if entries is None:
+        return
+
+    dirs, nondirs = entries
+    yield top, dirs, nondirs
+
+    for dir_entry in dirs:
+        for entry in walk(dir_entry.path, onerror, followlinks):
+            yield entry
+
+
+def scan(top, onerror=None, followlinks=False):
+    """Return the `os.DirEntry` objects of the directories and of the other files in `top`,
+    or None if it can't be read.
+    """
     dirs = []
     nondirs = []
 
@@ -34,7 +53,7 @@ def walk(top, onerror=None, followlinks=False):
     except OSError as error:
         if onerror is not None:
             onerror(error)
-        return
+        return None
 
     # Avoid repeated global lookups.
     get_next = next
@@ -59,8 +78,93 @@ def walk(top, onerror=None, followlinks=False):
         else:
             nondirs.append(entry)
 
-    yield top, dirs, nondirs
+    return dirs, nondirs
 
-    for dir_entry in dirs:
-        for entry in walk(dir_entry.path, onerror, followlinks):
+
+def walk_ahead(top, visit, executor, onerror=None, followlinks=False, recursive=True, prefetch=1):
+    """A version of `walk` scanning the directories ahead of time on the threads of `executor`, for
+    filesystems where the latency of system calls dominates.
+
+    `visit(top, dirs, nondirs)` is called on the worker threads with the entries of each directory, and
+    returns the directories to descend into along with the data to yield for the directory. Up to
+    `prefetch` of the next sibling directories of the one being consumed are scanned ahead, and up to
+    `prefetch` subdirectories of the directories scanned ahead.
+
+    This yields the same `(top, dirs, data)` tuples in the same order as `walk` would, and calls `onerror`
+    in that order too. Unlike with `walk`, `dirs` can't be pruned: `visit` returns the ones to descend into.
+    """
+    scanner = _Scanner(visit, executor, followlinks, recursive, prefetch)
+    for entry in _walk_ahead(top, scanner.take(top), scanner, onerror, recursive, prefetch):
+        yield entry
+
+
+def _walk_ahead(top, future, scanner, onerror, recursive, prefetch):
+    errors, visited = future.result()
+    if onerror is not None:
+        for error in errors:
+            onerror(error)
+    if visited is None:
+        return
+
+    dirs, data = visited
+    yield top, dirs, data
+
+    if not recursive:
+        return
+
+    children = iter(dirs)
+    pending = deque()
+    for dir_entry in islice(children, prefetch):
+        pending.append((dir_entry.path, scanner.take(dir_entry.path)))
+
+    while pending:
+        path, future = pending.popleft()
+        # Keep scanning the next siblings while descending into this directory
+        for dir_entry in islice(children, 1):
+            pending.append((dir_entry.path, scanner.take(dir_entry.path)))
+
+        for entry in _walk_ahead(path, future, scanner, onerror, recursive, prefetch):
             yield entry
+
+
+class _Scanner(object):
+    """
+    Visits the directories on the threads of an executor. Once a directory is visited, its first subdirectories
+    are scanned ahead too, as long as there are less than `prefetch` of them waiting to be taken.
+    """
+
+    def __init__(self, visit, executor, followlinks, recursive, prefetch):
+        self._visit = visit
+        self._executor = executor
+        self._followlinks = followlinks
+        self._recursive = recursive
+        self._lock = Lock()
+        self._scanned_ahead = {}
+        self._budget = prefetch
+
+    def take(self, path):
+        """Return the future result of the visit of `path`, scanning it now unless it was scanned ahead."""
+        with self._lock:
+            future = self._scanned_ahead.pop(path, None)
+            if future is not None:
+                self._budget += 1
+                return future
+        return self._executor.submit(self._scan, path)
+
+    def _scan(self, top):
+        # The errors are reported by the consumer, to keep them in order
+        errors = []
+        entries = scan(top, errors.append, self._followlinks)
+        if entries is None:
+            return errors, None
+
+        visited = self._visit(top, *entries)
+        if self._recursive:
+            for dir_entry in visited[0]:
+                with self._lock:
+                    if self._budget <= 0:
+                        break
+                    self._budget -= 1
+                    self._scanned_ahead[dir_entry.path] = self._executor.submit(self._scan, dir_entry.path)
+
+        return errors, visited
@@ -1,13 +1,21 @@
 # (C) Datadog, Inc. 2018-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import os
 import shutil
 import subprocess
 import sys
 import tempfile
+import time
+
+import mock
+import pytest
 
 from datadog_checks.directory import DirectoryCheck
 
+# Seconds waited by each system call of the emulated network filesystem
+LATENCY = 0.001
+
 
 def test_run(benchmark):
     temp_dir = tempfile.mkdtemp()
@@ -21,3 +29,35 @@ def test_run(benchmark):
         benchmark(c.check, instance)
     finally:
         shutil.rmtree(temp_dir)
+
+
+@pytest.mark.parametrize('traversal_workers', [1, 8])
+def test_run_with_latency(benchmark, traversal_workers):
+    """
+    Emulate a network filesystem where each system call waits for the server.
+    """
+    temp_dir = tempfile.mkdtemp()
+    for i in range(20):
+        sub_dir = os.path.join(temp_dir, 'dir{}'.format(i))
+        os.makedirs(os.path.join(sub_dir, 'sub'))
+        for j in range(5):
+            open(os.path.join(sub_dir, 'file{}'.format(j)), 'w').close()
+            open(os.path.join(sub_dir, 'sub', 'file{}'.format(j)), 'w').close()
+
+    def with_latency(function):
+        def call(*args, **kwargs):
+            time.sleep(LATENCY)
+            return function(*args, **kwargs)
+
+        return call
+
+    instance = {'directory': temp_dir, 'recursive': True, 'traversal_workers': traversal_workers}
+    c = DirectoryCheck('directory', {}, [instance])
+    try:
+        with mock.patch('datadog_checks.directory.traverse.scandir', with_latency(os.scandir)), mock.patch(
+            'datadog_checks.directory.directory.realpath', with_latency(os.path.realpath)
+        ):
+            benchmark(c.check, instance)
+    finally:
+        c.cancel()
+        shutil.rmtree(temp_dir)
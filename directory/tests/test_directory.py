@@ -7,6 +7,7 @@ import shutil
 import tempfile
 from os import mkdir
 
+import mock
 import pytest
 
 from datadog_checks.base.errors import CheckException, ConfigurationError
@@ -488,3 +489,290 @@ def test_stat_follow_symlinks(aggregator, stat_follow_symlinks, expected_dir_siz
         for filename, size in expected_file_sizes:
             tags = common_tags + ['filename:{}'.format(os.path.join(target_dir, filename))]
             aggregator.assert_metric('system.disk.directory.file.bytes', value=flatten_value(size), tags=tags)
+
+
+def write_file(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def get_directory_metrics(aggregator, tags):
+    return {
+        metric: [m.value for m in aggregator.metrics(metric) if m.tags == tags]
+        for metric in ('system.disk.directory.files', 'system.disk.directory.folders', 'system.disk.directory.bytes')
+    }
+
+
+@pytest.mark.parametrize(
+    'instance',
+    [
+        pytest.param({'directory': 'main'}, id='not_recursive'),
+        pytest.param({'directory': 'main', 'recursive': True}, id='recursive'),
+        pytest.param({'directory': 'main', 'recursive': True, 'pattern': '*.log'}, id='pattern'),
+        pytest.param({'directory': 'main', 'recursive': True, 'exclude_dirs': ['subsub']}, id='exclude_dirs'),
+        pytest.param({'directory': 'many', 'recursive': True, 'countonly': True}, id='countonly'),
+    ],
+)
+def test_incremental_same_totals(aggregator, instance):
+    instance = dict(instance, directory=os.path.join(temp_dir, instance['directory']), submit_histograms=False)
+    tags = ['name:{}'.format(instance['directory'])]
+
+    DirectoryCheck('directory', {}, [instance]).check(instance)
+    expected = get_directory_metrics(aggregator, tags)
+    aggregator.reset()
+
+    incremental_instance = dict(instance, incremental=True)
+    check = DirectoryCheck('directory', {}, [incremental_instance])
+    for _ in range(2):
+        check.check(incremental_instance)
+        assert get_directory_metrics(aggregator, tags) == expected
+        aggregator.reset()
+
+
+def test_incremental_stat_follow_symlinks(aggregator):
+    with temp_directory() as tdir:
+        os.makedirs(os.path.join(tdir, 'main', 'sub'))
+        os.makedirs(os.path.join(tdir, 'othr'))
+        write_file(os.path.join(tdir, 'main', 'file500'), '0' * 500)
+        write_file(os.path.join(tdir, 'main', 'sub', 'file1000'), '0' * 1000)
+        write_file(os.path.join(tdir, 'othr', 'file2000'), '0' * 2000)
+        os.symlink(os.path.join(tdir, 'main', 'sub', 'file1000'), os.path.join(tdir, 'main', 'file1000sym'))
+        os.symlink(os.path.join(tdir, 'othr', 'file2000'), os.path.join(tdir, 'main', 'file2000sym'))
+        os.symlink(os.path.join(tdir, 'othr', 'file2000'), os.path.join(tdir, 'main', 'sub', 'file2000sym'))
+
+        target_dir = os.path.join(tdir, 'main')
+        instance = {'directory': target_dir, 'recursive': True, 'submit_histograms': False, 'incremental': True}
+        DirectoryCheck('directory', {}, [instance]).check(instance)
+
+        aggregator.assert_metric('system.disk.directory.bytes', value=3500, tags=['name:{}'.format(target_dir)])
+
+
+def test_incremental_symlink_to_unmatched_file(aggregator):
+    with temp_directory() as tdir:
+        os.makedirs(os.path.join(tdir, 'main', 'sub'))
+        write_file(os.path.join(tdir, 'main', 'file.log'), '0' * 100)
+        write_file(os.path.join(tdir, 'main', 'data.bin'), '0' * 2000)
+        # The target of the first link is in a monitored directory, but doesn't match the pattern
+        os.symlink(os.path.join(tdir, 'main', 'data.bin'), os.path.join(tdir, 'main', 'sub', 'data.log'))
+        os.symlink(os.path.join(tdir, 'main', 'file.log'), os.path.join(tdir, 'main', 'sub', 'file.log'))
+
+        target_dir = os.path.join(tdir, 'main')
+        instance = {'directory': target_dir, 'recursive': True, 'pattern': '*.log', 'submit_histograms': False}
+        tags = ['name:{}'.format(target_dir)]
+        DirectoryCheck('directory', {}, [instance]).check(instance)
+        expected = get_directory_metrics(aggregator, tags)
+        assert expected['system.disk.directory.bytes'] == [2100]
+        aggregator.reset()
+
+        incremental_instance = dict(instance, incremental=True)
+        DirectoryCheck('directory', {}, [incremental_instance]).check(incremental_instance)
+        assert get_directory_metrics(aggregator, tags) == expected
+
+
+def test_incremental_directory_through_symlink(aggregator):
+    with temp_directory() as tdir:
+        os.makedirs(os.path.join(tdir, 'main', 'sub'))
+        write_file(os.path.join(tdir, 'main', 'file.log'), '0' * 100)
+        os.symlink(os.path.join(tdir, 'main', 'file.log'), os.path.join(tdir, 'main', 'sub', 'file.log'))
+        os.symlink(os.path.join(tdir, 'main'), os.path.join(tdir, 'link'))
+
+        target_dir = os.path.join(tdir, 'link')
+        instance = {'directory': target_dir, 'recursive': True, 'submit_histograms': False}
+        tags = ['name:{}'.format(target_dir)]
+        DirectoryCheck('directory', {}, [instance]).check(instance)
+        expected = get_directory_metrics(aggregator, tags)
+        assert expected['system.disk.directory.bytes'] == [100]
+        aggregator.reset()
+
+        incremental_instance = dict(instance, incremental=True)
+        DirectoryCheck('directory', {}, [incremental_instance]).check(incremental_instance)
+        assert get_directory_metrics(aggregator, tags) == expected
+
+
+def test_incremental_scans_modified_directories(aggregator):
+    with temp_directory() as tdir, mock.patch('datadog_checks.directory.directory.RACY_MTIME_NS', 0):
+        os.makedirs(os.path.join(tdir, 'a', 'aa'))
+        os.makedirs(os.path.join(tdir, 'b'))
+        write_file(os.path.join(tdir, 'a', 'file'), '0' * 10)
+        write_file(os.path.join(tdir, 'b', 'file'), '0' * 20)
+
+        instance = {'directory': tdir, 'recursive': True, 'submit_histograms': False, 'incremental': True}
+        tags = ['name:{}'.format(tdir)]
+        check = DirectoryCheck('directory', {}, [instance])
+        scan_directory = mock.patch.object(check, '_scan_directory', wraps=check._scan_directory)
+
+        with scan_directory as scanned:
+            check.check(instance)
+        assert scanned.call_count == 4
+        assert get_directory_metrics(aggregator, tags) == {
+            'system.disk.directory.files': [2],
+            'system.disk.directory.folders': [3],
+            'system.disk.directory.bytes': [30],
+        }
+        aggregator.reset()
+
+        with scan_directory as scanned:
+            check.check(instance)
+        assert scanned.call_count == 0
+
+        write_file(os.path.join(tdir, 'a', 'aa', 'file'), '0' * 40)
+        shutil.rmtree(os.path.join(tdir, 'b'))
+        aggregator.reset()
+        with scan_directory as scanned:
+            check.check(instance)
+        assert sorted(call[0][0] for call in scanned.call_args_list) == [tdir, os.path.join(tdir, 'a', 'aa')]
+        assert get_directory_metrics(aggregator, tags) == {
+            'system.disk.directory.files': [2],
+            'system.disk.directory.folders': [2],
+            'system.disk.directory.bytes': [50],
+        }
+
+
+def test_incremental_full_scan_interval(aggregator):
+    with temp_directory() as tdir, mock.patch('datadog_checks.directory.directory.RACY_MTIME_NS', 0):
+        os.makedirs(os.path.join(tdir, 'a'))
+        write_file(os.path.join(tdir, 'a', 'file'), '0' * 10)
+
+        instance = {
+            'directory': tdir,
+            'recursive': True,
+            'submit_histograms': False,
+            'incremental': True,
+            'full_scan_interval': 3,
+        }
+        check = DirectoryCheck('directory', {}, [instance])
+        scan_counts = []
+        for _ in range(7):
+            with mock.patch.object(check, '_scan_directory', wraps=check._scan_directory) as scanned:
+                check.check(instance)
+            scan_counts.append(scanned.call_count)
+
+        assert scan_counts == [2, 0, 0, 2, 0, 0, 2]
+
+        # Files modified in place are only updated by full scans
+        write_file(os.path.join(tdir, 'a', 'file'), '0' * 20)
+        aggregator.reset()
+        for _ in range(3):
+            check.check(instance)
+        assert [m.value for m in aggregator.metrics('system.disk.directory.bytes')] == [10, 10, 20]
+
+
+def test_incremental_index_is_persisted(aggregator):
+    with temp_directory() as tdir, mock.patch('datadog_checks.directory.directory.RACY_MTIME_NS', 0):
+        os.makedirs(os.path.join(tdir, 'a'))
+        write_file(os.path.join(tdir, 'a', 'file'), '0' * 10)
+
+        instance = {'directory': tdir, 'recursive': True, 'submit_histograms': False, 'incremental': True}
+        DirectoryCheck('directory', {}, [instance]).check(instance)
+
+        check = DirectoryCheck('directory', {}, [instance])
+        with mock.patch.object(check, '_scan_directory', wraps=check._scan_directory) as scanned:
+            check.check(instance)
+        assert scanned.call_count == 0
+        aggregator.assert_metric('system.disk.directory.bytes', value=10, count=2)
+
+        # The index is not used with another configuration
+        instance = dict(instance, pattern='*.log')
+        check = DirectoryCheck('directory', {}, [instance])
+        with mock.patch.object(check, '_scan_directory', wraps=check._scan_directory) as scanned:
+            check.check(instance)
+        assert scanned.call_count == 2
+
+
+@pytest.mark.parametrize(
+    'options',
+    [
+        pytest.param({}, id='histograms'),
+        pytest.param({'submit_histograms': False, 'filegauges': True}, id='filegauges'),
+        pytest.param({'submit_histograms': False, 'full_scan_interval': 0}, id='full_scan_interval'),
+    ],
+)
+def test_incremental_config_errors(options):
+    instance = dict({'directory': temp_dir, 'incremental': True}, **options)
+    with pytest.raises(ConfigurationError):
+        DirectoryCheck('directory', {}, [instance])
+
+
+def get_submitted_metrics(aggregator):
+    # The age of the files depends on when they are checked
+    return [
+        (metric.name, metric.value if not metric.name.endswith('_sec_ago') else None, metric.tags)
+        for name in sorted(aggregator.metric_names)
+        for metric in aggregator.metrics(name)
+    ]
+
+
+@pytest.mark.parametrize(
+    'instance',
+    [
+        pytest.param({'directory': 'main'}, id='not_recursive'),
+        pytest.param({'directory': 'main', 'recursive': True}, id='recursive'),
+        pytest.param({'directory': 'main', 'recursive': True, 'exclude_dirs': ['subsub']}, id='exclude_dirs'),
+        pytest.param({'directory': 'many', 'recursive': True, 'pattern': '*.log'}, id='pattern'),
+        pytest.param({'directory': 'many', 'recursive': True, 'countonly': True}, id='countonly'),
+        pytest.param({'directory': '', 'recursive': True, 'filegauges': True}, id='filegauges'),
+        pytest.param(
+            {'directory': '', 'recursive': True, 'filegauges': True, 'max_filegauge_count': 30},
+            id='max_filegauge_count',
+        ),
+    ],
+)
+def test_traversal_workers_same_metrics(aggregator, instance):
+    instance = dict(instance, directory=os.path.join(temp_dir, instance['directory']))
+    DirectoryCheck('directory', {}, [instance]).check(instance)
+    expected = get_submitted_metrics(aggregator)
+    aggregator.reset()
+
+    instance = dict(instance, traversal_workers=4)
+    check = DirectoryCheck('directory', {}, [instance])
+    try:
+        check.check(instance)
+    finally:
+        check.cancel()
+
+    assert get_submitted_metrics(aggregator) == expected
+
+
+def test_traversal_workers_stat_follow_symlinks(aggregator):
+    with temp_directory() as tdir:
+        os.makedirs(os.path.join(tdir, 'main', 'sub'))
+        os.makedirs(os.path.join(tdir, 'othr'))
+        write_file(os.path.join(tdir, 'main', 'file500'), '0' * 500)
+        write_file(os.path.join(tdir, 'main', 'sub', 'file1000'), '0' * 1000)
+        write_file(os.path.join(tdir, 'othr', 'file2000'), '0' * 2000)
+        os.symlink(os.path.join(tdir, 'main', 'sub', 'file1000'), os.path.join(tdir, 'main', 'file1000sym'))
+        os.symlink(os.path.join(tdir, 'othr', 'file2000'), os.path.join(tdir, 'main', 'file2000sym'))
+        os.symlink(os.path.join(tdir, 'othr', 'file2000'), os.path.join(tdir, 'main', 'sub', 'file2000sym'))
+
+        target_dir = os.path.join(tdir, 'main')
+        instance = {'directory': target_dir, 'recursive': True, 'traversal_workers': 4}
+        check = DirectoryCheck('directory', {}, [instance])
+        check.check(instance)
+        check.cancel()
+
+        aggregator.assert_metric('system.disk.directory.bytes', value=3500, tags=['name:{}'.format(target_dir)])
+
+
+def test_traversal_workers_config_error():
+    with pytest.raises(ConfigurationError):
+        DirectoryCheck('directory', {}, [{'directory': temp_dir, 'traversal_workers': 0}])
+
+
+def test_traversal_workers_errors_in_order(aggregator, caplog):
+    def scandir(path):
+        if os.path.basename(path).startswith('subfolder'):
+            raise PermissionError(13, 'Permission denied', path)
+        return os.scandir(path)
+
+    errors = []
+    for traversal_workers in (1, 4):
+        instance = {'directory': temp_dir, 'recursive': True, 'traversal_workers': traversal_workers}
+        check = DirectoryCheck('directory', {}, [instance])
+        caplog.clear()
+        with mock.patch('datadog_checks.directory.traverse.scandir', side_effect=scandir):
+            check.check(instance)
+        check.cancel()
+        errors.append([record.getMessage() for record in caplog.records if record.levelno == logging.ERROR])
+
+    assert len(errors[0]) == 2
+    assert errors[0] == errors[1]
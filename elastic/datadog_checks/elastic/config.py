@@ -15,6 +15,7 @@ ESInstanceConfig = namedtuple(
         'node_name_as_host',
         'cluster_stats',
         'detailed_index_stats',
+        'filter_responses',
         'slm_stats',
         'index_stats',
         'service_check_tags',
@@ -43,6 +44,7 @@ def from_instance(instance):
     cluster_stats = is_affirmative(instance.get('cluster_stats', False))
     detailed_index_stats = is_affirmative(instance.get('detailed_index_stats', False))
     slm_stats = is_affirmative(instance.get('slm_stats', False))
+    filter_responses = is_affirmative(instance.get('filter_responses', False))
     if 'is_external' in instance:
         cluster_stats = is_affirmative(instance.get('is_external', False))
     pending_task_stats = is_affirmative(instance.get('pending_task_stats', True))
@@ -80,6 +82,7 @@ def from_instance(instance):
         node_name_as_host=node_name_as_host,
         cluster_stats=cluster_stats,
         detailed_index_stats=detailed_index_stats,
+        filter_responses=filter_responses,
         slm_stats=slm_stats,
         index_stats=index_stats,
         service_check_tags=service_check_tags,
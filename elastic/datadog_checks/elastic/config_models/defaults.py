@@ -56,6 +56,10 @@ def instance_empty_default_hostname():
     return False
 
 
+def instance_filter_responses():
+    return False
+
+
 def instance_gc_collectors_as_rate():
     return False
 
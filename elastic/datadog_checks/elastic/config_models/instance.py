@@ -93,6 +93,7 @@ class InstanceConfig(BaseModel):
     disable_legacy_service_check_tags: Optional[bool] = None
     empty_default_hostname: Optional[bool] = None
     extra_headers: Optional[MappingProxyType[str, Any]] = None
+    filter_responses: Optional[bool] = None
     gc_collectors_as_rate: Optional[bool] = None
     headers: Optional[MappingProxyType[str, Any]] = None
     index_stats: Optional[bool] = None
@@ -1,11 +1,9 @@
 # (C) Datadog, Inc. 2018-present
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
-import re
 import time
 from collections import defaultdict, namedtuple
 from copy import deepcopy
-from itertools import product
 from urllib.parse import urljoin, urlparse
 
 import requests
@@ -25,8 +23,19 @@ from .metrics import (
     slm_stats_for_version,
     stats_for_version,
 )
+from .paths import CompiledMetric, build_filter_path, compile_metrics, get_value_from_keys, split_path
 
-REGEX = r'(?<!\\)\.'  # This regex string is used to traverse through nested dictionaries for JSON responses
+# The fields of the nodes needed besides their metrics, to tag them
+NODE_FIELD_PATHS = [('nodes', '*', 'name'), ('nodes', '*', 'host'), ('nodes', '*', 'hostname')]
+
+# The metrics of the pshard stats counting indices don't need their whole stats, but a field they all have
+PSHARD_COUNTED_PATHS = {('indices',): ('indices', '*', 'total', 'docs', 'count')}
+
+# The metrics to collect for a version of Elasticsearch, along with the parameters of the requests to get them
+MetricsPlan = namedtuple(
+    'MetricsPlan',
+    ['stats', 'stats_params', 'pshard', 'pshard_index', 'pshard_params', 'index_search', 'index_search_params'],
+)
 
 DatadogESHealth = namedtuple('DatadogESHealth', ['status', 'reverse_status', 'tag'])
 ES_HEALTH_TO_DD_STATUS = {
@@ -71,20 +80,7 @@ def get_dynamic_tags(columns):
 
 
 def get_value_from_path(value, path):
-    result = value
-
-    # Traverse the nested dictionaries
-    for key in re.split(REGEX, path):
-        if result is not None:
-            key = key.replace('\\', '')
-            if key.isdigit() and isinstance(result, list):
-                result = result[int(key)]
-            else:
-                result = result.get(key)
-        else:
-            break
-
-    return result
+    return get_value_from_keys(value, split_path(path))
 
 
 class ESCheck(AgentCheck):
@@ -112,10 +108,11 @@ class ESCheck(AgentCheck):
                 'default': urlparse(self.instance['url']).hostname,
             }
         self._config = from_instance(self.instance)
+        # Version of Elasticsearch -> MetricsPlan
+        self._plans = {}
 
     def check(self, _):
         admin_forwarder = self._config.admin_forwarder
-        jvm_rate = self.instance.get('gc_collectors_as_rate', False)
         base_tags = list(self._config.tags)
         service_check_tags = list(self._config.service_check_tags)
 
@@ -128,17 +125,13 @@ class ESCheck(AgentCheck):
             raise
 
         health_url, stats_url, pshard_stats_url, pending_tasks_url, slm_url = self._get_urls(version)
-        stats_metrics = stats_for_version(version, jvm_rate)
-        if self._config.cluster_stats:
-            # Include Node System metrics
-            stats_metrics.update(node_system_stats_for_version(version))
-        pshard_stats_metrics = pshard_stats_for_version(version)
+        plan = self._get_plan(version)
 
         # Load stats data.
         # This must happen before other URL processing as the cluster name
         # is retrieved here, and added to the tag list.
         stats_url = self._join_url(stats_url, admin_forwarder)
-        stats_data = self._get_data(stats_url)
+        stats_data = self._get_data(stats_url, params=plan.stats_params)
 
         if stats_data.get('cluster_name'):
             # retrieve the cluster name from the data, and append it to the
@@ -148,7 +141,7 @@ class ESCheck(AgentCheck):
                 cluster_tags.append("cluster_name:{}".format(stats_data['cluster_name']))
             base_tags.extend(cluster_tags)
             service_check_tags.extend(cluster_tags)
-        self._process_stats_data(stats_data, stats_metrics, base_tags)
+        self._process_stats_data(stats_data, plan.stats, base_tags)
 
         if self._collect_template_metrics(es_version=version):
             self._get_template_metrics(admin_forwarder, base_tags)
@@ -161,8 +154,8 @@ class ESCheck(AgentCheck):
             send_sc = bubble_ex = not self._config.pshard_graceful_to
             pshard_stats_url = self._join_url(pshard_stats_url, admin_forwarder)
             try:
-                pshard_stats_data = self._get_data(pshard_stats_url, send_sc=send_sc)
-                self._process_pshard_stats_data(pshard_stats_data, pshard_stats_metrics, base_tags)
+                pshard_stats_data = self._get_data(pshard_stats_url, send_sc=send_sc, params=plan.pshard_params)
+                self._process_pshard_stats_data(pshard_stats_data, plan.pshard, plan.pshard_index, base_tags)
             except requests.ReadTimeout as e:
                 if bubble_ex:
                     raise
@@ -229,6 +222,61 @@ class ESCheck(AgentCheck):
         self.log.debug("Elasticsearch version is %s", version)
         return version
 
+    def _get_plan(self, version):
+        """
+        Get the metrics to collect for the specified ES version, compiled once
+        """
+        key = tuple(version)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = self._compile_plan(version)
+        return plan
+
+    def _compile_plan(self, version):
+        stats_metrics = stats_for_version(version, self.instance.get('gc_collectors_as_rate', False))
+        if self._config.cluster_stats:
+            # Include Node System metrics
+            stats_metrics.update(node_system_stats_for_version(version))
+        stats = compile_metrics(stats_metrics)
+
+        pshard = compile_metrics(pshard_stats_for_version(version))
+        pshard_index = []
+        if self._config.cluster_stats and self._config.detailed_index_stats:
+            # The index-level metrics are the `_all` ones, read from the stats of each index
+            pshard_index = [
+                CompiledMetric(
+                    metric.name, metric.type, 'indices.*.' + metric.path[len('_all.') :], metric.keys[1:], metric.xform
+                )
+                for metric in pshard
+                if metric.keys[0] == '_all'
+            ]
+
+        index_search = [
+            CompiledMetric(metric, 'gauge', path, split_path(path), None) for metric, path in INDEX_SEARCH_STATS
+        ]
+
+        stats_params = pshard_params = index_search_params = None
+        # `filter_path` is available since Elasticsearch 1.6
+        if self._config.filter_responses and version >= [1, 6, 0]:
+            stats_params = self._filter_params(
+                [('cluster_name',)] + NODE_FIELD_PATHS + [('nodes', '*') + metric.keys for metric in stats]
+            )
+            pshard_params = self._filter_params(
+                [PSHARD_COUNTED_PATHS.get(metric.keys, metric.keys) for metric in pshard]
+                + [('indices', '*') + metric.keys for metric in pshard_index]
+            )
+            index_search_params = self._filter_params([('indices', '*') + metric.keys for metric in index_search])
+
+        return MetricsPlan(stats, stats_params, pshard, pshard_index, pshard_params, index_search, index_search_params)
+
+    def _filter_params(self, paths):
+        filter_path = build_filter_path(paths)
+        if filter_path is None:
+            self.log.debug("Too many paths to filter the response, requesting it whole: %s", paths)
+            return None
+
+        return {'filter_path': filter_path}
+
     def _join_url(self, url, admin_forwarder=False):
         """
         overrides `urlparse.urljoin` since it removes base url path
@@ -269,7 +317,7 @@ class ESCheck(AgentCheck):
             tags = base_tags + ['index_name:' + idx['index']]
             for metric, desc in index_stats_for_version(version).items():
                 self._process_metric(index_data, metric, *desc, tags=tags)
-        self._get_index_search_stats(admin_forwarder, base_tags)
+        self._get_index_search_stats(admin_forwarder, base_tags, self._get_plan(version))
 
     def _get_template_metrics(self, admin_forwarder, base_tags):
 
@@ -284,7 +332,7 @@ class ESCheck(AgentCheck):
         for metric, desc in TEMPLATE_METRICS.items():
             self._process_metric({'templates': filtered_templates}, metric, *desc, tags=base_tags)
 
-    def _get_index_search_stats(self, admin_forwarder, base_tags):
+    def _get_index_search_stats(self, admin_forwarder, base_tags, plan):
         """
         Stats for searches in every index.
         """
@@ -292,10 +340,12 @@ class ESCheck(AgentCheck):
         # This endpoint can return more data, all of what the /_cat/indices endpoint returns except index health.
         # The health we can get from /_cluster/health if we pass level=indices query param. Reference:
         # https://www.elastic.co/guide/en/elasticsearch/reference/current/cluster-health.html#cluster-health-api-query-params # noqa: E501
-        indices = self._get_data(self._join_url('/_stats/search', admin_forwarder))['indices']
-        for (idx_name, data), (m_name, path) in product(indices.items(), INDEX_SEARCH_STATS):
+        url = self._join_url('/_stats/search', admin_forwarder)
+        indices = self._get_data(url, params=plan.index_search_params).get('indices', {})
+        for idx_name, data in indices.items():
             tags = base_tags + ['index_name:' + idx_name]
-            self._process_metric(data, m_name, 'gauge', path, tags=tags)
+            for metric in plan.index_search:
+                self._process_compiled_metric(data, metric, tags=tags)
 
     def _get_urls(self, version):
         """
@@ -324,7 +374,7 @@ class ESCheck(AgentCheck):
 
         return health_url, stats_url, pshard_stats_url, pending_tasks_url, slm_url
 
-    def _get_data(self, url, send_sc=True, data=None):
+    def _get_data(self, url, send_sc=True, data=None, params=None):
         """
         Hit a given URL and return the parsed json
         """
@@ -333,7 +383,7 @@ class ESCheck(AgentCheck):
             if data:
                 resp = self.http.post(url, json=data)
             else:
-                resp = self.http.get(url)
+                resp = self.http.get(url, params=params)
             resp.raise_for_status()
         except Exception as e:
             # this means we've hit a particular kind of auth error that means the config is broken
@@ -395,28 +445,30 @@ class ESCheck(AgentCheck):
                         metric_hostname = node_data[k]
                         break
 
-            for metric, desc in stats_metrics.items():
-                self._process_metric(node_data, metric, *desc, tags=metrics_tags, hostname=metric_hostname)
+            for metric in stats_metrics:
+                self._process_compiled_metric(node_data, metric, tags=metrics_tags, hostname=metric_hostname)
+
+    def _process_pshard_stats_data(self, data, pshard_stats_metrics, pshard_index_metrics, base_tags):
+        all_tags = base_tags + ['index_name:_all']
+        for metric in pshard_stats_metrics:
+            pshard_tags = all_tags if metric.keys[0] == '_all' else base_tags
+            self._process_compiled_metric(data, metric, tags=pshard_tags)
 
-    def _process_pshard_stats_data(self, data, pshard_stats_metrics, base_tags):
-        for metric, desc in pshard_stats_metrics.items():
-            pshard_tags = base_tags
-            if desc[1].startswith('_all.'):
-                pshard_tags = pshard_tags + ['index_name:_all']
-            self._process_metric(data, metric, *desc, tags=pshard_tags)
         # process index-level metrics
-        if self._config.cluster_stats and self._config.detailed_index_stats:
-            for metric, desc in pshard_stats_metrics.items():
-                if desc[1].startswith('_all.'):
-                    for index in data['indices']:
-                        self.log.debug("Processing index %s", index)
-                        escaped_index = index.replace('.', '\.')  # noqa: W605
-                        index_desc = (
-                            desc[0],
-                            'indices.' + escaped_index + '.' + desc[1].replace('_all.', ''),
-                            desc[2] if 2 < len(desc) else None,
-                        )
-                        self._process_metric(data, metric, *index_desc, tags=base_tags + ['index_name:' + index])
+        if pshard_index_metrics:
+            for index, index_data in data.get('indices', {}).items():
+                self.log.debug("Processing index %s", index)
+                index_tags = base_tags + ['index_name:' + index]
+                for metric in pshard_index_metrics:
+                    self._process_compiled_metric(index_data, metric, tags=index_tags)
+
+    def _process_compiled_metric(self, data, metric, tags=None, hostname=None):
+        """
+        data: dictionary containing all the stats
+        metric: CompiledMetric to extract from data
+        """
+        value = get_value_from_keys(data, metric.keys)
+        self._submit_value(value, metric.name, metric.type, metric.path, metric.xform, tags, hostname)
 
     def _process_metric(self, data, metric, xtype, path, xform=None, tags=None, hostname=None):
         """
@@ -426,7 +478,9 @@ class ESCheck(AgentCheck):
         xform: a lambda to apply to the numerical value
         """
         value = get_value_from_path(data, path)
+        self._submit_value(value, metric, xtype, path, xform, tags, hostname)
 
+    def _submit_value(self, value, metric, xtype, path, xform, tags, hostname):
         if value is not None:
             if xform:
                 value = xform(value)
@@ -0,0 +1,85 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import re
+from collections import namedtuple
+from urllib.parse import quote_plus
+
+# Dots that are not escaped with a backslash separate the keys of a path
+PATH_SEPARATOR = re.compile(r'(?<!\\)\.')
+
+# Elasticsearch rejects requests whose first line is longer than `http.max_initial_line_length`, 4KB by default,
+# this leaves room for the rest of the URL once the parameter is encoded
+MAX_FILTER_PATH_LENGTH = 3072
+
+# A metric descriptor of metrics.py, with its path split into keys once and for all
+CompiledMetric = namedtuple('CompiledMetric', ['name', 'type', 'path', 'keys', 'xform'])
+
+
+def split_path(path):
+    """
+    Split a flattened path, e.g. thread_pool.bulk.queue, into its keys.
+    """
+    return tuple(key.replace('\\', '') for key in PATH_SEPARATOR.split(path))
+
+
+def get_value_from_keys(value, keys):
+    result = value
+
+    # Traverse the nested dictionaries
+    for key in keys:
+        if result is None:
+            break
+        if key.isdigit() and isinstance(result, list):
+            result = result[int(key)]
+        else:
+            result = result.get(key)
+
+    return result
+
+
+def compile_metrics(metrics):
+    """
+    Compile metric descriptors, mapping the Datadog metric names to their type, path and optional conversion.
+    """
+    return [
+        CompiledMetric(name, desc[0], desc[1], split_path(desc[1]), desc[2] if len(desc) > 2 else None)
+        for name, desc in metrics.items()
+    ]
+
+
+def build_filter_path(paths, max_length=MAX_FILTER_PATH_LENGTH):
+    """
+    Return the `filter_path` parameter asking Elasticsearch to only return the given paths, tuples of keys which can be
+    `*` wildcards.
+
+    If listing every path is too long, the paths are shortened to their first keys, so that the whole objects they
+    lead to are returned. None is returned if even that is too long, or if the whole response is needed.
+    """
+    filter_paths = set()
+    for path in paths:
+        # Keys containing dots or commas can't be expressed, the objects containing them are returned whole
+        for i, key in enumerate(path):
+            if '.' in key or ',' in key:
+                path = path[:i]
+                break
+        if not path:
+            return None
+        filter_paths.add(path)
+
+    depth = max(len(path) for path in filter_paths) if filter_paths else 0
+    while depth:
+        filters = []
+        # The paths are sorted so that the ones they start with come right before them
+        for path in sorted({path[:depth] for path in filter_paths}):
+            if filters and path[: len(filters[-1])] == filters[-1]:
+                continue
+            filters.append(path)
+
+        filter_path = ','.join('.'.join(path) for path in filters)
+        if len(quote_plus(filter_path)) <= max_length:
+            return filter_path
+
+        depth -= 1
+
+    return None
@@ -12,6 +12,7 @@ from datadog_checks.dev.http import MockResponse
 from datadog_checks.elastic import ESCheck
 from datadog_checks.elastic.elastic import AuthenticationError, get_value_from_path
 from datadog_checks.elastic.metrics import INDEX_STATS_METRICS, stats_for_version
+from datadog_checks.elastic.paths import build_filter_path, compile_metrics
 
 from .common import URL, get_fixture_path
 
@@ -149,6 +150,120 @@ def test_get_value_from_path():
     assert value == "foo"
 
 
+def test_get_value_from_path_escaped_dots():
+    assert get_value_from_path({"indices": {"my.index": {"docs": 1}}}, "indices.my\\.index.docs") == 1
+
+
+@pytest.mark.parametrize(
+    'paths, max_length, filter_path',
+    [
+        pytest.param([('a', 'b'), ('c',)], 100, 'a.b,c', id="paths"),
+        pytest.param([('a', 'b', 'c'), ('a', 'b'), ('a', 'bc')], 100, 'a.b,a.bc', id="included paths"),
+        pytest.param([('a', '*', 'b'), ('a', '*', 'c')], 12, 'a.*', id="shortened paths"),
+        pytest.param([('a', 'b.c', 'd'), ('e',)], 100, 'a,e', id="keys with dots"),
+        pytest.param([('a.b',), ('c',)], 100, None, id="whole response"),
+        pytest.param([('abc',), ('def',)], 5, None, id="too long"),
+    ],
+)
+def test_build_filter_path(paths, max_length, filter_path):
+    assert build_filter_path(paths, max_length=max_length) == filter_path
+
+
+def apply_filter_path(data, filter_path):
+    """
+    Filter a response like Elasticsearch does with `filter_path`, without the support of `**`.
+    """
+
+    def select(value, keys):
+        if not keys:
+            return value
+        if not isinstance(value, dict):
+            return None
+        selected = {}
+        for key, child in value.items():
+            if keys[0] in ('*', key):
+                child = select(child, keys[1:])
+                if child is not None:
+                    selected[key] = child
+        return selected or None
+
+    def merge(left, right):
+        if isinstance(left, dict) and isinstance(right, dict):
+            for key, value in right.items():
+                left[key] = merge(left[key], value) if key in left else value
+            return left
+        return right
+
+    filtered = {}
+    for path in filter_path.split(','):
+        merge(filtered, select(data, path.split('.')) or {})
+    return filtered
+
+
+@pytest.mark.parametrize('cluster_stats', [True, False])
+def test_filter_responses_stats(aggregator, instance, cluster_stats):
+    instance['filter_responses'] = True
+    instance['cluster_stats'] = cluster_stats
+    check = ESCheck('elastic', {}, instances=[instance])
+    plan = check._get_plan([8, 0, 0])
+    with open(get_fixture_path('stats_v8.json')) as f:
+        stats_data = json.load(f)
+
+    check._process_stats_data(stats_data, plan.stats, ['foo:bar'])
+    expected = {name: aggregator.metrics(name) for name in aggregator.metric_names}
+    aggregator.reset()
+
+    filtered_data = apply_filter_path(stats_data, plan.stats_params['filter_path'])
+    assert len(json.dumps(filtered_data)) < len(json.dumps(stats_data))
+    check._process_stats_data(filtered_data, plan.stats, ['foo:bar'])
+
+    assert {name: aggregator.metrics(name) for name in aggregator.metric_names} == expected
+
+
+def test_filter_responses_pshard_stats(aggregator, instance):
+    instance.update({'filter_responses': True, 'cluster_stats': True, 'detailed_index_stats': True})
+    check = ESCheck('elastic', {}, instances=[instance])
+    plan = check._get_plan([8, 0, 0])
+    primaries = {'docs': {'count': 10, 'deleted': 1}, 'store': {'size_in_bytes': 100}, 'segments': {'count': 5}}
+    pshard_data = {
+        '_shards': {'total': 2},
+        '_all': {'primaries': primaries, 'total': primaries},
+        'indices': {
+            'my.index': {'uuid': 'foo', 'primaries': primaries, 'total': primaries},
+            'other': {'uuid': 'bar', 'primaries': primaries, 'total': primaries},
+        },
+    }
+
+    filtered_data = apply_filter_path(pshard_data, plan.pshard_params['filter_path'])
+    check._process_pshard_stats_data(filtered_data, plan.pshard, plan.pshard_index, ['foo:bar'])
+
+    assert filtered_data['indices']['my.index'] == {
+        'primaries': {'docs': {'count': 10, 'deleted': 1}, 'store': {'size_in_bytes': 100}},
+        'total': {'docs': {'count': 10}},
+    }
+    aggregator.assert_metric('elasticsearch.indices.count', 2, tags=['foo:bar'])
+    for index_name in ('_all', 'my.index', 'other'):
+        tags = ['foo:bar', 'index_name:{}'.format(index_name)]
+        aggregator.assert_metric('elasticsearch.primaries.docs.count', 10, tags=tags)
+        aggregator.assert_metric('elasticsearch.primaries.store.size', 100, tags=tags)
+
+
+@pytest.mark.parametrize(
+    'filter_responses, version',
+    [
+        pytest.param(False, [8, 0, 0], id="disabled"),
+        pytest.param(True, [1, 5, 0], id="unsupported version"),
+    ],
+)
+def test_filter_responses_disabled(instance, filter_responses, version):
+    instance['filter_responses'] = filter_responses
+    check = ESCheck('elastic', {}, instances=[instance])
+    plan = check._get_plan(version)
+
+    assert plan.stats_params is plan.pshard_params is plan.index_search_params is None
+    assert check._get_plan(version) is plan
+
+
 def test__get_data_throws_authentication_error(instance):
     with mock.patch(
         'requests.get',
@@ -235,7 +350,7 @@ def test_v8_process_stats_data(aggregator, instance):
     v8 = [8, 0, 0]
     with open(get_fixture_path('stats_v8.json')) as f:
         stats_data = json.load(f)
-        check._process_stats_data(stats_data, stats_for_version(v8), {})
+        check._process_stats_data(stats_data, compile_metrics(stats_for_version(v8)), {})
 
     aggregator.assert_metric("elasticsearch.breakers.inflight_requests.tripped", metric_type=aggregator.GAUGE)
     aggregator.assert_metric("elasticsearch.breakers.inflight_requests.overhead", metric_type=aggregator.GAUGE)
@@ -32,6 +32,10 @@ def instance_cache_metrics():
     return True
 
 
+def instance_cache_metrics_size():
+    return 100000
+
+
 def instance_cache_shared_labels():
     return True
 
@@ -64,6 +68,10 @@ def instance_enable_health_service_check():
     return True
 
 
+def instance_filter_stats_in_envoy():
+    return False
+
+
 def instance_histogram_buckets_as_distributions():
     return False
 
@@ -154,3 +162,7 @@ def instance_use_legacy_auth_encoding():
 
 def instance_use_process_start_time():
     return False
+
+
+def instance_used_only():
+    return False
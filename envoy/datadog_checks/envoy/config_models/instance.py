@@ -91,6 +91,7 @@ class InstanceConfig(BaseModel):
     aws_service: Optional[str] = None
     cache_metric_wildcards: Optional[bool] = None
     cache_metrics: Optional[bool] = None
+    cache_metrics_size: Optional[int] = None
     cache_shared_labels: Optional[bool] = None
     collect_counters_with_distributions: Optional[bool] = None
     collect_histogram_buckets: Optional[bool] = None
@@ -106,6 +107,7 @@ class InstanceConfig(BaseModel):
     excluded_metrics: Optional[tuple[str, ...]] = None
     extra_headers: Optional[MappingProxyType[str, Any]] = None
     extra_metrics: Optional[tuple[Union[str, MappingProxyType[str, Union[str, ExtraMetrics]]], ...]] = None
+    filter_stats_in_envoy: Optional[bool] = None
     headers: Optional[MappingProxyType[str, Any]] = None
     histogram_buckets_as_distributions: Optional[bool] = None
     hostname_format: Optional[str] = None
@@ -157,6 +159,7 @@ class InstanceConfig(BaseModel):
     use_latest_spec: Optional[bool] = None
     use_legacy_auth_encoding: Optional[bool] = None
     use_process_start_time: Optional[bool] = None
+    used_only: Optional[bool] = None
     username: Optional[str] = None
 
     @model_validator(mode='before')
@@ -14,6 +14,14 @@ from .errors import UnknownMetric, UnknownTags
 from .parser import parse_histogram, parse_metric
 from .utils import _get_server_info
 
+# Stats in the cache by default, more than a large sidecar exposes
+DEFAULT_CACHE_METRICS_SIZE = 100000
+
+# Why stats are skipped, in place of their metric name
+_EXCLUDED = object()
+_UNKNOWN_METRIC = object()
+_UNKNOWN_TAGS = object()
+
 
 class Envoy(AgentCheck):
     """
@@ -76,12 +84,22 @@ class Envoy(AgentCheck):
         }
         self.config_excluded_metrics = [re.compile(pattern) for pattern in excluded_metrics]
 
-        # The memory implications here are unclear to me. We may want a bloom filter
-        # or a data structure that expires elements based on inactivity.
-        self.included_metrics_cache = set()
-        self.excluded_metrics_cache = set()
+        # Stat name -> what to do with it, see `_parse_stat`. Once full, the oldest entries are evicted first.
+        self.stats_cache = {}
+        self.stats_cache_size = int(self.instance.get('cache_metrics_size', DEFAULT_CACHE_METRICS_SIZE))
+        if self.stats_cache_size < 0:
+            raise ConfigurationError('Envoy configuration setting `cache_metrics_size` must be a positive integer')
+        if not is_affirmative(self.caching_metrics):
+            self.stats_cache_size = 0
+
+        # Envoy can filter the stats itself, so that they are neither serialized nor parsed
+        stats_params = {}
+        if is_affirmative(self.instance.get('filter_stats_in_envoy', False)) and included_metrics:
+            stats_params['filter'] = '|'.join('(?:{})'.format(pattern) for pattern in sorted(included_metrics))
+        if is_affirmative(self.instance.get('used_only', False)):
+            stats_params['usedonly'] = ''
+        self.stats_request_kwargs = {'params': stats_params} if stats_params else {}
 
-        self.caching_metrics = None
         self.parse_unknown_metrics = is_affirmative(self.instance.get('parse_unknown_metrics', False))
         self.disable_legacy_cluster_tag = is_affirmative(self.instance.get('disable_legacy_cluster_tag', False))
 
@@ -89,7 +107,7 @@ class Envoy(AgentCheck):
         self._collect_metadata()
 
         try:
-            response = self.http.get(self.stats_url)
+            response = self.http.get(self.stats_url, **self.stats_request_kwargs)
         except requests.exceptions.Timeout:
             timeout = self.http.options['timeout']
             msg = 'Envoy endpoint `{}` timed out after {} seconds'.format(self.stats_url, timeout)
@@ -117,47 +135,68 @@ class Envoy(AgentCheck):
             except ValueError:
                 continue
 
-            if not self.included_metrics(envoy_metric):
+            metric, tags, method = self._parse_stat(envoy_metric)
+            if method is None:
+                if metric is _UNKNOWN_METRIC:
+                    self.unknown_metrics[envoy_metric] += 1
+                elif metric is _UNKNOWN_TAGS:
+                    for tag in tags:
+                        self.unknown_tags[tag] += 1
                 continue
 
+            tags = list(tags)
+            tags.extend(self.custom_tags)
+            try:
+                value = int(value)
+                get_method(self, method)(metric, value, tags=tags)
+
+            # If the value isn't an integer assume it's pre-computed histogram data.
+            except (ValueError, TypeError):
+                for histo_metric, histo_value in parse_histogram(metric, value):
+                    self.gauge(histo_metric, histo_value, tags=tags)
+
+        self.service_check(self.SERVICE_CHECK_NAME, AgentCheck.OK, tags=self.custom_tags)
+
+    def _parse_stat(self, envoy_metric):
+        """
+        Return the metric name, tags and submission method of a stat, remembering them for the next runs.
+
+        The method is None when the stat must be skipped, and the metric name then tells why: excluded by
+        the configuration, unknown metric, or unknown tags which are then returned.
+        """
+        entry = self.stats_cache.get(envoy_metric)
+        if entry is not None:
+            return entry
+
+        if not self.included_metrics(envoy_metric):
+            entry = (_EXCLUDED, (), None)
+        else:
             try:
                 metric, tags, method = parse_metric(
                     envoy_metric,
                     retry=self.parse_unknown_metrics,
                     disable_legacy_cluster_tag=self.disable_legacy_cluster_tag,
                 )
+                entry = (metric, tuple(tags), method)
             except UnknownMetric:
                 if envoy_metric not in self.unknown_metrics:
                     self.log.debug('Unknown metric `%s`', envoy_metric)
-                self.unknown_metrics[envoy_metric] += 1
-                continue
+                entry = (_UNKNOWN_METRIC, (), None)
             except UnknownTags as e:
                 unknown_tags = str(e).split('|||')
                 for tag in unknown_tags:
                     if tag not in self.unknown_tags:
                         self.log.debug('Unknown tag `%s` in metric `%s`', tag, envoy_metric)
-                    self.unknown_tags[tag] += 1
-                continue
-
-            tags.extend(self.custom_tags)
-            try:
-                value = int(value)
-                get_method(self, method)(metric, value, tags=tags)
+                entry = (_UNKNOWN_TAGS, tuple(unknown_tags), None)
 
-            # If the value isn't an integer assume it's pre-computed histogram data.
-            except (ValueError, TypeError):
-                for histo_metric, histo_value in parse_histogram(metric, value):
-                    self.gauge(histo_metric, histo_value, tags=tags)
+        if self.stats_cache_size:
+            if len(self.stats_cache) >= self.stats_cache_size:
+                del self.stats_cache[next(iter(self.stats_cache))]
+            self.stats_cache[envoy_metric] = entry
 
-        self.service_check(self.SERVICE_CHECK_NAME, AgentCheck.OK, tags=self.custom_tags)
+        return entry
 
     def included_metrics(self, metric):
-        if self.caching_metrics:
-            if metric in self.included_metrics_cache:
-                return True
-            elif metric in self.excluded_metrics_cache:
-                return False
-
         if self.config_included_metrics:
             included_metrics = any(pattern.search(metric) for pattern in self.config_included_metrics)
             if self.config_excluded_metrics:
@@ -165,17 +204,9 @@ class Envoy(AgentCheck):
                     pattern.search(metric) for pattern in self.config_excluded_metrics
                 )
 
-            if self.caching_metrics and included_metrics:
-                self.included_metrics_cache.add(metric)
-
             return included_metrics
         elif self.config_excluded_metrics:
-            excluded_metrics = any(pattern.search(metric) for pattern in self.config_excluded_metrics)
-
-            if self.caching_metrics and excluded_metrics:
-                self.excluded_metrics_cache.add(metric)
-
-            return not excluded_metrics
+            return not any(pattern.search(metric) for pattern in self.config_excluded_metrics)
         else:
             return True
 
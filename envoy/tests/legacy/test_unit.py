@@ -123,6 +123,88 @@ def test_unknown(fixture_path, mock_http_response, dd_run_check, check):
     assert sum(c.unknown_metrics.values()) == 5
 
 
+def test_stats_cache(aggregator, fixture_path, mock_http_response, dd_run_check, check):
+    instance = deepcopy(INSTANCES['main'])
+    instance['included_metrics'] = [r'^server\.']
+    c = check(instance)
+
+    mock_http_response(file_path=fixture_path('./legacy/multiple_services'))
+    dd_run_check(c)
+    metrics = {name: len(aggregator.metrics(name)) for name in aggregator.metric_names}
+    assert metrics
+    aggregator.reset()
+
+    with mock.patch('datadog_checks.envoy.envoy.parse_metric') as parse_metric:
+        dd_run_check(c)
+
+    parse_metric.assert_not_called()
+    assert {name: len(aggregator.metrics(name)) for name in aggregator.metric_names} == metrics
+
+
+def test_stats_cache_unknown(fixture_path, mock_http_response, dd_run_check, check):
+    instance = INSTANCES['main']
+    c = check(instance)
+
+    mock_http_response(file_path=fixture_path('./legacy/unknown_metrics'))
+    dd_run_check(c)
+    dd_run_check(c)
+
+    assert sum(c.unknown_metrics.values()) == 10
+
+
+@pytest.mark.parametrize(
+    'extra_config, expected_size',
+    [
+        pytest.param({}, 4, id="default"),
+        pytest.param({'cache_metrics_size': 2}, 2, id="bounded"),
+        pytest.param({'cache_metrics': False}, 0, id="disabled"),
+    ],
+)
+def test_stats_cache_size(extra_config, expected_size, fixture_path, mock_http_response, dd_run_check, check):
+    instance = deepcopy(INSTANCES['main'])
+    instance.update(extra_config)
+    c = check(instance)
+
+    mock_http_response(file_path=fixture_path('./legacy/unknown_metrics'))
+    dd_run_check(c)
+
+    assert len(c.stats_cache) == expected_size
+
+
+def test_stats_cache_size_invalid(check):
+    instance = deepcopy(INSTANCES['main'])
+    instance['cache_metrics_size'] = -1
+
+    with pytest.raises(Exception, match='cache_metrics_size'):
+        check(instance)
+
+
+@pytest.mark.parametrize(
+    'extra_config, expected_params',
+    [
+        pytest.param(
+            {'included_metrics': [r'envoy\.cluster\.', r'^http\.'], 'filter_stats_in_envoy': True},
+            {'filter': r'(?:^http\.)|(?:cluster\.)'},
+            id="filter",
+        ),
+        pytest.param({'filter_stats_in_envoy': True}, None, id="filter without included metrics"),
+        pytest.param({'used_only': True}, {'usedonly': ''}, id="used only"),
+    ],
+)
+def test_stats_params(extra_config, expected_params, check, dd_run_check):
+    instance = deepcopy(INSTANCES['main'])
+    instance['collect_server_info'] = False
+    instance.update(extra_config)
+    check = check(instance)
+
+    with mock.patch('datadog_checks.base.utils.http.requests') as r:
+        r.get.return_value = mock.MagicMock(status_code=200)
+
+        dd_run_check(check)
+
+        assert r.get.call_args.kwargs.get('params') == expected_params
+
+
 @pytest.mark.parametrize(
     'extra_config, expected_http_kwargs',
     [
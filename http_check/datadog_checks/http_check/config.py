@@ -7,9 +7,33 @@ from requests.structures import CaseInsensitiveDict
 
 from datadog_checks.base import ConfigurationError, ensure_unicode, is_affirmative
 from datadog_checks.base.utils.headers import headers as agent_headers
+from datadog_checks.base.utils.http import STANDARD_FIELDS
 
 DEFAULT_EXPECTED_CODE = r'(1|2|3)\d\d'
 
+# Options of the batch mode, which are not inherited by the targets
+BATCH_OPTIONS = ('targets', 'max_concurrent_requests')
+
+# Options of the HTTP client, which is shared by all the targets of an instance
+CLIENT_OPTIONS = (
+    frozenset(STANDARD_FIELDS)
+    .difference(['headers'])
+    .union(
+        [
+            'ca_certs',
+            'check_hostname',
+            'client_cert',
+            'client_key',
+            'disable_ssl_validation',
+            'ignore_ssl_warning',
+            'include_default_headers',
+            'tls_ciphers',
+            'tls_private_key_password',
+            'tls_validate_hostname',
+        ]
+    )
+)
+
 
 Config = namedtuple(
     'Config',
@@ -92,3 +116,37 @@ def from_instance(instance, default_ca_certs=None):
         stream,
         use_cert_from_response,
     )
+
+
+def targets_from_instance(instance):
+    """
+    Create an instance dictionary for every target of an instance, which inherits the options of the instance
+    """
+    targets = instance.get('targets')
+    if not isinstance(targets, list) or not targets:
+        raise ConfigurationError("Bad configuration. `targets` must be a non-empty list")
+    if instance.get('url'):
+        raise ConfigurationError("Bad configuration. You must specify either a url or targets, not both")
+
+    defaults = {option: value for option, value in instance.items() if option not in BATCH_OPTIONS}
+    instances = []
+    for target in targets:
+        if not isinstance(target, dict) or 'name' not in target:
+            raise ConfigurationError("Bad configuration. Every target must be a mapping with a name and a url")
+
+        client_options = sorted(CLIENT_OPTIONS.intersection(target))
+        if client_options:
+            raise ConfigurationError(
+                "Bad configuration. The target {} cannot override the options of the instance: {}".format(
+                    target['name'], ', '.join(client_options)
+                )
+            )
+
+        target_instance = dict(defaults)
+        target_instance.update(target)
+        target_instance['tags'] = list(instance.get('tags', [])) + list(target.get('tags', []))
+        if 'headers' in target:
+            target_instance['headers'] = dict(instance.get('headers', {}), **target['headers'])
+        instances.append(target_instance)
+
+    return instances
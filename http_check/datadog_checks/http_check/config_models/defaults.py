@@ -68,6 +68,10 @@ def instance_log_requests():
     return False
 
 
+def instance_max_concurrent_requests():
+    return 16
+
+
 def instance_method():
     return 'get'
 
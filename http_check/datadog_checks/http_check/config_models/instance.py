@@ -82,6 +82,7 @@ class InstanceConfig(BaseModel):
     kerberos_keytab: Optional[str] = None
     kerberos_principal: Optional[str] = None
     log_requests: Optional[bool] = None
+    max_concurrent_requests: Optional[int] = None
     method: Optional[str] = None
     metric_patterns: Optional[MetricPatterns] = None
     min_collection_interval: Optional[float] = None
@@ -100,6 +101,7 @@ class InstanceConfig(BaseModel):
     ssl_server_name: Optional[str] = None
     stream: Optional[bool] = None
     tags: Optional[tuple[str, ...]] = None
+    targets: Optional[tuple[MappingProxyType[str, Any], ...]] = None
     timeout: Optional[float] = None
     tls_ca_cert: Optional[str] = None
     tls_cert: Optional[str] = None
@@ -112,7 +114,7 @@ class InstanceConfig(BaseModel):
     tls_use_host_header: Optional[bool] = None
     tls_validate_hostname: Optional[bool] = None
     tls_verify: Optional[bool] = None
-    url: str
+    url: Optional[str] = None
     use_cert_from_response: Optional[bool] = None
     use_legacy_auth_encoding: Optional[bool] = None
     username: Optional[str] = None
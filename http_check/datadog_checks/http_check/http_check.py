@@ -6,17 +6,23 @@ from __future__ import unicode_literals
 import copy
 import re
 import socket
+import threading
 import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urlparse
 
 import requests
-from cryptography import x509
 from requests import Response  # noqa: F401
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from requests_toolbelt.adapters import host_header_ssl
 
-from datadog_checks.base import AgentCheck, ensure_unicode, is_affirmative
+from datadog_checks.base import AgentCheck, ConfigurationError, ensure_unicode, is_affirmative
+from datadog_checks.base.utils.certificates import CertificateCache
+from datadog_checks.base.utils.http import RequestsWrapper
 
-from .config import DEFAULT_EXPECTED_CODE, from_instance
+from .config import DEFAULT_EXPECTED_CODE, from_instance, targets_from_instance
 from .utils import get_ca_certs_path
 
 DEFAULT_EXPIRE_DAYS_WARNING = 14
@@ -24,6 +30,9 @@ DEFAULT_EXPIRE_DAYS_CRITICAL = 7
 DEFAULT_EXPIRE_WARNING = DEFAULT_EXPIRE_DAYS_WARNING * 24 * 3600
 DEFAULT_EXPIRE_CRITICAL = DEFAULT_EXPIRE_DAYS_CRITICAL * 24 * 3600
 MESSAGE_LENGTH = 2500  # https://docs.datadoghq.com/api/v1/service-checks/
+DEFAULT_MAX_CONCURRENT_REQUESTS = 16
+# Seconds after which the certificate of a connection kept alive may have been renewed
+PEER_CERT_MAX_AGE = 3600
 
 DATA_METHODS = ["POST", "PUT", "DELETE", "PATCH", "OPTIONS"]
 
@@ -66,7 +75,91 @@ class HTTPCheck(AgentCheck):
         if is_affirmative(self.instance.get('use_cert_from_response', False)):
             self.HTTP_CONFIG_REMAPPER['disable_ssl_validation']['default'] = False
 
+        self._executor = None
+        if self.instance.get('targets') is not None:
+            self._configure_targets()
+
     def check(self, instance):
+        if self._executor is not None:
+            self._check_targets(instance)
+        else:
+            self._check_target(instance)
+
+    def cancel(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            for http in self._worker_clients:
+                http.session.close()
+
+    def _configure_targets(self):
+        """
+        Set up the batch mode, where the targets of the instance are probed concurrently by workers which keep their
+        connections alive across check runs.
+        """
+        hosts = set()
+        for target in targets_from_instance(self.instance):
+            hosts.add(urlparse(from_instance(target, self.ca_certs).url).netloc)
+
+        max_concurrent_requests = int(self.instance.get('max_concurrent_requests', DEFAULT_MAX_CONCURRENT_REQUESTS))
+        if max_concurrent_requests < 1:
+            raise ConfigurationError("Bad configuration. `max_concurrent_requests` must be positive")
+
+        # Keep a connection to every host in each worker, so that each run reuses the connections of the previous one
+        self._pool_connections = max(len(hosts), DEFAULT_POOLSIZE)
+        self._worker_options = self.http.options
+        self._worker_local = threading.local()
+        self._worker_clients = []
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_requests)
+
+    def _check_targets(self, instance):
+        targets = targets_from_instance(instance)
+        futures = [
+            self._executor.submit(self._check_target, target, keep_alive=True, extra_headers=options.get('headers'))
+            for target, options in zip(targets, instance['targets'])
+        ]
+
+        # Unhandled errors of a target don't prevent checking the others, the first one is raised once all are done
+        errors = [error for error in (future.exception() for future in futures) if error is not None]
+        if errors:
+            raise errors[0]
+
+    def _create_http(self, pool_connections=DEFAULT_POOLSIZE):
+        """
+        Create an HTTP client for a worker, with the options of `self.http`.
+        """
+        http = RequestsWrapper(self.instance, self.init_config, self.HTTP_CONFIG_REMAPPER, self.log)
+        # The options are only read by the requests of the targets
+        http.options = self._worker_options
+
+        session = http.session
+        session.trust_env = False
+        session.mount('http://', HTTPAdapter(pool_connections=pool_connections))
+        if http.tls_use_host_header:
+            session.mount('https://', host_header_ssl.HostHeaderSSLAdapter(pool_connections=pool_connections))
+        else:
+            session.mount('https://', HTTPAdapter(pool_connections=pool_connections))
+
+        return http
+
+    def _get_worker_http(self):
+        """
+        Return the HTTP client of the current worker. Sessions are not thread safe, so each worker has its own.
+        """
+        http = getattr(self._worker_local, 'http', None)
+        if http is None:
+            http = self._worker_local.http = self._create_http(self._pool_connections)
+            # The time each connection of the worker was first seen, right after its handshake
+            self._worker_local.handshakes = weakref.WeakKeyDictionary()
+            self._worker_clients.append(http)
+
+        return http
+
+    def _check_target(self, instance, keep_alive=False, extra_headers=None):
+        """
+        Check a URL. With `keep_alive`, the request is sent from the session of the current worker, and its connection
+        goes back to the pool of its host after the request. The certificate is read from that connection unless its
+        handshake is older than `PEER_CERT_MAX_AGE`.
+        """
         (
             addr,
             client_cert,
@@ -86,7 +179,16 @@ class HTTPCheck(AgentCheck):
             stream,
             use_cert_from_response,
         ) = from_instance(instance, self.ca_certs)
-        timeout = self.http.options["timeout"][0]
+        if not keep_alive:
+            http = self.http
+        elif use_cert_from_response:
+            # A connection kept alive may have been opened before the certificate was renewed
+            http = self._create_http()
+        else:
+            http = self._get_worker_http()
+        reuse_connection = keep_alive and not use_cert_from_response
+
+        timeout = http.options["timeout"][0]
         start = time.time()
 
         def send_status_up(log_msg):
@@ -112,23 +214,49 @@ class HTTPCheck(AgentCheck):
         try:
             parsed_uri = urlparse(addr)
             self.log.debug("Connecting to %s", addr)
-            self.http.session.trust_env = False
+            http.session.trust_env = False
+
+            options = {}
+            if keep_alive:
+                # The options of the HTTP client are shared by the targets checked concurrently
+                request_headers = dict(extra_headers or {})
+                if method.upper() in DATA_METHODS and not headers.get("Content-Type"):
+                    request_headers["Content-Type"] = "application/x-www-form-urlencoded"
+                if request_headers:
+                    options['extra_headers'] = request_headers
 
             # Add 'Content-Type' for non GET requests when they have not been specified in custom headers
-            if method.upper() in DATA_METHODS and not headers.get("Content-Type"):
-                self.http.options["headers"]["Content-Type"] = "application/x-www-form-urlencoded"
+            elif method.upper() in DATA_METHODS and not headers.get("Content-Type"):
+                http.options["headers"]["Content-Type"] = "application/x-www-form-urlencoded"
 
             http_method = method.lower()
             if http_method == "options":
                 http_method = "options_method"
 
-            r = getattr(self.http, http_method)(
+            r = getattr(http, http_method)(
                 addr,
                 persist=True,
-                stream=stream,
+                stream=stream or keep_alive,
                 json=data if method.upper() in DATA_METHODS and isinstance(data, dict) else None,
                 data=data if method.upper() in DATA_METHODS and isinstance(data, str) else None,
+                **options
             )
+
+            if keep_alive and not stream:
+                expired_connection = None
+                if use_cert_from_response:
+                    peer_cert = r.raw.connection.sock.getpeercert(binary_form=True)
+                elif ssl_expire and parsed_uri.scheme == "https":
+                    if self._is_handshake_recent(r.raw.connection):
+                        peer_cert = self._get_peer_cert(r, parsed_uri, instance)
+                    else:
+                        expired_connection = r.raw.connection
+
+                # Read the body like a request which is not streamed, this also releases the connection to its pool
+                r.content  # noqa: B018
+                if expired_connection is not None:
+                    # The certificate is fetched from a new connection, and the next request opens a new one too
+                    expired_connection.close()
         except (
             socket.timeout,
             requests.exceptions.ConnectionError,
@@ -180,7 +308,7 @@ class HTTPCheck(AgentCheck):
             raise
 
         else:
-            if use_cert_from_response:
+            if use_cert_from_response and peer_cert is None:
                 peer_cert = r.raw.connection.sock.getpeercert(binary_form=True)
 
             # Only add the URL tag if it's not already present
@@ -246,9 +374,10 @@ class HTTPCheck(AgentCheck):
         finally:
             if r is not None:
                 r.close()
-            # resets the wrapper Session object
-            self.http._session.close()
-            self.http._session = None
+            if not reuse_connection:
+                # resets the wrapper Session object
+                http._session.close()
+                http._session = None
 
         # Report status metrics as well
         if service_checks:
@@ -262,8 +391,10 @@ class HTTPCheck(AgentCheck):
         if ssl_expire and parsed_uri.scheme == "https":
             if peer_cert is None:
                 status, days_left, seconds_left, msg = self.check_cert_expiration(instance, timeout, instance_ca_certs)
-            else:
+            elif use_cert_from_response:
                 status, days_left, seconds_left, msg = self._inspect_cert(peer_cert, instance)
+            else:
+                status, days_left, seconds_left, msg = self._check_peer_cert(peer_cert, instance)
 
             tags_list = list(tags)
             tags_list.append("url:{}".format(addr))
@@ -326,6 +457,9 @@ class HTTPCheck(AgentCheck):
                     self.log.debug('Unable to connect to site to get cert expiration: %s', e)
                 return AgentCheck.UNKNOWN, None, None, msg
 
+        return self._check_peer_cert(peer_cert, instance)
+
+    def _check_peer_cert(self, peer_cert, instance):
         # To maintain backwards compatability, if we aren't validating tls/certs, do not process
         # the returned binary cert unless specifically configured to with tls_retrieve_non_validated_cert
         if (
@@ -350,7 +484,7 @@ class HTTPCheck(AgentCheck):
         )
 
         try:
-            cert = x509.load_der_x509_certificate(binary_cert)
+            cert, _ = CertificateCache.shared_instance().load_certificate(binary_cert)
             exp_date = cert.not_valid_after
         except Exception as e:
             msg = repr(e)
@@ -388,6 +522,40 @@ class HTTPCheck(AgentCheck):
                 "Days left: {}".format(days_left),
             )
 
+    def _is_handshake_recent(self, connection):
+        """
+        Return whether a connection of the current worker was opened less than `PEER_CERT_MAX_AGE` seconds ago.
+        """
+        sock = getattr(connection, 'sock', None)
+        if sock is None:
+            return False
+
+        now = time.time()
+        return now - self._worker_local.handshakes.setdefault(sock, now) < PEER_CERT_MAX_AGE
+
+    def _get_peer_cert(self, response, parsed_uri, instance):
+        """
+        Return the certificate of the connection of a response, or None if it may differ from the one that
+        `_fetch_cert` would get.
+        """
+        if instance.get('ssl_server_name'):
+            return None
+
+        # Redirections may lead to another host
+        final_uri = urlparse(response.url)
+        if (final_uri.scheme, final_uri.hostname, final_uri.port or 443) != (
+            parsed_uri.scheme,
+            parsed_uri.hostname,
+            parsed_uri.port or 443,
+        ):
+            return None
+
+        try:
+            return response.raw.connection.sock.getpeercert(binary_form=True)
+        except Exception as e:
+            self.log.debug('Unable to get the certificate of the connection to %s: %s', parsed_uri.geturl(), e)
+            return None
+
     def _fetch_cert(self, instance, timeout, instance_ca_certs):
         url = instance.get('url')
 
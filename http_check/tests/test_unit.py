@@ -1,9 +1,15 @@
 # (C) Datadog, Inc. 2018-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import mock
+import pytest
 
+from datadog_checks.base import AgentCheck
+from datadog_checks.base.utils.http import RequestsWrapper
 from datadog_checks.http_check import HTTPCheck, http_check
 
 
@@ -79,3 +85,168 @@ def test_message_when_content_is_disabled():
 
     assert message == error_message
     assert content not in message
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        body = 'Hello {}'.format(self.path).encode('utf-8')
+        self.send_response(404 if self.path == '/missing' else 200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.lock = threading.Lock()
+    server.connections = set()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.delay = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def server_targets(server):
+    url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+    return [
+        {'name': 'up', 'url': url + '/up', 'tags': ['target:up']},
+        {'name': 'missing', 'url': url + '/missing'},
+        {'name': 'content', 'url': url + '/content', 'content_match': 'Hello /other'},
+    ]
+
+
+def submissions(aggregator):
+    metrics = {
+        (name, metric.value if name != 'network.http.response_time' else None, tuple(sorted(metric.tags)))
+        for name in aggregator.metric_names
+        for metric in aggregator.metrics(name)
+    }
+    service_checks = {
+        (name, service_check.status, tuple(sorted(service_check.tags)), service_check.message)
+        for name in aggregator.service_check_names
+        for service_check in aggregator.service_checks(name)
+    }
+    return metrics, service_checks
+
+
+def test_targets_same_submissions_as_instances(aggregator, dd_run_check, server):
+    for target in server_targets(server):
+        instance = dict(target, tags=['team:web'] + target.get('tags', []))
+        dd_run_check(HTTPCheck('http_check', {'ca_certs': 'foo'}, [instance]))
+    expected = submissions(aggregator)
+    aggregator.reset()
+
+    check = HTTPCheck(
+        'http_check', {'ca_certs': 'foo'}, [{'name': 'batch', 'tags': ['team:web'], 'targets': server_targets(server)}]
+    )
+    dd_run_check(check)
+
+    assert submissions(aggregator) == expected
+    aggregator.assert_service_check(
+        HTTPCheck.SC_STATUS,
+        status=AgentCheck.OK,
+        tags=['team:web', 'target:up', 'instance:up', 'url:{}'.format(server_targets(server)[0]['url'])],
+    )
+    aggregator.assert_service_check(HTTPCheck.SC_STATUS, status=AgentCheck.CRITICAL, count=2)
+
+
+def test_targets_keep_connections_alive(aggregator, dd_run_check, server):
+    instance = {
+        'name': 'batch',
+        'targets': server_targets(server),
+        'max_concurrent_requests': 1,
+    }
+    check = HTTPCheck('http_check', {'ca_certs': 'foo'}, [instance])
+
+    dd_run_check(check)
+    dd_run_check(check)
+
+    aggregator.assert_metric('network.http.can_connect', count=6)
+    assert len(server.connections) == 1
+
+
+def test_targets_max_concurrent_requests(aggregator, dd_run_check, server):
+    server.delay = 0.05
+    url = 'http://127.0.0.1:{}/up'.format(server.server_address[1])
+    targets = [{'name': 'target{}'.format(i), 'url': url} for i in range(20)]
+    check = HTTPCheck(
+        'http_check', {'ca_certs': 'foo'}, [{'name': 'batch', 'targets': targets, 'max_concurrent_requests': 5}]
+    )
+
+    dd_run_check(check)
+
+    aggregator.assert_service_check(HTTPCheck.SC_STATUS, status=AgentCheck.OK, count=20)
+    assert 1 < server.max_in_flight <= 5
+
+
+def test_targets_session_per_worker(aggregator, dd_run_check, server):
+    server.delay = 0.05
+    url = 'http://127.0.0.1:{}/up'.format(server.server_address[1])
+    targets = [{'name': 'target{}'.format(i), 'url': url} for i in range(20)]
+    check = HTTPCheck(
+        'http_check', {'ca_certs': 'foo'}, [{'name': 'batch', 'targets': targets, 'max_concurrent_requests': 5}]
+    )
+
+    dd_run_check(check)
+    dd_run_check(check)
+
+    aggregator.assert_service_check(HTTPCheck.SC_STATUS, status=AgentCheck.OK, count=40)
+    sessions = {id(http.session) for http in check._worker_clients}
+    assert len(sessions) == len(check._worker_clients) == 5
+    assert id(check.http.session) not in sessions
+    assert len(server.connections) == 5
+
+
+def test_targets_certificate_from_probe_connection(aggregator, dd_run_check):
+    check = HTTPCheck(
+        'http_check',
+        {'ca_certs': 'foo'},
+        [{'name': 'batch', 'targets': [{'name': 'secure', 'url': 'https://foo.bar'}]}],
+    )
+    response = mock.MagicMock(status_code=200, url='https://foo.bar', text='')
+    response.elapsed.total_seconds.return_value = 0.1
+    connection = response.raw.connection
+    connection.sock.getpeercert.return_value = b'cert'
+    cert_status = (AgentCheck.OK, 30, 30 * 24 * 3600, 'Days left: 30')
+
+    with mock.patch.object(RequestsWrapper, 'get', return_value=response), mock.patch.object(
+        HTTPCheck, '_fetch_cert'
+    ) as fetch_cert, mock.patch.object(HTTPCheck, '_check_peer_cert', return_value=cert_status) as check_peer_cert:
+        dd_run_check(check)
+        dd_run_check(check)
+
+        # The handshake of the probe is reused
+        fetch_cert.assert_not_called()
+        assert connection.sock.getpeercert.call_count == 2
+        check_peer_cert.assert_called_with(b'cert', mock.ANY)
+        connection.close.assert_not_called()
+
+        # Until the connection is too old to trust its certificate
+        with mock.patch.object(http_check, 'PEER_CERT_MAX_AGE', 0):
+            dd_run_check(check)
+
+        fetch_cert.assert_called_once()
+        assert connection.sock.getpeercert.call_count == 2
+        connection.close.assert_called_once()
+
+    aggregator.assert_service_check(HTTPCheck.SC_STATUS, status=AgentCheck.OK, count=3)
+    aggregator.assert_service_check(HTTPCheck.SC_SSL_CERT, count=3)
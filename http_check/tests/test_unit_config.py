@@ -5,7 +5,7 @@ import pytest
 
 from datadog_checks.base import ConfigurationError
 from datadog_checks.base.utils.headers import headers as agent_headers
-from datadog_checks.http_check.config import DEFAULT_EXPECTED_CODE, from_instance
+from datadog_checks.http_check.config import DEFAULT_EXPECTED_CODE, from_instance, targets_from_instance
 
 
 def test_from_instance():
@@ -81,3 +81,68 @@ def test_instance_ca_cert():
     # No default ca_cert
     params_no_default = from_instance({'url': 'https://example2.com', 'name': 'UpService'})
     assert params_no_default.instance_ca_certs is None
+
+
+def test_targets_from_instance():
+    instance = {
+        'name': 'Services',
+        'method': 'post',
+        'headers': {'X-Team': 'web'},
+        'tags': ['env:prod'],
+        'max_concurrent_requests': 4,
+        'targets': [
+            {'name': 'Web', 'url': 'https://example.com'},
+            {
+                'name': 'Api',
+                'url': 'https://api.example.com',
+                'method': 'get',
+                'headers': {'X-Auth': 'token'},
+                'tags': ['api'],
+            },
+        ],
+    }
+
+    web, api = targets_from_instance(instance)
+
+    assert web == {
+        'name': 'Web',
+        'url': 'https://example.com',
+        'method': 'post',
+        'headers': {'X-Team': 'web'},
+        'tags': ['env:prod'],
+    }
+    assert api == {
+        'name': 'Api',
+        'url': 'https://api.example.com',
+        'method': 'get',
+        'headers': {'X-Team': 'web', 'X-Auth': 'token'},
+        'tags': ['env:prod', 'api'],
+    }
+    # The tags of the instance are not shared
+    assert web['tags'] is not instance['tags']
+
+
+@pytest.mark.parametrize(
+    'instance, message',
+    [
+        pytest.param({'name': 'Services', 'targets': []}, 'non-empty list', id='empty'),
+        pytest.param(
+            {
+                'name': 'Services',
+                'url': 'https://example.com',
+                'targets': [{'name': 'Web', 'url': 'https://example.com'}],
+            },
+            'either a url or targets',
+            id='url and targets',
+        ),
+        pytest.param({'name': 'Services', 'targets': [{'url': 'https://example.com'}]}, 'with a name', id='no name'),
+        pytest.param(
+            {'name': 'Services', 'targets': [{'name': 'Web', 'url': 'https://example.com', 'tls_verify': False}]},
+            'cannot override the options of the instance: tls_verify',
+            id='client option',
+        ),
+    ],
+)
+def test_targets_from_instance_errors(instance, message):
+    with pytest.raises(ConfigurationError, match=message):
+        targets_from_instance(instance)
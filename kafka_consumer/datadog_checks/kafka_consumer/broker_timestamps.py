@@ -0,0 +1,243 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import base64
+import json
+import math
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+# Prefix of the binary format, JSON written by previous versions starts with `{`
+SNAPSHOT_PREFIX = 'b1:'
+
+_KEY_HEADER = struct.Struct('<HI')
+
+
+class TimestampHistory:
+    """
+    The timestamps at which a partition reached some highwater offsets, in a ring buffer ordered by offset.
+
+    Offsets and timestamps are stored in two typed arrays. Once `capacity` offsets are stored, each new offset
+    replaces the oldest one.
+    """
+
+    __slots__ = ('_capacity', '_offsets', '_timestamps', '_start')
+
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._offsets = array('q')
+        self._timestamps = array('d')
+        # Physical index of the oldest offset once the buffer is full, 0 until then
+        self._start = 0
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def add(self, offset, timestamp):
+        size = len(self._offsets)
+        if size:
+            newest = (self._start - 1) % size
+            if offset == self._offsets[newest]:
+                self._timestamps[newest] = timestamp
+                return
+            if offset < self._offsets[newest]:
+                # The offsets went back, e.g. the topic was recreated: drop the offsets that are now ahead of it
+                items = [(o, t) for o, t in self.items() if o < offset]
+                self._offsets = array('q', (o for o, _ in items))
+                self._timestamps = array('d', (t for _, t in items))
+                self._start = 0
+                size = len(items)
+
+        if size < self._capacity:
+            self._offsets.append(offset)
+            self._timestamps.append(timestamp)
+        else:
+            self._offsets[self._start] = offset
+            self._timestamps[self._start] = timestamp
+            self._start = (self._start + 1) % size
+
+    def items(self):
+        """Iterate over the (offset, timestamp) pairs from the oldest to the newest."""
+        size = len(self._offsets)
+        for i in range(size):
+            index = (self._start + i) % size
+            yield self._offsets[index], self._timestamps[index]
+
+    def get(self, offset):
+        """Return the timestamp at which the partition reached `offset`, or None."""
+        size = len(self._offsets)
+        i = self._bisect(offset)
+        if i < size and self._offset(i) == offset:
+            return self._timestamp(i)
+        return None
+
+    def interpolate(self, offset):
+        """
+        Estimate the timestamp at which the partition reached `offset`.
+
+        We assume that the timestamp is an affine function of the offset between the closest saved offsets. When
+        there are none before or after `offset`, the timestamp is extrapolated from the oldest and newest offsets.
+        """
+        size = len(self._offsets)
+        i = self._bisect(offset)
+        if i < size and self._offset(i) == offset:
+            return self._timestamp(i)
+
+        if 0 < i < size:
+            before, after = i - 1, i
+        elif size < 2:
+            return None
+        else:
+            # We couldn't find offsets before and after the current consumer offset.
+            # This happens when you start a consumer to replay data in the past:
+            #   - We provision a consumer at t0 that will start consuming from t1 (t1 << t0).
+            #   - It starts building a history of offset/timestamp pairs from the moment it started to run, i.e. t0.
+            #   - So there is no offset/timestamp pair in the local history between t1 -> t0.
+            before, after = 0, size - 1
+
+        offset_before, offset_after = self._offset(before), self._offset(after)
+        timestamp_before, timestamp_after = self._timestamp(before), self._timestamp(after)
+        slope = (timestamp_after - timestamp_before) / float(offset_after - offset_before)
+        return slope * (offset - offset_after) + timestamp_after
+
+    def _offset(self, i):
+        return self._offsets[(self._start + i) % len(self._offsets)]
+
+    def _timestamp(self, i):
+        return self._timestamps[(self._start + i) % len(self._timestamps)]
+
+    def _bisect(self, offset):
+        """Return the number of saved offsets lower than `offset`."""
+        offsets = self._offsets
+        size = len(offsets)
+        if not self._start:
+            return bisect_left(offsets, offset)
+
+        # The buffer wrapped around: both [start, size) and [0, start) are sorted, and hold the oldest offsets first
+        if offset <= offsets[size - 1]:
+            return bisect_left(offsets, offset, self._start, size) - self._start
+        return size - self._start + bisect_left(offsets, offset, 0, self._start)
+
+
+class BrokerTimestamps:
+    """
+    The timestamp history of every partition, persisted as a binary snapshot and the offsets added since then.
+
+    Writing the whole history on every run costs as much as the history is large, so the offsets added since the
+    last snapshot are written on their own, and merged into a new snapshot from time to time.
+    """
+
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._histories = {}
+        # Offsets added since the last snapshot
+        self._delta = {}
+        self._runs_since_snapshot = None
+        # Writing the delta costs up to `n` times the new offsets of a run, and the snapshot `capacity` times. Taking
+        # a snapshot every sqrt(2 * capacity) runs balances both.
+        self._snapshot_interval = max(1, int(math.sqrt(2 * capacity)))
+
+    def __len__(self):
+        return len(self._histories)
+
+    def get(self, topic, partition):
+        return self._histories.get(_key(topic, partition))
+
+    def add(self, topic, partition, offset, timestamp):
+        key = _key(topic, partition)
+        self._add(key, offset, timestamp)
+        self._delta.setdefault(key, []).append((offset, timestamp))
+
+    def should_snapshot(self):
+        """Return whether to write a new snapshot, rather than only the offsets added since the last one."""
+        return self._runs_since_snapshot is None or self._runs_since_snapshot >= self._snapshot_interval
+
+    def snapshot(self):
+        """Encode the whole history, which then becomes the base of the next deltas."""
+        self._delta = {}
+        self._runs_since_snapshot = 0
+        return _encode((key, history.items()) for key, history in self._histories.items())
+
+    def delta(self):
+        """Encode the offsets added since the last snapshot."""
+        self._runs_since_snapshot += 1
+        return _encode(self._delta.items())
+
+    def load(self, snapshot, delta):
+        """Load a snapshot, and the offsets added since then."""
+        for key, offset, timestamp in _decode(snapshot):
+            self._add(key, offset, timestamp)
+        if delta:
+            for key, offset, timestamp in _decode(delta):
+                self._add(key, offset, timestamp)
+                self._delta.setdefault(key, []).append((offset, timestamp))
+        self._runs_since_snapshot = 0
+
+    def load_json(self, content):
+        """Load the history written by previous versions of the check."""
+        for key, timestamps in json.loads(content).items():
+            for offset, timestamp in sorted((int(offset), timestamp) for offset, timestamp in timestamps.items()):
+                self._add(key, offset, timestamp)
+
+    def _add(self, key, offset, timestamp):
+        history = self._histories.get(key)
+        if history is None:
+            history = self._histories[key] = TimestampHistory(self._capacity)
+        history.add(offset, timestamp)
+
+
+def is_snapshot(content):
+    return content.startswith(SNAPSHOT_PREFIX)
+
+
+def _key(topic, partition):
+    return '{}_{}'.format(topic, partition)
+
+
+def _encode(histories):
+    chunks = []
+    for key, items in histories:
+        offsets = array('q')
+        timestamps = array('d')
+        for offset, timestamp in items:
+            offsets.append(offset)
+            timestamps.append(timestamp)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+            timestamps.byteswap()
+
+        encoded_key = key.encode('utf-8')
+        chunks.append(_KEY_HEADER.pack(len(encoded_key), len(offsets)))
+        chunks.append(encoded_key)
+        chunks.append(offsets.tobytes())
+        chunks.append(timestamps.tobytes())
+
+    return SNAPSHOT_PREFIX + base64.b64encode(b''.join(chunks)).decode('ascii')
+
+
+def _decode(content):
+    if not is_snapshot(content):
+        raise ValueError('Unknown broker timestamps format')
+
+    data = base64.b64decode(content[len(SNAPSHOT_PREFIX) :])
+    position = 0
+    while position < len(data):
+        key_length, count = _KEY_HEADER.unpack_from(data, position)
+        position += _KEY_HEADER.size
+        key = data[position : position + key_length].decode('utf-8')
+        position += key_length
+
+        offsets = array('q')
+        offsets.frombytes(data[position : position + 8 * count])
+        position += 8 * count
+        timestamps = array('d')
+        timestamps.frombytes(data[position : position + 8 * count])
+        position += 8 * count
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+            timestamps.byteswap()
+
+        for offset, timestamp in zip(offsets, timestamps):
+            yield key, offset, timestamp
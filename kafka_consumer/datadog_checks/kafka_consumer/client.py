@@ -3,8 +3,8 @@
 # Licensed under a 3-clause BSD style license (see LICENSE)
 from concurrent.futures import as_completed
 
-from confluent_kafka import Consumer, ConsumerGroupTopicPartitions, KafkaException, TopicPartition
-from confluent_kafka.admin import AdminClient
+from confluent_kafka import Consumer, ConsumerGroupTopicPartitions, IsolationLevel, KafkaException, TopicPartition
+from confluent_kafka.admin import AdminClient, OffsetSpec
 
 
 class KafkaClient:
@@ -106,6 +106,44 @@ class KafkaClient:
             )
         ]
 
+    def get_cluster_id_and_list_topics(self):
+        cluster_metadata = self.kafka_client.list_topics(timeout=self.config._request_timeout)
+        return (
+            cluster_metadata.cluster_id,
+            [(name, list(metadata.partitions)) for name, metadata in cluster_metadata.topics.items()],
+        )
+
+    def list_highwater_offsets(self, partitions):
+        """
+        Retrieve the highwater offsets of a list of (topic, partition) with the admin client.
+
+        The requests are batched by partition leader, so this sends one ListOffsets request per broker. Like the
+        consumers, which read committed messages by default, this returns the last stable offset of transactional
+        topics.
+
+        Returns a list of tuples: (topic, partition, offset)
+        """
+        if not partitions:
+            return []
+
+        futures = self.kafka_client.list_offsets(
+            {TopicPartition(topic, partition): OffsetSpec.latest() for topic, partition in partitions},
+            isolation_level=IsolationLevel.READ_COMMITTED,
+            request_timeout=self.config._request_timeout,
+        )
+        offsets = []
+        for topic_partition, future in futures.items():
+            try:
+                offsets.append((topic_partition.topic, topic_partition.partition, future.result().offset))
+            except KafkaException as e:
+                self.log.debug(
+                    "Failed to read highwater offset for topic: %s; partition: [%s]: %s",
+                    topic_partition.topic,
+                    topic_partition.partition,
+                    e,
+                )
+        return offsets
+
     def get_partitions_for_topic(self, topic):
         try:
             cluster_metadata = self.kafka_client.list_topics(topic, timeout=self.config._request_timeout)
@@ -22,6 +22,9 @@ class KafkaConfig:
         self._monitor_all_broker_highwatermarks = is_affirmative(
             instance.get('monitor_all_broker_highwatermarks', False)
         )
+        self._highwater_offsets_per_consumer_group = is_affirmative(
+            instance.get('highwater_offsets_per_consumer_group', False)
+        )
         self._consumer_groups = instance.get('consumer_groups', {})
         self._consumer_groups_regex = instance.get('consumer_groups_regex', {})
 
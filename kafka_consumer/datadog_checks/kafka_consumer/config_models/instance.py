@@ -52,6 +52,7 @@ class InstanceConfig(BaseModel):
     data_streams_enabled: Optional[bool] = None
     disable_generic_tags: Optional[bool] = None
     empty_default_hostname: Optional[bool] = None
+    highwater_offsets_per_consumer_group: Optional[bool] = None
     kafka_client_api_version: Optional[str] = None
     kafka_connect_str: Union[str, tuple[str, ...]]
     metric_patterns: Optional[MetricPatterns] = None
@@ -1,16 +1,18 @@
 # (C) Datadog, Inc. 2019-present
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
-import json
-from collections import defaultdict
 from time import time
 
 from datadog_checks.base import AgentCheck, is_affirmative
+from datadog_checks.kafka_consumer.broker_timestamps import BrokerTimestamps, is_snapshot
 from datadog_checks.kafka_consumer.client import KafkaClient
 from datadog_checks.kafka_consumer.config import KafkaConfig
 from datadog_checks.kafka_consumer.constants import KAFKA_INTERNAL_TOPICS, OFFSET_INVALID
 
 MAX_TIMESTAMPS = 1000
+BROKER_TIMESTAMPS_CACHE_KEY = "broker_timestamps_"
+# Offsets added since the snapshot stored under `BROKER_TIMESTAMPS_CACHE_KEY`
+BROKER_TIMESTAMPS_DELTA_CACHE_KEY = "broker_timestamps_delta"
 
 
 class KafkaCheck(AgentCheck):
@@ -22,6 +24,8 @@ class KafkaCheck(AgentCheck):
         self._context_limit = self.config._context_limit
         self._data_streams_enabled = is_affirmative(self.instance.get('data_streams_enabled', False))
         self._max_timestamps = int(self.instance.get('timestamp_history_size', MAX_TIMESTAMPS))
+        self._broker_timestamps = BrokerTimestamps(self._max_timestamps)
+        self._broker_timestamps_loaded = False
         self.client = KafkaClient(self.config, self.log)
         self.topic_partition_cache = {}
         self.check_initializations.insert(0, self.config.validate_config)
@@ -49,18 +53,17 @@ class KafkaCheck(AgentCheck):
 
         # Fetch the broker highwater offsets
         highwater_offsets = {}
-        broker_timestamps = defaultdict(dict)
         cluster_id = ""
-        persistent_cache_key = "broker_timestamps_"
         try:
             if len(consumer_offsets) < self._context_limit:
                 # Fetch highwater offsets
                 # Expected format: ({(topic, partition): offset}, cluster_id)
                 highwater_offsets, cluster_id = self.get_highwater_offsets(consumer_offsets)
                 if self._data_streams_enabled:
-                    broker_timestamps = self._load_broker_timestamps(persistent_cache_key)
-                    self._add_broker_timestamps(broker_timestamps, highwater_offsets)
-                    self._save_broker_timestamps(broker_timestamps, persistent_cache_key)
+                    if not self._broker_timestamps_loaded:
+                        self._load_broker_timestamps()
+                    self._add_broker_timestamps(highwater_offsets)
+                    self._save_broker_timestamps()
             else:
                 self.warning("Context limit reached. Skipping highwater offset collection.")
         except Exception:
@@ -91,7 +94,7 @@ class KafkaCheck(AgentCheck):
             consumer_offsets,
             highwater_offsets,
             self._context_limit - len(highwater_offsets),
-            broker_timestamps,
+            self._broker_timestamps,
             cluster_id,
         )
         if self.config._close_admin_client:
@@ -165,28 +168,34 @@ class KafkaCheck(AgentCheck):
 
         return self.client.list_consumer_group_offsets(groups)
 
-    def _load_broker_timestamps(self, persistent_cache_key):
-        """Loads broker timestamps from persistent cache."""
-        broker_timestamps = defaultdict(dict)
+    def _load_broker_timestamps(self):
+        """Loads broker timestamps from persistent cache, they are then kept in memory for the next runs."""
+        self._broker_timestamps_loaded = True
         try:
-            for topic_partition, content in json.loads(self.read_persistent_cache(persistent_cache_key)).items():
-                for offset, timestamp in content.items():
-                    broker_timestamps[topic_partition][int(offset)] = timestamp
+            content = self.read_persistent_cache(BROKER_TIMESTAMPS_CACHE_KEY)
+            if is_snapshot(content):
+                self._broker_timestamps.load(content, self.read_persistent_cache(BROKER_TIMESTAMPS_DELTA_CACHE_KEY))
+            else:
+                # Written by a previous version of the check
+                self._broker_timestamps.load_json(content)
         except Exception as e:
             self.log.warning('Could not read broker timestamps from cache: %s', str(e))
-        return broker_timestamps
+            self._broker_timestamps = BrokerTimestamps(self._max_timestamps)
 
-    def _add_broker_timestamps(self, broker_timestamps, highwater_offsets):
+    def _add_broker_timestamps(self, highwater_offsets):
+        now = time()
         for (topic, partition), highwater_offset in highwater_offsets.items():
-            timestamps = broker_timestamps["{}_{}".format(topic, partition)]
-            timestamps[highwater_offset] = time()
-            # If there's too many timestamps, we delete the oldest
-            if len(timestamps) > self._max_timestamps:
-                del timestamps[min(timestamps)]
-
-    def _save_broker_timestamps(self, broker_timestamps, persistent_cache_key):
-        """Saves broker timestamps to persistent cache."""
-        self.write_persistent_cache(persistent_cache_key, json.dumps(broker_timestamps))
+            self._broker_timestamps.add(topic, partition, highwater_offset, now)
+
+    def _save_broker_timestamps(self):
+        """Saves broker timestamps to persistent cache, only writing the offsets added since the last snapshot."""
+        if self._broker_timestamps.should_snapshot():
+            # Clear the delta first: if the snapshot can't be written, the previous snapshot is loaded without the
+            # offsets added since then, rather than with a delta of offsets older than the new snapshot.
+            self.write_persistent_cache(BROKER_TIMESTAMPS_DELTA_CACHE_KEY, '')
+            self.write_persistent_cache(BROKER_TIMESTAMPS_CACHE_KEY, self._broker_timestamps.snapshot())
+        else:
+            self.write_persistent_cache(BROKER_TIMESTAMPS_DELTA_CACHE_KEY, self._broker_timestamps.delta())
 
     def report_highwater_offsets(self, highwater_offsets, contexts_limit, cluster_id):
         """Report the broker highwater offsets."""
@@ -267,10 +276,12 @@ class KafkaCheck(AgentCheck):
                 if not self._data_streams_enabled:
                     continue
 
-                timestamps = broker_timestamps["{}_{}".format(topic, partition)]
+                history = broker_timestamps.get(topic, partition)
+                if history is None:
+                    continue
                 # The producer timestamp can be not set if there was an error fetching broker offsets.
-                producer_timestamp = timestamps.get(producer_offset, None)
-                consumer_timestamp = _get_interpolated_timestamp(timestamps, consumer_offset)
+                producer_timestamp = history.get(producer_offset)
+                consumer_timestamp = history.interpolate(consumer_offset)
                 if consumer_timestamp is None or producer_timestamp is None:
                     continue
                 lag = producer_timestamp - consumer_timestamp
@@ -305,8 +316,27 @@ class KafkaCheck(AgentCheck):
     def get_highwater_offsets(self, consumer_offsets):
         self.log.debug('Getting highwater offsets')
 
-        cluster_id = ""
-        highwater_offsets = {}
+        if self.config._highwater_offsets_per_consumer_group:
+            highwater_offsets, cluster_id = self._get_highwater_offsets_per_consumer_group(consumer_offsets)
+        elif not consumer_offsets:
+            highwater_offsets, cluster_id = {}, ""
+        else:
+            # Fetch the metadata once, then the highwater offsets of all the relevant partitions at once,
+            # however many consumer groups read them.
+            cluster_id, topics = self.client.get_cluster_id_and_list_topics()
+            topic_partitions = self._get_topic_partitions_for_highwater_offsets(
+                topics, *self._get_topic_partitions_with_consumer_offset(consumer_offsets)
+            )
+            self.log.debug('Querying %s highwater offsets', len(topic_partitions))
+            highwater_offsets = {
+                (topic, partition): offset
+                for topic, partition, offset in self.client.list_highwater_offsets(topic_partitions)
+            }
+
+        self.log.debug('Got %s highwater offsets', len(highwater_offsets))
+        return highwater_offsets, cluster_id
+
+    def _get_topic_partitions_with_consumer_offset(self, consumer_offsets):
         topics_with_consumer_offset = set()
         topic_partition_with_consumer_offset = set()
 
@@ -315,6 +345,40 @@ class KafkaCheck(AgentCheck):
                 topics_with_consumer_offset.add(topic)
                 topic_partition_with_consumer_offset.add((topic, partition))
 
+        return topics_with_consumer_offset, topic_partition_with_consumer_offset
+
+    def _get_topic_partitions_for_highwater_offsets(
+        self, topics, topics_with_consumer_offset, topic_partition_with_consumer_offset
+    ):
+        topic_partitions_for_highwater_offsets = set()
+
+        for topic, partitions in topics:
+            if topic in KAFKA_INTERNAL_TOPICS:
+                self.log.debug("Skipping internal topic %s", topic)
+                continue
+            if not self.config._monitor_all_broker_highwatermarks and topic not in topics_with_consumer_offset:
+                self.log.debug("Skipping non-relevant topic %s", topic)
+                continue
+
+            for partition in partitions:
+                if (
+                    self.config._monitor_all_broker_highwatermarks
+                    or (topic, partition) in topic_partition_with_consumer_offset
+                ):
+                    topic_partitions_for_highwater_offsets.add((topic, partition))
+                    self.log.debug('TOPIC: %s', topic)
+                    self.log.debug('PARTITION: %s', partition)
+                else:
+                    self.log.debug("Skipping non-relevant partition %s of topic %s", partition, topic)
+
+        return topic_partitions_for_highwater_offsets
+
+    def _get_highwater_offsets_per_consumer_group(self, consumer_offsets):
+        cluster_id = ""
+        highwater_offsets = {}
+        topics_with_consumer_offset, topic_partition_with_consumer_offset = (
+            self._get_topic_partitions_with_consumer_offset(consumer_offsets)
+        )
         topic_partition_checked = set()
 
         for consumer_group, _topic, _partition in consumer_offsets:
@@ -323,29 +387,11 @@ class KafkaCheck(AgentCheck):
                 self.log.debug('Highwater offset already collected for topic %s with partition %s', _topic, _partition)
                 continue
 
-            topic_partitions_for_highwater_offsets = set()
-
             self.client.open_consumer(consumer_group)
             cluster_id, topics = self.client.consumer_get_cluster_id_and_list_topics(consumer_group)
-
-            for topic, partitions in topics:
-                if topic in KAFKA_INTERNAL_TOPICS:
-                    self.log.debug("Skipping internal topic %s", topic)
-                    continue
-                if not self.config._monitor_all_broker_highwatermarks and topic not in topics_with_consumer_offset:
-                    self.log.debug("Skipping non-relevant topic %s", topic)
-                    continue
-
-                for partition in partitions:
-                    if (
-                        self.config._monitor_all_broker_highwatermarks
-                        or (topic, partition) in topic_partition_with_consumer_offset
-                    ):
-                        topic_partitions_for_highwater_offsets.add((topic, partition))
-                        self.log.debug('TOPIC: %s', topic)
-                        self.log.debug('PARTITION: %s', partition)
-                    else:
-                        self.log.debug("Skipping non-relevant partition %s of topic %s", partition, topic)
+            topic_partitions_for_highwater_offsets = self._get_topic_partitions_for_highwater_offsets(
+                topics, topics_with_consumer_offset, topic_partition_with_consumer_offset
+            )
 
             if len(topic_partitions_for_highwater_offsets) > 0:
                 self.log.debug(
@@ -364,7 +410,6 @@ class KafkaCheck(AgentCheck):
 
             self.client.close_consumer()
 
-        self.log.debug('Got %s highwater offsets', len(highwater_offsets))
         return highwater_offsets, cluster_id
 
     def send_event(self, title, text, tags, event_type, aggregation_key, severity='info'):
@@ -379,32 +424,3 @@ class KafkaCheck(AgentCheck):
             'aggregation_key': aggregation_key,
         }
         self.event(event_dict)
-
-
-def _get_interpolated_timestamp(timestamps, offset):
-    if offset in timestamps:
-        return timestamps[offset]
-    offsets = timestamps.keys()
-    try:
-        # Get the closest saved offsets to the consumer_offset
-        offset_before = max([o for o in offsets if o < offset])
-        offset_after = min([o for o in offsets if o > offset])
-    except ValueError:
-        if len(offsets) < 2:
-            return None
-        # We couldn't find offsets before and after the current consumer offset.
-        # This happens when you start a consumer to replay data in the past:
-        #   - We provision a consumer at t0 that will start consuming from t1 (t1 << t0).
-        #   - It starts building a history of offset/timestamp pairs from the moment it started to run, i.e. t0.
-        #   - So there is no offset/timestamp pair in the local history between t1 -> t0.
-        # We'll take the min and max offsets available and assume the timestamp is an affine function
-        # of the offset to compute an approximate broker timestamp corresponding to the current consumer offset.
-        offset_before = min(offsets)
-        offset_after = max(offsets)
-
-    # We assume that the timestamp is an affine function of the offset
-    timestamp_before = timestamps[offset_before]
-    timestamp_after = timestamps[offset_after]
-    slope = (timestamp_after - timestamp_before) / float(offset_after - offset_before)
-    timestamp = slope * (offset - offset_after) + timestamp_after
-    return timestamp
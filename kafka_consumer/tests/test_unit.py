@@ -8,8 +8,9 @@ import mock
 import pytest
 
 from datadog_checks.kafka_consumer import KafkaCheck
+from datadog_checks.kafka_consumer.broker_timestamps import BrokerTimestamps, TimestampHistory
 from datadog_checks.kafka_consumer.client import KafkaClient
-from datadog_checks.kafka_consumer.kafka_consumer import _get_interpolated_timestamp
+from datadog_checks.kafka_consumer.kafka_consumer import BROKER_TIMESTAMPS_CACHE_KEY, BROKER_TIMESTAMPS_DELTA_CACHE_KEY
 
 pytestmark = [pytest.mark.unit]
 
@@ -20,6 +21,18 @@ def fake_consumer_offsets_for_times(partitions):
     return [(t, p, 80) for t, p in partitions]
 
 
+TOPICS = [
+    # Used in unit tets
+    ('topic1', ["partition1"]),
+    ('topic2', ["partition2"]),
+    # Copied from integration tests
+    ('dc', [0, 1]),
+    ('unconsumed_topic', [0, 1]),
+    ('marvel', [0, 1]),
+    ('__consumer_offsets', [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]),
+]
+
+
 def seed_mock_client():
     """Set some common defaults for the mock client to kafka."""
     client = mock.create_autospec(KafkaClient)
@@ -27,21 +40,10 @@ def seed_mock_client():
     client.get_partitions_for_topic.return_value = ['partition1']
     client.list_consumer_group_offsets.return_value = [("consumer_group1", [("topic1", "partition1", 2)])]
     client.describe_consumer_groups.return_value = ('consumer_group', 'STABLE')
-    client.consumer_get_cluster_id_and_list_topics.return_value = (
-        "cluster_id",
-        # topics
-        [
-            # Used in unit tets
-            ('topic1', ["partition1"]),
-            ('topic2', ["partition2"]),
-            # Copied from integration tests
-            ('dc', [0, 1]),
-            ('unconsumed_topic', [0, 1]),
-            ('marvel', [0, 1]),
-            ('__consumer_offsets', [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]),
-        ],
-    )
+    client.consumer_get_cluster_id_and_list_topics.return_value = ("cluster_id", TOPICS)
     client.consumer_offsets_for_times = fake_consumer_offsets_for_times
+    client.get_cluster_id_and_list_topics.return_value = ("cluster_id", TOPICS)
+    client.list_highwater_offsets.side_effect = fake_consumer_offsets_for_times
     return client
 
 
@@ -365,6 +367,73 @@ def test_when_consumer_metric_count_hit_context_limit_then_no_more_consumer_metr
     assert expected_debug in caplog.text
 
 
+def test_highwater_offsets_fetched_once_for_all_consumer_groups(check, kafka_instance):
+    mock_client = seed_mock_client()
+    kafka_consumer_check = check(kafka_instance)
+    kafka_consumer_check.client = mock_client
+    consumer_offsets = {
+        ('consumer_group{}'.format(i), topic, partition): 2
+        for i in range(100)
+        for topic, partition in [('topic1', 'partition1'), ('dc', 0), ('dc', 1)]
+    }
+
+    highwater_offsets, cluster_id = kafka_consumer_check.get_highwater_offsets(consumer_offsets)
+
+    assert cluster_id == 'cluster_id'
+    assert highwater_offsets == {('topic1', 'partition1'): 80, ('dc', 0): 80, ('dc', 1): 80}
+    mock_client.get_cluster_id_and_list_topics.assert_called_once_with()
+    mock_client.list_highwater_offsets.assert_called_once_with({('topic1', 'partition1'), ('dc', 0), ('dc', 1)})
+    mock_client.open_consumer.assert_not_called()
+
+
+def test_highwater_offsets_of_all_topics(check, kafka_instance):
+    kafka_instance['monitor_all_broker_highwatermarks'] = True
+    mock_client = seed_mock_client()
+    kafka_consumer_check = check(kafka_instance)
+    kafka_consumer_check.client = mock_client
+
+    highwater_offsets, _ = kafka_consumer_check.get_highwater_offsets({('consumer_group1', 'topic1', 'partition1'): 2})
+
+    assert sorted(highwater_offsets) == [
+        ('dc', 0),
+        ('dc', 1),
+        ('marvel', 0),
+        ('marvel', 1),
+        ('topic1', 'partition1'),
+        ('topic2', 'partition2'),
+        ('unconsumed_topic', 0),
+        ('unconsumed_topic', 1),
+    ]
+
+
+def test_highwater_offsets_without_consumer_offsets(check, kafka_instance):
+    mock_client = seed_mock_client()
+    kafka_consumer_check = check(kafka_instance)
+    kafka_consumer_check.client = mock_client
+
+    assert kafka_consumer_check.get_highwater_offsets({}) == ({}, "")
+    mock_client.get_cluster_id_and_list_topics.assert_not_called()
+
+
+def test_highwater_offsets_per_consumer_group(check, kafka_instance):
+    kafka_instance['highwater_offsets_per_consumer_group'] = True
+    mock_client = seed_mock_client()
+    kafka_consumer_check = check(kafka_instance)
+    kafka_consumer_check.client = mock_client
+    consumer_offsets = {
+        ('consumer_group1', 'topic1', 'partition1'): 2,
+        ('consumer_group2', 'topic2', 'partition2'): 2,
+    }
+
+    highwater_offsets, cluster_id = kafka_consumer_check.get_highwater_offsets(consumer_offsets)
+
+    assert cluster_id == 'cluster_id'
+    assert highwater_offsets == {('topic1', 'partition1'): 80, ('topic2', 'partition2'): 80}
+    # Both partitions are queried with the consumer of the first group
+    mock_client.open_consumer.assert_called_once_with('consumer_group1')
+    mock_client.list_highwater_offsets.assert_not_called()
+
+
 def test_when_empty_string_consumer_group_then_skip(kafka_instance):
     kafka_instance["monitor_unlisted_consumer_groups"] = True
     with mock.patch(
@@ -375,8 +444,89 @@ def test_when_empty_string_consumer_group_then_skip(kafka_instance):
         assert kafka_consumer_check._get_consumer_groups() == ["my_consumer"]
 
 
+def history(timestamps, capacity=10):
+    history = TimestampHistory(capacity)
+    for offset, timestamp in timestamps.items():
+        history.add(offset, timestamp)
+    return history
+
+
 def test_get_interpolated_timestamp():
-    assert _get_interpolated_timestamp({0: 100, 10: 200}, 5) == 150
-    assert _get_interpolated_timestamp({10: 100, 20: 200}, 5) == 50
-    assert _get_interpolated_timestamp({0: 100, 10: 200}, 15) == 250
-    assert _get_interpolated_timestamp({10: 200}, 15) is None
+    assert history({0: 100, 10: 200}).interpolate(5) == 150
+    assert history({10: 100, 20: 200}).interpolate(5) == 50
+    assert history({0: 100, 10: 200}).interpolate(15) == 250
+    assert history({10: 200}).interpolate(15) is None
+
+
+def test_timestamp_history_replaces_oldest_offsets():
+    timestamps = history({offset: offset * 10 for offset in range(0, 100, 10)}, capacity=4)
+
+    assert list(timestamps.items()) == [(60, 600), (70, 700), (80, 800), (90, 900)]
+    assert timestamps.get(60) == 600
+    assert timestamps.get(90) == 900
+    assert timestamps.get(50) is None
+    assert timestamps.get(65) is None
+    assert timestamps.interpolate(65) == 650
+    assert timestamps.interpolate(85) == 850
+    assert timestamps.interpolate(100) == 1000
+    assert timestamps.interpolate(40) == 400
+
+
+def test_timestamp_history_offsets_going_back():
+    timestamps = history({10: 100, 20: 200, 30: 300})
+
+    timestamps.add(30, 350)
+    assert list(timestamps.items()) == [(10, 100), (20, 200), (30, 350)]
+
+    timestamps.add(15, 400)
+    assert list(timestamps.items()) == [(10, 100), (15, 400)]
+
+
+def test_broker_timestamps_persistence():
+    broker_timestamps = BrokerTimestamps(3)
+    broker_timestamps.add('topic', 0, 10, 100.0)
+    broker_timestamps.add('topic', 1, 20, 200.0)
+    assert broker_timestamps.should_snapshot()
+    snapshot = broker_timestamps.snapshot()
+    assert not broker_timestamps.should_snapshot()
+
+    broker_timestamps.add('topic', 0, 30, 300.0)
+    broker_timestamps.add('topic', 0, 40, 400.0)
+    broker_timestamps.add('topic', 0, 50, 500.0)
+    delta = broker_timestamps.delta()
+
+    loaded = BrokerTimestamps(3)
+    loaded.load(snapshot, delta)
+    assert list(loaded.get('topic', 0).items()) == [(30, 300.0), (40, 400.0), (50, 500.0)]
+    assert list(loaded.get('topic', 1).items()) == [(20, 200.0)]
+    assert loaded.get('topic', 2) is None
+
+    # The offsets of the delta are kept until the next snapshot
+    loaded.add('topic', 1, 60, 600.0)
+    reloaded = BrokerTimestamps(3)
+    reloaded.load(snapshot, loaded.delta())
+    assert list(reloaded.get('topic', 0).items()) == [(30, 300.0), (40, 400.0), (50, 500.0)]
+    assert list(reloaded.get('topic', 1).items()) == [(20, 200.0), (60, 600.0)]
+
+
+def test_broker_timestamps_load_json():
+    broker_timestamps = BrokerTimestamps(10)
+    broker_timestamps.load_json('{"topic_0": {"20": 200, "10": 100}}')
+
+    assert list(broker_timestamps.get('topic', 0).items()) == [(10, 100), (20, 200)]
+    # The previous format is replaced by a snapshot on the next save
+    assert broker_timestamps.should_snapshot()
+
+
+def test_broker_timestamps_delta_cleared_before_snapshot(check, kafka_instance):
+    kafka_consumer_check = check(kafka_instance)
+    kafka_consumer_check.write_persistent_cache = mock.Mock()
+    kafka_consumer_check._add_broker_timestamps({('topic', 0): 10})
+
+    kafka_consumer_check._save_broker_timestamps()
+
+    assert [c.args[0] for c in kafka_consumer_check.write_persistent_cache.mock_calls] == [
+        BROKER_TIMESTAMPS_DELTA_CACHE_KEY,
+        BROKER_TIMESTAMPS_CACHE_KEY,
+    ]
+    assert kafka_consumer_check.write_persistent_cache.mock_calls[0].args[1] == ''
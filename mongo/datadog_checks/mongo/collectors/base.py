@@ -4,11 +4,36 @@
 
 import re
 import time
+from collections import namedtuple
 from functools import wraps
 
 from datadog_checks.base import AgentCheck
 from datadog_checks.mongo.metrics import CASE_SENSITIVE_METRIC_NAME_SUFFIXES
 
+CASE_SENSITIVE_METRIC_NAME_PATTERNS = [
+    (re.compile(pattern), repl) for pattern, repl in CASE_SENSITIVE_METRIC_NAME_SUFFIXES.items()
+]
+
+# This is because https://datadoghq.atlassian.net/browse/AGENT-9001
+# Delete this when the metrics are definitely deprecated
+DEPRECATED_RATE_METRICS = frozenset(
+    ['opLatencies.reads.latency', 'opLatencies.writes.latency', 'opLatencies.commands.latency']
+)
+
+# Keep old incorrect metric names, 'top' and 'index', 'collectionscans' metrics are affected
+LEGACY_GAUGE_METRIC_SUFFIXES = ("countps", "accesses.opsps", "collectionscans.totalps", "collectionscans.nontailableps")
+
+# How a metric of `metrics_to_collect` is found in a payload and submitted:
+# * `metric_name`: the key of the metric in `metrics_to_collect`
+# * `keys`: the keys leading to its value in the payload
+# * `submit_method`: the AgentCheck method submitting it
+# * `name`: the normalized name it's submitted as
+# * `deprecated_rate_name`: the normalized name it's also submitted as a rate, if any
+# * `legacy_gauge_name`: the normalized name it's also submitted as a gauge, if any
+PayloadMetric = namedtuple(
+    'PayloadMetric', ['metric_name', 'keys', 'submit_method', 'name', 'deprecated_rate_name', 'legacy_gauge_name']
+)
+
 
 class MongoCollector(object):
     """The base collector object, can be considered abstract.
@@ -57,8 +82,8 @@ class MongoCollector(object):
         metric_suffix = "ps" if submit_method == AgentCheck.rate else ""
 
         # Replace case-sensitive metric name characters
-        for pattern, repl in CASE_SENSITIVE_METRIC_NAME_SUFFIXES.items():
-            metric_name = re.compile(pattern).sub(repl, metric_name)
+        for pattern, repl in CASE_SENSITIVE_METRIC_NAME_PATTERNS:
+            metric_name = pattern.sub(repl, metric_name)
 
         # Normalize, and wrap
         return u"{metric_prefix}{normalized_metric_name}{metric_suffix}".format(
@@ -91,57 +116,70 @@ class MongoCollector(object):
         if metrics_to_collect is None:
             metrics_to_collect = self.metrics_to_collect
         tags = self.base_tags + (additional_tags or [])
-        # Go through the metrics and save the values
-        for metric_name in metrics_to_collect:
+        for metric in self._get_payload_plan(metrics_to_collect, prefix):
             # each metric is of the form: x.y.z with z optional
             # and can be found at status[x][y][z]
             value = payload
 
             try:
-                for c in metric_name.split("."):
-                    value = value[c]
+                for key in metric.keys:
+                    value = value[key]
             except KeyError:
                 continue
 
             # value is now status[x][y][z]
             if not isinstance(value, (int, float)):
                 raise TypeError(
-                    u"{0} value is a {1}, it should be an int, or a float instead.".format(metric_name, type(value))
+                    u"{0} value is a {1}, it should be an int, or a float instead.".format(
+                        metric.metric_name, type(value)
+                    )
                 )
 
             # Submit the metric
-            submit_method = (
-                metrics_to_collect[metric_name][0]
-                if isinstance(metrics_to_collect[metric_name], tuple)
-                else metrics_to_collect[metric_name]
-            )
-            metric_name_alias = (
-                metrics_to_collect[metric_name][1]
-                if isinstance(metrics_to_collect[metric_name], tuple)
-                else metric_name
+            if metric.deprecated_rate_name is not None:
+                AgentCheck.rate(self.check, metric.deprecated_rate_name, value, tags=tags)
+            metric.submit_method(self.check, metric.name, value, tags=tags)
+            if metric.legacy_gauge_name is not None:
+                self.gauge(metric.legacy_gauge_name, value, tags=tags)
+
+    def _get_payload_plan(self, metrics_to_collect, prefix):
+        """Return the PayloadMetric list of `metrics_to_collect`, compiled once per check and prefix since the
+        metrics to collect don't change between payloads and runs.
+        """
+        key = (id(metrics_to_collect), prefix)
+        cached = self.check.payload_plans.get(key)
+        # The identity check guards against the id of a garbage collected mapping being reused
+        if cached is not None and cached[0] is metrics_to_collect:
+            return cached[1]
+
+        plan = self._compile_payload_plan(metrics_to_collect, prefix)
+        self.check.payload_plans[key] = (metrics_to_collect, plan)
+        return plan
+
+    def _compile_payload_plan(self, metrics_to_collect, prefix):
+        plan = []
+        for metric_name, metadata in metrics_to_collect.items():
+            submit_method, metric_name_alias = metadata if isinstance(metadata, tuple) else (metadata, metric_name)
+
+            deprecated_rate_name = None
+            if metric_name_alias in DEPRECATED_RATE_METRICS:
+                deprecated_rate_name = self._normalize(metric_name_alias, AgentCheck.rate, prefix)
+
+            name = self._normalize(metric_name_alias, submit_method, prefix)
+            legacy_gauge_name = name[:-2] if name.endswith(LEGACY_GAUGE_METRIC_SUFFIXES) else None
+
+            plan.append(
+                PayloadMetric(
+                    metric_name,
+                    tuple(metric_name.split(".")),
+                    submit_method,
+                    name,
+                    deprecated_rate_name,
+                    legacy_gauge_name,
+                )
             )
 
-            # This is because https://datadoghq.atlassian.net/browse/AGENT-9001
-            # Delete this code when the metrics are definitely deprecated
-            if metric_name_alias in (
-                'opLatencies.reads.latency',
-                'opLatencies.writes.latency',
-                'opLatencies.commands.latency',
-            ):
-                deprecated_metric_name_alias = self._normalize(metric_name_alias, AgentCheck.rate, prefix)
-                AgentCheck.rate(self.check, deprecated_metric_name_alias, value, tags=tags)
-
-            metric_name_alias = self._normalize(metric_name_alias, submit_method, prefix)
-            submit_method(self.check, metric_name_alias, value, tags=tags)
-            if (
-                metric_name_alias.endswith("countps")
-                or metric_name_alias.endswith("accesses.opsps")
-                or metric_name_alias.endswith("collectionscans.totalps")
-                or metric_name_alias.endswith("collectionscans.nontailableps")
-            ):
-                # Keep old incorrect metric name
-                # 'top' and 'index', 'collectionscans' metrics are affected
-                self.gauge(metric_name_alias[:-2], value, tags=tags)
+        return plan
 
     def get_last_collection_timestamp(self):
         return self.check.metrics_last_collection_timestamp.get(self._collector_key)
@@ -79,6 +79,9 @@ class MongoConfig(object):
         self.db_names = instance.get('dbnames', None)
 
         self.timeout = float(instance.get('timeout', DEFAULT_TIMEOUT)) * 1000
+        self.max_concurrent_collectors = int(instance.get('max_concurrent_collectors', 1))
+        if self.max_concurrent_collectors < 1:
+            raise ConfigurationError('`max_concurrent_collectors` must be greater than or equal to 1')
         self.additional_metrics = instance.get('additional_metrics', [])
 
         # Authenticate
@@ -40,6 +40,10 @@ def instance_empty_default_hostname():
     return False
 
 
+def instance_max_concurrent_collectors():
+    return 1
+
+
 def instance_min_collection_interval():
     return 15
 
@@ -4,7 +4,10 @@
 from __future__ import division
 
 import json
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 
 from cachetools import TTLCache
@@ -54,6 +57,11 @@ except ImportError:
 long = int
 
 
+def _collector_telemetry_name(collector):
+    # e.g. ServerStatusCollector -> server_status_collector_ms
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', type(collector).__name__).lower() + '_ms'
+
+
 class MongoDb(AgentCheck):
     """
     MongoDB agent check.
@@ -94,6 +102,8 @@ class MongoDb(AgentCheck):
         self.collectors = []
         self.last_states_by_server = {}
         self.metrics_last_collection_timestamp = {}
+        # The metrics to collect of the collectors compiled by `MongoCollector._get_payload_plan`
+        self.payload_plans = {}
 
         self.deployment_type = None
         self._mongo_version = None
@@ -118,6 +128,15 @@ class MongoDb(AgentCheck):
 
         self._api = None
 
+        # Collectors run on worker threads when several can run concurrently, while their metrics and events are
+        # recorded in `_collector_thread.submissions` and submitted by the check thread.
+        self._collector_thread = threading.local()
+        self._collectors_executor = None
+        if self._config.max_concurrent_collectors > 1:
+            self._collectors_executor = ThreadPoolExecutor(
+                max_workers=self._config.max_concurrent_collectors, thread_name_prefix='mongo-collector'
+            )
+
     @property
     def api_client(self):
         if self._api is None:
@@ -321,18 +340,71 @@ class MongoDb(AgentCheck):
 
         dbnames = self._get_db_names(tags)
         self.refresh_collectors(deployment, dbnames, tags)
-        for collector in self.collectors:
-            try:
-                collector.collect(self.api_client)
-            except CRITICAL_FAILURE as e:
-                self.log.info(
-                    "Unable to collect logs from collector %s. Some metrics will be missing.", collector, exc_info=True
-                )
-                raise e  # Critical failures must bubble up to trigger a CRITICAL service check.
-            except Exception:
-                self.log.info(
-                    "Unable to collect logs from collector %s. Some metrics will be missing.", collector, exc_info=True
-                )
+        api = self.api_client
+        if self._collectors_executor is None:
+            futures = None
+            results = (self._run_collector(collector, api) for collector in self.collectors)
+        else:
+            futures = [
+                self._collectors_executor.submit(self._run_collector, collector, api, concurrent=True)
+                for collector in self.collectors
+            ]
+            results = (future.result() for future in futures)
+
+        # Whether they ran concurrently or not, the results of the collectors are handled in order
+        for collector, (submissions, elapsed, error) in zip(self.collectors, results):
+            for submit, args, kwargs in submissions:
+                submit(*args, **kwargs)
+
+            self.log.debug("Collector %s ran in %.3f seconds", collector, elapsed)
+            datadog_agent.emit_agent_telemetry(
+                "mongo", _collector_telemetry_name(collector), elapsed * 1000, "histogram"
+            )
+
+            if error is None:
+                continue
+            self.log.info(
+                "Unable to collect logs from collector %s. Some metrics will be missing.",
+                collector,
+                exc_info=(type(error), error, error.__traceback__),
+            )
+            if isinstance(error, CRITICAL_FAILURE):
+                if futures is not None:
+                    for future in futures:
+                        future.cancel()
+                raise error  # Critical failures must bubble up to trigger a CRITICAL service check.
+
+    def _run_collector(self, collector, api, concurrent=False):
+        """
+        Run a collector and return what it submitted if it ran concurrently, the time it took and its error if any.
+        """
+        submissions = []
+        if concurrent:
+            self._collector_thread.submissions = submissions
+
+        start = time.monotonic()
+        error = None
+        try:
+            collector.collect(api)
+        except Exception as e:
+            error = e
+        finally:
+            self._collector_thread.submissions = None
+
+        return submissions, time.monotonic() - start, error
+
+    def _submit_metric(self, *args, **kwargs):
+        self._submit_from_check_thread(super(MongoDb, self)._submit_metric, args, kwargs)
+
+    def event(self, event):
+        self._submit_from_check_thread(super(MongoDb, self).event, (event,), {})
+
+    def _submit_from_check_thread(self, submit, args, kwargs):
+        submissions = getattr(self._collector_thread, 'submissions', None)
+        if submissions is None:
+            submit(*args, **kwargs)
+        else:
+            submissions.append((submit, args, kwargs))
 
     def _get_db_names(self, tags):
         dbnames, database_count = self._database_autodiscovery.get_databases_and_count()
@@ -404,6 +476,8 @@ class MongoDb(AgentCheck):
         if self._config.dbm_enabled:
             self._operation_samples.cancel()
             self._slow_operations.cancel()
+        if self._collectors_executor is not None:
+            self._collectors_executor.shutdown(wait=False, cancel_futures=True)
 
     def _get_rs_deployment_from_status_payload(self, repl_set_payload, is_master_payload, cluster_role, hosting_type):
         replset_name = repl_set_payload["set"]
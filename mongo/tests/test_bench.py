@@ -0,0 +1,44 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import json
+import os
+
+from bson import json_util
+
+from datadog_checks.mongo.collectors import MongoCollector
+from datadog_checks.mongo.metrics import COLLECTION_METRICS
+
+from . import common
+
+
+def load_fixture(name):
+    with open(os.path.join(common.HERE, 'fixtures', name), 'r') as f:
+        return json.load(f, object_hook=json_util.object_hook)
+
+
+def test_submit_server_status(benchmark, aggregator, check):
+    collector = MongoCollector(check(common.INSTANCE_BASIC), ['foo:1'])
+    payload = load_fixture('serverStatus')
+    payload.pop('localTime', None)
+
+    # Reset the aggregator between rounds to only measure the submission of the payload
+    benchmark.pedantic(collector._submit_payload, args=(payload,), setup=aggregator.reset, rounds=1000)
+
+    aggregator.assert_metric('mongodb.connections.current', tags=['foo:1'])
+
+
+def test_submit_coll_stats(benchmark, aggregator, check):
+    collector = MongoCollector(check(common.INSTANCE_BASIC), ['foo:1'])
+    (coll_stats,) = load_fixture('$collStats-foo')
+    payload = {'collection': {**coll_stats['storageStats'], **coll_stats['latencyStats']}}
+    additional_tags = ['db:test', 'collection:foo']
+
+    benchmark.pedantic(
+        collector._submit_payload,
+        args=(payload, additional_tags, COLLECTION_METRICS),
+        setup=aggregator.reset,
+        rounds=1000,
+    )
+
+    aggregator.assert_metric('mongodb.collection.size', tags=['foo:1'] + additional_tags)
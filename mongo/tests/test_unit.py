@@ -5,6 +5,7 @@ import copy
 import json
 import logging
 import os
+import threading
 from contextlib import nullcontext  # type: ignore
 from urllib.parse import quote_plus
 
@@ -13,7 +14,7 @@ import pytest
 from bson import json_util
 from pymongo.errors import ConnectionFailure, OperationFailure
 
-from datadog_checks.base import ConfigurationError
+from datadog_checks.base import AgentCheck, ConfigurationError
 from datadog_checks.base.utils.db.sql import compute_exec_plan_signature
 from datadog_checks.mongo.api import CRITICAL_FAILURE, MongoApi
 from datadog_checks.mongo.collectors import MongoCollector
@@ -497,6 +498,48 @@ def test_collector_submit_payload(check, aggregator):
     aggregator.assert_all_metrics_covered()
 
 
+def test_collector_submit_payload_compatibility_metrics(check, aggregator):
+    check = check(common.INSTANCE_BASIC)
+    collector = MongoCollector(check, ['foo:1'])
+
+    metrics_to_collect = {
+        'opLatencies.reads.latency': GAUGE,
+        'indexes.accesses.ops': RATE,
+        'foo.count': (RATE, 'foo.renamed.count'),
+    }
+    payload = {'opLatencies': {'reads': {'latency': 1}}, 'indexes': {'accesses': {'ops': 2}}, 'foo': {'count': 3}}
+    collector._submit_payload(payload, metrics_to_collect=metrics_to_collect, prefix='collection')
+    tags = ['foo:1']
+    aggregator.assert_metric('mongodb.collection.oplatencies.reads.latency', 1, tags, metric_type=aggregator.GAUGE)
+    aggregator.assert_metric('mongodb.collection.oplatencies.reads.latencyps', 1, tags, metric_type=aggregator.RATE)
+    aggregator.assert_metric('mongodb.collection.indexes.accesses.opsps', 2, tags, metric_type=aggregator.RATE)
+    aggregator.assert_metric('mongodb.collection.indexes.accesses.ops', 2, tags, metric_type=aggregator.GAUGE)
+    aggregator.assert_metric('mongodb.collection.foo.renamed.countps', 3, tags, metric_type=aggregator.RATE)
+    aggregator.assert_metric('mongodb.collection.foo.renamed.count', 3, tags, metric_type=aggregator.GAUGE)
+    aggregator.assert_all_metrics_covered()
+
+
+def test_collector_payload_plan_compiled_once(check, aggregator):
+    check = check(common.INSTANCE_BASIC)
+    metrics_to_collect = {'foo.bar': GAUGE, 'foo.R': RATE}
+
+    with mock.patch.object(
+        MongoCollector, '_normalize', autospec=True, side_effect=MongoCollector._normalize
+    ) as normalize:
+        for tags in (['foo:1'], ['foo:2']):
+            # Collectors are created again when the deployment or the databases change
+            collector = MongoCollector(check, tags)
+            for _ in range(3):
+                collector._submit_payload({'foo': {'bar': 1, 'R': 2}}, metrics_to_collect=metrics_to_collect)
+                collector._submit_payload({'foo': {'bar': 1}}, metrics_to_collect=metrics_to_collect, prefix='usage')
+
+    # Once per metric and prefix
+    assert normalize.call_count == 4
+    aggregator.assert_metric('mongodb.foo.bar', 1, ['foo:2'], count=3)
+    aggregator.assert_metric('mongodb.foo.sharedps', 2, ['foo:1'], count=3)
+    aggregator.assert_metric('mongodb.usage.foo.bar', 1, ['foo:1'], count=3)
+
+
 def test_api_alibaba_mongos(check, aggregator):
     payload = {'isMaster': {'msg': 'isdbgrid'}}
     mocked_client = mock.MagicMock()
@@ -669,6 +712,63 @@ def test_parse_mongo_version_with_suffix(check, instance, dd_run_check, datadog_
     datadog_agent.assert_metadata('test:123', {'version.scheme': 'semver', 'version.major': '3', 'version.minor': '6'})
 
 
+def _submitted_metrics(aggregator):
+    return sorted(
+        (m.name, m.type, m.value, tuple(sorted(m.tags)))
+        for name in aggregator.metric_names
+        for m in aggregator.metrics(name)
+    )
+
+
+def test_concurrent_collectors_submit_same_metrics(aggregator, check, instance, dd_run_check, datadog_agent):
+    instance['collections'] = ['bar', 'foo']
+    with mock_pymongo("standalone"):
+        dd_run_check(check(instance))
+    serial_metrics = _submitted_metrics(aggregator)
+    aggregator.reset()
+
+    instance['max_concurrent_collectors'] = 4
+    concurrent_check = check(instance)
+    with mock_pymongo("standalone"):
+        dd_run_check(concurrent_check)
+    concurrent_check.cancel()
+
+    assert serial_metrics
+    assert _submitted_metrics(aggregator) == serial_metrics
+    assert datadog_agent._sent_telemetry[('mongo', 'server_status_collector_ms', 'histogram')]
+
+
+def test_concurrent_collectors_submit_from_check_thread(check, instance, dd_run_check):
+    instance['max_concurrent_collectors'] = 4
+    check = check(instance)
+    submitting_threads = set()
+    submit_metric = AgentCheck._submit_metric
+
+    def record_thread(*args, **kwargs):
+        submitting_threads.add(threading.current_thread())
+        return submit_metric(*args, **kwargs)
+
+    with mock_pymongo("standalone"), mock.patch.object(AgentCheck, '_submit_metric', record_thread):
+        dd_run_check(check)
+    check.cancel()
+
+    assert submitting_threads == {threading.current_thread()}
+
+
+@pytest.mark.parametrize("error_cls", CRITICAL_FAILURE)
+def test_concurrent_collectors_critical_failure(error_cls, aggregator, check, instance, dd_run_check):
+    instance['max_concurrent_collectors'] = 4
+    check = check(instance)
+    with mock_pymongo('standalone'), mock.patch(
+        'datadog_checks.mongo.collectors.server_status.ServerStatusCollector.collect', side_effect=error_cls('Testing')
+    ):
+        with pytest.raises(Exception, match=f"{error_cls.__name__}: Testing"):
+            dd_run_check(check)
+    check.cancel()
+
+    aggregator.assert_service_check('mongodb.can_connect', MongoDb.CRITICAL)
+
+
 @mock.patch(
     'pymongo.database.Database.command',
     side_effect=[
@@ -21,6 +21,13 @@ def test_empty_hosts():
         MongoConfig(instance, mock.Mock(), {})
 
 
+@pytest.mark.parametrize('max_concurrent_collectors', [0, -1])
+def test_invalid_max_concurrent_collectors(instance, max_concurrent_collectors):
+    instance['max_concurrent_collectors'] = max_concurrent_collectors
+    with pytest.raises(ConfigurationError, match='`max_concurrent_collectors` must be greater than or equal to 1'):
+        MongoConfig(instance, mock.Mock(), {})
+
+
 def test_default_tls_params():
     instance = {'hosts': ['test.mongodb.com']}
     config = MongoConfig(instance, mock.Mock(), {})
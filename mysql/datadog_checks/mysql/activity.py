@@ -13,12 +13,12 @@ import pymysql
 
 from datadog_checks.base import is_affirmative, to_native_string
 from datadog_checks.base.utils.db.sql import compute_sql_signature
-from datadog_checks.base.utils.db.utils import DBMAsyncJob, obfuscate_sql_with_metadata
+from datadog_checks.base.utils.db.utils import DBMAsyncJob
 from datadog_checks.base.utils.serialization import json
 from datadog_checks.base.utils.tracking import tracked_method
 from datadog_checks.mysql.cursor import CommenterDictCursor
 
-from .util import DatabaseConfigurationError, connect_with_autocommit, get_truncation_state, warning_with_tags
+from .util import DatabaseConfigurationError, get_truncation_state, warning_with_tags
 
 try:
     import datadog_agent
@@ -102,7 +102,7 @@ class MySQLActivity(DBMAsyncJob):
     DEFAULT_COLLECTION_INTERVAL = 10
     MAX_PAYLOAD_BYTES = 19e6
 
-    def __init__(self, check, config, connection_args):
+    def __init__(self, check, config, connections):
         self.collection_interval = float(
             config.activity_config.get("collection_interval", MySQLActivity.DEFAULT_COLLECTION_INTERVAL)
         )
@@ -123,7 +123,7 @@ class MySQLActivity(DBMAsyncJob):
         self._config = config
         self._log = check.log
 
-        self._connection_args = connection_args
+        self._connections = connections
         self._db = None
         self._db_version = None
         self._obfuscator_options = to_native_string(json.dumps(self._config.obfuscator_options))
@@ -216,8 +216,10 @@ class MySQLActivity(DBMAsyncJob):
         try:
             self._finalize_row(
                 row,
-                obfuscate_sql_with_metadata(row["sql_text"], self._obfuscator_options),
-                obfuscate_sql_with_metadata(row.get("digest_text"), self._obfuscator_options),
+                self._check.obfuscation_cache.obfuscate_sql_with_metadata(row["sql_text"], self._obfuscator_options),
+                self._check.obfuscation_cache.obfuscate_sql_with_metadata(
+                    row.get("digest_text"), self._obfuscator_options
+                ),
             )
         except Exception as e:
             if self._config.log_unobfuscated_queries:
@@ -284,17 +286,13 @@ class MySQLActivity(DBMAsyncJob):
     def _get_db_connection(self):
         """
         pymysql connections are not thread safe, so we can't reuse the same connection from the main check.
+        The job leases its own connection, which is kept open across runs.
         """
-        if not self._db:
-            self._db = connect_with_autocommit(**self._connection_args)
+        self._db = self._connections.get_connection(self._job_name)
         return self._db
 
     def _close_db_conn(self):
         # type: () -> None
         if self._db:
-            try:
-                self._db.close()
-            except Exception as e:
-                self._log.debug("Failed to close db connection | err=[%s]", e)
-            finally:
-                self._db = None
+            self._connections.close(self._job_name)
+            self._db = None
@@ -0,0 +1,118 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import threading
+import time
+from typing import Callable, Dict, Optional  # noqa: F401
+
+import pymysql  # noqa: F401
+
+from .util import connect_with_autocommit
+
+# Connections used within this many seconds are assumed to be alive without pinging the server
+DEFAULT_PING_INTERVAL = 5
+
+
+class ConnectionInfo(object):
+    def __init__(self, connection, last_used):
+        # type: (pymysql.connections.Connection, float) -> None
+        self.connection = connection
+        self.last_used = last_used
+
+
+class MySQLConnectionManager(object):
+    """
+    Keeps the connections of a check instance open across check runs.
+
+    pymysql connections are not thread safe, so the check and each DBM job lease their own connection, identified by
+    a name. A leased connection is reused for as long as it is alive: connections idle for more than `ping_interval`
+    seconds are pinged before being returned, and the ones which were closed or don't answer are replaced.
+    """
+
+    class Stats(object):
+        def __init__(self):
+            self.connection_opened = 0
+            self.connection_closed = 0
+            self.connection_closed_failed = 0
+
+        def __repr__(self):
+            return str(self.__dict__)
+
+    def __init__(self, connection_args, log, ping_interval=DEFAULT_PING_INTERVAL):
+        self._connection_args = connection_args
+        self._log = log
+        self._ping_interval = ping_interval
+        self._stats = self.Stats()
+        self._mu = threading.Lock()
+        self._conns = {}  # type: Dict[str, ConnectionInfo]
+
+    def get_connection(self, name, startup_fn=None):
+        # type: (str, Optional[Callable[[pymysql.connections.Connection], None]]) -> pymysql.connections.Connection
+        """
+        Return the connection leased to `name`, opening a new one if there is none or it is no longer alive.
+        Pass a function to `startup_fn` if there is an action needed when a new connection is opened.
+        """
+        with self._mu:
+            info = self._conns.get(name)
+
+        now = time.monotonic()
+        if info is not None:
+            if self._is_alive(info, now):
+                info.last_used = now
+                return info.connection
+            self._log.debug("Connection %s is no longer alive, reconnecting", name)
+            self.close(name)
+
+        db = connect_with_autocommit(**self._connection_args)
+        self._stats.connection_opened += 1
+        if startup_fn:
+            try:
+                startup_fn(db)
+            except Exception:
+                self._close(name, db)
+                raise
+
+        with self._mu:
+            self._conns[name] = ConnectionInfo(db, now)
+        return db
+
+    def close(self, name):
+        # type: (str) -> None
+        """
+        Close the connection leased to `name`, if any.
+        """
+        with self._mu:
+            info = self._conns.pop(name, None)
+        if info is not None:
+            self._close(name, info.connection)
+
+    def close_all(self):
+        # type: () -> None
+        with self._mu:
+            conns, self._conns = self._conns, {}
+        for name, info in conns.items():
+            self._close(name, info.connection)
+
+    def _is_alive(self, info, now):
+        # type: (ConnectionInfo, float) -> bool
+        db = info.connection
+        # pymysql drops the socket of connections which failed
+        if not db.open:
+            return False
+        if now - info.last_used < self._ping_interval:
+            return True
+        try:
+            db.ping(reconnect=False)
+        except Exception:
+            return False
+        return True
+
+    def _close(self, name, db):
+        # type: (str, pymysql.connections.Connection) -> None
+        try:
+            if db.open:
+                db.close()
+            self._stats.connection_closed += 1
+        except Exception:
+            self._stats.connection_closed_failed += 1
+            self._log.debug("Failed to close connection %s", name, exc_info=1)
@@ -10,8 +10,6 @@ import pymysql
 from datadog_checks.mysql.cursor import CommenterDictCursor
 from datadog_checks.mysql.databases_data import DEFAULT_DATABASES_DATA_COLLECTION_INTERVAL, DatabasesData
 
-from .util import connect_with_autocommit
-
 try:
     import datadog_agent
 except ImportError:
@@ -47,7 +45,7 @@ class MySQLMetadata(DBMAsyncJob):
     2. collection of databases(schemas) data
     """
 
-    def __init__(self, check, config, connection_args):
+    def __init__(self, check, config, connections):
         self._databases_data_enabled = is_affirmative(config.schemas_config.get("enabled", False))
         self._databases_data_collection_interval = config.schemas_config.get(
             "collection_interval", DEFAULT_DATABASES_DATA_COLLECTION_INTERVAL
@@ -81,7 +79,7 @@ class MySQLMetadata(DBMAsyncJob):
         self._check = check
         self._config = config
         self._version_processed = False
-        self._connection_args = connection_args
+        self._connections = connections
         self._db = None
         self._check = check
         self._databases_data = DatabasesData(self, check, config)
@@ -90,22 +88,17 @@ class MySQLMetadata(DBMAsyncJob):
 
     def get_db_connection(self):
         """
-        lazy reconnect db
-        pymysql connections are not thread safe so we can't reuse the same connection from the main check
-        :return:
+        pymysql connections are not thread safe, so we can't reuse the same connection from the main check.
+        The job leases its own connection, which is kept open across runs.
         """
-        if not self._db:
-            self._db = connect_with_autocommit(**self._connection_args)
+        self._db = self._connections.get_connection(self._job_name)
         return self._db
 
     def _close_db_conn(self):
+        # type: () -> None
         if self._db:
-            try:
-                self._db.close()
-            except Exception:
-                self._log.debug("Failed to close db connection", exc_info=1)
-            finally:
-                self._db = None
+            self._connections.close(self._job_name)
+            self._db = None
 
     def _cursor_run(self, cursor, query, params=None):
         """
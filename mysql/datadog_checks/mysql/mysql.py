@@ -17,6 +17,7 @@ from cachetools import TTLCache
 from datadog_checks.base import AgentCheck, is_affirmative
 from datadog_checks.base.utils.db import QueryExecutor, QueryManager
 from datadog_checks.base.utils.db.utils import (
+    ObfuscationCache,
     default_json_event_encoding,
     tracked_query,
 )
@@ -30,6 +31,7 @@ from .__about__ import __version__
 from .activity import MySQLActivity
 from .collection_utils import collect_all_scalars, collect_scalar, collect_string, collect_type
 from .config import MySQLConfig
+from .connections import MySQLConnectionManager
 from .const import (
     AWS_RDS_HOSTNAME_SUFFIX,
     AZURE_DEPLOYMENT_TYPE_TO_RESOURCE_TYPE,
@@ -102,11 +104,15 @@ class MySql(AgentCheck):
     REPLICA_SERVICE_CHECK_NAME = 'mysql.replication.replica_running'
     GROUP_REPLICATION_SERVICE_CHECK_NAME = 'mysql.replication.group.status'
     DEFAULT_MAX_CUSTOM_QUERIES = 20
+    # Name of the connection leased by the check itself, see `MySQLConnectionManager`
+    CHECK_CONNECTION = 'check'
 
     def __init__(self, name, init_config, instances):
         super(MySql, self).__init__(name, init_config, instances)
         self.qcache_stats = {}
         self.version = None
+        # The DBM jobs keep reading the last known version while the check refreshes it
+        self._version_refresh_needed = True
         self.is_mariadb = None
         self._resolved_hostname = None
         self._agent_hostname = None
@@ -116,8 +122,9 @@ class MySql(AgentCheck):
         self.tags = self._config.tags
         self.cloud_metadata = self._config.cloud_metadata
 
-        # Create a new connection on every check run
+        # The connection of the current check run, kept open across runs by the connection manager
         self._conn = None
+        self._connections = MySQLConnectionManager(self._get_connection_args(), self.log)
 
         self._query_manager = QueryManager(self, self.execute_query_raw, queries=[])
         self.check_initializations.append(self._query_manager.compile_queries)
@@ -127,10 +134,12 @@ class MySql(AgentCheck):
         self.userstat_enabled = None
         self.events_wait_current_enabled = None
         self._warnings_by_code = {}
-        self._statement_metrics = MySQLStatementMetrics(self, self._config, self._get_connection_args())
-        self._statement_samples = MySQLStatementSamples(self, self._config, self._get_connection_args())
-        self._mysql_metadata = MySQLMetadata(self, self._config, self._get_connection_args())
-        self._query_activity = MySQLActivity(self, self._config, self._get_connection_args())
+        # Shared by all the DBM jobs
+        self.obfuscation_cache = ObfuscationCache()
+        self._statement_metrics = MySQLStatementMetrics(self, self._config, self._connections)
+        self._statement_samples = MySQLStatementSamples(self, self._config, self._connections)
+        self._mysql_metadata = MySQLMetadata(self, self._config, self._connections)
+        self._query_activity = MySQLActivity(self, self._config, self._connections)
         self._index_metrics = MySqlIndexMetrics(self._config)
         # _database_instance_emitted: limit the collection and transmission of the database instance metadata
         self._database_instance_emitted = TTLCache(
@@ -303,18 +312,20 @@ class MySql(AgentCheck):
                     self.tags = list(set(self.tags) | set(aurora_tags))
                     self._non_internal_tags = self._set_database_instance_tags(aurora_tags)
 
-                # version collection
-                self.version = get_version(db)
-                self.set_version_tags()
-                self._send_metadata()
-                self._send_database_instance_metadata()
+                # version collection, the version and configuration of the server are kept until the check reconnects
+                if self._version_refresh_needed:
+                    self.version = get_version(db)
+                    self.set_version_tags()
+                    self.is_mariadb = self.version.flavor == "MariaDB"
 
-                self.is_mariadb = self.version.flavor == "MariaDB"
+                    self._check_database_configuration(db)
 
-                self._check_database_configuration(db)
+                    if self._config.table_rows_stats_enabled:
+                        self.check_userstat_enabled(db)
+                    self._version_refresh_needed = False
 
-                if self._config.table_rows_stats_enabled:
-                    self.check_userstat_enabled(db)
+                self._send_metadata()
+                self._send_database_instance_metadata()
 
                 # Metric collection
                 tags = copy.deepcopy(self.tags)
@@ -330,6 +341,7 @@ class MySql(AgentCheck):
                     self._statement_samples.run_job_loop(dbm_tags)
                     self._query_activity.run_job_loop(dbm_tags)
                     self._mysql_metadata.run_job_loop(dbm_tags)
+                    self.obfuscation_cache.submit_metrics(self, 'mysql', **self.debug_stats_kwargs())
 
                 # keeping track of these:
                 self._put_qcache_stats()
@@ -356,6 +368,7 @@ class MySql(AgentCheck):
         self._statement_metrics.cancel()
         self._query_activity.cancel()
         self._mysql_metadata.cancel()
+        self._connections.close(self.CHECK_CONNECTION)
 
     def _new_query_executor(self, queries):
         return QueryExecutor(
@@ -451,10 +464,8 @@ class MySql(AgentCheck):
     @contextmanager
     def _connect(self):
         service_check_tags = self._service_check_tags()
-        db = None
         try:
-            connect_args = self._get_connection_args()
-            db = connect_with_autocommit(**connect_args)
+            db = self._connections.get_connection(self.CHECK_CONNECTION, startup_fn=self._on_connect)
             self.log.debug("Connected to MySQL")
             self.service_check_tags = list(set(service_check_tags))
             self.service_check(
@@ -465,10 +476,13 @@ class MySql(AgentCheck):
             self.service_check(
                 self.SERVICE_CHECK_NAME, AgentCheck.CRITICAL, tags=service_check_tags, hostname=self.resolved_hostname
             )
+            # The connection may be left in an unknown state, start over with a new one on the next run
+            self._connections.close(self.CHECK_CONNECTION)
             raise
-        finally:
-            if db:
-                db.close()
+
+    def _on_connect(self, db):
+        # The server may have been upgraded or reconfigured since the previous connection
+        self._version_refresh_needed = True
 
     def _collect_metrics(self, db, tags):
         # Get aggregate of all VARS we want to collect
@@ -26,7 +26,6 @@ from datadog_checks.base.utils.db.utils import (
     DBMAsyncJob,
     RateLimitingTTLCache,
     default_json_event_encoding,
-    obfuscate_sql_with_metadata,
 )
 from datadog_checks.base.utils.serialization import json
 from datadog_checks.base.utils.tracking import tracked_method
@@ -34,7 +33,6 @@ from datadog_checks.base.utils.tracking import tracked_method
 from .util import (
     DatabaseConfigurationError,
     StatementTruncationState,
-    connect_with_autocommit,
     get_truncation_state,
     warning_with_tags,
 )
@@ -191,7 +189,7 @@ class MySQLStatementSamples(DBMAsyncJob):
     Collects statement samples and execution plans.
     """
 
-    def __init__(self, check, config, connection_args):
+    def __init__(self, check, config, connections):
         collection_interval = float(config.statement_metrics_config.get('collection_interval', 1))
         if collection_interval <= 0:
             collection_interval = 1
@@ -208,7 +206,7 @@ class MySQLStatementSamples(DBMAsyncJob):
         )
         self._config = config
         self._version_processed = False
-        self._connection_args = connection_args
+        self._connections = connections
         self._last_check_run = 0
         self._db = None
         self._check = check
@@ -273,22 +271,17 @@ class MySQLStatementSamples(DBMAsyncJob):
 
     def _get_db_connection(self):
         """
-        lazy reconnect db
-        pymysql connections are not thread safe so we can't reuse the same connection from the main check
-        :return:
+        pymysql connections are not thread safe, so we can't reuse the same connection from the main check.
+        The job leases its own connection, which is kept open across runs.
         """
-        if not self._db:
-            self._db = connect_with_autocommit(**self._connection_args)
+        self._db = self._connections.get_connection(self._job_name)
         return self._db
 
     def _close_db_conn(self):
+        # type: () -> None
         if self._db:
-            try:
-                self._db.close()
-            except Exception:
-                self._log.debug("Failed to close db connection", exc_info=1)
-            finally:
-                self._db = None
+            self._connections.close(self._job_name)
+            self._db = None
 
     def _use_schema(self, cursor, schema, explain_state_cache_key):
         """
@@ -378,8 +371,12 @@ class MySQLStatementSamples(DBMAsyncJob):
         # - `resource_hash` - hash computed off the raw sql text to match apm resources
         # - `query_signature` - hash computed from the digest text to match query metrics
         try:
-            statement = obfuscate_sql_with_metadata(row['sql_text'], self._obfuscate_options)
-            statement_digest_text = obfuscate_sql_with_metadata(row['digest_text'], self._obfuscate_options)
+            statement = self._check.obfuscation_cache.obfuscate_sql_with_metadata(
+                row['sql_text'], self._obfuscate_options
+            )
+            statement_digest_text = self._check.obfuscation_cache.obfuscate_sql_with_metadata(
+                row['digest_text'], self._obfuscate_options
+            )
         except Exception as e:
             # do not log raw sql_text to avoid leaking sensitive data into logs unless log_unobfuscated_queries is set
             # digest_text is safe as parameters are obfuscated by the database
@@ -15,12 +15,12 @@ from datadog_checks.base.log import get_check_logger
 from datadog_checks.base.utils.common import to_native_string
 from datadog_checks.base.utils.db.sql import compute_sql_signature
 from datadog_checks.base.utils.db.statement_metrics import StatementMetrics
-from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding, obfuscate_sql_with_metadata
+from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding
 from datadog_checks.base.utils.serialization import json
 from datadog_checks.base.utils.tracking import tracked_method
 from datadog_checks.mysql.cursor import CommenterDictCursor
 
-from .util import DatabaseConfigurationError, connect_with_autocommit, warning_with_tags
+from .util import DatabaseConfigurationError, warning_with_tags
 
 try:
     import datadog_agent
@@ -61,7 +61,7 @@ class MySQLStatementMetrics(DBMAsyncJob):
     MySQLStatementMetrics collects database metrics per normalized MySQL statement
     """
 
-    def __init__(self, check, config, connection_args):
+    def __init__(self, check, config, connections):
         # (MySql, MySQLConfig) -> None
         collection_interval = float(config.statement_metrics_config.get('collection_interval', 10))
         if collection_interval <= 0:
@@ -79,7 +79,7 @@ class MySQLStatementMetrics(DBMAsyncJob):
         )
         self._check = check
         self._metric_collection_interval = collection_interval
-        self._connection_args = connection_args
+        self._connections = connections
         self._db = None
         self._config = config
         self.log = get_check_logger()
@@ -100,22 +100,17 @@ class MySQLStatementMetrics(DBMAsyncJob):
 
     def _get_db_connection(self):
         """
-        lazy reconnect db
-        pymysql connections are not thread safe so we can't reuse the same connection from the main check
-        :return:
+        pymysql connections are not thread safe, so we can't reuse the same connection from the main check.
+        The job leases its own connection, which is kept open across runs.
         """
-        if not self._db:
-            self._db = connect_with_autocommit(**self._connection_args)
+        self._db = self._connections.get_connection(self._job_name)
         return self._db
 
     def _close_db_conn(self):
+        # type: () -> None
         if self._db:
-            try:
-                self._db.close()
-            except Exception:
-                self._log.debug("Failed to close db connection", exc_info=1)
-            finally:
-                self._db = None
+            self._connections.close(self._job_name)
+            self._db = None
 
     def run_job(self):
         start = time.time()
@@ -275,7 +270,9 @@ class MySQLStatementMetrics(DBMAsyncJob):
         for row in rows:
             normalized_row = dict(copy.copy(row))
             try:
-                statement = obfuscate_sql_with_metadata(row['digest_text'], self._obfuscate_options)
+                statement = self._check.obfuscation_cache.obfuscate_sql_with_metadata(
+                    row['digest_text'], self._obfuscate_options
+                )
                 obfuscated_statement = statement['query'] if row['digest_text'] is not None else None
             except Exception as e:
                 self.log.warning("Failed to obfuscate query=[%s] | err=[%s]", row['digest_text'], e)
@@ -11,6 +11,7 @@ import pymysql
 import pytest
 
 from datadog_checks.mysql import MySql
+from datadog_checks.mysql.connections import MySQLConnectionManager
 from datadog_checks.mysql.databases_data import DatabasesData, SubmitData
 from datadog_checks.mysql.version_utils import get_version
 
@@ -445,3 +446,82 @@ def test_exception_handling_by_do_for_dbs():
         side_effect=Exception("Can't connect to DB"),
     ):
         databases_data._fetch_for_databases([{"name": "my_db"}], "dummy_cursor")
+
+
+class FakeConnection:
+    def __init__(self, alive=True):
+        self.open = True
+        self.alive = alive
+        self.pings = 0
+
+    def ping(self, reconnect=True):
+        self.pings += 1
+        if not self.alive:
+            raise pymysql.err.OperationalError(2013, 'Lost connection to MySQL server during query')
+
+    def close(self):
+        self.open = False
+
+
+def test_connection_manager_reuses_connections():
+    connections = MySQLConnectionManager({'host': 'localhost'}, DummyLogger(), ping_interval=5)
+    with mock.patch('datadog_checks.mysql.connections.time.monotonic', side_effect=[0, 1, 2]), mock.patch(
+        'datadog_checks.mysql.connections.connect_with_autocommit', side_effect=lambda **kwargs: FakeConnection()
+    ) as connect:
+        check_connection = connections.get_connection('check')
+        job_connection = connections.get_connection('statement-metrics')
+        assert connections.get_connection('check') is check_connection
+
+    assert check_connection is not job_connection
+    assert check_connection.pings == 0
+    assert connect.call_args_list == [mock.call(host='localhost'), mock.call(host='localhost')]
+
+    connections.close_all()
+    assert not check_connection.open
+    assert not job_connection.open
+    assert connections._stats.connection_closed == 2
+
+
+def test_connection_manager_replaces_dead_connections():
+    connections = MySQLConnectionManager({}, DummyLogger(), ping_interval=5)
+    startup_fn = mock.Mock()
+    with mock.patch('datadog_checks.mysql.connections.time.monotonic', side_effect=[0, 10, 20, 30]), mock.patch(
+        'datadog_checks.mysql.connections.connect_with_autocommit', side_effect=lambda **kwargs: FakeConnection()
+    ):
+        connection = connections.get_connection('check', startup_fn)
+        # Idle connections are pinged before being reused
+        assert connections.get_connection('check', startup_fn) is connection
+        assert connection.pings == 1
+        assert startup_fn.call_count == 1
+
+        connection.alive = False
+        new_connection = connections.get_connection('check', startup_fn)
+        assert new_connection is not connection
+        assert not connection.open
+        assert startup_fn.call_args_list == [mock.call(connection), mock.call(new_connection)]
+
+        # pymysql drops the socket of failed connections
+        new_connection.open = False
+        assert connections.get_connection('check', startup_fn) is not new_connection
+
+    assert connections._stats.connection_opened == 3
+
+
+def test_version_is_kept_until_reconnect():
+    check = MySql(common.CHECK_NAME, {}, instances=[{'server': 'localhost', 'user': 'datadog'}])
+    version = mock.Mock()
+    with mock.patch(
+        'datadog_checks.mysql.connections.connect_with_autocommit', side_effect=lambda **kwargs: FakeConnection()
+    ):
+        with check._connect():
+            check.version = version
+            check._version_refresh_needed = False
+        with check._connect():
+            assert check.version is version
+            assert not check._version_refresh_needed
+
+        check._connections.close(MySql.CHECK_CONNECTION)
+        with check._connect():
+            # The DBM jobs keep using the last known version until the check refreshes it
+            assert check.version is version
+            assert check._version_refresh_needed
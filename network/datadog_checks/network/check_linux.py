@@ -3,15 +3,18 @@
 # Licensed under Simplified BSD License (see LICENSE)
 import os
 import socket
+from collections import Counter
 
-from datadog_checks.base import is_affirmative
+from datadog_checks.base import ConfigurationError, is_affirmative
 from datadog_checks.base.utils.common import pattern_filter
 from datadog_checks.base.utils.subprocess_output import SubprocessOutputEmptyError, get_subprocess_output
-from datadog_checks.network import ethtool
+from datadog_checks.network import connections, ethtool
 from datadog_checks.network.const import ENA_METRIC_NAMES, ENA_METRIC_PREFIX
 
 from . import Network
 
+CX_STATE_SOURCES = ('ss', 'proc', 'netlink')
+
 try:
     import datadog_agent
 except ImportError:
@@ -22,6 +25,17 @@ class LinuxNetwork(Network):
     def __init__(self, name, init_config, instances):
         super(LinuxNetwork, self).__init__(name, init_config, instances)
         self._collect_cx_queues = self.instance.get('collect_connection_queues', False)
+        self._cx_state_source = self.instance.get('connection_state_source', 'ss')
+
+    def _validate(self):
+        super(LinuxNetwork, self)._validate()
+
+        if self._cx_state_source not in CX_STATE_SOURCES:
+            raise ConfigurationError(
+                "Expected 'connection_state_source' to be one of {}, got '{}'".format(
+                    ', '.join(CX_STATE_SOURCES), self._cx_state_source
+                )
+            )
 
     def check(self, _):
         """
@@ -38,7 +52,9 @@ class LinuxNetwork(Network):
         self._get_iface_sys_metrics(custom_tags)
         net_proc_base_location = self.get_net_proc_base_location(proc_location)
 
-        if self.is_collect_cx_state_runnable(net_proc_base_location):
+        if self._collect_cx_state and self._cx_state_source != 'ss':
+            self._collect_cx_state_from_sockets(net_proc_base_location, custom_tags)
+        elif self.is_collect_cx_state_runnable(net_proc_base_location):
             try:
                 self.log.debug("Using `ss` to collect connection state")
                 # Try using `ss` for increased performance over `netstat`
@@ -385,6 +401,75 @@ class LinuxNetwork(Network):
         except SubprocessOutputEmptyError:
             self.log.debug("Couldn't use %s to get conntrack stats", conntrack_path)
 
+    def _collect_cx_state_from_sockets(self, net_proc_base_location, custom_tags):
+        """
+        Collect the connection states by reading the sockets in process, with sock_diag over netlink or from
+        /proc/net, instead of running `ss`.
+        """
+        source = self._cx_state_source
+        try:
+            metrics, queues = self._read_cx_state(source, net_proc_base_location)
+        except (IOError, OSError, ValueError) as e:
+            if source == 'netlink':
+                self.log.warning(
+                    "Unable to collect connection states with netlink: %s. Reading %s/net instead",
+                    e,
+                    net_proc_base_location,
+                )
+                self._cx_state_source = 'proc'
+                self._collect_cx_state_from_sockets(net_proc_base_location, custom_tags)
+            else:
+                self.log.warning("Unable to collect connection states from %s/net: %s", net_proc_base_location, e)
+            return
+
+        for metric, value in metrics.items():
+            self.gauge(metric, value, tags=custom_tags)
+
+        for state, recvq, sendq in queues:
+            self.histogram('system.net.tcp.recv_q', recvq, custom_tags + ["state:" + state])
+            self.histogram('system.net.tcp.send_q', sendq, custom_tags + ["state:" + state])
+
+    def _read_cx_state(self, source, net_proc_base_location):
+        """
+        Return the connection state gauges, and the (state, receive queue, send queue) of the TCP connections
+        if collecting the connection queues, reading each kind of socket in a single pass.
+        """
+        metrics = self._get_metrics()
+        queues = []
+        net_location = os.path.join(net_proc_base_location, 'net')
+        # Translate the TCP states once rather than for each socket
+        tcp_states = {
+            code: self.tcp_states['ss'][name]
+            for code, name in connections.TCP_STATES.items()
+            if name in self.tcp_states['ss']
+        }
+
+        for ip_version in ['4', '6']:
+            if source == 'netlink':
+                tcp_sockets = connections.query_sock_diag('tcp', ip_version)
+                udp_sockets = connections.query_sock_diag('udp', ip_version)
+            else:
+                tcp_sockets = connections.read_proc_sockets(net_location, 'tcp', ip_version, self._collect_cx_queues)
+                udp_sockets = connections.read_proc_sockets(net_location, 'udp', ip_version)
+
+            protocol = 'tcp{}'.format(ip_version)
+            if self._collect_cx_queues:
+                for code, recvq, sendq in tcp_sockets:
+                    state = tcp_states.get(code)
+                    if state is not None:
+                        metrics[self.cx_state_gauge[protocol, state]] += 1
+                        queues.append((state, recvq, sendq))
+            else:
+                counts = Counter(code for code, _, _ in tcp_sockets)
+                for code, count in counts.items():
+                    state = tcp_states.get(code)
+                    if state is not None:
+                        metrics[self.cx_state_gauge[protocol, state]] += count
+
+            metrics[self.cx_state_gauge['udp{}'.format(ip_version), 'connections']] = sum(1 for _ in udp_sockets)
+
+        return metrics, queues
+
     def _parse_short_state_lines(self, lines, metrics, tcp_states, ip_version):
         for line in lines:
             value, state = line.split()
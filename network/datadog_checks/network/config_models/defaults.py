@@ -40,6 +40,10 @@ def instance_combine_connection_states():
     return True
 
 
+def instance_connection_state_source():
+    return 'ss'
+
+
 def instance_disable_generic_tags():
     return False
 
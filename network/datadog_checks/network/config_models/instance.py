@@ -12,6 +12,7 @@ from __future__ import annotations
 from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+from typing_extensions import Literal
 
 from datadog_checks.base.utils.functions import identity
 from datadog_checks.base.utils.models import validation
@@ -42,6 +43,7 @@ class InstanceConfig(BaseModel):
     collect_ethtool_metrics: Optional[bool] = None
     collect_rate_metrics: Optional[bool] = None
     combine_connection_states: Optional[bool] = None
+    connection_state_source: Optional[Literal['ss', 'proc', 'netlink']] = None
     conntrack_path: Optional[str] = None
     disable_generic_tags: Optional[bool] = None
     empty_default_hostname: Optional[bool] = None
@@ -0,0 +1,117 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+"""
+Read the state of the sockets without running `ss` or `netstat`, from /proc/net or with sock_diag over netlink.
+"""
+import errno
+import os
+import socket
+import struct
+
+# The names `ss` gives to the TCP states defined in include/net/tcp_states.h
+TCP_STATES = {
+    1: 'ESTAB',
+    2: 'SYN-SENT',
+    3: 'SYN-RECV',
+    4: 'FIN-WAIT-1',
+    5: 'FIN-WAIT-2',
+    6: 'TIME-WAIT',
+    7: 'UNCONN',
+    8: 'CLOSE-WAIT',
+    9: 'LAST-ACK',
+    10: 'LISTEN',
+    11: 'CLOSING',
+    12: 'SYN-RECV',
+}
+
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 0x2
+NLMSG_DONE = 0x3
+
+# Bit mask of all the TCP states
+ALL_STATES = 0xFFFFFFFF
+
+RECV_BUFFER_SIZE = 1 << 16
+
+_NLMSGHDR = struct.Struct('=IHHII')
+# struct inet_diag_req_v2, with a zeroed `struct inet_diag_sockid`
+_INET_DIAG_REQ_V2 = struct.Struct('=BBBxI48x')
+# struct inet_diag_msg: family, state, timer, retrans, id, expires, rqueue, wqueue, uid, inode
+_INET_DIAG_MSG = struct.Struct('=BBBB48xIIIII')
+_NLMSGERR = struct.Struct('=i')
+
+FAMILIES = {'4': socket.AF_INET, '6': socket.AF_INET6}
+PROTOCOLS = {'tcp': socket.IPPROTO_TCP, 'udp': socket.IPPROTO_UDP}
+
+
+def read_proc_sockets(net_location, protocol, ip_version, queues=False):
+    """
+    Yield the (state, receive queue, send queue) of each socket listed in `<net_location>/<protocol><6>`.
+    The queues are None unless `queues` is true.
+
+    Raises IOError if the file can't be read.
+    """
+    path = os.path.join(net_location, protocol if ip_version == '4' else protocol + '6')
+    try:
+        f = open(path, 'rb')
+    except IOError as e:
+        # The IPv6 files don't exist when IPv6 is disabled
+        if e.errno == errno.ENOENT and ip_version == '6':
+            return
+        raise
+
+    with f:
+        # sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode
+        # 0: 0100007F:BC8F 00000000:0000 0A 00000000:00000000 00:00000000 00000000 65534        0 913 1 ...
+        next(f, None)
+        for line in f:
+            fields = line.split(None, 5)
+            if len(fields) < 5:
+                continue
+            if queues:
+                tx_queue, _, rx_queue = fields[4].partition(b':')
+                yield int(fields[3], 16), int(rx_queue, 16), int(tx_queue, 16)
+            else:
+                yield int(fields[3], 16), None, None
+
+
+def query_sock_diag(protocol, ip_version):
+    """
+    Yield the (state, receive queue, send queue) of each socket of the network namespace of the process,
+    as reported by the sock_diag netlink subsystem.
+
+    Raises OSError if netlink or sock_diag is not available.
+    """
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_SOCK_DIAG)
+    try:
+        request = _INET_DIAG_REQ_V2.pack(FAMILIES[ip_version], PROTOCOLS[protocol], 0, ALL_STATES)
+        header = _NLMSGHDR.pack(_NLMSGHDR.size + len(request), SOCK_DIAG_BY_FAMILY, NLM_F_REQUEST | NLM_F_DUMP, 1, 0)
+        sock.sendall(header + request)
+
+        while True:
+            data = sock.recv(RECV_BUFFER_SIZE)
+            if not data:
+                raise OSError(errno.EIO, 'Unexpected end of the sock_diag dump')
+
+            offset = 0
+            while offset + _NLMSGHDR.size <= len(data):
+                length, message_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+                if length < _NLMSGHDR.size:
+                    raise OSError(errno.EIO, 'Invalid sock_diag message')
+                if message_type == NLMSG_DONE:
+                    return
+                if message_type == NLMSG_ERROR:
+                    error = -_NLMSGERR.unpack_from(data, offset + _NLMSGHDR.size)[0]
+                    raise OSError(error, os.strerror(error))
+                if message_type == SOCK_DIAG_BY_FAMILY:
+                    _, state, _, _, _, rqueue, wqueue, _, _ = _INET_DIAG_MSG.unpack_from(data, offset + _NLMSGHDR.size)
+                    yield state, rqueue, wqueue
+
+                # Messages are aligned on 4 bytes
+                offset += (length + 3) & ~3
+    finally:
+        sock.close()
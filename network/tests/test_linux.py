@@ -4,6 +4,7 @@
 import copy
 import logging
 import os
+import socket
 
 import mock
 import pytest
@@ -11,6 +12,7 @@ import pytest
 from datadog_checks.base.utils.platform import Platform
 from datadog_checks.base.utils.subprocess_output import get_subprocess_output
 from datadog_checks.dev.utils import get_metadata_metrics
+from datadog_checks.network import connections
 from datadog_checks.network.check_linux import LinuxNetwork
 
 from . import common
@@ -332,3 +334,82 @@ def test_proc_net_metrics(aggregator):
         aggregator.assert_metric(metric, value=value)
 
     aggregator.assert_metrics_using_metadata(get_metadata_metrics(), check_submission_type=True)
+
+
+def proc_sockets_as_sock_diag(protocol, ip_version):
+    # The same sockets as the /proc/net fixtures
+    return connections.read_proc_sockets(os.path.join(FIXTURE_DIR, 'net'), protocol, ip_version, queues=True)
+
+
+@pytest.mark.parametrize('source', ['proc', 'netlink'])
+def test_cx_state_from_sockets(aggregator, source):
+    instance = copy.deepcopy(common.INSTANCE)
+    instance['collect_connection_state'] = True
+    instance['collect_connection_queues'] = True
+    instance['connection_state_source'] = source
+    check_instance = LinuxNetwork('network', {}, [instance])
+    check_instance.get_net_proc_base_location = lambda x: FIXTURE_DIR
+
+    with mock.patch('datadog_checks.network.check_linux.get_subprocess_output') as out, mock.patch(
+        'datadog_checks.network.connections.query_sock_diag', side_effect=proc_sockets_as_sock_diag
+    ):
+        check_instance.check({})
+        out.assert_not_called()
+
+    for metric, value in CX_STATE_GAUGES_VALUES.items():
+        aggregator.assert_metric(metric, value=value)
+    aggregator.assert_metric('system.net.tcp.recv_q', count=13)
+    aggregator.assert_metric('system.net.tcp.recv_q', value=32, tags=['state:established'])
+    aggregator.assert_metric('system.net.tcp.recv_q', value=3, tags=['state:listening'])
+    aggregator.assert_metric('system.net.tcp.send_q', value=16, tags=['state:established'])
+    aggregator.assert_metric('system.net.tcp.send_q', value=1, tags=['state:opening'])
+
+
+def test_cx_state_netlink_falls_back_to_proc(aggregator, caplog):
+    instance = copy.deepcopy(common.INSTANCE)
+    instance['collect_connection_state'] = True
+    instance['connection_state_source'] = 'netlink'
+    check_instance = LinuxNetwork('network', {}, [instance])
+    check_instance.get_net_proc_base_location = lambda x: FIXTURE_DIR
+
+    with mock.patch(
+        'datadog_checks.network.connections.query_sock_diag', side_effect=OSError(93, 'Protocol not supported')
+    ) as query_sock_diag:
+        check_instance.check({})
+        check_instance.check({})
+
+    assert query_sock_diag.call_count == 1
+    assert 'Unable to collect connection states with netlink' in caplog.text
+    for metric, value in CX_STATE_GAUGES_VALUES.items():
+        aggregator.assert_metric(metric, value=value, count=2)
+
+
+@pytest.mark.skipif(not Platform.is_linux(), reason="Only works on Linux systems")
+def test_cx_state_netlink(aggregator):
+    instance = copy.deepcopy(common.INSTANCE)
+    instance['collect_connection_state'] = True
+    instance['connection_state_source'] = 'netlink'
+    check_instance = LinuxNetwork('network', {}, [instance])
+
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    client = socket.create_connection(server.getsockname())
+    accepted, _ = server.accept()
+    try:
+        check_instance.check({})
+    finally:
+        for sock in (accepted, client, server):
+            sock.close()
+
+    assert aggregator.metrics('system.net.tcp4.listening')[0].value >= 1
+    assert aggregator.metrics('system.net.tcp4.established')[0].value >= 2
+
+
+def test_invalid_connection_state_source(dd_run_check):
+    instance = copy.deepcopy(common.INSTANCE)
+    instance['connection_state_source'] = 'lsof'
+    check_instance = LinuxNetwork('network', {}, [instance])
+
+    with pytest.raises(Exception, match='connection_state_source'):
+        dd_run_check(check_instance)
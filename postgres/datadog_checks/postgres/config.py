@@ -169,6 +169,8 @@ class PostgresConfig:
             self.statement_metrics_config.get('incremental_query_metrics', False)
         )
         self.baseline_metrics_expiry = self.statement_metrics_config.get('baseline_metrics_expiry', 300)
+        self.cache_query_text = is_affirmative(self.statement_metrics_config.get('cache_query_text', False))
+        self.query_text_cache_max_size = int(self.statement_metrics_config.get('query_text_cache_max_size', 10000))
         self.service = instance.get('service') or init_config.get('service') or ''
 
     def _build_tags(self, custom_tags, propagate_agent_tags):
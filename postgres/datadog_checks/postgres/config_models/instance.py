@@ -176,10 +176,12 @@ class QueryMetrics(BaseModel):
         frozen=True,
     )
     baseline_metrics_expiry: Optional[float] = None
+    cache_query_text: Optional[bool] = None
     collection_interval: Optional[float] = None
     enabled: Optional[bool] = None
     incremental_query_metrics: Optional[bool] = None
     pg_stat_statements_max_warning_threshold: Optional[float] = None
+    query_text_cache_max_size: Optional[float] = None
 
 
 class QuerySamples(BaseModel):
@@ -14,6 +14,7 @@ from datadog_checks.base import AgentCheck
 from datadog_checks.base.utils.db import QueryExecutor
 from datadog_checks.base.utils.db.core import QueryManager
 from datadog_checks.base.utils.db.utils import (
+    ObfuscationCache,
     default_json_event_encoding,
     tracked_query,
 )
@@ -127,6 +128,8 @@ class PostgreSql(AgentCheck):
         self._warnings_by_code = {}
         self.db_pool = MultiDatabaseConnectionPool(self._new_connection, self._config.max_connections)
         self.metrics_cache = PostgresMetricsCache(self._config)
+        # Shared by all the DBM jobs
+        self.obfuscation_cache = ObfuscationCache()
         self.statement_metrics = PostgresStatementMetrics(self, self._config, shutdown_callback=self._close_db_pool)
         self.statement_samples = PostgresStatementSamples(self, self._config, shutdown_callback=self._close_db_pool)
         self.metadata_samples = PostgresMetadata(self, self._config, shutdown_callback=self._close_db_pool)
@@ -988,6 +991,7 @@ class PostgreSql(AgentCheck):
                 self.statement_metrics.run_job_loop(tags)
                 self.statement_samples.run_job_loop(tags)
                 self.metadata_samples.run_job_loop(tags)
+                self.obfuscation_cache.submit_metrics(self, 'postgres', **self.debug_stats_kwargs())
             if self._config.collect_wal_metrics:
                 # collect wal metrics for pg < 10, disabled by enabled
                 self._collect_wal_metrics()
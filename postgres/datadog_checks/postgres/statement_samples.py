@@ -25,7 +25,6 @@ from datadog_checks.base.utils.db.utils import (
     DBMAsyncJob,
     RateLimitingTTLCache,
     default_json_event_encoding,
-    obfuscate_sql_with_metadata,
 )
 from datadog_checks.base.utils.serialization import json
 from datadog_checks.base.utils.time import get_timestamp
@@ -384,7 +383,9 @@ class PostgresStatementSamples(DBMAsyncJob):
                 obfuscated_query = backend_type
                 normalized_row['query_signature'] = compute_sql_signature(backend_type)
             else:
-                statement = obfuscate_sql_with_metadata(row['query'], self._obfuscate_options)
+                statement = self._check.obfuscation_cache.obfuscate_sql_with_metadata(
+                    row['query'], self._obfuscate_options
+                )
                 obfuscated_query = statement['query']
                 metadata = statement['metadata']
                 normalized_row['query_signature'] = compute_sql_signature(obfuscated_query)
@@ -8,13 +8,13 @@ import time
 
 import psycopg2
 import psycopg2.extras
-from cachetools import TTLCache
+from cachetools import LRUCache, TTLCache
 
 from datadog_checks.base import is_affirmative
 from datadog_checks.base.utils.common import to_native_string
 from datadog_checks.base.utils.db.sql import compute_sql_signature
 from datadog_checks.base.utils.db.statement_metrics import StatementMetrics
-from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding, obfuscate_sql_with_metadata
+from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding
 from datadog_checks.base.utils.serialization import json
 from datadog_checks.base.utils.tracking import tracked_method
 from datadog_checks.postgres.cursor import CommenterCursor, CommenterDictCursor
@@ -70,6 +70,37 @@ def statements_query(**kwargs):
     )
 
 
+# Only the statements whose number of calls differs from their last known value, passed as arrays of
+# queryid, datname, rolname and calls, are returned. The query text may be unavailable so the rows of other
+# users' statements are excluded by their missing queryid instead.
+CHANGED_STATEMENTS_QUERY = """
+SELECT {cols}
+  FROM {pg_stat_statements_view} as pg_stat_statements
+  LEFT JOIN pg_roles
+         ON pg_stat_statements.userid = pg_roles.oid
+  LEFT JOIN pg_database
+         ON pg_stat_statements.dbid = pg_database.oid
+  LEFT JOIN unnest(%s::bigint[], %s::text[], %s::text[], %s::bigint[])
+         AS watermarks(wm_queryid, wm_datname, wm_rolname, wm_calls)
+         ON watermarks.wm_queryid = pg_stat_statements.queryid
+        AND watermarks.wm_datname IS NOT DISTINCT FROM pg_database.datname
+        AND watermarks.wm_rolname IS NOT DISTINCT FROM pg_roles.rolname
+  WHERE pg_stat_statements.queryid IS NOT NULL
+  AND watermarks.wm_calls IS DISTINCT FROM pg_stat_statements.calls
+  {filters}
+"""
+
+QUERY_TEXT_QUERY = """
+SELECT pg_stat_statements.queryid, pg_database.datname, pg_roles.rolname, query
+  FROM {pg_stat_statements_view} as pg_stat_statements
+  LEFT JOIN pg_roles
+         ON pg_stat_statements.userid = pg_roles.oid
+  LEFT JOIN pg_database
+         ON pg_stat_statements.dbid = pg_database.oid
+  WHERE query != '<insufficient privilege>'
+  AND pg_stat_statements.queryid = ANY(%s::bigint[])
+"""
+
 # Use pg_stat_statements(false) when available as an optimization to avoid pulling SQL text from disk
 PG_STAT_STATEMENTS_COUNT_QUERY = "SELECT COUNT(*) FROM pg_stat_statements(false)"
 PG_STAT_STATEMENTS_COUNT_QUERY_LT_9_4 = "SELECT COUNT(*) FROM pg_stat_statements"
@@ -135,6 +166,14 @@ def agent_check_getter(self):
     return self._check
 
 
+def _text_key(row):
+    """
+    :param row: a row from pg_stat_statements
+    :return: a tuple identifying the text of this row
+    """
+    return row['queryid'], row['datname'], row['rolname']
+
+
 def _row_key(row):
     """
     :param row: a normalized row from pg_stat_statements
@@ -179,6 +218,10 @@ class PostgresStatementMetrics(DBMAsyncJob):
         self._query_calls_cache = QueryCallsCache()
         self._baseline_metrics = {}
         self._last_baseline_metrics_expiry = None
+        # (queryid, datname, rolname) -> normalized query columns, or `False` for statements that are skipped
+        self._query_text_cache = LRUCache(maxsize=config.query_text_cache_max_size)
+        # (queryid, datname, rolname) -> number of calls when the statement was last fetched
+        self._calls_watermarks = {}
         self._track_io_timing_cache = None
         self._obfuscate_options = to_native_string(json.dumps(self._config.obfuscator_options))
         # full_statement_text_cache: limit the ingestion rate of full statement text events per query_signature
@@ -280,7 +323,11 @@ class PostgresStatementMetrics(DBMAsyncJob):
             return []
 
     @tracked_method(agent_check_getter=agent_check_getter, track_result_length=True)
-    def _load_pg_stat_statements(self):
+    def _load_pg_stat_statements(self, changed_only=False):
+        """
+        Load the rows of pg_stat_statements. When `changed_only` is set, only the statements whose number of calls
+        changed since they were last loaded are returned, already normalized.
+        """
         try:
             available_columns = set(self._get_pg_stat_statements_columns())
             missing_columns = PG_STAT_STATEMENTS_REQUIRED_COLUMNS - available_columns
@@ -353,7 +400,9 @@ class PostgresStatementMetrics(DBMAsyncJob):
                 params = params + tuple(self._config.ignore_databases)
             with self._check._get_main_db() as conn:
                 with conn.cursor(cursor_factory=CommenterDictCursor) as cursor:
-                    if len(self._query_calls_cache.cache) > 0:
+                    if changed_only:
+                        return self._load_changed_pg_stat_statements(cursor, query_columns, filters, params)
+                    elif len(self._query_calls_cache.cache) > 0:
                         return self._execute_query(
                             cursor,
                             statements_query(
@@ -433,6 +482,69 @@ class PostgresStatementMetrics(DBMAsyncJob):
 
             return []
 
+    def _load_changed_pg_stat_statements(self, cursor, query_columns, filters, params):
+        pgss_view_without_query_text = self._config.pg_stat_statements_view
+        if pgss_view_without_query_text == "pg_stat_statements":
+            # See `_check_called_queries`, the text is fetched separately and only when it is not cached
+            pgss_view_without_query_text = "pg_stat_statements(false)"
+
+        watermarks = self._calls_watermarks
+        rows = self._execute_query(
+            cursor,
+            CHANGED_STATEMENTS_QUERY.format(
+                cols=', '.join(column for column in query_columns if column != 'query'),
+                pg_stat_statements_view=pgss_view_without_query_text,
+                filters=filters,
+            ),
+            params=(
+                [key[0] for key in watermarks],
+                [key[1] for key in watermarks],
+                [key[2] for key in watermarks],
+                list(watermarks.values()),
+            )
+            + params,
+        )
+        self._check.gauge(
+            "dd.postgresql.pg_stat_statements.calls_changed",
+            len(rows),
+            tags=self.tags,
+            hostname=self._check.resolved_hostname,
+            raw=True,
+        )
+
+        query_text_cache = self._query_text_cache
+        missing_queryids = {row['queryid'] for row in rows if _text_key(row) not in query_text_cache}
+        if missing_queryids:
+            text_rows = self._execute_query(
+                cursor,
+                QUERY_TEXT_QUERY.format(pg_stat_statements_view=self._config.pg_stat_statements_view),
+                params=(sorted(missing_queryids),),
+            )
+            for text_row in text_rows:
+                query_text_cache[_text_key(text_row)] = self._normalize_query_text(text_row['query'])
+
+            self._check.count(
+                "dd.postgres.statement_metrics.query_text_fetched",
+                len(text_rows),
+                tags=self.tags + self._check._get_debug_tags(),
+                hostname=self._check.resolved_hostname,
+                raw=True,
+            )
+
+        normalized_rows = []
+        for row in rows:
+            key = _text_key(row)
+            query_columns = query_text_cache.get(key)
+            if query_columns is None:
+                # The statement was evicted before its text could be fetched, try again during the next run
+                continue
+
+            watermarks[key] = row['calls']
+            if query_columns:
+                normalized_rows.append({**row, **query_columns})
+
+        return normalized_rows
+
     def _emit_pg_stat_statements_dealloc(self):
         if self._check.version < V14:
             return
@@ -523,6 +635,7 @@ class PostgresStatementMetrics(DBMAsyncJob):
         ):
             self._baseline_metrics = {}
             self._query_calls_cache = QueryCallsCache()
+            self._calls_watermarks = {}
             self._last_baseline_metrics_expiry = time.time()
 
             self._check.count(
@@ -540,9 +653,14 @@ class PostgresStatementMetrics(DBMAsyncJob):
 
         self._check_baseline_metrics_expiry()
         rows = []
-        if (not self._config.incremental_query_metrics) or self._check.version < V10:
+        if not (self._config.incremental_query_metrics or self._config.cache_query_text) or self._check.version < V10:
             rows = self._load_pg_stat_statements()
             rows = self._normalize_queries(rows)
+        elif self._config.cache_query_text:
+            # Only the statements whose calls changed are fetched, using the query text cache when possible,
+            # and the baseline metrics provide the rest of the rows.
+            rows = self._load_pg_stat_statements(changed_only=True)
+            rows = self._apply_called_queries(rows)
         elif len(self._baseline_metrics) == 0:
             # When we don't have baseline metrics (either on the first run or after cache expiry),
             # we fetch all rows from pg_stat_statements, and update the initial state of relevant
@@ -579,27 +697,48 @@ class PostgresStatementMetrics(DBMAsyncJob):
     def _normalize_queries(self, rows):
         normalized_rows = []
         for row in rows:
-            normalized_row = dict(copy.copy(row))
-            try:
-                statement = obfuscate_sql_with_metadata(row['query'], self._obfuscate_options)
-            except Exception as e:
-                if self._config.log_unobfuscated_queries:
-                    self._log.warning("Failed to obfuscate query=[%s] | err=[%s]", row['query'], e)
-                else:
-                    self._log.debug("Failed to obfuscate query | err=[%s]", e)
+            query_columns = self._normalize_query(row['query'])
+            if query_columns is None:
                 continue
 
-            obfuscated_query = statement['query']
-            normalized_row['query'] = obfuscated_query
-            normalized_row['query_signature'] = compute_sql_signature(obfuscated_query)
-            metadata = statement['metadata']
-            normalized_row['dd_tables'] = metadata.get('tables', None)
-            normalized_row['dd_commands'] = metadata.get('commands', None)
-            normalized_row['dd_comments'] = metadata.get('comments', None)
+            normalized_row = dict(copy.copy(row))
+            normalized_row.update(query_columns)
             normalized_rows.append(normalized_row)
 
         return normalized_rows
 
+    def _normalize_query(self, query):
+        """
+        Return the obfuscated query and its metadata as row columns, or `None` if it cannot be obfuscated.
+        """
+        try:
+            statement = self._check.obfuscation_cache.obfuscate_sql_with_metadata(query, self._obfuscate_options)
+        except Exception as e:
+            if self._config.log_unobfuscated_queries:
+                self._log.warning("Failed to obfuscate query=[%s] | err=[%s]", query, e)
+            else:
+                self._log.debug("Failed to obfuscate query | err=[%s]", e)
+            return None
+
+        obfuscated_query = statement['query']
+        metadata = statement['metadata']
+        return {
+            'query': obfuscated_query,
+            'query_signature': compute_sql_signature(obfuscated_query),
+            'dd_tables': metadata.get('tables', None),
+            'dd_commands': metadata.get('commands', None),
+            'dd_comments': metadata.get('comments', None),
+        }
+
+    def _normalize_query_text(self, query):
+        """
+        Return the normalized query columns to cache for a query text, `False` if the statement must be skipped.
+        """
+        if query.startswith('/* DDIGNORE */'):
+            return False
+
+        return self._normalize_query(query) or False
+
     def _rows_to_fqt_events(self, rows):
         for row in rows:
             query_cache_key = _row_key(row)
@@ -0,0 +1,155 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import mock
+import pytest
+from semver import VersionInfo
+
+pytestmark = [pytest.mark.unit]
+
+
+class FakeCursor:
+    """
+    Returns the given result sets in order and records the queries that were executed.
+    """
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.executed = []
+
+    def execute(self, query, params=()):
+        self.executed.append((query, params))
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+
+def metrics_row(queryid, calls, datname='db', rolname='user'):
+    return {'queryid': queryid, 'calls': calls, 'total_time': calls * 10, 'datname': datname, 'rolname': rolname}
+
+
+def text_row(queryid, query, datname='db', rolname='user'):
+    return {'queryid': queryid, 'query': query, 'datname': datname, 'rolname': rolname}
+
+
+@pytest.fixture
+def statement_metrics(pg_instance, integration_check):
+    pg_instance['reported_hostname'] = 'stubbed.hostname'
+    pg_instance['query_metrics'] = {'enabled': True, 'cache_query_text': True}
+    check = integration_check(pg_instance)
+    statement_metrics = check.statement_metrics
+    statement_metrics.tags = []
+    return statement_metrics
+
+
+def load_changed(statement_metrics, cursor):
+    return statement_metrics._load_changed_pg_stat_statements(
+        cursor, ['calls', 'datname', 'query', 'queryid', 'rolname', 'total_time'], '', ()
+    )
+
+
+def test_query_text_is_only_fetched_once(statement_metrics):
+    cursor = FakeCursor(
+        [metrics_row(1, 5), metrics_row(2, 7)],
+        [text_row(1, 'SELECT  1'), text_row(2, 'SELECT 2')],
+    )
+    rows = load_changed(statement_metrics, cursor)
+
+    assert [(row['queryid'], row['calls'], row['query']) for row in rows] == [(1, 5, 'SELECT 1'), (2, 7, 'SELECT 2')]
+    assert all(row['query_signature'] for row in rows)
+    assert len(cursor.executed) == 2
+    metrics_query, metrics_params = cursor.executed[0]
+    assert 'pg_stat_statements(false)' in metrics_query
+    assert 'query,' not in metrics_query
+    assert metrics_params == ([], [], [], [])
+    assert cursor.executed[1][1] == ([1, 2],)
+
+    cursor = FakeCursor([metrics_row(2, 9)])
+    rows = load_changed(statement_metrics, cursor)
+
+    assert [(row['queryid'], row['calls'], row['query']) for row in rows] == [(2, 9, 'SELECT 2')]
+    assert len(cursor.executed) == 1
+    assert cursor.executed[0][1] == ([1, 2], ['db', 'db'], ['user', 'user'], [5, 7])
+    assert statement_metrics._calls_watermarks == {(1, 'db', 'user'): 5, (2, 'db', 'user'): 9}
+
+
+def test_text_is_keyed_by_database_and_user(statement_metrics):
+    cursor = FakeCursor([metrics_row(1, 5, datname='db1')], [text_row(1, 'SELECT 1', datname='db1')])
+    load_changed(statement_metrics, cursor)
+
+    cursor = FakeCursor([metrics_row(1, 3, datname='db2')], [text_row(1, 'SELECT 1', datname='db2')])
+    rows = load_changed(statement_metrics, cursor)
+
+    assert [(row['datname'], row['calls']) for row in rows] == [('db2', 3)]
+    assert len(cursor.executed) == 2
+
+
+def test_ignored_statements_are_cached(statement_metrics):
+    cursor = FakeCursor(
+        [metrics_row(1, 5), metrics_row(2, 7)],
+        [text_row(1, '/* DDIGNORE */ SELECT 1'), text_row(2, 'SELECT 2')],
+    )
+    rows = load_changed(statement_metrics, cursor)
+    assert [row['queryid'] for row in rows] == [2]
+
+    cursor = FakeCursor([metrics_row(1, 6)])
+    assert load_changed(statement_metrics, cursor) == []
+    assert len(cursor.executed) == 1
+
+
+def test_statements_without_text_are_retried(statement_metrics):
+    # The statement was deallocated, or is not visible to the user, by the time its text was queried
+    cursor = FakeCursor([metrics_row(1, 5)], [])
+    assert load_changed(statement_metrics, cursor) == []
+    assert statement_metrics._calls_watermarks == {}
+
+    cursor = FakeCursor([metrics_row(1, 5)], [text_row(1, 'SELECT 1')])
+    assert [row['queryid'] for row in load_changed(statement_metrics, cursor)] == [1]
+
+
+def test_obfuscation_failures_are_cached(statement_metrics):
+    cursor = FakeCursor([metrics_row(1, 5)], [text_row(1, 'SELECT 1')])
+    with mock.patch.object(
+        statement_metrics._check.obfuscation_cache, 'obfuscate_sql_with_metadata', side_effect=Exception('failed')
+    ):
+        assert load_changed(statement_metrics, cursor) == []
+
+    cursor = FakeCursor([metrics_row(1, 6)])
+    assert load_changed(statement_metrics, cursor) == []
+    assert len(cursor.executed) == 1
+
+
+def test_derivative_rows_of_changed_statements(statement_metrics):
+    check = statement_metrics._check
+    check.version = VersionInfo(13, 0, 0)
+    check.pg_settings = {'pg_stat_statements.max': '10000'}
+    statement_metrics._stat_column_cache = ['calls', 'datname', 'query', 'queryid', 'rolname', 'rows', 'total_time']
+    statement_metrics._emit_pg_stat_statements_metrics = mock.Mock()
+
+    def collect(cursor):
+        with mock.patch.object(check, '_get_main_db') as get_main_db:
+            get_main_db.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = cursor
+            return statement_metrics._collect_metrics_rows()
+
+    cursor = FakeCursor(
+        [metrics_row(1, 5), metrics_row(2, 7), metrics_row(3, 1)],
+        [text_row(1, 'SELECT 1'), text_row(2, 'SELECT 2'), text_row(3, 'SELECT 3')],
+    )
+    # The first run sets the baseline of the derivatives
+    assert collect(cursor) == []
+
+    # Only the statements whose calls changed are fetched, the others come from the baseline metrics
+    cursor = FakeCursor([metrics_row(2, 9), metrics_row(3, 4)])
+    rows = collect(cursor)
+
+    assert len(cursor.executed) == 1
+    assert sorted((row['query'], row['calls'], row['total_time']) for row in rows) == [
+        ('SELECT 2', 2, 20),
+        ('SELECT 3', 3, 30),
+    ]
+
+    cursor = FakeCursor([metrics_row(1, 6)])
+    rows = collect(cursor)
+
+    assert cursor.executed[0][1][:4] == ([1, 2, 3], ['db', 'db', 'db'], ['user', 'user', 'user'], [5, 9, 4])
+    assert [(row['query'], row['calls'], row['total_time']) for row in rows] == [('SELECT 1', 1, 10)]
@@ -0,0 +1,297 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+"""
+An asyncio SNMP client multiplexing the requests of many devices over a few UDP sockets.
+
+Unlike the commands from `commands.py`, which run the dispatcher of one `SnmpEngine` per device and block until
+each response is received, all the requests are sent concurrently and their responses are matched by request ID.
+Only SNMP v1 and v2c are supported, the `SnmpEngine` of each device is still used to resolve the MIBs. Like
+PySNMP, requests are built as SNMP v2c PDUs and converted from and to SNMP v1 on the wire when needed.
+"""
+import asyncio
+import itertools
+import socket
+from typing import Any, Dict, List, Optional, Tuple  # noqa: F401
+
+from pyasn1.codec.ber import decoder, encoder
+from pyasn1.type.univ import Null
+from pysnmp.entity.rfc3413.cmdgen import getNextVarBinds
+from pysnmp.hlapi.asyncore.cmdgen import vbProcessor
+from pysnmp.proto import api
+from pysnmp.proto.api import v2c
+from pysnmp.proto.proxy import rfc2576
+from pysnmp.proto.rfc1905 import endOfMibView
+
+from datadog_checks.base.errors import CheckException
+
+from .commands import unmakeVarbinds
+from .config import InstanceConfig  # noqa: F401
+from .models import Device  # noqa: F401
+
+DEFAULT_SOCKETS = 4
+DEFAULT_MAX_INFLIGHT_REQUESTS_PER_DEVICE = 2
+DEFAULT_MAX_INFLIGHT_REQUESTS = 1024
+
+# Request IDs are signed 32-bit integers
+_MAX_REQUEST_ID = 2**31 - 1
+
+_NULL = Null('')
+
+
+class _SnmpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, engine):
+        # type: (AsyncSnmpEngine) -> None
+        self._engine = engine
+
+    def datagram_received(self, data, address):
+        # type: (bytes, Tuple[Any, ...]) -> None
+        self._engine._on_datagram(data, address)
+
+    def error_received(self, exc):
+        # type: (Exception) -> None
+        # The requests are retried then time out on their own
+        pass
+
+
+class AsyncSnmpEngine:
+    """
+    Send SNMP requests to any number of devices over a fixed pool of UDP sockets.
+
+    Every request is retried and times out according to the configuration of its device. At most
+    `max_inflight_per_device` requests are in flight for each device, and `max_inflight` overall,
+    so that neither the devices nor the socket buffers are flooded.
+    """
+
+    def __init__(
+        self,
+        sockets=DEFAULT_SOCKETS,  # type: int
+        max_inflight_per_device=DEFAULT_MAX_INFLIGHT_REQUESTS_PER_DEVICE,  # type: int
+        max_inflight=DEFAULT_MAX_INFLIGHT_REQUESTS,  # type: int
+    ):
+        # type: (...) -> None
+        self._sockets = sockets
+        self._max_inflight_per_device = max_inflight_per_device
+        self._max_inflight = max_inflight
+
+        self._request_ids = itertools.count(1)
+        self._transport_index = itertools.count()
+
+        # Socket family -> transports
+        self._transports = {}  # type: Dict[int, List[asyncio.DatagramTransport]]
+        # Request ID -> (device address, response future)
+        self._pending = {}  # type: Dict[int, Tuple[Tuple[Any, ...], asyncio.Future]]
+        # (host, port) -> (socket family, device address)
+        self._addresses = {}  # type: Dict[Tuple[str, int], Tuple[int, Tuple[Any, ...]]]
+        self._device_semaphores = {}  # type: Dict[Device, asyncio.Semaphore]
+
+        # Created lazily as they must belong to the running loop
+        self._lock = None  # type: Optional[asyncio.Lock]
+        self._semaphore = None  # type: Optional[asyncio.Semaphore]
+
+    async def get(self, config, oids, lookup_mib):
+        # type: (InstanceConfig, list, bool) -> list
+        """Call SNMP GET on a list of oids."""
+        pdu = v2c.GetRequestPDU()
+        v2c.apiPDU.setDefaults(pdu)
+        v2c.apiPDU.setVarBinds(pdu, _make_request_var_binds(config, oids))
+
+        response = await self._request(config, pdu)
+
+        return unmakeVarbinds(config._snmp_engine, v2c.apiPDU.getVarBinds(response), lookup_mib)
+
+    async def getnext(self, config, oids, lookup_mib, ignore_nonincreasing_oid):
+        # type: (InstanceConfig, list, bool, bool) -> list
+        """Call SNMP GETNEXT on a list of oids, iterating on the results as long as they are under the same prefix."""
+        initial_vars = [x[0] for x in vbProcessor.makeVarBinds(config._snmp_engine, oids)]
+        request_var_binds = _make_request_var_binds(config, oids)
+        results = []
+
+        while True:
+            pdu = v2c.GetNextRequestPDU()
+            v2c.apiPDU.setDefaults(pdu)
+            v2c.apiPDU.setVarBinds(pdu, request_var_binds)
+
+            response = await self._request(config, pdu)
+            response_var_binds = v2c.apiPDU.getVarBinds(response)
+            if v2c.apiPDU.getErrorStatus(response):
+                # PySNMP stops walking as well, the values of the response are either errors or `Null`
+                return results
+
+            _check_increasing(config, request_var_binds, response_var_binds, ignore_nonincreasing_oid)
+
+            # The OIDs of the response are reused as is for the next request, without resolving them again
+            request_var_binds = []
+            new_initial_vars = []
+            var_bind_table = vbProcessor.unmakeVarBinds(config._snmp_engine, response_var_binds, lookup_mib)
+            for col, var_bind in enumerate(var_bind_table):
+                name, val = var_bind
+                if not isinstance(val, Null) and initial_vars[col].isPrefixOf(name):
+                    request_var_binds.append((response_var_binds[col][0], _NULL))
+                    new_initial_vars.append(initial_vars[col])
+                    results.append(var_bind)
+            if not request_var_binds:
+                return results
+            initial_vars = new_initial_vars
+
+    async def bulk(self, config, oid, non_repeaters, max_repetitions, lookup_mib, ignore_nonincreasing_oid):
+        # type: (InstanceConfig, Any, int, int, bool, bool) -> list
+        """Call SNMP GETBULK on an oid, iterating on the results as long as they are under the same prefix."""
+        initial_var = vbProcessor.makeVarBinds(config._snmp_engine, [oid])[0][0]
+        request_var_binds = _make_request_var_binds(config, [oid])
+        results = []
+
+        while True:
+            pdu = v2c.GetBulkRequestPDU()
+            v2c.apiBulkPDU.setDefaults(pdu)
+            v2c.apiBulkPDU.setNonRepeaters(pdu, non_repeaters)
+            v2c.apiBulkPDU.setMaxRepetitions(pdu, max_repetitions)
+            v2c.apiBulkPDU.setVarBinds(pdu, request_var_binds)
+
+            response = await self._request(config, pdu)
+            if v2c.apiBulkPDU.getErrorStatus(response):
+                return results
+
+            var_bind_table = v2c.apiBulkPDU.getVarBindTable(pdu, response)
+            if not var_bind_table:
+                return results
+
+            _check_increasing(config, request_var_binds, var_bind_table[-1], ignore_nonincreasing_oid)
+
+            for var_binds in var_bind_table:
+                var_bind = vbProcessor.unmakeVarBinds(config._snmp_engine, var_binds, lookup_mib)[0]
+                name, value = var_bind
+                if endOfMibView.isSameTypeWith(value):
+                    return results
+                if initial_var.isPrefixOf(name):
+                    results.append(var_bind)
+                else:
+                    return results
+
+            request_var_binds = [(var_bind_table[-1][0][0], _NULL)]
+
+    async def close(self):
+        # type: () -> None
+        for transports in self._transports.values():
+            for transport in transports:
+                transport.close()
+        self._transports.clear()
+
+        for _, future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+
+    async def _request(self, config, pdu):
+        # type: (InstanceConfig, Any) -> Any
+        """
+        Send an SNMP v2c PDU to the device of the given config and return the SNMP v2c response PDU.
+        """
+        device = config.device
+        if device is None:
+            raise RuntimeError('No device set')  # pragma: no cover
+
+        request_id = next(self._request_ids) % _MAX_REQUEST_ID
+        v2c.apiPDU.setRequestID(pdu, request_id)
+
+        snmp_v1 = config._auth_data.mpModel == 0
+        if snmp_v1:
+            protocol_module = api.protoModules[api.protoVersion1]
+            request_pdu = rfc2576.v2ToV1(pdu)
+        else:
+            protocol_module = v2c
+            request_pdu = pdu
+
+        message = protocol_module.Message()
+        protocol_module.apiMessage.setDefaults(message)
+        protocol_module.apiMessage.setCommunity(message, config._auth_data.communityName)
+        protocol_module.apiMessage.setPDU(message, request_pdu)
+        data = encoder.encode(message)
+
+        family, address = await self._resolve(device.ip, device.port)
+        transport = await self._get_transport(family)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_inflight)
+        device_semaphore = self._device_semaphores.get(device)
+        if device_semaphore is None:
+            device_semaphore = self._device_semaphores[device] = asyncio.Semaphore(self._max_inflight_per_device)
+
+        async with device_semaphore, self._semaphore:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = (address, future)
+            try:
+                for _ in range(config.retries + 1):
+                    transport.sendto(data, address)
+                    try:
+                        response = await asyncio.wait_for(asyncio.shield(future), config.timeout)
+                    except asyncio.TimeoutError:
+                        continue
+
+                    return rfc2576.v1ToV2(response, pdu) if snmp_v1 else response
+            finally:
+                self._pending.pop(request_id, None)
+
+        raise CheckException('No SNMP response received before timeout for device {}'.format(device))
+
+    def _on_datagram(self, data, address):
+        # type: (bytes, Tuple[Any, ...]) -> None
+        try:
+            protocol_module = api.protoModules[int(api.decodeMessageVersion(data))]
+            message, _ = decoder.decode(data, asn1Spec=protocol_module.Message())
+            pdu = protocol_module.apiMessage.getPDU(message)
+            request_id = int(protocol_module.apiPDU.getRequestID(pdu))
+        except Exception:
+            # Not an SNMP response, drop it like pysnmp does
+            return
+
+        pending = self._pending.get(request_id)
+        if pending is None:
+            # Late response to a request that already timed out or was answered by a retry
+            return
+
+        expected_address, future = pending
+        if address[:2] != expected_address[:2] or future.done():
+            return
+
+        future.set_result(pdu)
+
+    async def _resolve(self, host, port):
+        # type: (str, int) -> Tuple[int, Tuple[Any, ...]]
+        resolved = self._addresses.get((host, port))
+        if resolved is None:
+            addresses = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_DGRAM)
+            family, _, _, _, address = addresses[0]
+            resolved = self._addresses[(host, port)] = (family, address)
+
+        return resolved
+
+    async def _get_transport(self, family):
+        # type: (int) -> asyncio.DatagramTransport
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        transports = self._transports.get(family)
+        if transports is None:
+            async with self._lock:
+                transports = self._transports.get(family)
+                if transports is None:
+                    transports = []
+                    loop = asyncio.get_running_loop()
+                    for _ in range(self._sockets):
+                        transport, _ = await loop.create_datagram_endpoint(lambda: _SnmpProtocol(self), family=family)
+                        transports.append(transport)
+                    self._transports[family] = transports
+
+        return transports[next(self._transport_index) % len(transports)]
+
+
+def _make_request_var_binds(config, var_binds):
+    # type: (InstanceConfig, list) -> List[Tuple[Any, Null]]
+    return [(x[0].getOid(), _NULL) for x in vbProcessor.makeVarBinds(config._snmp_engine, var_binds)]
+
+
+def _check_increasing(config, request_var_binds, response_var_binds, ignore_nonincreasing_oid):
+    # type: (InstanceConfig, list, list, bool) -> None
+    error_indication, _ = getNextVarBinds(response_var_binds, request_var_binds)
+    if error_indication and not ignore_nonincreasing_oid:
+        raise CheckException('{} for device {}'.format(error_indication, config.device))
@@ -6,13 +6,21 @@ import time
 import weakref
 from collections import defaultdict
 from logging import Logger, getLogger  # noqa: F401
-from typing import Any, DefaultDict, Dict, Iterator, List, Optional, Set, Tuple  # noqa: F401
+from typing import Any, DefaultDict, Dict, Iterator, List, Optional, Sequence, Set, Tuple  # noqa: F401
 
 from datadog_checks.base import ConfigurationError, is_affirmative
 
 from .mibs import MIBLoader
-from .models import OID, Device
-from .parsing import ParsedMetric, ParsedSymbolMetric, SymbolTag, parse_metrics, parse_symbol_metric_tags  # noqa: F401
+from .models import OID, Device  # noqa: F401
+from .parsing import ParsedMetric, SymbolTag, parse_metrics, parse_symbol_metric_tags  # noqa: F401
+from .profiles import (
+    UPTIME_METRIC,
+    UPTIME_METRIC_NAME,
+    UPTIME_OID,
+    OIDFetchPlan,  # noqa: F401
+    ProfileCache,
+    ProfileCacheStats,  # noqa: F401
+)
 from .pysnmp_types import (
     CommunityData,
     ContextData,
@@ -39,6 +47,8 @@ class InstanceConfig:
     DEFAULT_ALLOWED_FAILURES = 3
     DEFAULT_BULK_THRESHOLD = 0
     DEFAULT_WORKERS = 5
+    DEFAULT_ASYNC_ENGINE_SOCKETS = 4
+    DEFAULT_MAX_INFLIGHT_REQUESTS_PER_DEVICE = 2
     DEFAULT_REFRESH_OIDS_CACHE_INTERVAL = 0  # `0` means disabled
 
     AUTH_PROTOCOL_MAPPING = {
@@ -70,12 +80,16 @@ class InstanceConfig:
         profiles_by_oid=None,  # type: Dict[str, str]
         loader=None,  # type: MIBLoader
         logger=None,  # type: Logger
+        profile_cache=None,  # type: ProfileCache
+        profile_cache_stats=None,  # type: ProfileCacheStats
     ):
         # type: (...) -> None
         global_metrics = [] if global_metrics is None else global_metrics
         profiles = {} if profiles is None else profiles
         profiles_by_oid = {} if profiles_by_oid is None else profiles_by_oid
         loader = MIBLoader() if loader is None else loader
+        self._profile_cache = ProfileCache.shared_instance() if profile_cache is None else profile_cache
+        self._profile_cache_stats = profile_cache_stats
 
         # Clean empty or null values. This will help templating.
         for key, value in list(instance.items()):
@@ -106,14 +120,19 @@ class InstanceConfig:
         self.failing_instances = defaultdict(int)  # type: DefaultDict[str, int]
         self.allowed_failures = int(instance.get('discovery_allowed_failures', self.DEFAULT_ALLOWED_FAILURES))
         self.workers = int(instance.get('workers', self.DEFAULT_WORKERS))
+        self.use_async_engine = is_affirmative(instance.get('use_async_engine', False))
+        self.async_engine_sockets = int(instance.get('async_engine_sockets', self.DEFAULT_ASYNC_ENGINE_SOCKETS))
+        self.max_inflight_requests_per_device = int(
+            instance.get('max_inflight_requests_per_device', self.DEFAULT_MAX_INFLIGHT_REQUESTS_PER_DEVICE)
+        )
 
         self.bulk_threshold = int(instance.get('bulk_threshold', self.DEFAULT_BULK_THRESHOLD))
 
         self._auth_data = self.get_auth_data(instance)
         self._context_data = ContextData(*self.get_context_data(instance))
 
-        timeout = int(instance.get('timeout', self.DEFAULT_TIMEOUT))
-        retries = int(instance.get('retries', self.DEFAULT_RETRIES))
+        self.timeout = int(instance.get('timeout', self.DEFAULT_TIMEOUT))
+        self.retries = int(instance.get('retries', self.DEFAULT_RETRIES))
 
         ip_address = instance.get('ip_address')
         network_address = instance.get('network_address')
@@ -130,8 +149,8 @@ class InstanceConfig:
             target = register_device_target(
                 ip_address,
                 port,
-                timeout=timeout,
-                retries=retries,
+                timeout=self.timeout,
+                retries=self.retries,
                 engine=self._snmp_engine,
                 auth_data=self._auth_data,
                 context_data=self._context_data,
@@ -166,38 +185,55 @@ class InstanceConfig:
         self.oid_config = OIDConfig(refresh_interval_sec)
         self.oid_config.add_parsed_oids(scalar_oids=scalar_oids, next_oids=next_oids, bulk_oids=bulk_oids)
 
+        self._uptime_metric_added = False
+
         if profile:
             if profile not in profiles:
                 raise ConfigurationError("Unknown profile '{}'".format(profile))
             self.refresh_with_profile(profiles[profile])
             self.add_profile_tag(profile)
 
-        self._uptime_metric_added = False
-
     def resolve_oid(self, oid):
         # type: (OID) -> OIDMatch
         return self._resolver.resolve_oid(oid)
 
     def refresh_with_profile(self, profile):
         # type: (Dict[str, Any]) -> None
-        metrics = profile['definition'].get('metrics', [])
-        scalar_oids, next_oids, bulk_oids, parsed_metrics = self.parse_metrics(metrics)
-
-        metric_tags = profile['definition'].get('metric_tags', [])
-        tag_oids, parsed_metric_tags = self.parse_metric_tags(metric_tags)
+        # Use bulk for SNMP version > 1 only.
+        bulk_threshold = self.bulk_threshold if self._auth_data.mpModel else 0
+        compiled = self._profile_cache.get(
+            profile, bulk_threshold, logger=self.logger(), stats=self._profile_cache_stats
+        )
+        compiled.register(self._resolver)
 
         device = profile['definition'].get('device', {})
         self.add_device_tags(device)
 
+        self.metrics.extend(profile['definition'].get('metrics', []))
+
+        if not self.oid_config.has_parsed_oids() and not self.parsed_metrics and not self.parsed_metric_tags:
+            # Nothing else is fetched for this device: share the plan of the profile instead of copying it.
+            if self._uptime_metric_added:
+                plan = compiled.plan
+            else:
+                plan = compiled.uptime_plan
+                self._resolver.register(UPTIME_OID, UPTIME_METRIC_NAME)
+                self._uptime_metric_added = True
+            self.oid_config.set_plan(plan)
+            self.parsed_metrics = plan.parsed_metrics
+            self.parsed_metric_tags = compiled.parsed_metric_tags
+            return
+
         # NOTE: `profile` may contain metrics and metric tags that have already been ingested in this configuration.
         # As a result, multiple copies of metrics/tags will be fetched and submitted to Datadog, which is inefficient
         # and possibly problematic.
         # In the future we'll probably want to implement de-duplication.
-
-        self.metrics.extend(metrics)
-        self.oid_config.add_parsed_oids(scalar_oids=scalar_oids + tag_oids, next_oids=next_oids, bulk_oids=bulk_oids)
-        self.parsed_metrics.extend(parsed_metrics)
-        self.parsed_metric_tags.extend(parsed_metric_tags)
+        plan = compiled.plan
+        self.oid_config.add_parsed_oids(
+            scalar_oids=plan.scalar_oids, next_oids=plan.next_oids, bulk_oids=plan.bulk_oids
+        )
+        self.parsed_metrics = [*self.parsed_metrics, *plan.parsed_metrics]
+        self.parsed_metric_tags = [*self.parsed_metric_tags, *compiled.parsed_metric_tags]
 
     def add_profile_tag(self, profile_name):
         # type: (str) -> None
@@ -278,6 +314,14 @@ class InstanceConfig:
 
         return context_engine_id, context_name
 
+    @property
+    def supports_async_engine(self):
+        # type: () -> bool
+        """
+        Whether the devices can be collected by the asyncio engine, which doesn't support SNMP v3.
+        """
+        return isinstance(self._auth_data, CommunityData)
+
     def network_hosts(self):
         # type: () -> Iterator[str]
         if self.ip_network is None:
@@ -312,13 +356,10 @@ class InstanceConfig:
         # type: () -> None
         if self._uptime_metric_added:
             return
-        # Reference sysUpTimeInstance directly, see http://oidref.com/1.3.6.1.2.1.1.3.0
-        uptime_oid = OID('1.3.6.1.2.1.1.3.0')
-        self.oid_config.add_parsed_oids(scalar_oids=[uptime_oid])
-        self._resolver.register(uptime_oid, 'sysUpTimeInstance')
+        self.oid_config.add_parsed_oids(scalar_oids=[UPTIME_OID])
+        self._resolver.register(UPTIME_OID, UPTIME_METRIC_NAME)
 
-        parsed_metric = ParsedSymbolMetric('sysUpTimeInstance', forced_type='gauge')
-        self.parsed_metrics.append(parsed_metric)
+        self.parsed_metrics = [*self.parsed_metrics, UPTIME_METRIC]
         self._uptime_metric_added = True
 
 
@@ -332,44 +373,62 @@ class OIDConfig(object):
         self._refresh_interval_sec = refresh_interval_sec
         self._last_ts = 0  # type: float
 
-        self._scalar_oids = []  # type: List[OID]
-        self._next_oids = []  # type: List[OID]
-        self._bulk_oids = []  # type: List[OID]
+        # Sequences are replaced rather than extended in place, as they may be shared with other devices.
+        self._scalar_oids = ()  # type: Sequence[OID]
+        self._next_oids = ()  # type: Sequence[OID]
+        self._bulk_oids = ()  # type: Sequence[OID]
 
         self._all_scalar_oids = []  # type: List[OID]
         self._use_scalar_oids_cache = False
 
     @property
     def scalar_oids(self):
-        # type: () -> List[OID]
+        # type: () -> Sequence[OID]
         if self._use_scalar_oids_cache:
             return self._all_scalar_oids
         return self._scalar_oids
 
     @property
     def next_oids(self):
-        # type: () -> List[OID]
+        # type: () -> Sequence[OID]
         if self._use_scalar_oids_cache:
             return []
         return self._next_oids
 
     @property
     def bulk_oids(self):
-        # type: () -> List[OID]
+        # type: () -> Sequence[OID]
         if self._use_scalar_oids_cache:
             return []
         return self._bulk_oids
 
     def add_parsed_oids(self, scalar_oids=None, next_oids=None, bulk_oids=None):
-        # type: (List[OID], List[OID], List[OID]) -> None
+        # type: (Sequence[OID], Sequence[OID], Sequence[OID]) -> None
         if scalar_oids:
-            self._scalar_oids.extend(scalar_oids)
+            self._scalar_oids = [*self._scalar_oids, *scalar_oids]
         if next_oids:
-            self._next_oids.extend(next_oids)
+            self._next_oids = [*self._next_oids, *next_oids]
         if bulk_oids:
-            self._bulk_oids.extend(bulk_oids)
+            self._bulk_oids = [*self._bulk_oids, *bulk_oids]
+        self.reset()
+
+    def set_plan(self, plan):
+        # type: (OIDFetchPlan) -> None
+        """
+        Fetch the OIDs of a shared plan, without copying them.
+        """
+        self._scalar_oids = plan.scalar_oids
+        self._next_oids = plan.next_oids
+        self._bulk_oids = plan.bulk_oids
         self.reset()
 
+    def has_parsed_oids(self):
+        # type: () -> bool
+        """
+        Return whether any OIDs were parsed, regardless of the scalar OIDs cache.
+        """
+        return bool(self._scalar_oids or self._next_oids or self._bulk_oids)
+
     def has_oids(self):
         # type: () -> bool
         """
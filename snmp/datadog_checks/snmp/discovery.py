@@ -2,6 +2,7 @@
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
 
+import itertools
 import json
 import time
 import weakref  # noqa: F401
@@ -15,6 +16,9 @@ from .config import InstanceConfig  # noqa: F401
 if TYPE_CHECKING:
     from .snmp import SnmpCheck  # noqa: F401
 
+# Number of hosts probed concurrently when using the asyncio engine
+ASYNC_DISCOVERY_BATCH_SIZE = 256
+
 
 def discover_instances(config, interval, check_ref):
     # type: (InstanceConfig, float, weakref.ref[SnmpCheck]) -> None
@@ -26,37 +30,30 @@ def discover_instances(config, interval, check_ref):
     that function can stop.
     """
 
+    use_async_engine = config.use_async_engine and config.supports_async_engine
+
     while True:
         start_time = time.time()
-        for host in config.network_hosts():
-            check = check_ref()
-            if check is None or not check._running:
+        if use_async_engine:
+            if not _discover_hosts_concurrently(config, check_ref):
                 return
+        else:
+            for host in config.network_hosts():
+                check = check_ref()
+                if check is None or not check._running:
+                    return
 
-            host_config = check._build_autodiscovery_config(config.instance, host)
-
-            try:
-                sys_object_oid = check.fetch_sysobject_oid(host_config)
-            except Exception as e:
-                check.log.debug("Error scanning host %s: %s", host, e)
-                del check
-                continue
+                host_config = check._build_autodiscovery_config(config.instance, host)
 
-            try:
-                profile = check._profile_for_sysobject_oid(sys_object_oid)
-            except ConfigurationError:
-                if not host_config.oid_config.has_oids():
-                    check.log.warning("Host %s didn't match a profile for sysObjectID %s", host, sys_object_oid)
+                try:
+                    sys_object_oid = check.fetch_sysobject_oid(host_config)
+                except Exception as e:
+                    check.log.debug("Error scanning host %s: %s", host, e)
                     del check
                     continue
-            else:
-                host_config.refresh_with_profile(check.profiles[profile])
-                host_config.add_profile_tag(profile)
-
-            config.discovered_instances[host] = host_config
 
-            write_persistent_cache(check.check_id, json.dumps(list(config.discovered_instances)))
-            del check
+                _add_discovered_host(check, config, host, host_config, sys_object_oid)
+                del check
 
         check = check_ref()
         if check is None:
@@ -68,3 +65,48 @@ def discover_instances(config, interval, check_ref):
         time_elapsed = time.time() - start_time
         if interval - time_elapsed > 0:
             time.sleep(interval - time_elapsed)
+
+
+def _discover_hosts_concurrently(config, check_ref):
+    # type: (InstanceConfig, weakref.ref[SnmpCheck]) -> bool
+    """
+    Probe the hosts of the subnet by batches, querying the sysObjectID of all the hosts of a batch at once.
+
+    Return `False` if the check was unscheduled in the meantime.
+    """
+    hosts = config.network_hosts()
+    while True:
+        batch = list(itertools.islice(hosts, ASYNC_DISCOVERY_BATCH_SIZE))
+        if not batch:
+            return True
+
+        check = check_ref()
+        if check is None or not check._running:
+            return False
+
+        host_configs = [check._build_autodiscovery_config(config.instance, host) for host in batch]
+        sys_object_oids = check.fetch_sysobject_oids(host_configs)
+        for host, host_config, sys_object_oid in zip(batch, host_configs, sys_object_oids):
+            if isinstance(sys_object_oid, Exception):
+                check.log.debug("Error scanning host %s: %s", host, sys_object_oid)
+                continue
+
+            _add_discovered_host(check, config, host, host_config, sys_object_oid)
+        del check
+
+
+def _add_discovered_host(check, config, host, host_config, sys_object_oid):
+    # type: (SnmpCheck, InstanceConfig, str, InstanceConfig, str) -> None
+    try:
+        profile = check._profile_for_sysobject_oid(sys_object_oid)
+    except ConfigurationError:
+        if not host_config.oid_config.has_oids():
+            check.log.warning("Host %s didn't match a profile for sysObjectID %s", host, sys_object_oid)
+            return
+    else:
+        host_config.refresh_with_profile(check.profiles[profile])
+        host_config.add_profile_tag(profile)
+
+    config.discovered_instances[host] = host_config
+
+    write_persistent_cache(check.check_id, json.dumps(list(config.discovered_instances)))
@@ -0,0 +1,168 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+"""
+A process-wide cache of compiled SNMP profiles.
+
+Parsing the metrics of a profile builds the same OIDs and parsed metrics for every device using it. Profiles are
+compiled once per content and bulk threshold instead, and all the devices using a profile share its immutable
+fetch plan. Only the name and index registrations, which belong to the resolver of each device, are replayed.
+"""
+import threading
+from logging import Logger  # noqa: F401
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple  # noqa: F401
+
+from cachetools import LRUCache
+
+from .models import OID
+from .parsing import ParsedMetric, ParsedSymbolMetric, SymbolTag, parse_metrics, parse_symbol_metric_tags  # noqa: F401
+from .resolver import OIDResolver  # noqa: F401
+from .utils import profile_digest
+
+# Reference sysUpTimeInstance directly, see http://oidref.com/1.3.6.1.2.1.1.3.0
+UPTIME_OID = OID('1.3.6.1.2.1.1.3.0')
+UPTIME_METRIC_NAME = 'sysUpTimeInstance'
+UPTIME_METRIC = ParsedSymbolMetric(UPTIME_METRIC_NAME, forced_type='gauge')
+
+# Evict the least recently used profiles beyond this many, e.g. the previous contents of updated profiles
+DEFAULT_MAX_SIZE = 512
+
+OIDFetchPlan = NamedTuple(
+    'OIDFetchPlan',
+    [
+        ('scalar_oids', Tuple[OID, ...]),
+        ('next_oids', Tuple[OID, ...]),
+        ('bulk_oids', Tuple[OID, ...]),
+        ('parsed_metrics', Tuple[ParsedMetric, ...]),
+    ],
+)
+
+
+class _RecordingResolver(object):
+    """
+    Record the registrations made while parsing a profile, so they can be replayed on the resolver of each device.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.names = []  # type: List[Tuple[OID, str]]
+        self.indexes = []  # type: List[Tuple[str, int, Dict[int, str]]]
+
+    def register(self, oid, name):
+        # type: (OID, str) -> None
+        self.names.append((oid, name))
+
+    def register_index(self, tag, index, mapping):
+        # type: (str, int, Dict[int, str]) -> None
+        self.indexes.append((tag, index, mapping))
+
+
+class CompiledProfile(object):
+    """
+    The OIDs, parsed metrics and parsed metric tags of a profile, shared by all the devices using it.
+    """
+
+    __slots__ = ('plan', 'uptime_plan', 'parsed_metric_tags', '_names', '_indexes')
+
+    def __init__(self, definition, bulk_threshold, logger):
+        # type: (Dict[str, Any], int, Optional[Logger]) -> None
+        resolver = _RecordingResolver()
+        metrics = parse_metrics(
+            definition.get('metrics', []), resolver=resolver, logger=logger, bulk_threshold=bulk_threshold
+        )
+        metric_tags = parse_symbol_metric_tags(definition.get('metric_tags', []), resolver=resolver)
+
+        scalar_oids = tuple(metrics['oids'] + metric_tags['oids'])
+        next_oids = tuple(metrics['next_oids'])
+        bulk_oids = tuple(metrics['bulk_oids'])
+        parsed_metrics = tuple(metrics['parsed_metrics'])
+
+        self.plan = OIDFetchPlan(scalar_oids, next_oids, bulk_oids, parsed_metrics)
+        # Devices report their uptime along with the metrics of their profile
+        self.uptime_plan = OIDFetchPlan(
+            scalar_oids + (UPTIME_OID,), next_oids, bulk_oids, parsed_metrics + (UPTIME_METRIC,)
+        )
+        self.parsed_metric_tags = tuple(metric_tags['parsed_symbol_tags'])  # type: Tuple[SymbolTag, ...]
+        self._names = tuple(resolver.names)
+        self._indexes = tuple(resolver.indexes)
+
+    def register(self, resolver):
+        # type: (OIDResolver) -> None
+        """
+        Register the names and index mappings of the profile in the resolver of a device.
+        """
+        for oid, name in self._names:
+            resolver.register(oid, name)
+        for tag, index, mapping in self._indexes:
+            resolver.register_index(tag=tag, index=index, mapping=mapping)
+
+
+class ProfileCacheStats(object):
+    """
+    The profile cache lookups of a check instance.
+    """
+
+    __slots__ = ('hits', 'misses')
+
+    def __init__(self):
+        # type: () -> None
+        self.hits = 0
+        self.misses = 0
+
+
+class ProfileCache(object):
+    """
+    Compile each profile once for all the check instances of the process.
+
+    Profiles are keyed by the digest of their content, so that an updated profile is compiled again.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        # type: (int) -> None
+        self._compiled = LRUCache(maxsize=max_size)  # type: LRUCache[Tuple[str, int], CompiledProfile]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared_instance(cls):
+        # type: () -> ProfileCache
+        """
+        Return the globally shared cache.
+        """
+        if not hasattr(cls, "_instance"):
+            cls._instance = ProfileCache()  # type: ignore
+        return cls._instance  # type: ignore
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._compiled)
+
+    def get(self, profile, bulk_threshold, logger=None, stats=None):
+        # type: (Dict[str, Any], int, Optional[Logger], Optional[ProfileCacheStats]) -> CompiledProfile
+        """
+        Return the compiled version of a profile, compiling it if needed. The lookup is also counted in `stats` if
+        given, to tell apart the check instances sharing the cache.
+
+        Raises:
+        * ConfigurationError: if the profile contains invalid metrics or metric tags.
+        """
+        digest = profile.get('digest')
+        if digest is None:
+            digest = profile_digest(profile['definition'])
+        key = (digest, bulk_threshold)
+
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self.hits += 1
+                if stats is not None:
+                    stats.hits += 1
+                return compiled
+
+            compiled = CompiledProfile(profile['definition'], bulk_threshold, logger)
+            self._compiled[key] = compiled
+            self.misses += 1
+            if stats is not None:
+                stats.misses += 1
+            return compiled
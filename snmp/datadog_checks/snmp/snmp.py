@@ -1,6 +1,8 @@
 # (C) Datadog, Inc. 2010-present
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
+import asyncio
+import contextlib
 import copy
 import fnmatch
 import functools
@@ -12,12 +14,13 @@ import time
 import weakref
 from collections import defaultdict
 from concurrent import futures
-from typing import Any, DefaultDict, Dict, List, Optional, Pattern, Tuple  # noqa: F401
+from typing import Any, DefaultDict, Dict, Generator, Iterator, List, Optional, Pattern, Tuple  # noqa: F401
 
 from datadog_checks.base import AgentCheck, ConfigurationError, is_affirmative
 from datadog_checks.base.errors import CheckException
 from datadog_checks.snmp.utils import extract_value
 
+from .async_engine import AsyncSnmpEngine
 from .commands import snmp_bulk, snmp_get, snmp_getnext
 from .compat import read_persistent_cache, write_persistent_cache
 from .config import InstanceConfig
@@ -27,6 +30,7 @@ from .metrics import as_metric_with_forced_type, as_metric_with_inferred_type, t
 from .mibs import MIBLoader
 from .models import OID
 from .parsing import ColumnTag, IndexTag, ParsedMetric, ParsedTableMetric, SymbolTag  # noqa: F401
+from .profiles import ProfileCache, ProfileCacheStats
 from .pysnmp_types import ObjectIdentity, ObjectType, noSuchInstance, noSuchObject
 from .utils import (
     OIDPrinter,
@@ -34,6 +38,7 @@ from .utils import (
     get_default_profiles,
     get_profile_definition,
     oid_pattern_specificity,
+    profile_digest,
     recursively_expand_base_profiles,
     transform_index,
 )
@@ -44,11 +49,31 @@ LOADER_TAG = 'loader:python'
 _MAX_FETCH_NUMBER = 10**6
 
 
+# The SNMP commands, named after the methods of `AsyncSnmpEngine`
+SNMP_GET = 'get'
+SNMP_GETNEXT = 'getnext'
+SNMP_BULK = 'bulk'
+
+
 def reply_invalid(oid):
     # type: (Any) -> bool
     return noSuchInstance.isSameTypeWith(oid) or noSuchObject.isSameTypeWith(oid)
 
 
+class DeviceCollection(object):
+    """
+    The outcome of the collection of a device, see `SnmpCheck._device_collection`.
+    """
+
+    __slots__ = ('error', 'results', 'tags')
+
+    def __init__(self, tags):
+        # type: (List[str]) -> None
+        self.error = None  # type: Optional[str]
+        self.results = None  # type: Optional[Dict[str, Dict[Tuple[str, ...], Any]]]
+        self.tags = tags
+
+
 class SnmpCheck(AgentCheck):
 
     SC_STATUS = 'snmp.can_check'
@@ -76,8 +101,14 @@ class SnmpCheck(AgentCheck):
             self.init_config.get('refresh_oids_cache_interval', InstanceConfig.DEFAULT_REFRESH_OIDS_CACHE_INTERVAL)
         )
 
+        self.profile_cache_telemetry = is_affirmative(self.init_config.get('profile_cache_telemetry', False))
+        # The cache is shared by all the check instances of the process, only count the lookups of this one
+        self._profile_cache_stats = ProfileCacheStats()
+
+        start_time = time.time()
         self.profiles = self._load_profiles()
         self.profiles_by_oid = self._get_profiles_mapping()
+        self._profiles_load_duration = time.time() - start_time
 
         self._config = self._build_config(self.instance)
 
@@ -124,7 +155,7 @@ class SnmpCheck(AgentCheck):
                 self.log.warning("Failed to expand base profiles in profile '%s': %s", name, exc)
                 continue
 
-            profiles[name] = {'definition': definition}
+            profiles[name] = {'definition': definition, 'digest': profile_digest(definition)}
 
         return profiles
 
@@ -163,6 +194,7 @@ class SnmpCheck(AgentCheck):
             profiles_by_oid=self.profiles_by_oid,
             loader=loader,
             logger=self.log,
+            profile_cache_stats=self._profile_cache_stats,
         )
 
     def _build_autodiscovery_config(self, source_instance, ip_address):
@@ -204,40 +236,69 @@ class SnmpCheck(AgentCheck):
         dict[oid/metric_name][row index] = value
         In case of scalar objects, the row index is just 0
         """
-        results = defaultdict(dict)  # type: DefaultDict[str, Dict[Tuple[str, ...], Any]]
+        return self._run_requests(self._fetch_results_requests(config))
+
+    async def fetch_results_async(
+        self,
+        engine,  # type: AsyncSnmpEngine
+        config,  # type: InstanceConfig
+    ):
+        # type: (...) -> Tuple[Dict[str, Dict[Tuple[str, ...], Any]], List[OID], Optional[str]]
+        """
+        Same as `fetch_results`, sending the requests with the asyncio engine.
+        """
+        return await self._run_requests_async(engine, self._fetch_results_requests(config))
+
+    def _fetch_results_requests(self, config):
+        # type: (InstanceConfig) -> Generator[List[Tuple[str, tuple]], List[Any], Tuple[Dict, List[OID], Optional[str]]]
+        """
+        Generate the requests of `fetch_results`, see `_run_requests`.
+        """
         enforce_constraints = config.enforce_constraints
         fetch_id = self._get_next_fetch_id()
 
-        all_binds, error = self.fetch_oids(
+        all_binds, error = yield from self._fetch_oids_requests(
             config,
             config.oid_config.scalar_oids,
             config.oid_config.next_oids,
             enforce_constraints=enforce_constraints,
             fetch_id=fetch_id,
         )
+
+        requests = []
         for oid in config.oid_config.bulk_oids:
-            try:
-                oid_object_type = oid.as_object_type()
-                self.log.debug(
-                    '[%s] Running SNMP command getBulk on OID %s',
-                    fetch_id,
-                    OIDPrinter((oid_object_type,), with_values=False),
-                )
-                binds = snmp_bulk(
-                    config,
-                    oid_object_type,
-                    self._NON_REPEATERS,
-                    self._MAX_REPETITIONS,
-                    enforce_constraints,
-                    self.ignore_nonincreasing_oid,
+            oid_object_type = oid.as_object_type()
+            self.log.debug(
+                '[%s] Running SNMP command getBulk on OID %s',
+                fetch_id,
+                OIDPrinter((oid_object_type,), with_values=False),
+            )
+            requests.append(
+                (
+                    SNMP_BULK,
+                    (
+                        config,
+                        oid_object_type,
+                        self._NON_REPEATERS,
+                        self._MAX_REPETITIONS,
+                        enforce_constraints,
+                        self.ignore_nonincreasing_oid,
+                    ),
                 )
+            )
+
+        for binds in (yield requests):
+            if isinstance(binds, Exception):
+                error = self._report_fetch_error(fetch_id, binds, error)
+            else:
                 all_binds.extend(binds)
-            except (PySnmpError, CheckException) as e:
-                message = '[{}] Failed to collect some metrics: {}'.format(fetch_id, e)
-                if not error:
-                    error = message
-                self.warning(message)
 
+        results, scalar_oids = self._build_results(config, all_binds, fetch_id)
+        return results, scalar_oids, error
+
+    def _build_results(self, config, all_binds, fetch_id):
+        # type: (InstanceConfig, List[Any], str) -> Tuple[Dict[str, Dict[Tuple[str, ...], Any]], List[OID]]
+        results = defaultdict(dict)  # type: DefaultDict[str, Dict[Tuple[str, ...], Any]]
         scalar_oids = []
         for result_oid, value in all_binds:
             oid = OID(result_oid)
@@ -247,10 +308,28 @@ class SnmpCheck(AgentCheck):
         self.log.debug('[%s] Raw results: %s', fetch_id, OIDPrinter(results, with_values=False))
         # Freeze the result
         results.default_factory = None  # type: ignore
-        return results, scalar_oids, error
+        return results, scalar_oids
+
+    def _report_fetch_error(self, fetch_id, exception, error):
+        # type: (str, Exception, Optional[str]) -> str
+        """
+        Warn about a failed SNMP command and return the first error of the fetch.
+        """
+        message = '[{}] Failed to collect some metrics: {}'.format(fetch_id, exception)
+        self.warning(message)
+        return error or message
 
     def fetch_oids(self, config, scalar_oids, next_oids, enforce_constraints, fetch_id):
         # type: (InstanceConfig, List[OID], List[OID], bool, str) -> Tuple[List[Any], Optional[str]]
+        return self._run_requests(
+            self._fetch_oids_requests(config, scalar_oids, next_oids, enforce_constraints, fetch_id)
+        )
+
+    def _fetch_oids_requests(self, config, scalar_oids, next_oids, enforce_constraints, fetch_id):
+        # type: (InstanceConfig, List[OID], List[OID], bool, str) -> Generator[List[Any], List[Any], Tuple]
+        """
+        Generate the requests of `fetch_oids`, see `_run_requests`.
+        """
         # UPDATE: We used to perform only a snmpgetnext command to fetch metric values.
         # It returns the wrong value when the OID passed is referring to a specific leaf.
         # For example:
@@ -262,69 +341,141 @@ class SnmpCheck(AgentCheck):
         next_oids = [oid.as_object_type() for oid in next_oids]
         all_binds = []
 
+        requests = []
         for oids_batch in batches(scalar_oids, size=self.oid_batch_size):
-            try:
-                self.log.debug(
-                    '[%s] Running SNMP command get on OIDS: %s', fetch_id, OIDPrinter(oids_batch, with_values=False)
-                )
+            self.log.debug(
+                '[%s] Running SNMP command get on OIDS: %s', fetch_id, OIDPrinter(oids_batch, with_values=False)
+            )
+            requests.append((SNMP_GET, (config, oids_batch, enforce_constraints)))
 
-                var_binds = snmp_get(config, oids_batch, lookup_mib=enforce_constraints)
+        for var_binds in (yield requests):
+            if isinstance(var_binds, Exception):
+                error = self._report_fetch_error(fetch_id, var_binds, error)
+            else:
                 self.log.debug('[%s] Returned vars: %s', fetch_id, OIDPrinter(var_binds, with_values=True))
+                self._split_get_results(var_binds, all_binds, next_oids)
 
-                missing_results = []
-
-                for var in var_binds:
-                    result_oid, value = var
-                    if reply_invalid(value):
-                        oid_tuple = result_oid.asTuple()
-                        missing_results.append(ObjectType(ObjectIdentity(oid_tuple)))
-                    else:
-                        all_binds.append(var)
-
-                if missing_results:
-                    # If we didn't catch the metric using snmpget, try snmpnext
-                    next_oids.extend(missing_results)
-
-            except (PySnmpError, CheckException) as e:
-                message = '[{}] Failed to collect some metrics: {}'.format(fetch_id, e)
-                if not error:
-                    error = message
-                self.warning(message)
-
+        requests = []
         for oids_batch in batches(next_oids, size=self.oid_batch_size):
-            try:
-                self.log.debug(
-                    '[%s] Running SNMP command getNext on OIDS: %s', fetch_id, OIDPrinter(oids_batch, with_values=False)
-                )
-                binds = list(
-                    snmp_getnext(
-                        config,
-                        oids_batch,
-                        lookup_mib=enforce_constraints,
-                        ignore_nonincreasing_oid=self.ignore_nonincreasing_oid,
-                    )
-                )
+            self.log.debug(
+                '[%s] Running SNMP command getNext on OIDS: %s', fetch_id, OIDPrinter(oids_batch, with_values=False)
+            )
+            requests.append((SNMP_GETNEXT, (config, oids_batch, enforce_constraints, self.ignore_nonincreasing_oid)))
+
+        for binds in (yield requests):
+            if isinstance(binds, Exception):
+                error = self._report_fetch_error(fetch_id, binds, error)
+            else:
                 self.log.debug('[%s] Returned vars: %s', fetch_id, OIDPrinter(binds, with_values=True))
                 all_binds.extend(binds)
 
-            except (PySnmpError, CheckException) as e:
-                message = '[{}] Failed to collect some metrics: {}'.format(fetch_id, e)
-                if not error:
-                    error = message
-                self.warning(message)
-
         return all_binds, error
 
+    @staticmethod
+    def _split_get_results(var_binds, all_binds, next_oids):
+        # type: (List[Any], List[Any], List[Any]) -> None
+        """
+        Add the results of a GET to `all_binds`, and the OIDs it didn't find to `next_oids`.
+        """
+        for var in var_binds:
+            result_oid, value = var
+            if reply_invalid(value):
+                # If we didn't catch the metric using snmpget, try snmpnext
+                oid_tuple = result_oid.asTuple()
+                next_oids.append(ObjectType(ObjectIdentity(oid_tuple)))
+            else:
+                all_binds.append(var)
+
     def fetch_sysobject_oid(self, config):
         # type: (InstanceConfig) -> str
         """Return the sysObjectID of the instance."""
+        return self._run_requests(self._fetch_sysobject_oid_requests(config))
+
+    async def fetch_sysobject_oid_async(self, engine, config):
+        # type: (AsyncSnmpEngine, InstanceConfig) -> str
+        """Return the sysObjectID of the instance, using the asyncio engine."""
+        return await self._run_requests_async(engine, self._fetch_sysobject_oid_requests(config))
+
+    def _fetch_sysobject_oid_requests(self, config):
+        # type: (InstanceConfig) -> Generator[List[Tuple[str, tuple]], List[Any], str]
         # Reference sysObjectID directly, see http://oidref.com/1.3.6.1.2.1.1.2
         oid = ObjectType(ObjectIdentity((1, 3, 6, 1, 2, 1, 1, 2, 0)))
         self.log.debug('Running SNMP command on OID: %s', OIDPrinter((oid,), with_values=False))
-        var_binds = snmp_get(config, [oid], lookup_mib=False)
+        (var_binds,) = yield [(SNMP_GET, (config, [oid], False))]
+        if isinstance(var_binds, Exception):
+            raise var_binds
         self.log.debug('Returned vars: %s', OIDPrinter(var_binds, with_values=True))
         return var_binds[0][1].prettyPrint()
 
+    @staticmethod
+    def _run_requests(requests):
+        # type: (Generator[List[Tuple[str, tuple]], List[Any], Any]) -> Any
+        """
+        Send the SNMP requests generated by `requests` one after the other, and return its result.
+
+        The generator yields lists of (command, arguments) requests, and is sent back the var binds of each request,
+        or the `PySnmpError`/`CheckException` it raised, in the same order.
+        """
+        # Looked up on each call rather than once at import time, so that they can be mocked
+        commands = {SNMP_GET: snmp_get, SNMP_GETNEXT: snmp_getnext, SNMP_BULK: snmp_bulk}
+        try:
+            batch = next(requests)
+            while True:
+                responses = []  # type: List[Any]
+                for command, args in batch:
+                    try:
+                        responses.append(list(commands[command](*args)))
+                    except (PySnmpError, CheckException) as e:
+                        responses.append(e)
+                batch = requests.send(responses)
+        except StopIteration as e:
+            return e.value
+
+    @staticmethod
+    async def _run_requests_async(engine, requests):
+        # type: (AsyncSnmpEngine, Generator[List[Tuple[str, tuple]], List[Any], Any]) -> Any
+        """
+        Same as `_run_requests`, sending the requests of each batch concurrently with the asyncio engine, up to the
+        in-flight limit of the device.
+        """
+        try:
+            batch = next(requests)
+            while True:
+                responses = await asyncio.gather(
+                    *(getattr(engine, command)(*args) for command, args in batch), return_exceptions=True
+                )
+                for response in responses:
+                    if isinstance(response, BaseException) and not isinstance(response, (PySnmpError, CheckException)):
+                        raise response
+                batch = requests.send(responses)
+        except StopIteration as e:
+            return e.value
+
+    def fetch_sysobject_oids(self, configs):
+        # type: (List[InstanceConfig]) -> List[Any]
+        """
+        Return the sysObjectID of each instance, or the exception raised while fetching it, querying all the
+        instances concurrently with the asyncio engine.
+        """
+
+        async def fetch():
+            engine = self._create_async_engine()
+            try:
+                return await asyncio.gather(
+                    *(self.fetch_sysobject_oid_async(engine, config) for config in configs), return_exceptions=True
+                )
+            finally:
+                await engine.close()
+
+        return asyncio.run(fetch())
+
+    def _create_async_engine(self):
+        # type: () -> AsyncSnmpEngine
+        return AsyncSnmpEngine(
+            sockets=self._config.async_engine_sockets,
+            max_inflight_per_device=self._config.max_inflight_requests_per_device,
+        )
+
     def _profile_for_sysobject_oid(self, sys_object_oid):
         # type: (str) -> str
         """
@@ -379,16 +530,19 @@ class SnmpCheck(AgentCheck):
             if self._thread is None:
                 self._start_discovery()
 
-            executor = self._executor
-            if executor is None:
-                raise RuntimeError("Expected executor be set")
+            if config.use_async_engine and config.supports_async_engine:
+                self._check_devices_async(list(config.discovered_instances.items()))
+            else:
+                executor = self._executor
+                if executor is None:
+                    raise RuntimeError("Expected executor be set")
 
-            sent = []
-            for host, discovered in list(config.discovered_instances.items()):
-                future = executor.submit(self._check_device, discovered)  # type: Any
-                sent.append(future)
-                future.add_done_callback(functools.partial(self._on_check_device_done, host))
-            futures.wait(sent)
+                sent = []
+                for host, discovered in list(config.discovered_instances.items()):
+                    future = executor.submit(self._check_device, discovered)  # type: Any
+                    sent.append(future)
+                    future.add_done_callback(functools.partial(self._on_check_device_done, host))
+                futures.wait(sent)
 
             tags = ['network:{}'.format(config.ip_network), 'autodiscovery_subnet:{}'.format(config.ip_network)]
             tags.extend(config.tags)
@@ -410,10 +564,38 @@ class SnmpCheck(AgentCheck):
         self.gauge('datadog.snmp.check_duration', check_duration, tags=telemetry_tags)
         self.gauge('datadog.snmp.submitted_metrics', self._submitted_metrics, tags=telemetry_tags)
 
+        if self.profile_cache_telemetry:
+            profile_cache_stats = self._profile_cache_stats
+            self.gauge('datadog.snmp.profiles_load_duration', self._profiles_load_duration, tags=telemetry_tags)
+            self.gauge('datadog.snmp.profile_cache.size', len(ProfileCache.shared_instance()), tags=telemetry_tags)
+            self.monotonic_count('datadog.snmp.profile_cache.hits', profile_cache_stats.hits, tags=telemetry_tags)
+            self.monotonic_count('datadog.snmp.profile_cache.misses', profile_cache_stats.misses, tags=telemetry_tags)
+
+    def _check_devices_async(self, devices):
+        # type: (List[Tuple[str, InstanceConfig]]) -> None
+        """
+        Collect all the discovered devices concurrently from the check's thread, multiplexing their
+        requests over the few sockets of an asyncio engine instead of using one worker per device.
+        """
+
+        async def check_devices():
+            engine = self._create_async_engine()
+            try:
+                return await asyncio.gather(*(self._check_device_async(engine, config) for _, config in devices))
+            finally:
+                await engine.close()
+
+        for (host, _), (error, _) in zip(devices, asyncio.run(check_devices())):
+            self._update_failing_instances(host, error)
+
     def _on_check_device_done(self, host, future):
         # type: (str, futures.Future) -> None
-        config = self._config
         error, _ = future.result()
+        self._update_failing_instances(host, error)
+
+    def _update_failing_instances(self, host, error):
+        # type: (str, Optional[str]) -> None
+        config = self._config
         if error:
             config.failing_instances[host] += 1
             if config.failing_instances[host] >= config.allowed_failures:
@@ -427,53 +609,89 @@ class SnmpCheck(AgentCheck):
 
     def _check_device(self, config):
         # type: (InstanceConfig) -> Tuple[Optional[str], List[str]]
-        # Reset errors
+        with self._device_collection(config) as collection:
+            if not config.oid_config.has_oids():
+                self._refresh_with_sysobject_oid(config, self.fetch_sysobject_oid(config))
+
+            if config.oid_config.has_oids():
+                self._prepare_fetch(config)
+                self._report_results(config, collection, self.fetch_results(config))
+        return collection.error, collection.tags
+
+    async def _check_device_async(self, engine, config):
+        # type: (AsyncSnmpEngine, InstanceConfig) -> Tuple[Optional[str], List[str]]
+        """
+        Same as `_check_device`, sending the requests with the asyncio engine.
+        """
+        with self._device_collection(config) as collection:
+            if not config.oid_config.has_oids():
+                self._refresh_with_sysobject_oid(config, await self.fetch_sysobject_oid_async(engine, config))
+
+            if config.oid_config.has_oids():
+                self._prepare_fetch(config)
+                self._report_results(config, collection, await self.fetch_results_async(engine, config))
+        return collection.error, collection.tags
+
+    @contextlib.contextmanager
+    def _device_collection(self, config):
+        # type: (InstanceConfig) -> Iterator[DeviceCollection]
+        """
+        Handle the errors raised while collecting a device in the `with` block, and report its status.
+        """
         if config.device is None:
             raise RuntimeError('No device set')  # pragma: no cover
 
-        instance = config.instance
-        error = results = None
-        tags = config.tags
+        collection = DeviceCollection(config.tags)
         if config.oid_config.should_reset():
             config.oid_config.reset()
         try:
-            if not config.oid_config.has_oids():
-                sys_object_oid = self.fetch_sysobject_oid(config)
-                profile = self._profile_for_sysobject_oid(sys_object_oid)
-                config.refresh_with_profile(self.profiles[profile])
-                config.add_profile_tag(profile)
-
-            if config.oid_config.has_oids():
-                self.log.debug('Querying %s', config.device)
-                config.add_uptime_metric()
-                results, scalar_oids, error = self.fetch_results(config)
-                config.oid_config.update_scalar_oids(scalar_oids)
-                tags = self.extract_metric_tags(config.parsed_metric_tags, results)
-                tags.extend(config.tags)
-                self.report_metrics(config.parsed_metrics, results, tags)
+            yield collection
         except CheckException as e:
-            error = str(e)
-            self.warning(error)
+            collection.error = str(e)
+            self.warning(collection.error)
         except Exception as e:
-            if not error:
-                error = 'Failed to collect metrics for {} - {}'.format(self._get_instance_name(instance), e)
-            self.log.debug(error, exc_info=True)
-            self.warning(error)
+            if not collection.error:
+                collection.error = 'Failed to collect metrics for {} - {}'.format(
+                    self._get_instance_name(config.instance), e
+                )
+            self.log.debug(collection.error, exc_info=True)
+            self.warning(collection.error)
         finally:
-            # At this point, `tags` might include some extra tags added in try clause
-
-            # Sending `snmp.devices_monitored` with value 1 will allow users to count devices
-            # by using `sum by {X}` queries in UI. X being a tag like `autodiscovery_subnet`, `snmp_profile`, etc
-            self.gauge('snmp.devices_monitored', 1, tags=tags + [LOADER_TAG])
-
-            # Report service checks
-            status = self.OK
-            if error:
-                status = self.CRITICAL
-                if results:
-                    status = self.WARNING
-            self.service_check(self.SC_STATUS, status, tags=tags, message=error)
-        return error, tags
+            # At this point, `tags` might include some extra tags added in the `with` block
+            self._report_device_status(collection.tags, collection.error, collection.results)
+
+    def _refresh_with_sysobject_oid(self, config, sys_object_oid):
+        # type: (InstanceConfig, str) -> None
+        profile = self._profile_for_sysobject_oid(sys_object_oid)
+        config.refresh_with_profile(self.profiles[profile])
+        config.add_profile_tag(profile)
+
+    def _prepare_fetch(self, config):
+        # type: (InstanceConfig) -> None
+        self.log.debug('Querying %s', config.device)
+        config.add_uptime_metric()
+
+    def _report_results(self, config, collection, fetched):
+        # type: (InstanceConfig, DeviceCollection, Tuple[Dict, List[OID], Optional[str]]) -> None
+        collection.results, scalar_oids, collection.error = fetched
+        config.oid_config.update_scalar_oids(scalar_oids)
+        collection.tags = self.extract_metric_tags(config.parsed_metric_tags, collection.results)
+        collection.tags.extend(config.tags)
+        self.report_metrics(config.parsed_metrics, collection.results, collection.tags)
+
+    def _report_device_status(self, tags, error, results):
+        # type: (List[str], Optional[str], Optional[Dict[str, Dict[Tuple[str, ...], Any]]]) -> None
+        # Sending `snmp.devices_monitored` with value 1 will allow users to count devices
+        # by using `sum by {X}` queries in UI. X being a tag like `autodiscovery_subnet`, `snmp_profile`, etc
+        self.gauge('snmp.devices_monitored', 1, tags=tags + [LOADER_TAG])
+
+        # Report service checks
+        status = self.OK
+        if error:
+            status = self.CRITICAL
+            if results:
+                status = self.WARNING
+        self.service_check(self.SC_STATUS, status, tags=tags, message=error)
 
     def extract_metric_tags(self, metric_tags, results):
         # type: (List[SymbolTag], Dict[str, dict]) -> List[str]
@@ -1,11 +1,15 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
+import copy
+import hashlib
 import logging
 import os
+import threading
 from typing import Any, Dict, Iterator, List, Mapping, Optional, Pattern, Sequence, Tuple, Union  # noqa: F401
 
 import yaml
+from cachetools import LRUCache
 
 from .compat import get_config
 from .exceptions import CouldNotDecodeOID, SmiError, UnresolvedOID
@@ -84,12 +88,30 @@ def _resolve_definition_file(definition_file):
     return os.path.join(_get_profiles_site_root(), definition_file)
 
 
+# Content digest -> parsed definition, as base profiles are read again for each profile extending them. The least
+# recently used definitions are evicted, e.g. the previous contents of updated profiles.
+DEFINITION_CACHE_SIZE = 512
+_definitions_by_digest = LRUCache(maxsize=DEFINITION_CACHE_SIZE)  # type: LRUCache[str, Dict[str, Any]]
+_definitions_lock = threading.Lock()
+
+
 def _read_profile_definition(definition_file):
     # type: (str) -> Dict[str, Any]
     definition_file = _resolve_definition_file(definition_file)
 
-    with open(definition_file) as f:
-        return yaml.safe_load(f)
+    with open(definition_file, 'rb') as f:
+        content = f.read()
+
+    digest = hashlib.sha256(content).hexdigest()
+    with _definitions_lock:
+        definition = _definitions_by_digest.get(digest)
+    if definition is None:
+        definition = yaml.safe_load(content)
+        with _definitions_lock:
+            _definitions_by_digest[digest] = definition
+
+    # Definitions are updated in-place when expanding their base profiles
+    return copy.deepcopy(definition)
 
 
 def recursively_expand_base_profiles(definition):
@@ -116,6 +138,24 @@ def recursively_expand_base_profiles(definition):
         definition.setdefault('metric_tags', []).extend(base_definition.get('metric_tags', []))
 
 
+def _canonical_form(value):
+    # type: (Any) -> Any
+    if isinstance(value, dict):
+        # `repr` keeps the types of keys apart, e.g. for the `mapping` of metric tags
+        return sorted((repr(key), _canonical_form(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return [_canonical_form(item) for item in value]
+    return value
+
+
+def profile_digest(definition):
+    # type: (Dict[str, Any]) -> str
+    """
+    Return a digest of the content of a profile definition, regardless of the order of its keys.
+    """
+    return hashlib.sha256(repr(_canonical_form(definition)).encode('utf-8')).hexdigest()
+
+
 def _iter_default_profile_file_paths():
     # type: () -> Iterator[str]
 
@@ -164,7 +204,7 @@ def _load_default_profiles():
             logger.warning("Failed to expand base profiles in profile '%s': %s", name, exc)
             continue
 
-        profiles[name] = {'definition': definition}
+        profiles[name] = {'definition': definition, 'digest': profile_digest(definition)}
 
     return profiles
 
@@ -23,6 +23,7 @@ from .common import (
     SNMP_LISTENER_ENV,
     generate_container_instance_config,
 )
+from .fake_agent import FakeAgents
 
 # https://docs.pytest.org/en/latest/writing_plugins.html#assertion-rewriting
 pytest.register_assert_rewrite("tests.test_e2e_core_profiles.utils")
@@ -176,3 +177,10 @@ def create_datadog_conf_file(tmp_dir):
 @pytest.fixture
 def container_ip():
     return get_container_ip(SNMP_CONTAINER_NAME)
+
+
+@pytest.fixture
+def agents():
+    agents = FakeAgents()
+    yield agents
+    agents.stop()
@@ -0,0 +1,161 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+"""
+An in-process SNMP agent to test and benchmark the check against many devices without snmpsim.
+"""
+import asyncio
+import threading
+from concurrent import futures
+
+from pyasn1.codec.ber import decoder, encoder
+from pysnmp.proto import api
+from pysnmp.proto.api import v2c
+from pysnmp.proto.rfc1905 import endOfMibView, noSuchInstance
+
+from datadog_checks.snmp import SnmpCheck
+from datadog_checks.snmp.config import InstanceConfig
+from datadog_checks.snmp.mibs import MIBLoader
+
+SYS_OBJECT_ID = '1.3.6.1.2.1.1.2.0'
+IF_IN_OCTETS = '1.3.6.1.2.1.2.2.1.10'
+
+AGENT_VALUES = {
+    SYS_OBJECT_ID: v2c.ObjectIdentifier('1.3.6.1.4.1.8072.3.2.10'),
+    '1.3.6.1.2.1.1.3.0': v2c.TimeTicks(4200),
+    '1.3.6.1.2.1.4.24.6.0': v2c.Gauge32(12),
+}
+AGENT_VALUES.update({'{}.{}'.format(IF_IN_OCTETS, i): v2c.Counter32(i * 100) for i in range(1, 31)})
+
+LOADER = MIBLoader()
+
+METRICS = [
+    {'OID': '1.3.6.1.2.1.4.24.6.0', 'name': 'IAmAGauge32'},
+    {'MIB': 'IF-MIB', 'table': 'ifTable', 'symbols': ['ifInOctets'], 'metric_tags': [{'tag': 'interface', 'index': 1}]},
+]
+
+
+class FakeAgent(asyncio.DatagramProtocol):
+    """
+    A minimal SNMP v1/v2c agent serving a static MIB view, which can be told to drop some requests.
+    """
+
+    def __init__(self, values, drop=0, delay=0):
+        self.values = {v2c.ObjectIdentifier(oid): value for oid, value in values.items()}
+        self.oids = sorted(self.values)
+        self.drop = drop
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        self.requests += 1
+        if self.drop:
+            self.drop -= 1
+            return
+
+        if self.delay:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            asyncio.get_running_loop().call_later(self.delay, self.respond, data, address)
+        else:
+            self.respond(data, address)
+
+    def respond(self, data, address):
+        if self.delay:
+            self.in_flight -= 1
+
+        protocol_module = api.protoModules[int(api.decodeMessageVersion(data))]
+        message, _ = decoder.decode(data, asn1Spec=protocol_module.Message())
+        request = protocol_module.apiMessage.getPDU(message)
+        response = protocol_module.apiPDU.getResponse(request)
+        oids = [oid for oid, _ in protocol_module.apiPDU.getVarBinds(request)]
+
+        if request.isSameTypeWith(protocol_module.GetRequestPDU()):
+            var_binds = [(oid, self.values.get(oid, noSuchInstance)) for oid in oids]
+        elif request.isSameTypeWith(protocol_module.GetNextRequestPDU()):
+            var_binds = [self.next(oid) for oid in oids]
+        else:
+            var_binds = []
+            oid = oids[0]
+            for _ in range(int(v2c.apiBulkPDU.getMaxRepetitions(request))):
+                oid, value = self.next(oid)
+                var_binds.append((oid, value))
+                if value is endOfMibView:
+                    break
+
+        if protocol_module is not v2c and any(value in (noSuchInstance, endOfMibView) for _, value in var_binds):
+            # SNMP v1 agents report missing objects with a `noSuchName` error instead
+            protocol_module.apiPDU.setErrorStatus(response, 2)
+            protocol_module.apiPDU.setErrorIndex(response, 1)
+            var_binds = protocol_module.apiPDU.getVarBinds(request)
+
+        protocol_module.apiPDU.setVarBinds(response, var_binds)
+        protocol_module.apiMessage.setPDU(message, response)
+        self.transport.sendto(encoder.encode(message), address)
+
+    def next(self, oid):
+        for candidate in self.oids:
+            if candidate > oid:
+                return candidate, self.values[candidate]
+        return oid, endOfMibView
+
+
+class FakeAgents:
+    """
+    Serve fake agents on local ports from a background event loop, as the check runs its own loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def start(self, values=None, **kwargs):
+        async def start():
+            agent = FakeAgent(AGENT_VALUES if values is None else values, **kwargs)
+            transport, _ = await self.loop.create_datagram_endpoint(lambda: agent, local_addr=('127.0.0.1', 0))
+            return agent, transport.get_extra_info('sockname')[1]
+
+        return asyncio.run_coroutine_threadsafe(start(), self.loop).result()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def device_config(port, **options):
+    instance = {'ip_address': '127.0.0.1', 'port': port, 'community_string': 'public', 'metrics': METRICS}
+    instance.update(options)
+    return InstanceConfig(instance, loader=LOADER)
+
+
+def build_network_check(ports, use_async_engine):
+    instance = {
+        'network_address': '127.0.0.0/24',
+        'community_string': 'public',
+        'metrics': METRICS,
+        'use_async_engine': use_async_engine,
+    }
+    check = SnmpCheck('snmp', {}, [instance])
+    check._start_discovery = lambda: None
+    check._thread = True
+    check._executor = futures.ThreadPoolExecutor(max_workers=check._config.workers)
+    for port in ports:
+        # Each device gets its own MIB loader like in the check, as they are not thread safe
+        check._config.discovered_instances['127.0.0.1:{}'.format(port)] = check._build_config(
+            {
+                'ip_address': '127.0.0.1',
+                'port': port,
+                'community_string': 'public',
+                'metrics': METRICS,
+                'tags': ['port:{}'.format(port)],
+            }
+        )
+    return check
@@ -0,0 +1,154 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+import asyncio
+
+import pytest
+
+from datadog_checks.base.errors import CheckException
+from datadog_checks.snmp import SnmpCheck
+from datadog_checks.snmp.async_engine import AsyncSnmpEngine
+from datadog_checks.snmp.pysnmp_types import ObjectIdentity, ObjectType
+
+from . import common
+from .fake_agent import IF_IN_OCTETS, SYS_OBJECT_ID, build_network_check, device_config
+
+pytestmark = [pytest.mark.unit, common.snmp_integration_only]
+
+
+def run(engine, coroutine):
+    async def run_and_close():
+        try:
+            return await coroutine
+        finally:
+            await engine.close()
+
+    return asyncio.run(run_and_close())
+
+
+@pytest.mark.parametrize('snmp_version', [1, 2])
+def test_get(agents, snmp_version):
+    _, port = agents.start()
+    config = device_config(port, snmp_version=snmp_version)
+    engine = AsyncSnmpEngine()
+
+    oids = [ObjectType(ObjectIdentity(SYS_OBJECT_ID)), ObjectType(ObjectIdentity('1.3.6.1.2.1.4.24.6.0'))]
+    var_binds = run(engine, engine.get(config, oids, lookup_mib=False))
+
+    assert [(str(name), value.prettyPrint()) for name, value in var_binds] == [
+        (SYS_OBJECT_ID, '1.3.6.1.4.1.8072.3.2.10'),
+        ('1.3.6.1.2.1.4.24.6.0', '12'),
+    ]
+
+
+@pytest.mark.parametrize('snmp_version', [1, 2])
+def test_getnext(agents, snmp_version):
+    _, port = agents.start()
+    config = device_config(port, snmp_version=snmp_version)
+    engine = AsyncSnmpEngine()
+
+    var_binds = run(engine, engine.getnext(config, [ObjectType(ObjectIdentity(IF_IN_OCTETS))], True, False))
+
+    assert [int(value) for _, value in var_binds] == [i * 100 for i in range(1, 31)]
+
+
+def test_bulk(agents):
+    agent, port = agents.start()
+    config = device_config(port)
+    engine = AsyncSnmpEngine()
+
+    var_binds = run(engine, engine.bulk(config, ObjectType(ObjectIdentity(IF_IN_OCTETS)), 0, 10, True, False))
+
+    assert [int(value) for _, value in var_binds] == [i * 100 for i in range(1, 31)]
+    assert agent.requests == 4
+
+
+def test_retries(agents):
+    agent, port = agents.start(drop=2)
+    config = device_config(port, timeout=1, retries=2)
+    engine = AsyncSnmpEngine()
+
+    var_binds = run(engine, engine.get(config, [ObjectType(ObjectIdentity(SYS_OBJECT_ID))], lookup_mib=False))
+
+    assert len(var_binds) == 1
+    assert agent.requests == 3
+
+
+def test_timeout(agents):
+    agent, port = agents.start(drop=10)
+    config = device_config(port, timeout=1, retries=1)
+    engine = AsyncSnmpEngine()
+
+    with pytest.raises(CheckException, match='No SNMP response received before timeout'):
+        run(engine, engine.get(config, [ObjectType(ObjectIdentity(SYS_OBJECT_ID))], lookup_mib=False))
+    assert agent.requests == 2
+
+
+def test_max_inflight_per_device(agents):
+    agent, port = agents.start(delay=0.05)
+    config = device_config(port)
+    engine = AsyncSnmpEngine(max_inflight_per_device=3)
+
+    async def get_all():
+        oids = [ObjectType(ObjectIdentity(SYS_OBJECT_ID))]
+        return await asyncio.gather(*(engine.get(config, oids, lookup_mib=False) for _ in range(10)))
+
+    assert len(run(engine, get_all())) == 10
+    assert agent.max_in_flight == 3
+
+
+def submitted_metrics(aggregator):
+    return {
+        (metric.name, metric.value, tuple(sorted(metric.tags)))
+        for name in aggregator.metric_names
+        if not name.startswith('datadog.snmp')
+        for metric in aggregator.metrics(name)
+    }
+
+
+def test_check_same_results_as_thread_pool(aggregator, agents):
+    ports = [agents.start()[1] for _ in range(3)]
+
+    check = build_network_check(ports, use_async_engine=False)
+    check.check({})
+    expected = submitted_metrics(aggregator)
+    aggregator.reset()
+
+    check = build_network_check(ports, use_async_engine=True)
+    check.check({})
+
+    # 30 interfaces, the gauge, the uptime and `snmp.devices_monitored` for each device
+    assert len(expected) == 3 * 33 + 1
+    assert submitted_metrics(aggregator) == expected
+    aggregator.assert_service_check('snmp.can_check', status=SnmpCheck.OK, count=3)
+
+
+def test_check_removes_failing_devices(agents):
+    _, port = agents.start(drop=1000)
+    check = build_network_check([], use_async_engine=True)
+    check._config.discovered_instances['127.0.0.1:{}'.format(port)] = device_config(port, timeout=1, retries=0)
+
+    for _ in range(check._config.allowed_failures):
+        check.check({})
+
+    assert check._config.discovered_instances == {}
+
+
+def test_check_many_devices(aggregator, agents):
+    """
+    The requests of all the devices are in flight at the same time, instead of one device per worker.
+    """
+    agent, port = agents.start(delay=0.1)
+    check = build_network_check([], use_async_engine=True)
+    metrics = [{'OID': '1.3.6.1.2.1.4.24.6.0', 'name': 'IAmAGauge32'}]
+    for i in range(200):
+        check._config.discovered_instances['device-{}'.format(i)] = device_config(
+            port, metrics=metrics, tags=['device:{}'.format(i)]
+        )
+
+    check.check({})
+
+    aggregator.assert_service_check('snmp.can_check', status=SnmpCheck.OK, count=200)
+    aggregator.assert_metric('snmp.IAmAGauge32', count=200)
+    assert agent.requests == 200
+    assert agent.max_in_flight > check._config.workers
@@ -0,0 +1,47 @@
+# (C) Datadog, Inc. 2025-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+import pytest
+
+from . import common
+from .fake_agent import build_network_check
+
+pytestmark = [common.snmp_integration_only]
+
+# Each device of the thread pool owns a pysnmp engine, 1000 devices need minutes and gigabytes of memory per round
+DEVICES = 100
+AGENTS = 10
+
+# Seconds each fake agent waits before responding, like a device over the network
+LATENCY = 0.01
+
+METRICS = [
+    {'OID': '1.3.6.1.2.1.4.24.6.0', 'name': 'IAmAGauge32'},
+    {'MIB': 'IF-MIB', 'table': 'ifTable', 'symbols': ['ifInOctets'], 'metric_tags': [{'tag': 'interface', 'index': 1}]},
+]
+
+
+@pytest.mark.parametrize('use_async_engine', [False, True], ids=['thread_pool', 'async_engine'])
+def test_check_devices(benchmark, aggregator, agents, use_async_engine):
+    """
+    Collect 100 autodiscovered devices, each walking a table of 30 interfaces.
+    """
+    ports = [agents.start(delay=LATENCY)[1] for _ in range(AGENTS)]
+    check = build_network_check([], use_async_engine=use_async_engine)
+    for i in range(DEVICES):
+        port = ports[i % AGENTS]
+        check._config.discovered_instances['device-{}'.format(i)] = check._build_config(
+            {
+                'ip_address': '127.0.0.1',
+                'port': port,
+                'community_string': 'public',
+                'metrics': METRICS,
+                'tags': ['device:{}'.format(i)],
+            }
+        )
+
+    # Reset the aggregator before each round, which may be the only one with `--benchmark-disable`
+    benchmark.pedantic(check.check, args=({},), setup=aggregator.reset, rounds=3)
+
+    # The fake agents share the process with the check, so a loaded round may time out on a few devices
+    assert len(aggregator.service_checks('snmp.can_check')) == DEVICES
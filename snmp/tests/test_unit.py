@@ -13,18 +13,27 @@ from typing import Any, List  # noqa: F401
 import mock
 import pytest
 import yaml
+from cachetools import LRUCache
 
 from datadog_checks.base import ConfigurationError
 from datadog_checks.dev import temp_dir
 from datadog_checks.snmp import SnmpCheck
 from datadog_checks.snmp.config import InstanceConfig
 from datadog_checks.snmp.discovery import discover_instances
+from datadog_checks.snmp.exceptions import PySnmpError
+from datadog_checks.snmp.models import OID
 from datadog_checks.snmp.parsing import ParsedSymbolMetric, ParsedTableMetric
+from datadog_checks.snmp.profiles import UPTIME_OID, ProfileCache, ProfileCacheStats
+from datadog_checks.snmp.pysnmp_types import ObjectName, OctetString, noSuchInstance
 from datadog_checks.snmp.resolver import OIDTrie
+from datadog_checks.snmp.snmp import SNMP_GET, SNMP_GETNEXT
+from datadog_checks.snmp.types import OIDMatch
 from datadog_checks.snmp.utils import (
     _load_default_profiles,
+    _read_profile_definition,
     batches,
     oid_pattern_specificity,
+    profile_digest,
     recursively_expand_base_profiles,
 )
 
@@ -469,6 +478,164 @@ def test_profile_extends():
             }
 
 
+def test_read_profile_definition_copies():
+    profile = {'metrics': [{'MIB': 'TCP-MIB', 'symbol': 'tcpPassiveOpens'}]}
+
+    with temp_dir() as tmp:
+        profile_file = os.path.join(tmp, 'profile.yaml')
+        with open(profile_file, 'wb') as f:
+            f.write(yaml.safe_dump(profile))
+
+        definition = _read_profile_definition(profile_file)
+        definition['metrics'].append({'MIB': 'TCP-MIB', 'symbol': 'tcpActiveOpens'})
+
+        assert _read_profile_definition(profile_file) == profile
+
+
+def test_read_profile_definition_evicts_least_recently_used():
+    with temp_dir() as tmp:
+        profile_files = []
+        for symbol in ('tcpActiveOpens', 'tcpPassiveOpens'):
+            profile_file = os.path.join(tmp, '{}.yaml'.format(symbol))
+            with open(profile_file, 'wb') as f:
+                f.write(yaml.safe_dump({'metrics': [{'MIB': 'TCP-MIB', 'symbol': symbol}]}))
+            profile_files.append(profile_file)
+
+        definitions = LRUCache(maxsize=1)
+        with mock.patch('datadog_checks.snmp.utils._definitions_by_digest', definitions):
+            for profile_file in profile_files:
+                _read_profile_definition(profile_file)
+
+        assert len(definitions) == 1
+
+
+def test_devices_share_compiled_profile():
+    profile = {
+        'definition': {
+            'metrics': [
+                {'OID': '1.3.6.1.2.1.6.5.0', 'name': 'tcpActiveOpens'},
+                {
+                    'MIB': 'IF-MIB',
+                    'table': 'ifTable',
+                    'symbols': [{'OID': '1.3.6.1.2.1.2.2.1.14', 'name': 'ifInErrors'}],
+                    'metric_tags': [{'tag': 'interface', 'index': 1, 'mapping': {1: 'eth0'}}],
+                },
+            ],
+            'metric_tags': [{'OID': '1.3.6.1.2.1.1.5.0', 'symbol': 'sysName', 'tag': 'snmp_host'}],
+        }
+    }
+    profile_cache = ProfileCache()
+
+    configs = []
+    for ip_address in ('127.0.0.1', '127.0.0.2'):
+        config = InstanceConfig(
+            {'ip_address': ip_address, 'community_string': 'public'},
+            profiles_by_oid={'1.3.6.1.4.1.8072.3.2.10': 'profile'},
+            profile_cache=profile_cache,
+        )
+        config.refresh_with_profile(profile)
+        config.add_uptime_metric()
+        configs.append(config)
+
+    first, second = configs
+    assert (profile_cache.misses, profile_cache.hits, len(profile_cache)) == (1, 1, 1)
+    assert first.oid_config.scalar_oids is second.oid_config.scalar_oids
+    assert first.oid_config.next_oids is second.oid_config.next_oids
+    assert first.parsed_metrics is second.parsed_metrics
+    assert first.parsed_metric_tags is second.parsed_metric_tags
+    assert [str(oid) for oid in first.oid_config.scalar_oids] == [
+        '1.3.6.1.2.1.6.5.0',
+        '1.3.6.1.2.1.1.5.0',
+        str(UPTIME_OID),
+    ]
+    assert [metric.name for metric in first.parsed_metrics] == ['tcpActiveOpens', 'ifInErrors', 'sysUpTimeInstance']
+
+    # Each device resolves the names of the profile on its own
+    for config in configs:
+        assert config.resolve_oid(OID('1.3.6.1.2.1.2.2.1.14.1')) == OIDMatch('ifInErrors', ('eth0',))
+        assert config.resolve_oid(UPTIME_OID).name == 'sysUpTimeInstance'
+
+
+def test_compiled_profile_with_instance_metrics():
+    profile = {'definition': {'metrics': [{'OID': '1.3.6.1.2.1.6.5.0', 'name': 'tcpActiveOpens'}]}}
+    profile_cache = ProfileCache()
+
+    config = InstanceConfig(
+        {'ip_address': '127.0.0.1', 'community_string': 'public', 'metrics': [{'OID': '1.2.3', 'name': 'foo'}]},
+        profile_cache=profile_cache,
+    )
+    config.add_uptime_metric()
+    config.refresh_with_profile(profile)
+    config.refresh_with_profile(profile)
+
+    assert [str(oid) for oid in config.oid_config.scalar_oids] == [
+        '1.2.3',
+        str(UPTIME_OID),
+        '1.3.6.1.2.1.6.5.0',
+        '1.3.6.1.2.1.6.5.0',
+    ]
+    assert [metric.name for metric in config.parsed_metrics] == [
+        'foo',
+        'sysUpTimeInstance',
+        'tcpActiveOpens',
+        'tcpActiveOpens',
+    ]
+    # The shared plan is left untouched
+    assert [str(oid) for oid in profile_cache.get(profile, 0).plan.scalar_oids] == ['1.3.6.1.2.1.6.5.0']
+
+
+def test_profile_cache_keys():
+    profile_cache = ProfileCache()
+    definition = {'metrics': [{'OID': '1.3.6.1.2.1.6.5.0', 'name': 'tcpActiveOpens'}]}
+
+    compiled = profile_cache.get({'definition': definition}, 0)
+    assert profile_cache.get({'definition': copy.deepcopy(definition)}, 0) is compiled
+    assert profile_cache.get({'definition': definition, 'digest': profile_digest(definition)}, 0) is compiled
+    assert profile_cache.get({'definition': definition}, 10) is not compiled
+
+    definition['metrics'].append({'OID': '1.3.6.1.2.1.6.6.0', 'name': 'tcpPassiveOpens'})
+    assert len(profile_cache.get({'definition': definition}, 0).plan.scalar_oids) == 2
+    assert len(profile_cache) == 3
+
+
+def test_profile_cache_evicts_least_recently_used():
+    profile_cache = ProfileCache(max_size=2)
+    first = {'definition': {'metrics': [{'OID': '1.3.6.1.2.1.6.5.0', 'name': 'tcpActiveOpens'}]}}
+    second = {'definition': {'metrics': [{'OID': '1.3.6.1.2.1.6.6.0', 'name': 'tcpPassiveOpens'}]}}
+    third = {'definition': {'metrics': [{'OID': '1.3.6.1.2.1.6.7.0', 'name': 'tcpAttemptFails'}]}}
+
+    compiled = profile_cache.get(first, 0)
+    profile_cache.get(second, 0)
+    assert profile_cache.get(first, 0) is compiled
+    profile_cache.get(third, 0)
+
+    assert len(profile_cache) == 2
+    assert profile_cache.get(first, 0) is compiled
+    assert (profile_cache.hits, profile_cache.misses) == (2, 3)
+
+
+def test_profile_cache_stats_per_instance():
+    profile = {'definition': {'metrics': [{'OID': '1.3.6.1.2.1.6.5.0', 'name': 'tcpActiveOpens'}]}}
+    profile_cache = ProfileCache()
+
+    stats = []
+    for ip_address in ('127.0.0.1', '127.0.0.2'):
+        instance_stats = ProfileCacheStats()
+        config = InstanceConfig(
+            {'ip_address': ip_address, 'community_string': 'public'},
+            profiles_by_oid={'1.3.6.1.4.1.8072.3.2.10': 'profile'},
+            profile_cache=profile_cache,
+            profile_cache_stats=instance_stats,
+        )
+        config.refresh_with_profile(profile)
+        config.refresh_with_profile(profile)
+        stats.append(instance_stats)
+
+    # Only the lookups of each instance are counted, even though the cache is shared
+    assert [(s.hits, s.misses) for s in stats] == [(1, 1), (2, 0)]
+    assert (profile_cache.hits, profile_cache.misses) == (3, 1)
+
+
 def test_default_profiles():
     profile = {
         'metrics': [{'MIB': 'TCP-MIB', 'symbol': 'tcpPassiveOpens', 'forced_type': 'monotonic_count'}],
@@ -481,7 +648,7 @@ def test_default_profiles():
                 f.write(yaml.safe_dump(profile))
 
             profiles = _load_default_profiles()
-            assert profiles['profile'] == {'definition': profile}
+            assert profiles['profile'] == {'definition': profile, 'digest': profile_digest(profile)}
 
 
 def test_profile_override():
@@ -496,7 +663,7 @@ def test_profile_override():
                 f.write(yaml.safe_dump(profile))
 
             profiles = _load_default_profiles()
-            assert profiles['generic-device'] == {'definition': profile}
+            assert profiles['generic-device'] == {'definition': profile, 'digest': profile_digest(profile)}
 
 
 def test_user_profile_override():
@@ -521,7 +688,7 @@ def test_user_profile_override():
                 f.write(yaml.safe_dump(user_profile))
 
             profiles = _load_default_profiles()
-            assert profiles['generic-device'] == {'definition': user_profile}
+            assert profiles['generic-device'] == {'definition': user_profile, 'digest': profile_digest(user_profile)}
 
 
 def test_profile_extends_with_user_profiles():
@@ -654,6 +821,37 @@ def test_failed_to_collect_metrics():
     assert 'Failed to collect metrics for 127.0.0.123' in check.warnings[0]
 
 
+def test_fetch_oids_requests():
+    """
+    Both engines send the same requests, and a GET miss is retried with a GETNEXT.
+    """
+    config = InstanceConfig(
+        {"ip_address": "127.0.0.123", "community_string": "public", "metrics": [{"OID": "1.2.3", "name": "foo"}]}
+    )
+    check = SnmpCheck('snmp', {'oid_batch_size': 2}, [common.generate_instance_config([])])
+
+    requests = check._fetch_oids_requests(
+        config, [OID('1.2.3.0'), OID('1.2.4.0'), OID('1.2.5.0')], [OID('1.2.6')], True, 'fetch-id'
+    )
+
+    gets = next(requests)
+    assert [command for command, _ in gets] == [SNMP_GET, SNMP_GET]
+    assert [len(args[1]) for _, args in gets] == [2, 1]
+
+    found = (ObjectName('1.2.3.0'), OctetString('foo'))
+    getnexts = requests.send([[found, (ObjectName('1.2.4.0'), noSuchInstance)], PySnmpError('timeout')])
+    assert [command for command, _ in getnexts] == [SNMP_GETNEXT]
+    assert [len(args[1]) for _, args in getnexts] == [2]
+
+    with pytest.raises(StopIteration) as excinfo:
+        requests.send([[(ObjectName('1.2.6.1'), OctetString('bar'))]])
+
+    all_binds, error = excinfo.value.value
+    assert [(str(oid), str(value)) for oid, value in all_binds] == [('1.2.3.0', 'foo'), ('1.2.6.1', 'bar')]
+    assert error == '[fetch-id] Failed to collect some metrics: timeout'
+    assert check.warnings == [error]
+
+
 @pytest.mark.parametrize(
     "items, size, output",
     [
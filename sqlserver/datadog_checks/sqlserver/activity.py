@@ -9,7 +9,7 @@ import time
 
 from datadog_checks.base import is_affirmative
 from datadog_checks.base.utils.db.sql import compute_sql_signature
-from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding, obfuscate_sql_with_metadata
+from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding
 from datadog_checks.base.utils.serialization import json
 from datadog_checks.base.utils.tracking import tracked_method
 from datadog_checks.sqlserver.config import SQLServerConfig
@@ -288,7 +288,7 @@ class SqlserverActivity(DBMAsyncJob):
         if 'statement_text' not in row:
             return self._sanitize_row(row)
         try:
-            statement = obfuscate_sql_with_metadata(
+            statement = self._check.obfuscation_cache.obfuscate_sql_with_metadata(
                 row['statement_text'], self._config.obfuscator_options, replace_null_character=True
             )
             # sqlserver doesn't have a boolean data type so convert integer to boolean
@@ -299,7 +299,7 @@ class SqlserverActivity(DBMAsyncJob):
                     comments = list(set(comments + appended_comments))
             if row['is_proc'] and 'text' in row:
                 try:
-                    procedure_statement = obfuscate_sql_with_metadata(
+                    procedure_statement = self._check.obfuscation_cache.obfuscate_sql_with_metadata(
                         row['text'], self._config.obfuscator_options, replace_null_character=True
                     )
                     row['procedure_signature'] = compute_sql_signature(procedure_statement['query'])
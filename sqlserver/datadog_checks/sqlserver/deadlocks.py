@@ -6,7 +6,7 @@ import xml.etree.ElementTree as ET
 from time import time
 
 from datadog_checks.base.utils.db.sql import compute_sql_signature
-from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding, obfuscate_sql_with_metadata
+from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding
 from datadog_checks.base.utils.serialization import json
 from datadog_checks.base.utils.tracking import tracked_method
 from datadog_checks.sqlserver.config import SQLServerConfig
@@ -73,7 +73,7 @@ class Deadlocks(DBMAsyncJob):
 
     def obfuscate_no_except_wrapper(self, sql_text):
         try:
-            sql_text = obfuscate_sql_with_metadata(
+            sql_text = self._check.obfuscation_cache.obfuscate_sql_with_metadata(
                 sql_text, self._config.obfuscator_options, replace_null_character=True
             )['query']
         except Exception as e:
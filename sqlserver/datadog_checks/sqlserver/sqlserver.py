@@ -14,6 +14,7 @@ from datadog_checks.base import AgentCheck
 from datadog_checks.base.config import is_affirmative
 from datadog_checks.base.utils.db import QueryExecutor, QueryManager
 from datadog_checks.base.utils.db.utils import (
+    ObfuscationCache,
     default_json_event_encoding,
     resolve_db_host,
     tracked_query,
@@ -134,6 +135,8 @@ class SQLServer(AgentCheck):
         self.proc_type_mapping = {"gauge": self.gauge, "rate": self.rate, "histogram": self.histogram}
 
         # DBM
+        # Shared by all the DBM jobs
+        self.obfuscation_cache = ObfuscationCache()
         self.statement_metrics = SqlserverStatementMetrics(self, self._config)
         self.procedure_metrics = SqlserverProcedureMetrics(self, self._config)
         self.sql_metadata = SqlserverMetadata(self, self._config)
@@ -751,6 +754,7 @@ class SQLServer(AgentCheck):
                 self.sql_metadata.run_job_loop(self.tags)
                 self._schemas.run_job_loop(self.tags)
                 self.deadlocks.run_job_loop(self.tags)
+                self.obfuscation_cache.submit_metrics(self, 'sqlserver', **self.debug_stats_kwargs())
         else:
             self.log.debug("Skipping check")
 
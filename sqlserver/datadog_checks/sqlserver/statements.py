@@ -330,7 +330,7 @@ class SqlserverStatementMetrics(DBMAsyncJob):
             # Attempt to obfuscate SQL statement with metadata
             procedure_statement = None
             try:
-                statement = obfuscate_sql_with_metadata(
+                statement = self._check.obfuscation_cache.obfuscate_sql_with_metadata(
                     row['statement_text'], self._config.obfuscator_options, replace_null_character=True
                 )
                 comments, row['is_proc'], procedure_name = extract_sql_comments_and_procedure_name(row['text'])
@@ -356,7 +356,7 @@ class SqlserverStatementMetrics(DBMAsyncJob):
             procedure_content = None
             if row['is_proc']:
                 try:
-                    procedure_statement = obfuscate_sql_with_metadata(
+                    procedure_statement = self._check.obfuscation_cache.obfuscate_sql_with_metadata(
                         row['text'], self._config.obfuscator_options, replace_null_character=True
                     )
                     procedure_content = procedure_statement['query']
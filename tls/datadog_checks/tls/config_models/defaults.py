@@ -8,6 +8,10 @@
 #     ddev -x validate models -s <INTEGRATION_NAME>
 
 
+def shared_certificate_cache_telemetry():
+    return False
+
+
 def shared_fetch_intermediate_certs():
     return False
 
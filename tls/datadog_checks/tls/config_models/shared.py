@@ -26,6 +26,7 @@ class SharedConfig(BaseModel):
         frozen=True,
     )
     allowed_versions: Optional[tuple[str, ...]] = None
+    certificate_cache_telemetry: Optional[bool] = None
     fetch_intermediate_certs: Optional[bool] = None
     service: Optional[str] = None
 
@@ -101,9 +101,6 @@ class TLSCheck(AgentCheck):
         # Assign lazily since these aren't used by both collection methods
         self._validation_data = None
 
-        # Only fetch intermediate certs from the indicated URIs occasionally
-        self._intermediate_cert_uri_cache = {}
-
         # Only load intermediate certs once
         self._intermediate_cert_id_cache = set()
 
@@ -2,16 +2,14 @@
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
 import ssl
-from hashlib import sha256
 from struct import pack, unpack
 
-from cryptography.x509.base import load_der_x509_certificate
 from cryptography.x509.extensions import ExtensionNotFound
 from cryptography.x509.oid import AuthorityInformationAccessOID, ExtensionOID
 
 from datadog_checks.base import ConfigurationError, is_affirmative
 from datadog_checks.base.log import get_check_logger
-from datadog_checks.base.utils.time import get_timestamp
+from datadog_checks.base.utils.certificates import CacheStats, CertificateCache
 
 from .const import SERVICE_CHECK_CAN_CONNECT, SERVICE_CHECK_EXPIRATION, SERVICE_CHECK_VALIDATION
 
@@ -35,6 +33,12 @@ class TLSRemoteCheck(object):
             float(self.agent_check.instance.get('intermediate_cert_refresh_interval', 60))
             * 60
         )
+        self._certificate_cache_telemetry = is_affirmative(
+            self.agent_check.init_config.get('certificate_cache_telemetry', False)
+        )
+        # The cache is shared by all the check instances of the process, only count the lookups of this one
+        self._certificate_stats = CacheStats()
+        self._download_stats = CacheStats()
 
     def check(self):
         if not self.agent_check._server:
@@ -50,6 +54,22 @@ class TLSRemoteCheck(object):
         self.agent_check.validate_certificate(cert)
         self.agent_check.check_age(cert)
 
+        if self._certificate_cache_telemetry:
+            self.submit_certificate_cache_telemetry()
+
+    def submit_certificate_cache_telemetry(self):
+        tags = self.agent_check._tags
+        self.agent_check.monotonic_count('datadog.tls.certificate_cache.hits', self._certificate_stats.hits, tags=tags)
+        self.agent_check.monotonic_count(
+            'datadog.tls.certificate_cache.misses', self._certificate_stats.misses, tags=tags
+        )
+        self.agent_check.monotonic_count(
+            'datadog.tls.certificate_cache.download_hits', self._download_stats.hits, tags=tags
+        )
+        self.agent_check.monotonic_count(
+            'datadog.tls.certificate_cache.download_misses', self._download_stats.misses, tags=tags
+        )
+
     def _get_cert_and_protocol_version(self, sock):
         cert = None
         protocol_version = None
@@ -91,7 +111,7 @@ class TLSRemoteCheck(object):
         # Load https://cryptography.io/en/latest/x509/reference/#cryptography.x509.Certificate
         try:
             self.log.debug('Deserializing peer certificate')
-            cert = load_der_x509_certificate(der_cert)
+            cert, _ = CertificateCache.shared_instance().load_certificate(der_cert, stats=self._certificate_stats)
             self.log.debug('Deserialized peer certificate: %s', cert)
             return cert, protocol_version
         except Exception as e:
@@ -195,11 +215,15 @@ class TLSRemoteCheck(object):
 
         self.load_intermediate_certs(der_cert)
 
-    def load_intermediate_certs(self, der_cert):
+    def load_intermediate_certs(self, der_cert, visited_uris=None):
         # https://tools.ietf.org/html/rfc3280#section-4.2.2.1
         # https://tools.ietf.org/html/rfc5280#section-5.2.7
+        if visited_uris is None:
+            visited_uris = set()
+
+        cert_cache = CertificateCache.shared_instance()
         try:
-            cert = load_der_x509_certificate(der_cert)
+            cert, _ = cert_cache.load_certificate(der_cert, stats=self._certificate_stats)
         except Exception as e:
             self.log.error('Error while deserializing peer certificate to discover intermediate certificates: %s', e)
             return
@@ -219,28 +243,38 @@ class TLSRemoteCheck(object):
                 continue
 
             uri = access_description.access_location.value
-            if (
-                uri in self.agent_check._intermediate_cert_uri_cache
-                and get_timestamp() - self.agent_check._intermediate_cert_uri_cache[uri]
-                < self._intermediate_cert_refresh_interval
-            ):
+            if uri in visited_uris:
                 continue
+            visited_uris.add(uri)
 
-            # Assume HTTP for now
+            # Only fetch intermediate certs from the indicated URIs occasionally, the instances sharing a certificate
+            # authority share the downloads
             try:
-                response = self.agent_check.http.get(uri)  # SKIP_HTTP_VALIDATION
-                response.raise_for_status()
+                intermediate_cert = cert_cache.download(
+                    cert.issuer,
+                    uri,
+                    self._download_certificate,
+                    max_age=self._intermediate_cert_refresh_interval,
+                    stats=self._download_stats,
+                )
             except Exception as e:
                 self.log.error('Error fetching intermediate certificate from `%s`: %s', uri, e)
                 continue
-            else:
-                access_time = get_timestamp()
-                intermediate_cert = response.content
 
-            cert_id = sha256(intermediate_cert).digest()
+            try:
+                _, cert_id = cert_cache.load_certificate(intermediate_cert, stats=self._certificate_stats)
+            except Exception as e:
+                self.log.error('Error while deserializing intermediate certificate from `%s`: %s', uri, e)
+                continue
+
             if cert_id not in self.agent_check._intermediate_cert_id_cache:
                 self.agent_check.get_tls_context().load_verify_locations(cadata=intermediate_cert)
                 self.agent_check._intermediate_cert_id_cache.add(cert_id)
 
-            self.agent_check._intermediate_cert_uri_cache[uri] = access_time
-            self.load_intermediate_certs(intermediate_cert)
+            self.load_intermediate_certs(intermediate_cert, visited_uris)
+
+    def _download_certificate(self, uri):
+        # Assume HTTP for now
+        response = self.agent_check.http.get(uri)  # SKIP_HTTP_VALIDATION
+        response.raise_for_status()
+        return response.content
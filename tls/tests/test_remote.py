@@ -1,10 +1,13 @@
 # (C) Datadog, Inc. 2019-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import ssl
+
 import mock
 import pytest
 
 from datadog_checks.base import ConfigurationError
+from datadog_checks.base.utils.certificates import CertificateCache
 from datadog_checks.tls.const import (
     SERVICE_CHECK_CAN_CONNECT,
     SERVICE_CHECK_EXPIRATION,
@@ -14,6 +17,8 @@ from datadog_checks.tls.const import (
 from datadog_checks.tls.tls import TLSCheck
 from datadog_checks.tls.tls_remote import TLSRemoteCheck
 
+from .conftest import CA_CERT
+
 try:
     from unittest.mock import MagicMock, patch
 except ImportError:  # Python 2
@@ -104,6 +109,27 @@ def test_no_connect(aggregator, instance_remote_no_connect):
     aggregator.assert_all_metrics_covered()
 
 
+def test_certificate_cache_telemetry(aggregator, instance_remote_no_connect):
+    with open(CA_CERT) as f:
+        der_cert = ssl.PEM_cert_to_DER_cert(f.read())
+
+    cert_cache = CertificateCache()
+    c = TLSCheck('tls', {'certificate_cache_telemetry': True}, [instance_remote_no_connect])
+    other = TLSCheck('tls', {'certificate_cache_telemetry': True}, [instance_remote_no_connect])
+    with mock.patch.object(CertificateCache, 'shared_instance', return_value=cert_cache):
+        c.checker.load_intermediate_certs(der_cert)
+        other.checker.load_intermediate_certs(der_cert)
+        other.checker.load_intermediate_certs(der_cert)
+        c.check(None)
+
+    # Only the lookups of the instance are counted, even though the cache is shared
+    aggregator.assert_metric('datadog.tls.certificate_cache.hits', value=0, tags=c._tags, count=1)
+    aggregator.assert_metric('datadog.tls.certificate_cache.misses', value=1, tags=c._tags, count=1)
+    aggregator.assert_metric('datadog.tls.certificate_cache.download_hits', value=0, tags=c._tags, count=1)
+    aggregator.assert_metric('datadog.tls.certificate_cache.download_misses', value=0, tags=c._tags, count=1)
+    assert (cert_cache.certificate_stats.hits, cert_cache.certificate_stats.misses) == (2, 1)
+
+
 def test_no_connect_port_in_host(aggregator, instance_remote_no_connect_port_in_host):
     c = TLSCheck('tls', {}, [instance_remote_no_connect_port_in_host])
     c.check(None)